@@ -1,4 +1,12 @@
 """API 라우터 모듈"""
-from . import nodes, containers
+from . import (
+    nodes, containers, rounds, images, catalog, cleanse, shards, pipelines, drift, registry,
+    packages, deployments, monitor, events, alerts, commands, discovery,
+    provision, metrics, graph,
+)
 
-__all__ = ['nodes', 'containers']
+__all__ = [
+    'nodes', 'containers', 'rounds', 'images', 'catalog', 'cleanse', 'shards', 'pipelines',
+    'drift', 'registry', 'packages', 'deployments', 'monitor', 'events', 'alerts', 'commands',
+    'discovery', 'provision', 'metrics', 'graph',
+]
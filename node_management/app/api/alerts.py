@@ -0,0 +1,48 @@
+"""자원 임계치 알림 API 엔드포인트"""
+from typing import Optional
+from fastapi import APIRouter, Header
+from fastapi.responses import StreamingResponse
+from models.schemas import AlertRule, SiloThresholds
+from services import alert_service
+
+router = APIRouter(prefix="/api/alerts", tags=["alerts"])
+
+
+@router.get("")
+def get_alerts():
+    """대기/발생 중인 알림"""
+    return alert_service.get_alerts()
+
+
+@router.get("/stream")
+def stream_alerts(last_event_id: Optional[int] = Header(default=None)):
+    """알림 상태 전이 실시간 스트림 (SSE, Last-Event-ID 이후부터 재개)"""
+    return StreamingResponse(
+        alert_service.stream_transitions(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/rules")
+def list_rules(node_id: str = None):
+    """알림 규칙 목록 (node_id를 주면 그 사일로에 적용되는 규칙)"""
+    return alert_service.list_rules(node_id)
+
+
+@router.post("/rules")
+def add_rule(rule: AlertRule):
+    """알림 규칙 등록 (같은 id면 교체)"""
+    return alert_service.add_rule(rule)
+
+
+@router.delete("/rules/{rule_id}")
+def remove_rule(rule_id: str):
+    """알림 규칙 삭제"""
+    return alert_service.remove_rule(rule_id)
+
+
+@router.put("/thresholds/{node_id}")
+def set_thresholds(node_id: str, thresholds: SiloThresholds):
+    """사일로 cpu/mem/disk 임계치(%) 설정"""
+    return alert_service.set_thresholds(node_id, thresholds)
@@ -0,0 +1,36 @@
+"""사일로 데이터 카탈로그 API 엔드포인트"""
+from fastapi import APIRouter
+from services import catalog_service
+
+router = APIRouter(prefix="/api/catalog", tags=["catalog"])
+
+
+@router.post("/sync")
+def sync_all(full: bool = False):
+    """minio_url이 설정된 모든 사일로 동기화"""
+    return catalog_service.sync_all(full)
+
+
+@router.get("/stats")
+def get_all_stats():
+    """사일로별 데이터셋 통계 (인덱스 기준)"""
+    return catalog_service.get_stats()
+
+
+@router.post("/{node_id}/sync")
+def sync_node(node_id: str, full: bool = False):
+    """사일로 하나 동기화 (full=true면 etag가 같아도 Parquet 푸터를 다시 읽음)"""
+    return catalog_service.sync_node(node_id, full)
+
+
+@router.get("/{node_id}/stats")
+def get_node_stats(node_id: str):
+    """사일로 데이터셋 통계 (인덱스 기준)"""
+    stats = catalog_service.get_stats(node_id)
+    return stats[0] if stats else {"node_id": node_id, "buckets": 0, "objects": 0, "bytes": 0, "rows": 0, "synced_at": None}
+
+
+@router.get("/{node_id}/objects")
+def list_objects(node_id: str, bucket: str = None, prefix: str = "", limit: int = 100):
+    """인덱스에 저장된 객체 매니페스트 조회"""
+    return catalog_service.list_objects(node_id, bucket, prefix, limit)
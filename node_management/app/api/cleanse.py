@@ -0,0 +1,24 @@
+"""데이터 정제 API 엔드포인트"""
+from fastapi import APIRouter
+from models.schemas import CleanseRequest
+from services import cleansing_service
+
+router = APIRouter(prefix="/api/cleanse", tags=["cleanse"])
+
+
+@router.post("")
+def start_cleanse(request: CleanseRequest):
+    """정제 작업 시작 (백그라운드)"""
+    return cleansing_service.start_cleanse(request)
+
+
+@router.get("")
+def list_jobs():
+    """정제 작업 목록"""
+    return cleansing_service.list_jobs()
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    """정제 진행률과 처리 속도(rows/sec) 조회"""
+    return cleansing_service.get_job(job_id)
@@ -0,0 +1,43 @@
+"""원격 명령 실행 API 엔드포인트"""
+from typing import Optional
+from fastapi import APIRouter, Header
+from fastapi.responses import StreamingResponse
+from models.schemas import CommandRun
+from services import command_service
+
+router = APIRouter(prefix="/api/commands", tags=["commands"])
+
+
+@router.post("")
+def start_command(request: CommandRun):
+    """여러 사일로 컨테이너에서 명령 동시 실행 (docker exec)"""
+    return command_service.start_command(request)
+
+
+@router.get("")
+def list_jobs():
+    """명령 실행 작업 목록"""
+    return command_service.list_jobs()
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    """실행 상태와 대상별 종료 코드"""
+    return command_service.get_job(job_id)
+
+
+@router.get("/{job_id}/output")
+def get_output(job_id: str, target: str = None):
+    """대상별 stdout/stderr (target: 'node_id/container')"""
+    return command_service.get_output(job_id, target)
+
+
+@router.get("/{job_id}/events")
+def stream_events(job_id: str, last_event_id: Optional[int] = Header(default=None)):
+    """대상별 stdout/stderr/종료 이벤트 스트림 (SSE, Last-Event-ID 이후부터 재개)"""
+    events = command_service.stream_events(job_id, -1 if last_event_id is None else last_event_id)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,16 +1,49 @@
 """컨테이너 관리 API 엔드포인트"""
-from fastapi import APIRouter
+import hashlib
+import json
+import time
+from fastapi import APIRouter, Request, Response
+from api.responses import etag_matches, make_etag, not_modified, set_etag
+from config.settings import ETAG_MAX_AGE_SEC
 from models.schemas import ContainerAction
+from services import coalesce_service, event_service, graph_service, node_registry
 from services.docker_service import get_docker_client
 
 router = APIRouter(prefix="/api/containers", tags=["containers"])
 
 
+def _generation_name(node_id: str, all: bool) -> str:
+    return f"containers:{node_id}:{all}"
+
+
+def _containers_etag(node_id: str, all: bool) -> tuple:
+    """(ETag, 마지막 관측 시각). 노드 설정이 바뀌어도 달라짐"""
+    generation, observed_at = node_registry.generation(_generation_name(node_id, all))
+    return make_etag("containers", node_registry.epoch(), node_registry.version(), generation), observed_at
+
+
 @router.get("")
-def list_containers(node_id: str, all: bool = True):
+def list_containers(request: Request, response: Response, node_id: str, all: bool = True):
     """
-    특정 노드의 컨테이너 목록 조회
+    특정 노드의 컨테이너 목록 조회 (동시 요청은 한 번의 조회 결과를 공유)
+
+    마지막 조회가 ETAG_MAX_AGE_SEC 안이고 If-None-Match가 현재 ETag와 같으면 Docker 조회
+    없이 304로 응답한다.
     """
+    etag, observed_at = _containers_etag(node_id, all)
+    if etag_matches(request, etag) and time.time() - observed_at < ETAG_MAX_AGE_SEC:
+        return not_modified(etag)
+    containers, meta = coalesce_service.fetch(f"containers:{node_id}:{all}", lambda: _list_containers(node_id, all))
+    etag, _ = _containers_etag(node_id, all)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    coalesce_service.set_headers(response, meta)
+    set_etag(response, etag)
+    return containers
+
+
+def _list_containers(node_id: str, all: bool) -> list:
+    started_at = time.time()
     client = get_docker_client(node_id)
     containers = client.containers.list(all=all)
 
@@ -37,14 +70,26 @@ def list_containers(node_id: str, all: bool = True):
                 "ports": ", ".join(ports),
             }
         )
+    # 목록이 직전 조회와 다를 때만 세대 번호 증가
+    digest = hashlib.sha1(json.dumps(result, sort_keys=True).encode("utf-8")).hexdigest()
+    node_registry.observe(_generation_name(node_id, all), digest, started_at)
     return result
 
 
+def _invalidate(node_id: str):
+    """컨테이너 상태 변경 후 캐시 삭제, 세대 번호 증가, 그래프 재조회 표시"""
+    coalesce_service.invalidate(f"containers:{node_id}:")
+    node_registry.bump(_generation_name(node_id, True), _generation_name(node_id, False))
+    graph_service.invalidate(node_id)
+
+
 @router.post("/start")
 def start_container(action: ContainerAction):
     client = get_docker_client(action.node_id)
     container = client.containers.get(action.container_id)
     container.start()
+    event_service.log("client", f"컨테이너 {container.name} 시작", node_id=action.node_id, source="containers")
+    _invalidate(action.node_id)
     return {"ok": True}
 
 
@@ -53,6 +98,8 @@ def stop_container(action: ContainerAction):
     client = get_docker_client(action.node_id)
     container = client.containers.get(action.container_id)
     container.stop()
+    event_service.log("client", f"컨테이너 {container.name} 중지", node_id=action.node_id, source="containers")
+    _invalidate(action.node_id)
     return {"ok": True}
 
 
@@ -61,5 +108,7 @@ def restart_container(action: ContainerAction):
     client = get_docker_client(action.node_id)
     container = client.containers.get(action.container_id)
     container.restart()
+    event_service.log("client", f"컨테이너 {container.name} 재시작", node_id=action.node_id, source="containers")
+    _invalidate(action.node_id)
     return {"ok": True}
 
@@ -0,0 +1,30 @@
+"""모델 배포 API 엔드포인트"""
+from fastapi import APIRouter
+from models.schemas import DeployRequest
+from services import deploy_service
+
+router = APIRouter(prefix="/api/deployments", tags=["deployments"])
+
+
+@router.post("")
+def start_deployment(request: DeployRequest):
+    """서빙 이미지를 사일로들에 웨이브 단위로 배포 (백그라운드)"""
+    return deploy_service.start_deployment(request)
+
+
+@router.get("")
+def list_deployments():
+    """배포 목록"""
+    return deploy_service.list_deployments()
+
+
+@router.get("/{deployment_id}")
+def get_deployment(deployment_id: str):
+    """배포 진행 상태와 사일로별 소요 시간"""
+    return deploy_service.get_deployment(deployment_id)
+
+
+@router.post("/{deployment_id}/rollback")
+def rollback_deployment(deployment_id: str):
+    """완료된 배포를 이전 서빙 컨테이너로 롤백"""
+    return deploy_service.rollback_deployment(deployment_id)
@@ -0,0 +1,30 @@
+"""사일로 자동 탐색 API 엔드포인트"""
+from fastapi import APIRouter
+from models.schemas import DiscoveryRegister, DiscoveryScan
+from services import discovery_service
+
+router = APIRouter(prefix="/api/discovery", tags=["discovery"])
+
+
+@router.post("/scans")
+def start_scan(request: DiscoveryScan):
+    """CIDR/포트 범위에서 Docker 데몬 탐색 시작 (auto_register=true면 끝난 뒤 일괄 등록)"""
+    return discovery_service.start_scan(request)
+
+
+@router.get("/scans")
+def list_scans():
+    """탐색 작업 목록"""
+    return discovery_service.list_jobs()
+
+
+@router.get("/scans/{job_id}")
+def get_scan(job_id: str):
+    """탐색 진행 상황과 찾은 Docker 데몬"""
+    return discovery_service.get_job(job_id)
+
+
+@router.post("/scans/{job_id}/register")
+def register_found(job_id: str, request: DiscoveryRegister = None):
+    """찾은 데몬 중 미등록인 것을 한 번에 등록"""
+    return discovery_service.register(job_id, request.base_urls if request else None)
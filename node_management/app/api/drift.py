@@ -0,0 +1,36 @@
+"""데이터 드리프트 API 엔드포인트"""
+from fastapi import APIRouter
+from models.schemas import DriftObserve, DriftSketches
+from services import drift_service
+
+router = APIRouter(prefix="/api/drift", tags=["drift"])
+
+
+@router.get("")
+def get_drift():
+    """전체 사일로 병합 드리프트와 사일로별 드리프트"""
+    return drift_service.get_drift()
+
+
+@router.get("/{node_id}")
+def get_node_drift(node_id: str):
+    """사일로 하나의 피처별 드리프트 (PSI/KS)"""
+    return drift_service.get_drift(node_id)
+
+
+@router.post("/{node_id}/observe")
+def observe(node_id: str, request: DriftObserve):
+    """사일로 데이터 배치로 스케치 갱신"""
+    return drift_service.observe(node_id, request.uri, request.window, request.columns)
+
+
+@router.post("/{node_id}/sketches")
+def merge_sketches(node_id: str, request: DriftSketches):
+    """사일로가 보낸 스케치 병합 (원본 데이터 전송 없음)"""
+    return drift_service.merge_sketches(node_id, request.window, request.sketches)
+
+
+@router.post("/{node_id}/reference")
+def promote_reference(node_id: str):
+    """현재 구간을 기준 구간으로 지정"""
+    return drift_service.promote_reference(node_id)
@@ -0,0 +1,42 @@
+"""이벤트 로그 API 엔드포인트"""
+from typing import List, Optional
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+from services import event_service
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+
+@router.get("")
+def query_events(
+    kind: Optional[List[str]] = Query(default=None),
+    node_id: str = None,
+    scope: str = None,
+    since: float = None,
+    until: float = None,
+    cursor: int = None,
+    limit: int = 100,
+):
+    """이벤트 조회 (최신순, next_cursor로 이전 페이지 조회)"""
+    return event_service.query(kind, node_id, scope, since, until, cursor, limit)
+
+
+@router.get("/stream")
+def stream_events(
+    kind: Optional[List[str]] = Query(default=None),
+    node_id: str = None,
+    scope: str = None,
+    last_event_id: Optional[int] = Header(default=None),
+):
+    """새 이벤트 실시간 스트림 (SSE, Last-Event-ID 이후부터 재개)"""
+    return StreamingResponse(
+        event_service.tail(kind, node_id, scope, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/prune")
+def prune_events():
+    """보관 정책을 넘은 이벤트 즉시 정리"""
+    return event_service.prune()
@@ -0,0 +1,34 @@
+"""토폴로지 그래프 API 엔드포인트"""
+from fastapi import APIRouter
+from models.schemas import GraphPositionReset, GraphPositions
+from services import graph_service
+
+router = APIRouter(prefix="/api/graph", tags=["graph"])
+
+
+def _split(value: str) -> list:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+@router.get("")
+def get_graph(nodes: str = None, detail: str = "auto", expand: str = None, since: int = None,
+              instance: str = None):
+    """노드 -> 컨테이너 -> 네트워크/이미지 그래프
+
+    nodes는 보여줄 노드 id 목록(쉼표 구분, 생략하면 전체), detail은 nodes/auto/full,
+    expand는 auto에서도 접지 않을 노드 id 목록. 이전 응답의 revision과 instance를 since/instance로
+    보내면 그 이후 바뀐 요소(upsert)와 지운 요소 id(remove)만 돌려준다.
+    """
+    return graph_service.get_graph(_split(nodes), detail, _split(expand), since, instance)
+
+
+@router.post("/positions")
+def save_positions(request: GraphPositions):
+    """옮긴 요소 위치 저장"""
+    return graph_service.save_positions(request.positions)
+
+
+@router.post("/positions/reset")
+def reset_positions(request: GraphPositionReset):
+    """저장한 위치를 지우고 처음 배정한 위치로"""
+    return graph_service.reset_positions(request.ids)
@@ -0,0 +1,24 @@
+"""이미지 배포 API 엔드포인트"""
+from fastapi import APIRouter
+from models.schemas import ImageDistribute
+from services import image_service
+
+router = APIRouter(prefix="/api/images", tags=["images"])
+
+
+@router.post("/distribute")
+def distribute_image(request: ImageDistribute):
+    """중앙 서버에서 한 번 pull 후 노드들에 이미지 배포 (백그라운드)"""
+    return image_service.distribute_image(request.image, request.node_ids, request.max_parallel)
+
+
+@router.get("/jobs")
+def list_jobs():
+    """이미지 배포 작업 목록"""
+    return image_service.list_jobs()
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """이미지 배포 작업의 노드별 진행 상태"""
+    return image_service.get_job(job_id)
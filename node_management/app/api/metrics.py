@@ -0,0 +1,69 @@
+"""계측 지표/프로파일 API 엔드포인트"""
+import time
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from config.settings import PROFILE_INTERVAL_MS
+from services import telemetry_service
+
+# Prometheus 스크레이프 경로는 관례대로 /metrics
+router = APIRouter(tags=["metrics"])
+
+_PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class RequestMetricsMiddleware:
+    """라우트 템플릿(/api/nodes/{node_id})별 요청 처리 시간 기록"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+        root_path = scope.get("root_path", "")
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # 라우팅이 끝나면 scope에 매칭된 라우트(마운트는 root_path)가 들어 있음
+            # 경로 값 대신 템플릿으로 라벨 수 제한
+            route = getattr(scope.get("route"), "path", None)
+            if route is None:
+                mounted = scope.get("root_path", "")
+                route = mounted if mounted != root_path else "unmatched"
+            telemetry_service.observe(
+                telemetry_service.REQUEST_METRIC, time.perf_counter() - started,
+                method=scope["method"], route=route, status=f"{status // 100}xx",
+            )
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus 형식 지표 (모든 워커 합산, 종료된 워커의 누적 값 포함)"""
+    return PlainTextResponse(telemetry_service.render(), media_type=_PROMETHEUS_CONTENT_TYPE)
+
+
+@router.post("/api/admin/profile")
+def capture_profile(seconds: float = 10, interval_ms: float = PROFILE_INTERVAL_MS, idle: bool = False,
+                    format: str = "folded"):
+    """실행 중인 워커의 스택을 seconds 동안 표본 추출
+
+    format=folded면 flamegraph.pl / speedscope에 바로 넣을 수 있는 텍스트, json이면 스택별 횟수.
+    워커가 여러 개면 이 요청을 받은 워커만 수집한다 (응답의 worker).
+    """
+    report = telemetry_service.profile(seconds, interval_ms, idle)
+    if format == "json":
+        return report
+    return PlainTextResponse(
+        telemetry_service.folded(report),
+        headers={"X-Profile-Worker": report["worker"], "X-Profile-Samples": str(report["samples"])},
+    )
@@ -0,0 +1,29 @@
+"""추론 처리량/지연 시간 모니터링 API 엔드포인트"""
+from fastapi import APIRouter
+from services import monitor_service
+
+router = APIRouter(prefix="/api/monitor", tags=["monitor"])
+
+
+@router.get("/series")
+def get_series(silo: str = monitor_service.ALL_SILOS, limit: int = None):
+    """처리량(req/s)과 p50/p95/p99 지연 시간(ms) 시계열"""
+    return monitor_service.get_series(silo, limit)
+
+
+@router.get("/rounds")
+def get_rounds():
+    """라운드별 처리량과 지연 백분위수"""
+    return monitor_service.get_rounds()
+
+
+@router.get("/status")
+def get_status():
+    """사일로별 마지막 수집 상태"""
+    return monitor_service.get_status()
+
+
+@router.post("/scrape")
+def scrape():
+    """즉시 한 번 수집"""
+    return monitor_service.scrape_once()
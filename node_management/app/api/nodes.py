@@ -1,112 +1,245 @@
 """서버 관리 API 엔드포인트"""
-from fastapi import APIRouter, HTTPException
-from datetime import datetime
-import docker
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import APIRouter, HTTPException, Request, Response
+from api.responses import etag_matches, make_etag, not_modified, set_etag
+from config.settings import ETAG_MAX_AGE_SEC, NODE_PAGE_MAX, NODE_PAGE_SIZE, ROUND_PROBE_WORKERS
 from models.schemas import ServerConfig
-from services.docker_service import get_docker_client, get_docker_hosts, refresh_docker_hosts
-from config.server_manager import load_servers, save_servers
+from services.docker_service import get_docker_client, get_docker_hosts, probe_node, refresh_docker_hosts
+from services import circuit_breaker, coalesce_service, event_service, node_registry, resource_service
 
 router = APIRouter(prefix="/api/nodes", tags=["nodes"])
 
 
+# 응답에 고를 수 있는 필드 (fields=id,label,labels 처럼 지정)
+_NODE_FIELDS = ("id", "label", "base_url", "type", "role", "tls", "minio_url", "disk_gb", "labels")
+_STATUS_FIELDS = _NODE_FIELDS + ("status", "latency_ms", "last_check", "breaker", "error")
+
+
+def _node_entry(node_id: str, info: dict) -> dict:
+    return {
+        "id": node_id,
+        "label": info.get("label", node_id),
+        "base_url": info.get("base_url", ""),
+        "type": info.get("type", "remote"),
+        "role": info.get("role", "client"),
+        "tls": info.get("tls", False),
+        "minio_url": info.get("minio_url"),
+        "disk_gb": info.get("disk_gb"),
+        "labels": info.get("labels", {}),
+    }
+
+
+def _parse_fields(fields: str, allowed: tuple):
+    """요청한 필드 목록 (id는 항상 포함). 지정하지 않으면 None"""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 필드: {', '.join(unknown)}")
+    return ["id"] + [name for name in names if name != "id"]
+
+
+def _project(entries: list, names) -> list:
+    if names is None:
+        return entries
+    return [{name: entry[name] for name in names if name in entry} for entry in entries]
+
+
+def _page(selector: str, sort: str, cursor: str, limit: int) -> tuple:
+    """라벨 선택자/정렬/커서로 노드 한 페이지 조회 -> ([(node_id, info)], next_cursor)"""
+    limit = max(1, min(limit, NODE_PAGE_MAX))
+    try:
+        return node_registry.query(
+            node_registry.parse_selector(selector), sort.lstrip("-"), sort.startswith("-"), cursor, limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _set_cursor(response: Response, next_cursor: str):
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+
+def _config_etag() -> str:
+    """노드 설정 버전 기반 ETag"""
+    return make_etag("nodes", node_registry.epoch(), node_registry.version())
+
+
+def _status_etag() -> str:
+    """노드 설정 버전 + 상태 세대 기반 ETag (지연 시간/확인 시각만 바뀐 경우는 같은 값)"""
+    health_generation, _ = node_registry.generation(node_registry.HEALTH_GENERATION)
+    return make_etag("status", node_registry.epoch(), node_registry.version(), health_generation)
+
+
+def _not_modified_page(etag: str, next_cursor: str) -> Response:
+    response = not_modified(etag)
+    _set_cursor(response, next_cursor)
+    return response
+
+
 @router.get("")
-def list_nodes():
-    """서버 목록 조회"""
-    refresh_docker_hosts()
-    hosts = get_docker_hosts()
-    return [
-        {"id": node_id, "label": info.get("label", node_id)}
-        for node_id, info in hosts.items()
-    ]
+def list_nodes(
+    request: Request,
+    response: Response,
+    selector: str = None,
+    sort: str = "position",
+    cursor: str = None,
+    limit: int = NODE_PAGE_SIZE,
+    fields: str = None,
+):
+    """서버 목록 조회
+
+    selector는 라벨 선택자(예: region=kr,hw in (gpu,a100)), sort는 position/id/label
+    (앞에 '-'면 내림차순). 다음 페이지 커서는 X-Next-Cursor 헤더로 전달한다.
+    fields를 지정하지 않으면 id/label만 반환.
+    """
+    etag = _config_etag()
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    names = _parse_fields(fields, _NODE_FIELDS) or ["id", "label"]
+    page, next_cursor = _page(selector, sort, cursor, limit)
+    _set_cursor(response, next_cursor)
+    set_etag(response, etag)
+    return _project([_node_entry(node_id, info) for node_id, info in page], names)
+
+
+@router.get("/labels")
+def list_labels(key: str = None):
+    """라벨 키별 값과 노드 수"""
+    return node_registry.label_values(key)
+
+
+def _status_entry(node_id: str, info: dict) -> dict:
+    # 상태 확인 결과는 라운드 스케줄러의 사일로 선택에도 사용됨
+    health = probe_node(node_id, max_age=0)
+    entry = _node_entry(node_id, info)
+    entry.update({
+        "status": health["status"],
+        "type": info.get("type", "unknown"),
+        "latency_ms": health.get("latency_ms"),
+        "last_check": health["last_check"],
+        "breaker": circuit_breaker.snapshot(node_id),
+    })
+    if "error" in health:
+        entry["error"] = health["error"]
+    return entry
+
+
+def _probe_all(nodes: list) -> list:
+    """노드 상태를 병렬로 확인"""
+    if not nodes:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(len(nodes), ROUND_PROBE_WORKERS))) as pool:
+        return list(pool.map(lambda item: _status_entry(*item), nodes))
 
 
 @router.get("/status")
-def get_nodes_status():
-    """모든 서버의 연결 상태 확인"""
+def get_nodes_status(
+    request: Request,
+    response: Response,
+    selector: str = None,
+    sort: str = "position",
+    cursor: str = None,
+    limit: int = NODE_PAGE_SIZE,
+    fields: str = None,
+):
+    """서버 연결 상태 확인 (요청한 페이지의 노드만 확인, 동시 요청은 한 번의 확인 결과를 공유)
+
+    If-None-Match가 현재 ETag와 같고 페이지 노드의 상태 기록이 ETAG_MAX_AGE_SEC 안이면
+    상태 확인 없이 304로 응답한다.
+    """
+    names = _parse_fields(fields, _STATUS_FIELDS)
     try:
-        # 최신 설정 로드 (전체 교체하여 삭제된 서버도 제거)
-        try:
-            refresh_docker_hosts()
-        except Exception as e:
-            print(f"서버 설정 로드 오류: {e}")
-            # 기존 설정 유지하거나 기본값 사용
-            hosts = get_docker_hosts()
-            if not hosts:
-                refresh_docker_hosts()
-        
-        hosts = get_docker_hosts()
-        status_list = []
-        for node_id, info in hosts.items():
-            try:
-                client = docker.DockerClient(base_url=info["base_url"])
-                client.ping()  # 연결 테스트
-                status_list.append({
-                    "id": node_id,
-                    "label": info.get("label", node_id),
-                    "status": "online",
-                    "type": info.get("type", "unknown"),
-                    "role": info.get("role", "client"),
-                    "base_url": info.get("base_url", ""),
-                    "last_check": datetime.now().isoformat()
-                })
-            except Exception as e:
-                status_list.append({
-                    "id": node_id,
-                    "label": info.get("label", node_id),
-                    "status": "offline",
-                    "type": info.get("type", "unknown"),
-                    "role": info.get("role", "client"),
-                    "base_url": info.get("base_url", ""),
-                    "error": str(e),
-                    "last_check": datetime.now().isoformat()
-                })
-        return status_list
+        page, next_cursor = _page(selector, sort, cursor, limit)
+        etag = _status_etag()
+        if etag_matches(request, etag):
+            oldest = node_registry.oldest_check([node_id for node_id, _ in page])
+            if oldest is not None and time.time() - oldest < ETAG_MAX_AGE_SEC:
+                return _not_modified_page(etag, next_cursor)
+        # 노드 목록이 바뀌면 버전이 달라지므로 새 키로 조회
+        key = f"nodes-status:{node_registry.version()}:{selector}:{sort}:{cursor}:{limit}"
+        status_list, meta = coalesce_service.fetch(key, lambda: _probe_all(page))
+    except HTTPException:
+        raise
     except Exception as e:
         # 전체 함수 레벨 에러 처리
-        print(f"서버 상태 조회 오류: {e}")
+        event_service.log("error", f"서버 상태 조회 오류: {e}", source="nodes")
         raise HTTPException(status_code=500, detail=f"서버 상태 조회 실패: {str(e)}")
+    # 방금 확인으로 상태가 바뀌지 않았으면 본문 없이 응답
+    etag = _status_etag()
+    if etag_matches(request, etag):
+        return _not_modified_page(etag, next_cursor)
+    coalesce_service.set_headers(response, meta)
+    _set_cursor(response, next_cursor)
+    set_etag(response, etag)
+    return _project(status_list, names)
+
+
+
+@router.get("/resources")
+def get_nodes_resources():
+    """사일로별 마지막 CPU/메모리/디스크 사용률(%)"""
+    return resource_service.get_resources()
 
 
 @router.get("/{node_id}")
-def get_node(node_id: str):
+def get_node(request: Request, response: Response, node_id: str):
     """서버 상세 정보 조회"""
+    etag = _config_etag()
+    if etag_matches(request, etag):
+        return not_modified(etag)
     refresh_docker_hosts()
     hosts = get_docker_hosts()
     
     if node_id not in hosts:
         raise HTTPException(status_code=404, detail="서버를 찾을 수 없습니다")
     
-    info = hosts[node_id]
-    return {
-        "id": node_id,
-        "label": info.get("label", node_id),
-        "base_url": info.get("base_url", ""),
-        "type": info.get("type", "remote"),
-        "role": info.get("role", "client"),
-        "tls": info.get("tls", False)
-    }
+    set_etag(response, etag)
+    return _node_entry(node_id, hosts[node_id])
+
+
+def _validate_labels(labels: dict):
+    invalid = [
+        f"{key}={value}" for key, value in labels.items()
+        if not node_registry.LABEL_PATTERN.match(key) or not node_registry.LABEL_PATTERN.match(value)
+    ]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"라벨 키/값은 영문/숫자로 시작하고 영문/숫자/_./-만 쓸 수 있습니다: {', '.join(invalid)}",
+        )
 
 
 @router.post("")
 def add_node(server: ServerConfig):
     """서버 추가"""
-    servers = load_servers()
-    
-    # ID 중복 확인
-    if server.id in servers:
-        raise HTTPException(status_code=400, detail=f"서버 ID '{server.id}'가 이미 존재합니다")
-    
-    # 서버 정보 추가 - 새로 추가하는 서버는 항상 클라이언트 서버
-    servers[server.id] = {
-        "base_url": server.base_url,
-        "label": server.label,
-        "type": "remote",  # 클라이언트 서버는 항상 원격
-        "role": "client",  # 새로 추가하는 서버는 항상 클라이언트
-        "tls": server.tls
-    }
-    
-    save_servers(servers)
-    refresh_docker_hosts()
+    def add(servers):
+        # ID 중복 확인
+        if server.id in servers:
+            raise HTTPException(status_code=400, detail=f"서버 ID '{server.id}'가 이미 존재합니다")
+
+        # 서버 정보 추가 - 새로 추가하는 서버는 항상 클라이언트 서버
+        servers[server.id] = {
+            "base_url": server.base_url,
+            "label": server.label,
+            "type": "remote",  # 클라이언트 서버는 항상 원격
+            "role": "client",  # 새로 추가하는 서버는 항상 클라이언트
+            "tls": server.tls
+        }
+        if server.minio_url:
+            servers[server.id]["minio_url"] = server.minio_url
+        if server.disk_gb:
+            servers[server.id]["disk_gb"] = server.disk_gb
+        if server.labels:
+            servers[server.id]["labels"] = dict(server.labels)
+
+    _validate_labels(server.labels or {})
+    # 다른 워커의 동시 수정과 겹치지 않도록 레지스트리 쓰기 트랜잭션 안에서 수정
+    node_registry.update(add)
+    event_service.log("server", f"서버 '{server.label}' 추가", node_id=server.id, source="nodes")
     
     return {"ok": True, "message": f"서버 '{server.label}'가 추가되었습니다"}
 
@@ -114,38 +247,47 @@ def add_node(server: ServerConfig):
 @router.put("/{node_id}")
 def update_node(node_id: str, server: ServerConfig):
     """서버 수정"""
-    servers = load_servers()
-    
-    if node_id not in servers:
-        raise HTTPException(status_code=404, detail="서버를 찾을 수 없습니다")
-    
-    # 서버 정보 업데이트 - 기존 역할 유지 (중앙 서버는 고정, 클라이언트는 유지)
-    existing_role = servers[node_id].get("role", "client")
-    if node_id == "main":
-        # 중앙 서버는 역할과 타입 고정
-        final_role = "central"
-        final_type = "local"
-    else:
-        # 클라이언트 서버는 기존 역할 유지
-        final_role = existing_role
-        final_type = "remote"
-    
-    servers[node_id] = {
-        "base_url": server.base_url,
-        "label": server.label,
-        "type": final_type,
-        "role": final_role,
-        "tls": server.tls
-    }
-    
-    # ID가 변경된 경우
-    if server.id != node_id:
-        if server.id in servers:
-            raise HTTPException(status_code=400, detail=f"서버 ID '{server.id}'가 이미 존재합니다")
-        servers[server.id] = servers.pop(node_id)
-    
-    save_servers(servers)
-    refresh_docker_hosts()
+    def update(servers):
+        if node_id not in servers:
+            raise HTTPException(status_code=404, detail="서버를 찾을 수 없습니다")
+
+        # 서버 정보 업데이트 - 기존 역할 유지 (중앙 서버는 고정, 클라이언트는 유지)
+        existing_role = servers[node_id].get("role", "client")
+        minio_url = server.minio_url or servers[node_id].get("minio_url")
+        disk_gb = server.disk_gb or servers[node_id].get("disk_gb")
+        labels = servers[node_id].get("labels") if server.labels is None else server.labels
+        if node_id == "main":
+            # 중앙 서버는 역할과 타입 고정
+            final_role = "central"
+            final_type = "local"
+        else:
+            # 클라이언트 서버는 기존 역할 유지
+            final_role = existing_role
+            final_type = "remote"
+
+        servers[node_id] = {
+            "base_url": server.base_url,
+            "label": server.label,
+            "type": final_type,
+            "role": final_role,
+            "tls": server.tls
+        }
+        if minio_url:
+            servers[node_id]["minio_url"] = minio_url
+        if disk_gb:
+            servers[node_id]["disk_gb"] = disk_gb
+        if labels:
+            servers[node_id]["labels"] = dict(labels)
+
+        # ID가 변경된 경우
+        if server.id != node_id:
+            if server.id in servers:
+                raise HTTPException(status_code=400, detail=f"서버 ID '{server.id}'가 이미 존재합니다")
+            servers[server.id] = servers.pop(node_id)
+
+    _validate_labels(server.labels or {})
+    node_registry.update(update)
+    event_service.log("server", f"서버 '{server.label}' 수정", node_id=server.id, source="nodes")
     
     return {"ok": True, "message": f"서버 '{server.label}'가 수정되었습니다"}
 
@@ -153,20 +295,18 @@ def update_node(node_id: str, server: ServerConfig):
 @router.delete("/{node_id}")
 def delete_node(node_id: str):
     """서버 삭제"""
-    servers = load_servers()
-    
-    if node_id not in servers:
-        raise HTTPException(status_code=404, detail="서버를 찾을 수 없습니다")
-    
-    # 중앙 서버는 삭제 불가
-    if node_id == "main":
-        raise HTTPException(status_code=400, detail="중앙 서버는 삭제할 수 없습니다")
-    
-    label = servers[node_id].get("label", node_id)
-    del servers[node_id]
-    
-    save_servers(servers)
-    refresh_docker_hosts()
+    def delete(servers):
+        if node_id not in servers:
+            raise HTTPException(status_code=404, detail="서버를 찾을 수 없습니다")
+
+        # 중앙 서버는 삭제 불가
+        if node_id == "main":
+            raise HTTPException(status_code=400, detail="중앙 서버는 삭제할 수 없습니다")
+
+        return servers.pop(node_id).get("label", node_id)
+
+    label = node_registry.update(delete)
+    event_service.log("server", f"서버 '{label}' 삭제", node_id=node_id, source="nodes")
     
     return {"ok": True, "message": f"서버 '{label}'가 삭제되었습니다"}
 
@@ -180,9 +320,10 @@ def test_connection(node_id: str):
     if node_id not in hosts:
         raise HTTPException(status_code=404, detail="서버를 찾을 수 없습니다")
     
-    info = hosts[node_id]
+    # 수동 테스트는 차단 대기 시간과 관계없이 시험 요청 하나를 보냄
+    circuit_breaker.allow_trial(node_id)
     try:
-        client = docker.DockerClient(base_url=info["base_url"])
+        client = get_docker_client(node_id)
         client.ping()  # 연결 테스트
         
         # 추가 정보 가져오기
@@ -197,6 +338,7 @@ def test_connection(node_id: str):
         return {
             "ok": False,
             "status": "offline",
-            "error": str(e)
+            "error": str(e),
+            "breaker": circuit_breaker.snapshot(node_id),
         }
 
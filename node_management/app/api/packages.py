@@ -0,0 +1,37 @@
+"""모델 패키징 API 엔드포인트"""
+from typing import Optional
+from fastapi import APIRouter, Header
+from fastapi.responses import StreamingResponse
+from models.schemas import PackageBuild
+from services import packaging_service
+
+router = APIRouter(prefix="/api/packages", tags=["packages"])
+
+
+@router.post("")
+def start_build(request: PackageBuild):
+    """모델 버전의 서빙 이미지 빌드 시작 (중앙 서버 Docker)"""
+    return packaging_service.start_build(request.model_id, request.runtime)
+
+
+@router.get("")
+def list_jobs():
+    """패키징 작업 목록"""
+    return packaging_service.list_jobs()
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    """패키징 작업 상태"""
+    return packaging_service.get_job(job_id)
+
+
+@router.get("/{job_id}/events")
+def stream_events(job_id: str, last_event_id: Optional[int] = Header(default=None)):
+    """빌드 진행 이벤트 스트림 (SSE, Last-Event-ID 이후부터 재개)"""
+    events = packaging_service.stream_events(job_id, -1 if last_event_id is None else last_event_id)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
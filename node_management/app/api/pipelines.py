@@ -0,0 +1,48 @@
+"""데이터 파이프라인 API 엔드포인트"""
+from fastapi import APIRouter
+from models.schemas import PipelineJob, PipelineRun
+from services import pipeline_service
+
+router = APIRouter(prefix="/api/pipelines", tags=["pipelines"])
+
+
+@router.get("/jobs")
+def list_jobs():
+    """등록된 작업과 사일로별 최근 상태"""
+    return pipeline_service.job_states()
+
+
+@router.post("/jobs")
+def add_job(job: PipelineJob):
+    """파이프라인 작업 등록"""
+    return pipeline_service.add_job(job)
+
+
+@router.delete("/jobs/{job_id}")
+def remove_job(job_id: str):
+    """파이프라인 작업 삭제"""
+    return pipeline_service.remove_job(job_id)
+
+
+@router.post("/jobs/{job_id}/pause")
+def pause_job(job_id: str):
+    """작업 스케줄 일시정지"""
+    return pipeline_service.set_paused(job_id, True)
+
+
+@router.post("/jobs/{job_id}/resume")
+def resume_job(job_id: str):
+    """작업 스케줄 재개"""
+    return pipeline_service.set_paused(job_id, False)
+
+
+@router.post("/run")
+def run_pipeline(request: PipelineRun):
+    """DAG 즉시 실행 (선행 작업 포함, 변경 없는 단계는 건너뜀)"""
+    return pipeline_service.trigger(request.job_ids, request.force)
+
+
+@router.get("/runs")
+def list_runs(job_id: str = None, limit: int = 100):
+    """실행 기록 조회 (최신순)"""
+    return pipeline_service.list_runs(job_id, limit)
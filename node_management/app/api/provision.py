@@ -0,0 +1,24 @@
+"""사일로 프로비저닝 API 엔드포인트"""
+from fastapi import APIRouter
+from models.schemas import SiloProvision
+from services import provision_service
+
+router = APIRouter(prefix="/api/provision", tags=["provision"])
+
+
+@router.post("")
+def start_provision(request: SiloProvision):
+    """템플릿으로 사일로 컨테이너 여러 개를 병렬 생성 (준비되는 대로 노드 등록)"""
+    return provision_service.start_provision(request)
+
+
+@router.get("")
+def list_jobs():
+    """프로비저닝 작업 목록"""
+    return provision_service.list_jobs()
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    """사일로별 진행 상태와 준비까지 걸린 시간"""
+    return provision_service.get_job(job_id)
@@ -0,0 +1,42 @@
+"""모델 레지스트리 API 엔드포인트"""
+from fastapi import APIRouter
+from models.schemas import ModelRegister, ModelStatusUpdate
+from services import model_registry_service
+
+router = APIRouter(prefix="/api/models", tags=["models"])
+
+
+@router.get("")
+def list_models(project: str = None):
+    """모델 버전 목록"""
+    return model_registry_service.list_models(project)
+
+
+@router.post("")
+def register_model(request: ModelRegister):
+    """모델 버전 등록 (바뀐 청크만 저장)"""
+    return model_registry_service.register_from_uri(request)
+
+
+@router.get("/stats")
+def get_stats():
+    """청크 저장소 통계 (중복 제거율)"""
+    return model_registry_service.get_stats()
+
+
+@router.get("/{model_id}")
+def get_model(model_id: str):
+    """모델 버전 상세"""
+    return model_registry_service.get_model(model_id)
+
+
+@router.post("/{model_id}/status")
+def set_status(model_id: str, request: ModelStatusUpdate):
+    """배포/보관 상태 변경"""
+    return model_registry_service.set_status(model_id, request.status)
+
+
+@router.delete("/{model_id}")
+def remove_model(model_id: str):
+    """모델 버전 삭제"""
+    return model_registry_service.remove_model(model_id)
@@ -0,0 +1,168 @@
+"""HTTP 응답 유틸리티: 빠른 JSON 직렬화, 응답 압축, 조건부 GET, 미리 압축한 정적 파일 제공"""
+import json
+import mimetypes
+import os
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from fastapi.responses import JSONResponse, Response
+from fastapi.staticfiles import StaticFiles
+from config.settings import COMPRESS_BROTLI_QUALITY, COMPRESS_GZIP_LEVEL, COMPRESS_MIN_SIZE
+from services import telemetry_service
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 파일명에 내용 해시가 들어간 빌드 결과물은 내용이 바뀌면 URL도 바뀜
+_IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+_REVALIDATE_CACHE = "no-cache"
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson으로 직렬화하는 JSON 응답 (없으면 공백 없는 표준 json)"""
+
+    def render(self, content) -> bytes:
+        with telemetry_service.span("json_render"):
+            if orjson is not None:
+                return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+            return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def make_etag(*parts) -> str:
+    """세대 번호로 만든 약한 ETag (압축 여부와 관계없이 같은 내용이면 같은 값)"""
+    return 'W/"' + ".".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(request, etag: str) -> bool:
+    """If-None-Match에 etag가 있는지 (약한 비교)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in (tag.removeprefix("W/") for tag in tags)
+
+
+def set_etag(response, etag: str):
+    # 캐시에 두되 매번 재검증
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = _REVALIDATE_CACHE
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status_code=304)
+    set_etag(response, etag)
+    return response
+
+
+def _accepted_encodings(header: str) -> dict:
+    """Accept-Encoding -> {encoding: q}"""
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    return accepted
+
+
+def preferred_encoding(header: str, available: tuple) -> str:
+    """클라이언트가 받는 인코딩 중 available 순서상 먼저인 것 (없으면 None)"""
+    accepted = _accepted_encodings(header or "")
+    for encoding in available:
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int, quality: int):
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if more_body:
+            return self.compressor.process(body) + self.compressor.flush()
+        return self.compressor.process(body) + self.compressor.finish()
+
+
+class CompressionMiddleware:
+    """Accept-Encoding 협상으로 br/gzip 응답 압축
+
+    작은 응답, 이미 인코딩된 응답(미리 압축한 정적 파일), SSE 스트림은 그대로 보낸다.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = preferred_encoding(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        if encoding == "br":
+            responder = BrotliResponder(self.app, self.minimum_size, COMPRESS_BROTLI_QUALITY)
+        elif encoding == "gzip":
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=COMPRESS_GZIP_LEVEL)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
+
+
+class AssetStaticFiles(StaticFiles):
+    """미리 압축한 .br/.gz가 있으면 그 파일을 보내고, 빌드 결과물은 영구 캐시"""
+
+    _precompressed = {"br": ".br", "gzip": ".gz"}
+
+    def __init__(self, *args, immutable_prefix: str = "dist/", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.immutable_prefix = immutable_prefix
+
+    async def get_response(self, path: str, scope):
+        immutable = path.replace(os.sep, "/").startswith(self.immutable_prefix)
+        response = None
+        if immutable:
+            accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding") or "")
+            for encoding, suffix in self._precompressed.items():
+                if accepted.get(encoding, accepted.get("*", 0)) <= 0:
+                    continue
+                try:
+                    variant = await super().get_response(path + suffix, scope)
+                except HTTPException:
+                    # 이 인코딩의 압축본이 없으면 다음 인코딩 시도
+                    continue
+                if variant.status_code == 200:
+                    # 압축본의 Content-Type 대신 원본 파일 형식으로
+                    variant.headers["content-type"] = self.media_type(path)
+                    variant.headers["content-encoding"] = encoding
+                response = variant
+                break
+        if response is None:
+            response = await super().get_response(path, scope)
+        if immutable:
+            response.headers.append("vary", "Accept-Encoding")
+        response.headers["cache-control"] = _IMMUTABLE_CACHE if immutable else _REVALIDATE_CACHE
+        return response
+
+    @staticmethod
+    def media_type(path: str) -> str:
+        media_type = mimetypes.guess_type(path)[0] or "text/plain"
+        if media_type.startswith("text/") or media_type.endswith("javascript"):
+            media_type += "; charset=utf-8"
+        return media_type
@@ -0,0 +1,38 @@
+"""학습 라운드 API 엔드포인트"""
+from fastapi import APIRouter
+from models.schemas import ImagePrefetch, RoundStart, ShardAssign
+from services import assignment_service, round_service
+
+router = APIRouter(prefix="/api/rounds", tags=["rounds"])
+
+
+@router.get("/silos")
+def rank_silos(max_silos: int = None):
+    """라운드 참여 후보 사일로 (상태/지연 시간 순)"""
+    silos, health = round_service.select_silos(max_silos=max_silos)
+    return [{"node_id": node_id, **health[node_id]} for node_id in silos]
+
+
+@router.post("/start")
+def start_round(config: RoundStart):
+    """라운드 시작: 선택된 사일로에 트레이너 컨테이너 실행"""
+    return round_service.start_round(config)
+
+
+@router.post("/prefetch")
+def prefetch_image(request: ImagePrefetch):
+    """다음 라운드 이미지를 사일로에 미리 배포 (진행 상태는 /api/images/jobs)"""
+    return round_service.prefetch_image(request.image, request.silo_ids)
+
+
+@router.get("/{round_no}")
+def get_round(round_no: int):
+    """라운드 실행 결과 조회"""
+    return round_service.get_round(round_no)
+
+
+@router.post("/assign")
+def plan_assignment(request: ShardAssign):
+    """사일로별 로컬 샤드를 트레이너 워커에 배정한 계획 미리보기 (바이트 기준 LPT)"""
+    silos = request.silo_ids or round_service.select_silos()[0]
+    return assignment_service.plan(silos, request.shards_uri, request.workers_per_silo)
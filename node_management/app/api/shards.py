@@ -0,0 +1,30 @@
+"""학습 샤드 분할 API 엔드포인트"""
+from fastapi import APIRouter
+from models.schemas import ReshardRequest, ShardRequest
+from services import sharding_service
+
+router = APIRouter(prefix="/api/shards", tags=["shards"])
+
+
+@router.post("")
+def start_shard(request: ShardRequest):
+    """정제된 데이터셋을 N개 샤드로 분할 (백그라운드)"""
+    return sharding_service.start_shard(request)
+
+
+@router.post("/reshard")
+def start_reshard(request: ReshardRequest):
+    """샤드 수 변경 (이동이 필요한 행만 옮김)"""
+    return sharding_service.start_reshard(request)
+
+
+@router.get("/manifest")
+def get_manifest(output_uri: str, node_id: str = None):
+    """샤드 매니페스트 (행 수, 바이트, 레이블 히스토그램)"""
+    return sharding_service.get_manifest(output_uri, node_id)
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    """샤딩 작업 상태 조회"""
+    return sharding_service.get_job(job_id)
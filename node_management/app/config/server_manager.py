@@ -1,9 +1,16 @@
 """서버 설정 파일 관리"""
+import os
 from .settings import SERVERS_FILE
 import yaml
 from fastapi import HTTPException
 
 
+def _log_error(message: str):
+    """이벤트 로그에 오류 기록 (services가 이 모듈을 import 하므로 지연 import)"""
+    from services import event_service
+    event_service.log("error", message, source="config")
+
+
 def load_servers():
     """서버 설정 로드"""
     if SERVERS_FILE.exists():
@@ -13,7 +20,7 @@ def load_servers():
                 # YAML이 None을 반환할 수 있음
                 return data if data is not None else {}
         except (yaml.YAMLError, IOError) as e:
-            print(f"서버 설정 파일 로드 오류: {e}")
+            _log_error(f"서버 설정 파일 로드 오류: {e}")
             # 기본값 반환
             default = {
                 "main": {
@@ -40,11 +47,13 @@ def load_servers():
 
 
 def save_servers(servers: dict):
-    """서버 설정 저장"""
+    """서버 설정 저장 (다른 워커가 쓰는 중인 파일을 읽지 않도록 임시 파일 기록 후 교체)"""
+    tmp_path = SERVERS_FILE.with_name(f"{SERVERS_FILE.name}.{os.getpid()}.tmp")
     try:
-        with open(SERVERS_FILE, 'w', encoding='utf-8') as f:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
             yaml.dump(servers, f, allow_unicode=True, default_flow_style=False, sort_keys=False)
+        os.replace(tmp_path, SERVERS_FILE)
     except IOError as e:
-        print(f"서버 설정 파일 저장 오류: {e}")
+        _log_error(f"서버 설정 파일 저장 오류: {e}")
         raise HTTPException(status_code=500, detail=f"서버 설정 저장 실패: {e}")
 
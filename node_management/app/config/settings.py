@@ -1,8 +1,215 @@
 """애플리케이션 설정 상수"""
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent.parent.parent
 CONFIG_DIR = BASE_DIR / "config"
 CONFIG_DIR.mkdir(exist_ok=True)
 SERVERS_FILE = CONFIG_DIR / "servers.yaml"
+DATA_DIR = BASE_DIR / "data"
+DATA_DIR.mkdir(exist_ok=True)
+STATIC_DIR = BASE_DIR / "static"
+# 빌드한 정적 번들(파일명에 내용 해시, .gz/.br 미리 압축) 위치
+STATIC_DIST_DIR = STATIC_DIR / "dist"
+# 워커 간 공유 노드 레지스트리 (노드 목록, 상태 기록, 공유 캐시)
+NODE_REGISTRY_DB = DATA_DIR / "nodes.db"
+# 공유 캐시에서 만료된 행을 지우는 간격(초, 워커별로 기록할 때)
+CACHE_PURGE_SEC = 60
+# 워커 간 공유 작업 상태 (백그라운드 작업 스냅샷과 SSE 이벤트)
+JOB_DB = DATA_DIR / "jobs.db"
+# 실행 중인 작업 스냅샷 기록 간격(초), 이 시간(초) 넘게 갱신이 없으면 담당 워커가 종료된 것으로 봄
+JOB_SYNC_SEC = 0.5
+JOB_STALE_SEC = 30
 
+# 중앙 서버 노드 id
+CENTRAL_NODE_ID = "main"
+
+# 노드 목록/상태 조회 페이지 크기 (기본값, 최대값)
+NODE_PAGE_SIZE = 100
+NODE_PAGE_MAX = 1000
+
+# 노드 상태 확인 결과 재사용 시간(초)
+HEALTH_TTL_SEC = 15
+# 상태/컨테이너 목록 조회 결과 공유 시간(초). 동시 요청은 진행 중인 조회 하나를 함께 기다림
+COALESCE_TTL_SEC = float(os.environ.get("COALESCE_TTL_SEC", "2"))
+# 조건부 GET: 마지막 관측이 이 시간(초) 안이면 세대 번호만 비교해 Docker 조회 없이 304 응답
+ETAG_MAX_AGE_SEC = float(os.environ.get("ETAG_MAX_AGE_SEC", str(HEALTH_TTL_SEC)))
+
+# 원격 Docker 호출 타임아웃(초). 연결 타임아웃은 노드별 관측 지연(p99)에 맞춰 이 범위에서 조정
+DOCKER_TIMEOUT_SEC = 60
+DOCKER_CONNECT_TIMEOUT_SEC = 3.0
+DOCKER_CONNECT_TIMEOUT_MIN_SEC = 0.3
+DOCKER_CONNECT_TIMEOUT_MAX_SEC = 10.0
+# 노드별 차단기: 연속 실패 횟수, 차단 유지 시간(시험 실패 시 두 배씩 최대값까지), 지연 표본 수
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_OPEN_SEC = 5
+BREAKER_MAX_OPEN_SEC = 60
+BREAKER_LATENCY_SAMPLES = 200
+
+# 워커 간 공유 토폴로지 그래프 모델 (요소, 리비전, 위치)
+GRAPH_DB = DATA_DIR / "graph.db"
+# 토폴로지 그래프 모델: 노드별 컨테이너 재조회 간격(초), 변경 이력 보관 리비전 수
+GRAPH_REFRESH_SEC = 5
+GRAPH_HISTORY_REVISIONS = 1000
+# 컨테이너가 이 수를 넘는 노드는 그룹 하나로 접고, EXPAND 이하로 줄면 다시 펼침
+GRAPH_COLLAPSE_CONTAINERS = 40
+GRAPH_EXPAND_CONTAINERS = 30
+# 노드 칸 간격과 노드 주변 요소 간격 (그래프 좌표)
+GRAPH_CELL_SIZE = 1200
+GRAPH_SLOT_SPACING = 45
+
+# /metrics 지연 히스토그램 구간 상한(초)
+METRICS_BUCKETS_SEC = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 워커별 히스토그램 파일 위치와 기록 간격(초). /metrics는 모든 워커의 파일을 합산해 응답
+METRICS_DIR = DATA_DIR / "metrics"
+METRICS_FLUSH_SEC = 5
+# 샘플링 프로파일러: 최대 수집 시간(초), 표본 간격(ms) 기본값/최소값
+PROFILE_MAX_SEC = 60
+PROFILE_INTERVAL_MS = 10
+PROFILE_MIN_INTERVAL_MS = 1
+
+# 학습 라운드 스케줄러 설정
+TRAINER_IMAGE = "fl-trainer:latest"
+TRAINER_CONTAINER_PREFIX = "fl-trainer"
+ROUND_MAX_LAUNCH_PER_HOST = 2
+ROUND_PROBE_WORKERS = 16
+ROUND_HISTORY = 1000
+
+# 학습 샤드 배정 설정 (트레이너는 같은 사일로 MinIO 컨테이너에서만 읽음)
+SILO_MINIO_CONTAINER_PREFIX = "minio-silo"
+SILO_MINIO_PORT = 9000
+ASSIGNMENT_DIR_NAME = "_assignments"
+
+# 이미지 배포 설정
+IMAGE_DISTRIBUTE_PARALLEL = 4
+IMAGE_CHUNK_SIZE = 2 * 1024 * 1024
+IMAGE_JOB_HISTORY = 20
+
+# 사일로 데이터 카탈로그 설정
+CATALOG_DB = DATA_DIR / "catalog.db"
+CATALOG_SYNC_WORKERS = 8
+# 인덱스 쓰기 한 번에 기록할 객체 수 (쓰기 잠금 유지 시간 제한)
+CATALOG_WRITE_BATCH = 1000
+MINIO_ACCESS_KEY = os.environ.get("MINIO_ACCESS_KEY", "minioadmin")
+MINIO_SECRET_KEY = os.environ.get("MINIO_SECRET_KEY", "minioadmin")
+
+# 데이터 정제 엔진 설정
+CLEANSE_WORKERS = os.cpu_count() or 2
+CLEANSE_CSV_BLOCK_SIZE = 8 * 1024 * 1024
+CLEANSE_JOB_HISTORY = 20
+
+# 샤딩 설정
+SHARD_BATCH_ROWS = 64 * 1024
+SHARD_ROW_GROUP_ROWS = 128 * 1024
+SHARD_JOB_HISTORY = 20
+
+# 데이터 파이프라인(DAG) 설정
+PIPELINE_DB = DATA_DIR / "pipeline.db"
+PIPELINE_WORKERS = 4
+PIPELINE_TASK_TIMEOUT_SEC = 3600
+# 같은 (작업, 사일로)가 다른 실행에서 진행 중이면 이 간격(초)으로 끝나기를 기다림,
+# 이 시간(초) 넘게 running인 기록은 종료된 워커가 남긴 것으로 보고 무시
+PIPELINE_CLAIM_POLL_SEC = 2
+PIPELINE_RUN_STALE_SEC = 6 * 3600
+
+# 데이터 드리프트 탐지 설정 (fed 대시보드 DRIFT_WARN/DRIFT_ALERT와 동일)
+DRIFT_DB = DATA_DIR / "drift.db"
+DRIFT_WARN = 0.3
+DRIFT_ALERT = 0.5
+DRIFT_KLL_K = 200
+DRIFT_CMS_WIDTH = 256
+DRIFT_CMS_DEPTH = 4
+DRIFT_TOP_CATEGORIES = 64
+DRIFT_PSI_BINS = 10
+DRIFT_BATCH_ROWS = 64 * 1024
+
+# 모델 레지스트리 설정 (청크 저장소: local 또는 minio)
+MODEL_DB = DATA_DIR / "models.db"
+MODEL_BLOB_DIR = DATA_DIR / "blobs"
+# 여러 청크로 된 텐서를 이어 붙인 memory-map용 캐시 (청크 목록 해시별 파일)
+MODEL_TENSOR_CACHE_DIR = DATA_DIR / "tensors"
+MODEL_BLOB_BACKEND = os.environ.get("MODEL_BLOB_BACKEND", "local")
+MODEL_BLOB_NODE = os.environ.get("MODEL_BLOB_NODE", CENTRAL_NODE_ID)
+MODEL_BLOB_BUCKET = "model-blobs"
+MODEL_CHUNK_SIZE = 1024 * 1024
+
+# 모델 패키징(서빙 이미지 빌드) 설정
+PACKAGE_MAX_CONCURRENT_BUILDS = int(os.environ.get("PACKAGE_MAX_CONCURRENT_BUILDS", "2"))
+PACKAGE_RUNTIME_PACKAGES = ["numpy", "fastapi", "uvicorn"]
+# 빌드 로그 이벤트까지 보관하므로 작게
+PACKAGE_JOB_HISTORY = 20
+SERVING_PORT = 8080
+
+# 모델 배포(롤아웃) 설정
+SERVING_CONTAINER_PREFIX = "fl-serving"
+SERVING_HOST_PORT = 18080
+DEPLOY_WAVE_SIZE = 2
+DEPLOY_HEALTH_TIMEOUT_SEC = 60
+DEPLOY_JOB_HISTORY = 50
+
+# 서빙 지표 수집 설정
+MONITOR_SCRAPE_INTERVAL_SEC = 5
+MONITOR_SCRAPE_TIMEOUT_SEC = 2
+MONITOR_SCRAPE_WORKERS = 16
+MONITOR_RETENTION_POINTS = 720
+# 시계열/라운드 합산/수집 상태 (수집 워커가 기록하고 모든 워커가 조회)
+MONITOR_DB = DATA_DIR / "monitor.db"
+
+# 이벤트 로그 설정
+EVENT_DB = DATA_DIR / "events.db"
+EVENT_RETENTION_DAYS = 14
+EVENT_MAX_ROWS = 500_000
+EVENT_PAGE_LIMIT = 200
+# 다른 워커가 기록한 이벤트를 tail 스트림이 확인하는 간격(초)
+EVENT_POLL_SEC = 0.5
+
+# 노드 자원 수집 설정 (디스크 사용률은 servers.yaml의 disk_gb가 있는 노드만)
+RESOURCE_COLLECT_INTERVAL_SEC = 10
+RESOURCE_DISK_INTERVAL_SEC = 60
+RESOURCE_WORKERS = 16
+
+# 자원 임계치 알림 설정
+ALERT_DB = DATA_DIR / "alerts.db"
+ALERT_DEFAULT_FOR_SEC = 60
+# 해제 임계치 = 임계치 - ALERT_HYSTERESIS (%p)
+ALERT_HYSTERESIS = 5.0
+ALERT_HISTORY = 1000
+# 다른 워커가 기록한 상태 전이를 확인하는 간격(초, SSE)
+ALERT_POLL_SEC = 1.0
+
+# 원격 명령 실행(docker exec) 설정
+COMMAND_MAX_PARALLEL = 16
+COMMAND_TIMEOUT_SEC = 300
+# 출력 스트림 읽기 타임아웃 = 명령 제한 시간 + 이 여유(초). 제한 시간이 0이면 읽기 타임아웃 없음
+COMMAND_STREAM_GRACE_SEC = 30
+# 대상별로 보관/전송할 출력 상한 (초과분은 잘림 표시 후 버림)
+COMMAND_OUTPUT_LIMIT = 1024 * 1024
+COMMAND_JOB_HISTORY = 100
+
+# 사일로 자동 탐색 설정 (Docker API 포트 스캔)
+DISCOVERY_DEFAULT_PORTS = [2375]
+DISCOVERY_CONCURRENCY = 1000
+DISCOVERY_RATE_PER_SEC = 2000
+DISCOVERY_TIMEOUT_SEC = 1.0
+DISCOVERY_MAX_TARGETS = 65536
+DISCOVERY_JOB_HISTORY = 20
+
+# 사일로 컨테이너 프로비저닝 설정 (silo/compose.silo.yaml과 같은 포트 배치)
+# silo-N: Docker API = DOCKER_PORT_BASE + N, MinIO API/콘솔 = MINIO_PORT_BASE + 2N - 1 / + 2N
+SILO_IMAGE = "fl-silo:latest"
+SILO_NETWORK = "fed-net"
+SILO_PUBLISH_HOST = os.environ.get("SILO_PUBLISH_HOST", "localhost")
+SILO_DOCKER_PORT_BASE = 2370
+SILO_MINIO_PORT_BASE = 7000
+SILO_MINIO_IMAGE = "minio/minio:latest"
+PROVISION_MAX_PARALLEL = 8
+# 준비 확인 제한 시간(초)과 재시도 간격(초, 지수 증가)
+PROVISION_READY_TIMEOUT_SEC = 180
+PROVISION_PROBE_INTERVAL_SEC = 0.25
+PROVISION_PROBE_MAX_INTERVAL_SEC = 1.0
+PROVISION_JOB_HISTORY = 20
+
+# 응답 압축 설정 (brotli 패키지가 있으면 br 우선, 없으면 gzip)
+COMPRESS_MIN_SIZE = 1024
+COMPRESS_GZIP_LEVEL = 6
+COMPRESS_BROTLI_QUALITY = 5
@@ -1,21 +1,94 @@
 """FastAPI 애플리케이션 진입점"""
+import os
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
-from api import nodes, containers
+from api import (
+    nodes, containers, rounds, images, catalog, cleanse, shards, pipelines, drift, registry, packages,
+    deployments, monitor, events, alerts, commands, discovery, provision, metrics, graph,
+)
+from api.responses import AssetStaticFiles, CompressionMiddleware, FastJSONResponse
+from services import (
+    asset_service, circuit_breaker, event_service, monitor_service, node_registry, pipeline_service,
+    resource_service,
+)
 from services.docker_service import get_docker_hosts
 
-app = FastAPI(title="FL Container Dashboard")
+_leader_stop = threading.Event()
+
+
+def _lead_background_jobs():
+    """워커 중 하나만 스케줄러/수집기 실행 (담당 워커가 종료되면 다른 워커가 이어받음)"""
+    while not _leader_stop.is_set():
+        if node_registry.acquire_leadership():
+            event_service.log("system", f"백그라운드 작업 담당 워커 (pid {os.getpid()})")
+            event_service.prune()
+            pipeline_service.start_scheduler()
+            monitor_service.start_scraper()
+            resource_service.start_collector()
+            return
+        _leader_stop.wait(5)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """백그라운드 스케줄러/수집기 시작/종료"""
+    event_service.log("system", "노드 관리 서버 시작")
+    _leader_stop.clear()
+    threading.Thread(target=_lead_background_jobs, name="leader-election", daemon=True).start()
+    yield
+    _leader_stop.set()
+    resource_service.stop_collector()
+    monitor_service.stop_scraper()
+    pipeline_service.stop_scheduler()
+    event_service.log("system", "노드 관리 서버 종료")
+
+
+app = FastAPI(title="FL Container Dashboard", lifespan=lifespan, default_response_class=FastJSONResponse)
+# Accept-Encoding에 따라 br/gzip 압축 (SSE와 미리 압축한 정적 파일은 제외)
+app.add_middleware(CompressionMiddleware)
+# 라우트별 요청 처리 시간 (/metrics)
+app.add_middleware(metrics.RequestMetricsMiddleware)
+
+
+@app.exception_handler(circuit_breaker.CircuitOpenError)
+def circuit_open_handler(request: Request, exc: circuit_breaker.CircuitOpenError):
+    """차단 중인 노드로의 요청은 503과 재시도 시각으로 응답"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc), "node_id": exc.node_id},
+        headers={"Retry-After": str(max(1, round(exc.retry_in)))},
+    )
 
 # 정적 파일 및 템플릿 설정
 BASE_DIR = Path(__file__).parent.parent
 templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
-app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
+app.mount("/static", AssetStaticFiles(directory=str(BASE_DIR / "static")), name="static")
 
 # API 라우터 등록
 app.include_router(nodes.router)
 app.include_router(containers.router)
+app.include_router(rounds.router)
+app.include_router(images.router)
+app.include_router(catalog.router)
+app.include_router(cleanse.router)
+app.include_router(shards.router)
+app.include_router(pipelines.router)
+app.include_router(drift.router)
+app.include_router(registry.router)
+app.include_router(packages.router)
+app.include_router(deployments.router)
+app.include_router(monitor.router)
+app.include_router(events.router)
+app.include_router(alerts.router)
+app.include_router(commands.router)
+app.include_router(discovery.router)
+app.include_router(provision.router)
+app.include_router(metrics.router)
+app.include_router(graph.router)
 
 
 @app.get("/")
@@ -26,6 +99,7 @@ def index(request: Request):
         "index.html",
         {
             "request": request,
+            "assets": asset_service.get_assets(),
             "nodes": [
                 {"id": node_id, "label": info["label"]}
                 for node_id, info in hosts.items()
@@ -1,4 +1,5 @@
 """Pydantic 모델 정의"""
+from typing import Any, Dict, List, Literal, Optional, Union
 from pydantic import BaseModel
 
 
@@ -9,9 +10,244 @@ class ServerConfig(BaseModel):
     # type 필드 제거 - 역할에 따라 자동 결정됨
     # role 필드 제거 - 새로 추가하는 서버는 항상 "client"
     tls: bool = False
+    # 사일로 MinIO(S3 API) 주소. 예: http://localhost:7001
+    minio_url: Optional[str] = None
+    # Docker 데이터 디스크 용량(GB). 있으면 디스크 사용률 알림 평가
+    disk_gb: Optional[float] = None
+    # 임의 라벨 (예: region, site, hw). /api/nodes?selector=region=kr 로 조회
+    # 수정 시 생략(None)하면 기존 라벨 유지, {}면 모두 삭제
+    labels: Optional[Dict[str, str]] = None
 
 
 class ContainerAction(BaseModel):
     node_id: str
     container_id: str
 
+
+
+class RoundStart(BaseModel):
+    round: int
+    epochs: int = 5
+    learning_rate: float = 0.01
+    algorithm: Literal["fedavg", "fedmedian", "secagg"] = "fedavg"
+    image: Optional[str] = None
+    # 미지정 시 전체 클라이언트 사일로 중 상태가 좋은 순으로 선택
+    silo_ids: Optional[List[str]] = None
+    max_silos: Optional[int] = None
+    # 다음 라운드에 사용할 이미지 (현재 라운드 진행 중 미리 pull)
+    next_image: Optional[str] = None
+    # 사일로별 샤드 출력 경로 (s3://bucket/prefix, {silo}는 사일로 id로 치환).
+    # 지정하면 사일로 로컬 MinIO의 샤드를 트레이너 워커에 바이트 기준으로 배정
+    shards_uri: Optional[str] = None
+    workers_per_silo: int = 1
+
+
+class ShardAssign(BaseModel):
+    shards_uri: str
+    silo_ids: Optional[List[str]] = None
+    workers_per_silo: int = 1
+
+
+class ImagePrefetch(BaseModel):
+    image: str
+    silo_ids: Optional[List[str]] = None
+
+
+class ImageDistribute(BaseModel):
+    image: str
+    # 미지정 시 전체 클라이언트 노드
+    node_ids: Optional[List[str]] = None
+    max_parallel: Optional[int] = None
+
+
+class CleanseRules(BaseModel):
+    # ID 정규화 (소문자 → 공백 제거 → 영숫자만 → SHA-256) 후 중복 제거
+    id_column: Optional[str] = None
+    hash_ids: bool = True
+    # 해당 컬럼이 null인 행 제거
+    required_columns: List[str] = []
+    # 컬럼별 null 대체값
+    fill_nulls: Dict[str, Any] = {}
+    # 컬럼별 타입 변환 (int64, float64, string, bool, timestamp[ms] 등). 변환 불가 값은 null
+    casts: Dict[str, str] = {}
+    # 컬럼별 허용 범위 [min, max]. 범위를 벗어난 행 제거 (null은 유지)
+    ranges: Dict[str, List[Optional[float]]] = {}
+
+
+class CleanseRequest(BaseModel):
+    # 로컬 경로 또는 s3://bucket/key (node_id의 MinIO 사용)
+    input_uri: str
+    output_uri: str
+    node_id: Optional[str] = None
+    rules: CleanseRules = CleanseRules()
+    workers: Optional[int] = None
+
+
+class ShardRequest(BaseModel):
+    # 정제된 입력 Parquet과 샤드 출력 디렉터리 (로컬 경로 또는 s3://)
+    input_uri: str
+    output_uri: str
+    node_id: Optional[str] = None
+    num_shards: int
+    mode: Literal["hash", "stratified"] = "hash"
+    key_column: str = "normalized_id"
+    # stratified 모드의 분할 기준. hash 모드에서는 레이블 히스토그램용 (선택)
+    label_column: Optional[str] = None
+
+
+class ReshardRequest(BaseModel):
+    output_uri: str
+    node_id: Optional[str] = None
+    num_shards: int
+
+
+class PipelineJob(BaseModel):
+    id: str
+    name: str
+    # 5필드 cron 식 (분 시 일 월 요일)
+    schedule: str = "0 * * * *"
+    depends_on: List[str] = []
+    # 비어 있으면 전체 사일로 대상
+    target_silo: Optional[str] = None
+    kind: Literal["ingest", "cleanse", "shard", "container"]
+    # 작업별 설정. 문자열의 {silo}는 대상 사일로 id로 치환
+    spec: Dict[str, Any] = {}
+
+
+class PipelineRun(BaseModel):
+    job_ids: Optional[List[str]] = None
+    # 입력 지문이 같아도 다시 실행
+    force: bool = False
+
+
+class DriftObserve(BaseModel):
+    # 사일로 데이터 배치 (로컬 경로 또는 s3://, 노드 MinIO 사용)
+    uri: str
+    window: Literal["reference", "current"] = "current"
+    columns: Optional[List[str]] = None
+
+
+class DriftSketches(BaseModel):
+    window: Literal["reference", "current"] = "current"
+    # feature -> 직렬화된 스케치 (drift_service CLI 출력 형식)
+    sketches: Dict[str, Dict[str, Any]]
+
+
+class ModelRegister(BaseModel):
+    project: str
+    version: str
+    algorithm: Literal["fedavg", "fedmedian", "secagg"] = "fedavg"
+    accuracy: Optional[float] = None
+    rounds: Optional[int] = None
+    note: Optional[str] = None
+    # npz 가중치 파일 (로컬 경로 또는 s3://, node_id의 MinIO 사용)
+    weights_uri: str
+    node_id: Optional[str] = None
+
+
+class ModelStatusUpdate(BaseModel):
+    status: Literal["experimental", "deployed", "archived"]
+
+
+class PackageBuild(BaseModel):
+    model_id: str
+    # 서빙 이미지 베이스 (pip 사용 가능한 Python 이미지)
+    runtime: str = "python:3.11-slim"
+
+
+class DeployRequest(BaseModel):
+    model_id: str
+    strategy: Literal["batch", "realtime", "edge"] = "batch"
+    # edge 전략의 대상 사일로 (그 외 전략은 전체 사일로)
+    silo_ids: Optional[List[str]] = None
+    # 웨이브당 사일로 수 (realtime은 전체를 한 웨이브로)
+    wave_size: Optional[int] = None
+    # batch 전략의 웨이브 간 대기 시간(초)
+    interval_sec: int = 0
+    health_timeout_sec: Optional[int] = None
+
+
+class AlertRule(BaseModel):
+    id: str
+    # '*'이면 모든 사일로 (사일로 전용 규칙이 있는 지표는 제외)
+    node_id: str = "*"
+    metric: Literal["cpu", "mem", "disk"]
+    # 사용률(%)이 threshold 이상으로 for_sec 동안 유지되면 발생
+    threshold: float
+    # 이 값 미만으로 내려가야 해제 (기본: threshold - ALERT_HYSTERESIS)
+    clear_threshold: Optional[float] = None
+    for_sec: Optional[float] = None
+    severity: Literal["warning", "critical"] = "warning"
+
+
+class SiloThresholds(BaseModel):
+    cpu: Optional[float] = None
+    mem: Optional[float] = None
+    disk: Optional[float] = None
+    for_sec: Optional[float] = None
+
+
+class CommandTarget(BaseModel):
+    node_id: str
+    container: str
+
+
+class CommandRun(BaseModel):
+    # 문자열이면 sh -c로 실행, 목록이면 그대로 실행
+    command: Union[str, List[str]]
+    # targets가 없으면 node_ids(비우면 전체 사일로)의 container에서 실행
+    targets: Optional[List[CommandTarget]] = None
+    node_ids: Optional[List[str]] = None
+    container: Optional[str] = None
+    workdir: Optional[str] = None
+    env: Dict[str, str] = {}
+    user: Optional[str] = None
+    timeout_sec: Optional[int] = None
+    max_parallel: Optional[int] = None
+
+
+class DiscoveryScan(BaseModel):
+    # 스캔 대상: CIDR(예: 172.20.0.0/24)과/또는 호스트 목록
+    cidr: Optional[str] = None
+    hosts: List[str] = []
+    # 포트 목록과/또는 범위(예: "2371-2380"). 둘 다 없으면 2375
+    ports: List[int] = []
+    port_range: Optional[str] = None
+    concurrency: Optional[int] = None
+    rate_per_sec: Optional[float] = None
+    timeout_sec: Optional[float] = None
+    # True면 스캔이 끝난 뒤 새로 찾은 데몬을 한 번에 등록
+    auto_register: bool = False
+    id_prefix: str = "silo"
+    labels: Dict[str, str] = {}
+
+
+class DiscoveryRegister(BaseModel):
+    # 등록할 base_url (생략하면 스캔에서 찾은 미등록 데몬 전체)
+    base_urls: Optional[List[str]] = None
+
+
+class SiloProvision(BaseModel):
+    # 만들 사일로 수. start_index를 생략하면 사용 중인 번호 다음부터
+    count: int = 1
+    start_index: Optional[int] = None
+    image: Optional[str] = None
+    host: Optional[str] = None
+    docker_port_base: Optional[int] = None
+    minio_port_base: Optional[int] = None
+    # 사일로 /var/lib/docker를 둘 호스트 디렉터리 (생략하면 이름 있는 볼륨)
+    data_root: Optional[str] = None
+    network: Optional[str] = None
+    minio: bool = True
+    minio_image: Optional[str] = None
+    labels: Dict[str, str] = {}
+    ready_timeout_sec: Optional[int] = None
+
+
+class GraphPositions(BaseModel):
+    # 요소 id -> {"x": ..., "y": ...}
+    positions: Dict[str, Dict[str, float]]
+
+
+class GraphPositionReset(BaseModel):
+    ids: List[str]
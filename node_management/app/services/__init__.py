@@ -1,4 +1,18 @@
 """서비스 모듈"""
-from . import docker_service
+from . import (
+    event_service, node_registry, job_store, circuit_breaker, docker_service, image_service, round_service,
+    catalog_service, cleansing_service, sharding_service, pipeline_service, drift_service,
+    model_registry_service, packaging_service, deploy_service,
+    monitor_service, alert_service, resource_service,
+    command_service, assignment_service, coalesce_service, discovery_service,
+    provision_service, asset_service, telemetry_service, graph_service,
+)
 
-__all__ = ['docker_service']
+__all__ = [
+    'event_service', 'node_registry', 'job_store', 'circuit_breaker', 'docker_service', 'image_service', 'round_service',
+    'catalog_service', 'cleansing_service', 'sharding_service', 'pipeline_service', 'drift_service',
+    'model_registry_service', 'packaging_service', 'deploy_service',
+    'monitor_service', 'alert_service', 'resource_service',
+    'command_service', 'assignment_service', 'coalesce_service', 'discovery_service',
+    'provision_service', 'asset_service', 'telemetry_service', 'graph_service',
+]
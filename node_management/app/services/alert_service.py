@@ -0,0 +1,424 @@
+"""자원 임계치 알림 엔진
+
+노드별 자원 사용률(cpu/mem/disk %) 시계열에 대한 임계치 규칙을 서버에서 계속 평가한다.
+규칙은 (노드, 지표)로 색인해 값이 바뀐 시계열에 걸린 규칙만 평가하고, 지속 시간(for_sec)
+조건은 만료 시각 힙으로 처리해 틱마다 전체 규칙을 훑지 않는다. 해제는 별도의 해제
+임계치(히스테리시스) 아래로 내려가야 하며, 상태 전이는 구독자에게 SSE로 전달한다.
+
+평가는 수집을 맡은 워커 하나에서만 하므로 진행 중인 알림과 상태 전이는 DB에 기록해 모든
+워커가 조회/구독하고, 규칙을 바꾼 워커는 공유 세대 번호를 올려 다른 워커가 규칙을 다시 읽게 한다.
+"""
+import heapq
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from fastapi import HTTPException
+from config.settings import ALERT_DB, ALERT_DEFAULT_FOR_SEC, ALERT_HISTORY, ALERT_HYSTERESIS, ALERT_POLL_SEC
+from models.schemas import AlertRule
+from services import event_service, node_registry
+from services.docker_service import get_docker_hosts
+
+METRICS = ("cpu", "mem", "disk")
+ANY_NODE = "*"
+# 규칙 변경 세대 번호 (node_registry generations)
+RULES_GENERATION = "alert_rules"
+
+# 규칙: rule_id -> rule dict
+_rules = {}
+# 색인: (node_id 또는 '*', metric) -> {rule_id}
+_index = {}
+# 시계열 최신 값: (node_id, metric) -> value
+_values = {}
+# 규칙/노드별 상태: (rule_id, node_id) -> {"state": pending|firing, "since", "value", ...}
+_states = {}
+# 지속 시간 만료 힙: (due_at, rule_id, node_id, pending_since)
+_deadlines = []
+_lock = threading.RLock()
+# 마지막으로 읽은 규칙 세대 번호
+_rules_generation = None
+# 마지막으로 기록한 진행 중 알림 (바뀐 경우에만 다시 기록)
+_published = None
+
+# 상태 전이 기록 알림 (같은 워커의 SSE 구독자는 바로 깨움)
+_changed = threading.Condition()
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rules (
+    id TEXT PRIMARY KEY,
+    node_id TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    threshold REAL NOT NULL,
+    clear_threshold REAL NOT NULL,
+    for_sec REAL NOT NULL,
+    severity TEXT NOT NULL,
+    created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS active (
+    rule_id TEXT NOT NULL,
+    node_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    since REAL NOT NULL,
+    value REAL,
+    PRIMARY KEY (rule_id, node_id)
+);
+CREATE TABLE IF NOT EXISTS transitions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    data TEXT NOT NULL
+);
+"""
+
+
+def _connect() -> sqlite3.Connection:
+    """알림 규칙 DB 연결 (최초 호출 시 스키마 생성)"""
+    global _schema_ready
+    conn = sqlite3.connect(str(ALERT_DB), timeout=30)
+    conn.row_factory = sqlite3.Row
+    if not _schema_ready:
+        with _schema_lock:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _schema_ready = True
+    return conn
+
+
+def _ensure_loaded():
+    """규칙 세대 번호가 바뀌었으면(다른 워커의 변경 포함) 규칙을 다시 읽어 바뀐 규칙만 반영"""
+    global _rules_generation
+    current, _ = node_registry.generation(RULES_GENERATION)
+    if current == _rules_generation:
+        return
+    conn = _connect()
+    try:
+        stored = {row["id"]: dict(row) for row in conn.execute("SELECT * FROM rules")}
+    finally:
+        conn.close()
+    changed = [rule for rule_id, rule in stored.items() if _rules.get(rule_id) != rule]
+    removed = [rule_id for rule_id in _rules if rule_id not in stored]
+    if changed or removed:
+        _apply(changed, removed)
+    _rules_generation = current
+
+
+def _add_to_index(rule: dict):
+    _rules[rule["id"]] = rule
+    _index.setdefault((rule["node_id"], rule["metric"]), set()).add(rule["id"])
+
+
+def _drop_from_index(rule_id: str):
+    rule = _rules.pop(rule_id, None)
+    if rule is None:
+        return
+    key = (rule["node_id"], rule["metric"])
+    _index[key].discard(rule_id)
+    if not _index[key]:
+        del _index[key]
+    for state_key in [k for k in _states if k[0] == rule_id]:
+        del _states[state_key]
+
+
+def _rules_for(node_id: str, metric: str):
+    """시계열에 걸린 규칙 (사일로 전용 규칙이 있으면 '*' 규칙 대신 사용)"""
+    specific = _index.get((node_id, metric))
+    if specific:
+        return specific
+    return _index.get((ANY_NODE, metric), ())
+
+
+# --- 평가 ---
+
+def _emit(rule: dict, node_id: str, state: str, value: float, now: float):
+    """상태 전이 기록 후 구독자 깨우기"""
+    transition = {
+        "rule_id": rule["id"],
+        "node_id": node_id,
+        "metric": rule["metric"],
+        "severity": rule["severity"],
+        "state": state,
+        "value": value,
+        "threshold": rule["threshold"] if state == "firing" else rule["clear_threshold"],
+        "at": datetime.fromtimestamp(now).isoformat(timespec="seconds"),
+    }
+    conn = _connect()
+    try:
+        seq = conn.execute(
+            "INSERT INTO transitions (data) VALUES (?)", (json.dumps(transition, ensure_ascii=False),),
+        ).lastrowid
+        conn.execute("DELETE FROM transitions WHERE seq <= ?", (seq - ALERT_HISTORY,))
+        conn.commit()
+    finally:
+        conn.close()
+    with _changed:
+        _changed.notify_all()
+    if state == "firing":
+        message = f"{rule['metric']} 사용률 {value}% (임계치 {rule['threshold']}%)"
+        event_service.log("error", message, node_id=node_id, source="alerts", rule_id=rule["id"])
+    else:
+        message = f"{rule['metric']} 사용률 정상화 {value}% (해제 {rule['clear_threshold']}%)"
+        event_service.log("success", message, node_id=node_id, source="alerts", rule_id=rule["id"])
+
+
+def _fire(rule: dict, node_id: str, value: float, now: float):
+    _states[(rule["id"], node_id)] = {"state": "firing", "since": now, "value": value}
+    _emit(rule, node_id, "firing", value, now)
+
+
+def _evaluate(rule: dict, node_id: str, value: float, now: float):
+    key = (rule["id"], node_id)
+    current = _states.get(key)
+    if current is None:
+        if value >= rule["threshold"]:
+            if rule["for_sec"] <= 0:
+                _fire(rule, node_id, value, now)
+            else:
+                _states[key] = {"state": "pending", "since": now, "value": value}
+                heapq.heappush(_deadlines, (now + rule["for_sec"], rule["id"], node_id, now))
+    elif current["state"] == "pending":
+        if value < rule["threshold"]:
+            del _states[key]
+        else:
+            current["value"] = value
+    else:
+        current["value"] = value
+        if value < rule["clear_threshold"]:
+            del _states[key]
+            _emit(rule, node_id, "resolved", value, now)
+
+
+def ingest(node_id: str, metrics: dict, now: float = None):
+    """수집 값 반영. 값이 바뀐 시계열의 규칙만 평가"""
+    now = now or time.time()
+    with _lock:
+        _ensure_loaded()
+        for metric, value in metrics.items():
+            if value is None:
+                continue
+            series = (node_id, metric)
+            if _values.get(series) == value:
+                # 값이 그대로면 상태는 지속 시간 만료로만 바뀐다 (tick에서 처리)
+                continue
+            _values[series] = value
+            for rule_id in _rules_for(node_id, metric):
+                _evaluate(_rules[rule_id], node_id, value, now)
+
+
+def tick(now: float = None) -> int:
+    """지속 시간이 만료된 대기 알림 발생 처리. 발생한 알림 수 반환"""
+    now = now or time.time()
+    fired = 0
+    with _lock:
+        _ensure_loaded()
+        while _deadlines and _deadlines[0][0] <= now:
+            _, rule_id, node_id, since = heapq.heappop(_deadlines)
+            current = _states.get((rule_id, node_id))
+            # 그사이 해제/재시작된 대기 상태는 무시
+            if current is None or current["state"] != "pending" or current["since"] != since:
+                continue
+            _fire(_rules[rule_id], node_id, current["value"], now)
+            fired += 1
+        _publish()
+    return fired
+
+
+def _publish():
+    """진행 중인 알림을 DB에 기록 (다른 워커의 get_alerts용, 바뀐 경우에만)"""
+    global _published
+    rows = sorted(
+        (rule_id, node_id, current["state"], current["since"], current["value"])
+        for (rule_id, node_id), current in _states.items()
+    )
+    if rows == _published:
+        return
+    conn = _connect()
+    try:
+        conn.execute("DELETE FROM active")
+        conn.executemany("INSERT INTO active (rule_id, node_id, state, since, value) VALUES (?, ?, ?, ?, ?)", rows)
+        conn.commit()
+    finally:
+        conn.close()
+    _published = rows
+
+
+# --- 규칙 관리 ---
+
+def _rule_from_request(rule) -> dict:
+    if rule.node_id != ANY_NODE and rule.node_id not in get_docker_hosts():
+        raise HTTPException(status_code=404, detail="Unknown node")
+    clear = rule.clear_threshold if rule.clear_threshold is not None else rule.threshold - ALERT_HYSTERESIS
+    if clear > rule.threshold:
+        raise HTTPException(status_code=400, detail="clear_threshold는 threshold 이하여야 합니다")
+    return {
+        "id": rule.id,
+        "node_id": rule.node_id,
+        "metric": rule.metric,
+        "threshold": rule.threshold,
+        "clear_threshold": clear,
+        "for_sec": rule.for_sec if rule.for_sec is not None else ALERT_DEFAULT_FOR_SEC,
+        "severity": rule.severity,
+        "created_at": datetime.now().isoformat(),
+    }
+
+
+def _save(rules: list, replace_ids: list = ()):
+    """규칙 저장 후 세대 번호를 올려 모든 워커가 다시 읽게 하고, 이 워커의 색인 갱신"""
+    conn = _connect()
+    try:
+        conn.executemany("DELETE FROM rules WHERE id = ?", [(rule_id,) for rule_id in replace_ids])
+        conn.executemany(
+            "INSERT OR REPLACE INTO rules (id, node_id, metric, threshold, clear_threshold, for_sec, severity, created_at)"
+            " VALUES (:id, :node_id, :metric, :threshold, :clear_threshold, :for_sec, :severity, :created_at)",
+            rules,
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    node_registry.bump(RULES_GENERATION)
+    _ensure_loaded()
+
+
+def _apply(rules: list, replace_ids: list = ()):
+    """바뀐 규칙을 색인에 반영하고 현재 값으로 즉시 평가 (값은 평가를 맡은 워커에만 있음)"""
+    now = time.time()
+    # 같은 id로 교체하는 규칙은 진행 중인 상태를 이어받아 새 임계치로 평가
+    same_series = {
+        rule["id"] for rule in rules
+        if rule["id"] in _rules and (_rules[rule["id"]]["node_id"], _rules[rule["id"]]["metric"]) == (rule["node_id"], rule["metric"])
+    }
+    kept = {k: v for k, v in _states.items() if k[0] in same_series}
+    touched = {_rules[rule_id]["metric"] for rule_id in replace_ids if rule_id in _rules}
+    for rule_id in list(replace_ids) + [rule["id"] for rule in rules]:
+        _drop_from_index(rule_id)
+    for rule in rules:
+        _add_to_index(rule)
+        touched.add(rule["metric"])
+    _states.update(kept)
+    # 전용 규칙이 생기거나 사라지면 '*' 규칙 적용 여부가 바뀌므로 해당 지표 상태를 다시 평가
+    for (node_id, metric), value in list(_values.items()):
+        if metric not in touched:
+            continue
+        active = _rules_for(node_id, metric)
+        for state_key in [k for k in _states if k[1] == node_id and _rules[k[0]]["metric"] == metric]:
+            if state_key[0] not in active:
+                del _states[state_key]
+        for rule_id in active:
+            _evaluate(_rules[rule_id], node_id, value, now)
+
+
+def add_rule(rule) -> dict:
+    """규칙 등록 (같은 id면 교체)"""
+    record = _rule_from_request(rule)
+    with _lock:
+        _ensure_loaded()
+        _save([record])
+        return dict(record)
+
+
+def remove_rule(rule_id: str) -> dict:
+    """규칙 삭제 (진행 중인 알림도 함께 제거)"""
+    with _lock:
+        _ensure_loaded()
+        if rule_id not in _rules:
+            raise HTTPException(status_code=404, detail="알림 규칙을 찾을 수 없습니다")
+        _save([], replace_ids=[rule_id])
+    return {"ok": True}
+
+
+def set_thresholds(node_id: str, thresholds) -> list:
+    """사일로 임계치(cpu/mem/disk) 설정. 비운 지표는 사일로 전용 규칙 삭제"""
+    with _lock:
+        _ensure_loaded()
+        records, removed = [], []
+        for metric in METRICS:
+            rule_id = f"{node_id}:{metric}"
+            value = getattr(thresholds, metric)
+            if value is None:
+                if rule_id in _rules:
+                    removed.append(rule_id)
+                continue
+            records.append(_rule_from_request(AlertRule(
+                id=rule_id, node_id=node_id, metric=metric, threshold=value, for_sec=thresholds.for_sec,
+                severity=_rules.get(rule_id, {}).get("severity", "warning"),
+            )))
+        _save(records, replace_ids=removed)
+        return [dict(record) for record in records]
+
+
+def list_rules(node_id: str = None) -> list:
+    with _lock:
+        _ensure_loaded()
+        rules = [dict(rule) for rule in _rules.values() if node_id is None or rule["node_id"] in (node_id, ANY_NODE)]
+    return sorted(rules, key=lambda rule: rule["id"])
+
+
+def get_alerts() -> list:
+    """대기/발생 중인 알림 (평가를 맡은 워커가 기록한 상태)"""
+    conn = _connect()
+    try:
+        rows = [dict(row) for row in conn.execute("SELECT * FROM active")]
+    finally:
+        conn.close()
+    with _lock:
+        _ensure_loaded()
+        alerts = []
+        for current in rows:
+            # 삭제된 규칙의 알림은 평가 워커가 다음 수집에서 지우기 전이라도 제외
+            rule = _rules.get(current["rule_id"])
+            if rule is None:
+                continue
+            alerts.append({
+                "rule_id": current["rule_id"],
+                "node_id": current["node_id"],
+                "metric": rule["metric"],
+                "severity": rule["severity"],
+                "state": current["state"],
+                "value": current["value"],
+                "threshold": rule["threshold"],
+                "since": datetime.fromtimestamp(current["since"]).isoformat(timespec="seconds"),
+            })
+    return sorted(alerts, key=lambda alert: (alert["state"] != "firing", alert["node_id"], alert["rule_id"]))
+
+
+def _last_seq() -> int:
+    conn = _connect()
+    try:
+        return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM transitions").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _transitions_after(after: int) -> list:
+    """기록된 상태 전이 (seq가 after보다 큰 것)"""
+    conn = _connect()
+    try:
+        rows = conn.execute("SELECT seq, data FROM transitions WHERE seq > ? ORDER BY seq", (after,)).fetchall()
+    finally:
+        conn.close()
+    return [{"seq": seq, **json.loads(data)} for seq, data in rows]
+
+
+def stream_transitions(after: int = None, heartbeat_sec: float = 15.0):
+    """알림 상태 전이를 SSE 형식으로 계속 전송 (after 이후부터)
+
+    상태 전이는 평가 워커가 DB에 기록하므로 ALERT_POLL_SEC마다 확인하고, 같은 워커의 기록은 바로 깨어나 보낸다.
+    """
+    if after is None:
+        after = _last_seq()
+    idle_since = time.monotonic()
+    while True:
+        transitions = _transitions_after(after)
+        if not transitions:
+            if time.monotonic() - idle_since >= heartbeat_sec:
+                # 프록시 연결 유지용 주석 라인
+                yield ": keep-alive\n\n"
+                idle_since = time.monotonic()
+            with _changed:
+                _changed.wait(ALERT_POLL_SEC)
+            continue
+        for transition in transitions:
+            yield f"id: {transition['seq']}\nevent: {transition['state']}\ndata: {json.dumps(transition, ensure_ascii=False)}\n\n"
+        after = transitions[-1]["seq"]
+        idle_since = time.monotonic()
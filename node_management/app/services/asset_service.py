@@ -0,0 +1,176 @@
+"""정적 자산 번들 빌드 서비스
+
+배포 전에 한 번 실행해 CSS를 템플릿 순서대로 하나로 묶고, JS 모듈은 파일명에 내용 해시를
+붙인 사본(import 경로도 해시 이름으로 교체)을 만든 뒤 .gz/.br로 미리 압축한다. 결과 경로는
+manifest.json에 기록하고, 페이지는 매니페스트가 있으면 번들을, 없으면 원본 파일을 쓴다.
+
+    python -m services.asset_service   (node_management/app 에서)
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import shutil
+from config.settings import STATIC_DIR, STATIC_DIST_DIR
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 페이지에 넣는 순서대로의 CSS (뒤 파일이 앞 파일 규칙을 덮어씀)
+CSS_FILES = [
+    "css/main.css",
+    "css/layout/header.css",
+    "css/layout/sidebar.css",
+    "css/layout/layout.css",
+    "css/components/toolbar.css",
+    "css/components/buttons.css",
+    "css/components/cards.css",
+    "css/components/badges.css",
+    "css/components/modals.css",
+    "css/components/forms.css",
+    "css/views/serverView.css",
+    "css/views/graphView.css",
+    "css/utilities/animations.css",
+    "css/utilities/loading.css",
+    "css/utilities/empty-state.css",
+    "css/utilities/responsive.css",
+]
+JS_ENTRY = "js/main.js"
+
+_MANIFEST = "manifest.json"
+# 정적 import / re-export의 상대 경로 지정자
+_IMPORT = re.compile(r"""(\b(?:import|export)\b[^'";]*?\bfrom\s*|\bimport\s*)(['"])(\.{1,2}/[^'"]+)\2""")
+_HASH_LENGTH = 10
+
+# 매니페스트 캐시: (mtime, assets)
+_assets_cache = None
+
+
+def _fingerprint(relative: str, content: bytes) -> str:
+    digest = hashlib.sha256(content).hexdigest()[:_HASH_LENGTH]
+    stem, dot, suffix = relative.rpartition(".")
+    return f"{stem}.{digest}{dot}{suffix}"
+
+
+def _write(relative: str, content: bytes) -> list:
+    """dist 아래에 원본과 미리 압축한 사본 기록, 기록한 파일 목록 반환"""
+    path = STATIC_DIST_DIR / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    written = [path]
+    gz_path = path.with_name(path.name + ".gz")
+    # mtime=0: 같은 입력이면 같은 압축 결과
+    gz_path.write_bytes(gzip.compress(content, compresslevel=9, mtime=0))
+    written.append(gz_path)
+    if brotli is not None:
+        br_path = path.with_name(path.name + ".br")
+        br_path.write_bytes(brotli.compress(content, quality=11))
+        written.append(br_path)
+    return written
+
+
+def _build_modules(entry: str) -> dict:
+    """entry에서 import로 닿는 JS 모듈을 의존 순서대로 해시 이름으로 변환 -> {원본: 해시 경로}"""
+    built = {}
+    visiting = set()
+
+    def visit(relative: str):
+        if relative in built:
+            return built[relative]
+        if relative in visiting:
+            raise ValueError(f"JS 모듈 순환 import: {relative}")
+        visiting.add(relative)
+        source = (STATIC_DIR / relative).read_text(encoding="utf-8")
+        directory = relative.rsplit("/", 1)[0]
+
+        def rewrite(match):
+            prefix, quote, specifier = match.groups()
+            target = _normalize(f"{directory}/{specifier}")
+            hashed = visit(target)
+            # 같은 디렉터리 구조를 유지하므로 파일명만 해시 이름으로 교체
+            return f"{prefix}{quote}{specifier.rsplit('/', 1)[0]}/{hashed.rsplit('/', 1)[1]}{quote}"
+
+        content = _IMPORT.sub(rewrite, source).encode("utf-8")
+        hashed = _fingerprint(relative, content)
+        _write(hashed, content)
+        visiting.discard(relative)
+        built[relative] = hashed
+        return hashed
+
+    visit(entry)
+    return built
+
+
+def _normalize(path: str) -> str:
+    parts = []
+    for part in path.split("/"):
+        if part == "..":
+            parts.pop()
+        elif part not in ("", "."):
+            parts.append(part)
+    return "/".join(parts)
+
+
+def build() -> dict:
+    """CSS 번들과 JS 모듈 사본을 dist에 만들고 매니페스트 반환"""
+    if STATIC_DIST_DIR.exists():
+        shutil.rmtree(STATIC_DIST_DIR)
+    STATIC_DIST_DIR.mkdir(parents=True)
+
+    css = "\n".join(
+        f"/* {relative} */\n" + (STATIC_DIR / relative).read_text(encoding="utf-8") for relative in CSS_FILES
+    ).encode("utf-8")
+    css_bundle = _fingerprint("css/app.css", css)
+    _write(css_bundle, css)
+
+    modules = _build_modules(JS_ENTRY)
+    manifest = {
+        "css": [css_bundle],
+        "js": modules[JS_ENTRY],
+        # 진입 모듈이 import하는 모듈을 미리 받도록 modulepreload 힌트로 사용
+        "preload": [hashed for relative, hashed in modules.items() if relative != JS_ENTRY],
+        "bytes": {
+            "css": len(css),
+            "css_gz": (STATIC_DIST_DIR / (css_bundle + ".gz")).stat().st_size,
+        },
+    }
+    (STATIC_DIST_DIR / _MANIFEST).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def get_assets() -> dict:
+    """페이지에 넣을 CSS/JS 경로 (빌드 결과가 없으면 원본 파일)"""
+    global _assets_cache
+    manifest_path = STATIC_DIST_DIR / _MANIFEST
+    try:
+        mtime = manifest_path.stat().st_mtime
+    except FileNotFoundError:
+        return {
+            "css": [f"/static/{relative}" for relative in CSS_FILES],
+            "js": f"/static/{JS_ENTRY}",
+            "preload": [],
+        }
+    if _assets_cache is None or _assets_cache[0] != mtime:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        _assets_cache = (mtime, {
+            "css": [f"/static/dist/{path}" for path in manifest["css"]],
+            "js": f"/static/dist/{manifest['js']}",
+            "preload": [f"/static/dist/{path}" for path in manifest["preload"]],
+        })
+    return _assets_cache[1]
+
+
+def main(argv=None) -> int:
+    """CLI 진입점 (정적 번들 빌드)"""
+    parser = argparse.ArgumentParser(description="정적 자산 번들 빌드")
+    parser.parse_args(argv)
+    manifest = build()
+    print(json.dumps(manifest, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
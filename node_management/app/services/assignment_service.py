@@ -0,0 +1,127 @@
+"""데이터 지역성 기반 학습 샤드 배정 서비스
+
+사일로마다 로컬 MinIO의 샤드 매니페스트를 읽어, 그 사일로 트레이너의 워커들에게
+바이트 크기 기준 LPT(큰 샤드부터 가장 덜 찬 워커에 배정)로 나눠 준다. 트레이너는
+같은 Docker 네트워크의 MinIO 컨테이너에서만 읽고, 워커별 프리페치 목록을 받는다.
+"""
+import heapq
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from fastapi import HTTPException
+from config.settings import (
+    ASSIGNMENT_DIR_NAME,
+    ROUND_PROBE_WORKERS,
+    SILO_MINIO_CONTAINER_PREFIX,
+    SILO_MINIO_PORT,
+)
+from services import sharding_service
+from services.cleansing_service import get_filesystem, node_filesystem, split_uri
+from services.docker_service import get_docker_client, get_docker_hosts
+
+
+def lpt(shards: list, workers: int) -> list:
+    """큰 샤드부터 누적 바이트가 가장 작은 워커에 배정 (최적 대비 4/3 이내)"""
+    bins = [{"rank": rank, "shards": [], "bytes": 0, "rows": 0} for rank in range(workers)]
+    heap = [(0, rank) for rank in range(workers)]
+    for shard in sorted(shards, key=lambda s: (-s["bytes"], s["shard"])):
+        load, rank = heapq.heappop(heap)
+        bins[rank]["shards"].append(shard)
+        bins[rank]["bytes"] += shard["bytes"]
+        bins[rank]["rows"] += shard["rows"]
+        heapq.heappush(heap, (load + shard["bytes"], rank))
+    return bins
+
+
+def local_minio(node_id: str) -> dict:
+    """사일로 Docker에서 MinIO 컨테이너를 찾아 컨테이너 간 접속 주소와 네트워크 반환"""
+    client = get_docker_client(node_id)
+    containers = [
+        c for c in client.containers.list()
+        if c.name.startswith(SILO_MINIO_CONTAINER_PREFIX)
+    ]
+    if not containers:
+        raise HTTPException(status_code=409, detail=f"'{node_id}'에 실행 중인 MinIO 컨테이너가 없습니다")
+    container = containers[0]
+    networks = list(container.attrs.get("NetworkSettings", {}).get("Networks", {}))
+    return {
+        "container": container.name,
+        "endpoint": f"http://{container.name}:{SILO_MINIO_PORT}",
+        "network": networks[0] if networks else None,
+    }
+
+
+def _silo_plan(node_id: str, shards_uri: str, workers: int) -> dict:
+    """사일로 한 곳의 배정 계획"""
+    uri = shards_uri.replace("{silo}", node_id)
+    manifest = sharding_service.get_manifest(uri, node_id)
+    shards = [shard for shard in manifest["shards"] if shard["files"]]
+    bins = lpt(shards, workers)
+    mean = sum(b["bytes"] for b in bins) / workers
+    return {
+        "node_id": node_id,
+        "shards_uri": uri,
+        "generation": manifest.get("generation", 0),
+        "minio": local_minio(node_id),
+        "imbalance": round(max(b["bytes"] for b in bins) / mean, 4) if mean else 1.0,
+        "workers": [
+            {
+                "rank": b["rank"],
+                "bytes": b["bytes"],
+                "rows": b["rows"],
+                "shards": [shard["shard"] for shard in b["shards"]],
+                # 읽을 순서대로 나열한 프리페치 목록 (경로는 s3://bucket/key)
+                "prefetch": [
+                    {"uri": f"s3://{f['path']}", "bytes": f["bytes"], "rows": f["rows"]}
+                    for shard in b["shards"] for f in shard["files"]
+                ],
+            }
+            for b in bins
+        ],
+    }
+
+
+def plan(silo_ids: list, shards_uri: str, workers_per_silo: int = 1) -> dict:
+    """사일로별 샤드 배정 계획 (매니페스트는 병렬로 읽음)"""
+    if not shards_uri.startswith("s3://"):
+        raise HTTPException(status_code=400, detail="shards_uri는 s3:// 경로여야 합니다")
+    if workers_per_silo < 1:
+        raise HTTPException(status_code=400, detail="workers_per_silo는 1 이상이어야 합니다")
+    hosts = get_docker_hosts()
+    unknown = [node_id for node_id in silo_ids if node_id not in hosts]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"알 수 없는 사일로: {', '.join(unknown)}")
+    if not silo_ids:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(len(silo_ids), ROUND_PROBE_WORKERS)) as pool:
+        futures = {
+            node_id: pool.submit(_silo_plan, node_id, shards_uri, workers_per_silo) for node_id in silo_ids
+        }
+    plans = {}
+    for node_id, future in futures.items():
+        try:
+            plans[node_id] = future.result()
+        except HTTPException as e:
+            plans[node_id] = {"node_id": node_id, "error": e.detail}
+        except Exception as e:
+            plans[node_id] = {"node_id": node_id, "error": str(e)}
+    return plans
+
+
+def publish(silo_plan: dict, round_no: int) -> str:
+    """배정 계획을 사일로 MinIO에 기록하고 트레이너가 읽을 경로 반환"""
+    filesystem = get_filesystem(node_filesystem(silo_plan["node_id"]))
+    directory = f"{split_uri(silo_plan['shards_uri']).rstrip('/')}/{ASSIGNMENT_DIR_NAME}"
+    path = f"{directory}/round-{round_no:05d}.json"
+    document = {
+        "round": round_no,
+        "node_id": silo_plan["node_id"],
+        "endpoint": silo_plan["minio"]["endpoint"],
+        "generation": silo_plan["generation"],
+        "created_at": datetime.now().isoformat(),
+        "workers": silo_plan["workers"],
+    }
+    filesystem.create_dir(directory, recursive=True)
+    with filesystem.open_output_stream(path) as f:
+        f.write(json.dumps(document, ensure_ascii=False).encode('utf-8'))
+    return f"s3://{path}"
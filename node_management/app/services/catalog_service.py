@@ -0,0 +1,308 @@
+"""사일로 데이터 카탈로그 서비스 (MinIO 목록 → SQLite 매니페스트 인덱스)"""
+import hashlib
+import io
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlparse
+import pyarrow.parquet as pq
+from fastapi import HTTPException
+from minio import Minio
+from config.settings import (
+    CATALOG_DB,
+    CATALOG_SYNC_WORKERS,
+    CATALOG_WRITE_BATCH,
+    MINIO_ACCESS_KEY,
+    MINIO_SECRET_KEY,
+)
+from services import event_service
+from services.docker_service import get_docker_hosts
+
+# Parquet 푸터를 한 번에 읽기 위한 꼬리 구간 크기
+_FOOTER_TAIL_BYTES = 64 * 1024
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    node_id TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    key TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT NOT NULL,
+    last_modified TEXT,
+    rows INTEGER,
+    PRIMARY KEY (node_id, bucket, key)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    node_id TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    marker TEXT,  -- 이전 버전의 증분 마커 (사용 안 함)
+    synced_at TEXT,
+    PRIMARY KEY (node_id, bucket)
+);
+"""
+
+
+def _connect() -> sqlite3.Connection:
+    """카탈로그 인덱스 연결 (최초 호출 시 스키마 생성)"""
+    global _schema_ready
+    conn = sqlite3.connect(str(CATALOG_DB), timeout=30)
+    conn.row_factory = sqlite3.Row
+    if not _schema_ready:
+        with _schema_lock:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _schema_ready = True
+    return conn
+
+
+def get_minio_client(node_id: str) -> Minio:
+    """노드의 MinIO 클라이언트 반환"""
+    hosts = get_docker_hosts()
+    if node_id not in hosts:
+        raise HTTPException(status_code=404, detail="Unknown node")
+    minio_url = hosts[node_id].get("minio_url")
+    if not minio_url:
+        raise HTTPException(status_code=400, detail=f"'{node_id}'에 minio_url이 설정되어 있지 않습니다")
+
+    parsed = urlparse(minio_url)
+    return Minio(
+        parsed.netloc or parsed.path,
+        access_key=MINIO_ACCESS_KEY,
+        secret_key=MINIO_SECRET_KEY,
+        secure=parsed.scheme == "https",
+    )
+
+
+class _ObjectRangeFile(io.RawIOBase):
+    """S3 객체를 범위 요청으로 읽는 파일 객체 (Parquet 푸터 읽기용)"""
+
+    def __init__(self, client: Minio, bucket: str, key: str, size: int):
+        super().__init__()
+        self._client = client
+        self._bucket = bucket
+        self._key = key
+        self._size = size
+        self._pos = 0
+        # 푸터는 파일 끝에 있으므로 꼬리 구간을 한 번에 받아둔다
+        self._tail_start = max(0, size - _FOOTER_TAIL_BYTES)
+        self._tail = self._fetch(self._tail_start, size - self._tail_start)
+
+    def _fetch(self, offset: int, length: int) -> bytes:
+        if length <= 0:
+            return b""
+        response = self._client.get_object(self._bucket, self._key, offset=offset, length=length)
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = self._size + offset
+        return self._pos
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self._size - self._pos
+        size = min(size, self._size - self._pos)
+        if self._pos >= self._tail_start:
+            start = self._pos - self._tail_start
+            data = self._tail[start:start + size]
+        else:
+            data = self._fetch(self._pos, size)
+        self._pos += len(data)
+        return data
+
+
+def _parquet_row_count(client: Minio, bucket: str, key: str, size: int):
+    """Parquet 푸터에서 행 수 읽기 (본문은 받지 않음)"""
+    try:
+        return pq.read_metadata(_ObjectRangeFile(client, bucket, key, size)).num_rows
+    except Exception as e:
+        event_service.log("error", f"Parquet 메타데이터 읽기 오류 ({bucket}/{key}): {e}", source="catalog")
+        return None
+
+
+def _write_objects(conn, rows: list):
+    """객체 행을 짧은 트랜잭션 하나로 기록 (네트워크 읽기 중에는 쓰기 잠금을 잡지 않음)"""
+    if not rows:
+        return
+    conn.executemany(
+        "INSERT OR REPLACE INTO objects"
+        " (node_id, bucket, key, size, etag, last_modified, rows)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    rows.clear()
+
+
+def _sync_bucket(conn, client: Minio, node_id: str, bucket: str, full: bool) -> dict:
+    """버킷 하나 동기화 (etag가 바뀐 객체만 푸터를 다시 읽음)
+
+    목록은 매번 처음부터 받는다. 마커 이후만 나열하면 마커 앞 키의 덮어쓰기와
+    마커보다 앞에 정렬되는 새 키를 놓친다.
+    """
+    stats = {"listed": 0, "added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+    known = {
+        row["key"]: row["etag"]
+        for row in conn.execute(
+            "SELECT key, etag FROM objects WHERE node_id = ? AND bucket = ?", (node_id, bucket)
+        )
+    }
+    # 읽기만 했으므로 열린 트랜잭션 없음
+
+    seen = set()
+    pending = []
+    for obj in client.list_objects(bucket, recursive=True):
+        if obj.is_dir:
+            continue
+        stats["listed"] += 1
+        seen.add(obj.object_name)
+        etag = (obj.etag or "").strip('"')
+        previous = known.get(obj.object_name)
+        if previous == etag and not full:
+            stats["unchanged"] += 1
+            continue
+
+        rows = None
+        if obj.object_name.endswith(".parquet"):
+            rows = _parquet_row_count(client, bucket, obj.object_name, obj.size)
+        pending.append((
+            node_id, bucket, obj.object_name, obj.size, etag,
+            obj.last_modified.isoformat() if obj.last_modified else None, rows,
+        ))
+        if previous is None:
+            stats["added"] += 1
+        elif previous != etag:
+            stats["updated"] += 1
+        else:
+            stats["unchanged"] += 1
+        if len(pending) >= CATALOG_WRITE_BATCH:
+            _write_objects(conn, pending)
+    _write_objects(conn, pending)
+
+    removed = [key for key in known if key not in seen]
+    conn.executemany(
+        "DELETE FROM objects WHERE node_id = ? AND bucket = ? AND key = ?",
+        [(node_id, bucket, key) for key in removed],
+    )
+    stats["removed"] = len(removed)
+    conn.execute(
+        "INSERT OR REPLACE INTO sync_state (node_id, bucket, marker, synced_at) VALUES (?, ?, ?, ?)",
+        (node_id, bucket, None, datetime.now().isoformat()),
+    )
+    conn.commit()
+    return stats
+
+
+def sync_node(node_id: str, full: bool = False) -> dict:
+    """노드의 모든 버킷을 인덱스에 동기화
+
+    매번 전체 목록을 받아 추가/변경/삭제를 반영하고, etag가 그대로인 객체는 푸터를 다시 읽지 않는다.
+    full=True면 etag와 관계없이 모든 Parquet 푸터를 다시 읽는다.
+    """
+    started = time.perf_counter()
+    client = get_minio_client(node_id)
+    summary = {"node_id": node_id, "full": full, "buckets": {}}
+    conn = _connect()
+    try:
+        buckets = [b.name for b in client.list_buckets()]
+        for bucket in buckets:
+            summary["buckets"][bucket] = _sync_bucket(conn, client, node_id, bucket, full)
+        placeholders = ",".join("?" for _ in buckets) or "''"
+        for table in ("objects", "sync_state"):
+            conn.execute(
+                f"DELETE FROM {table} WHERE node_id = ? AND bucket NOT IN ({placeholders})",
+                (node_id, *buckets),
+            )
+        conn.commit()
+    finally:
+        conn.close()
+    summary["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return summary
+
+
+def sync_all(full: bool = False) -> list:
+    """minio_url이 있는 모든 노드를 병렬로 동기화"""
+    node_ids = [
+        node_id for node_id, info in get_docker_hosts().items() if info.get("minio_url")
+    ]
+    if not node_ids:
+        return []
+
+    def _sync(node_id):
+        try:
+            return sync_node(node_id, full)
+        except Exception as e:
+            return {"node_id": node_id, "full": full, "error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=min(len(node_ids), CATALOG_SYNC_WORKERS)) as pool:
+        return list(pool.map(_sync, node_ids))
+
+
+def get_stats(node_id: str = None) -> list:
+    """노드별 데이터셋 통계 (인덱스 조회만 수행)"""
+    query = (
+        "SELECT o.node_id, COUNT(DISTINCT o.bucket) AS buckets, COUNT(*) AS objects,"
+        " SUM(o.size) AS bytes, SUM(o.rows) AS rows,"
+        " (SELECT MAX(synced_at) FROM sync_state s WHERE s.node_id = o.node_id) AS synced_at"
+        " FROM objects o"
+    )
+    params = ()
+    if node_id is not None:
+        query += " WHERE o.node_id = ?"
+        params = (node_id,)
+    query += " GROUP BY o.node_id ORDER BY o.node_id"
+    conn = _connect()
+    try:
+        return [dict(row) for row in conn.execute(query, params)]
+    finally:
+        conn.close()
+
+
+def list_objects(node_id: str, bucket: str = None, prefix: str = "", limit: int = 100) -> list:
+    """인덱스에 저장된 객체 매니페스트 조회 (limit=-1이면 전체)"""
+    query = "SELECT bucket, key, size, etag, last_modified, rows FROM objects WHERE node_id = ?"
+    params = [node_id]
+    if bucket:
+        query += " AND bucket = ?"
+        params.append(bucket)
+    if prefix:
+        query += " AND key >= ? AND key < ?"
+        params += [prefix, prefix + "\uffff"]
+    query += " ORDER BY bucket, key LIMIT ?"
+    params.append(limit)
+    conn = _connect()
+    try:
+        return [dict(row) for row in conn.execute(query, params)]
+    finally:
+        conn.close()
+
+
+def fingerprint(node_id: str, bucket: str = None, prefix: str = "") -> str:
+    """인덱스 기준 객체 집합 지문 (key, etag). 변경 감지용 (bucket이 없으면 노드의 전체 버킷)"""
+    digest = hashlib.sha256()
+    for row in list_objects(node_id, bucket, prefix, limit=-1):
+        name = row["key"] if bucket else f"{row['bucket']}/{row['key']}"
+        digest.update(f"{name}\0{row['etag']}\n".encode('utf-8'))
+    return digest.hexdigest()
@@ -0,0 +1,224 @@
+"""노드별 Docker 호출 차단기 (circuit breaker)와 적응형 타임아웃
+
+원격 노드의 Docker API 요청을 감싸 연결 실패가 이어지면 차단(open)하고, 차단 중인
+노드로의 호출은 네트워크에 나가지 않고 바로 실패시킨다. 대기 시간이 지나면 요청 하나만
+시험으로 통과시키고(half-open), 성공하면 다시 연결(closed)한다. 연결 타임아웃은 노드별로
+관측한 GET 응답 지연의 p99에 비례해 정한다.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from urllib.parse import urlparse
+import requests
+from config.settings import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_LATENCY_SAMPLES,
+    BREAKER_MAX_OPEN_SEC,
+    BREAKER_OPEN_SEC,
+    DOCKER_CONNECT_TIMEOUT_SEC,
+    DOCKER_CONNECT_TIMEOUT_MAX_SEC,
+    DOCKER_CONNECT_TIMEOUT_MIN_SEC,
+    DOCKER_TIMEOUT_SEC,
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# p99 지연 대비 타임아웃 배수
+_TIMEOUT_FACTOR = 4
+# 응답 본문이 작아 읽기 타임아웃도 짧게 잡을 수 있는 요청
+_QUICK_PATHS = ("/_ping", "/version")
+
+# long_stream 안에서 보내는 요청의 읽기 타임아웃 (스레드별)
+_stream = threading.local()
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """차단 중인 노드로의 호출 (네트워크 요청 없이 즉시 실패)"""
+
+    def __init__(self, node_id: str, retry_in: float):
+        super().__init__(f"노드 '{node_id}' 연결 차단 중 ({retry_in:.1f}초 후 재시도)")
+        self.node_id = node_id
+        self.retry_in = retry_in
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class Breaker:
+    def __init__(self, node_id: str):
+        self.node_id = node_id
+        self.state = CLOSED
+        self.failures = 0
+        self.open_sec = BREAKER_OPEN_SEC
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.last_error = None
+        self.latencies = deque(maxlen=BREAKER_LATENCY_SAMPLES)
+        self.lock = threading.Lock()
+
+    def before_call(self):
+        """호출 허용 여부 확인 (차단 중이면 CircuitOpenError)"""
+        with self.lock:
+            if self.state == CLOSED:
+                return
+            retry_in = self.opened_at + self.open_sec - time.monotonic()
+            if self.state == OPEN and retry_in <= 0:
+                self.state = HALF_OPEN
+                self.trial_in_flight = False
+            if self.state == HALF_OPEN and not self.trial_in_flight:
+                # 시험 요청 하나만 통과
+                self.trial_in_flight = True
+                return
+            raise CircuitOpenError(self.node_id, max(0.0, retry_in))
+
+    def record_success(self, latency: float = None):
+        with self.lock:
+            if latency is not None:
+                self.latencies.append(latency)
+            self.state = CLOSED
+            self.failures = 0
+            self.open_sec = BREAKER_OPEN_SEC
+            self.trial_in_flight = False
+
+    def record_failure(self, error: Exception):
+        with self.lock:
+            self.failures += 1
+            self.last_error = str(error)
+            if self.state == HALF_OPEN:
+                # 시험 요청 실패: 대기 시간을 늘려 다시 차단
+                self.open_sec = min(self.open_sec * 2, BREAKER_MAX_OPEN_SEC)
+                self._open()
+            elif self.state == CLOSED and self.failures >= BREAKER_FAILURE_THRESHOLD:
+                self._open()
+
+    def release_trial(self):
+        """연결 문제가 아닌 오류로 끝난 시험 요청: 상태는 두고 다음 요청이 시험하도록 슬롯만 반환"""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.trial_in_flight = False
+
+    def connect_timeout(self) -> float:
+        """관측한 p99 지연에 비례한 연결 타임아웃 (표본이 없으면 기본값)"""
+        with self.lock:
+            samples = sorted(self.latencies)
+        if len(samples) < 10:
+            return DOCKER_CONNECT_TIMEOUT_SEC
+        timeout = _percentile(samples, 0.99) * _TIMEOUT_FACTOR
+        return min(max(timeout, DOCKER_CONNECT_TIMEOUT_MIN_SEC), DOCKER_CONNECT_TIMEOUT_MAX_SEC)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            samples = sorted(self.latencies)
+            state = self.state
+            retry_in = None
+            if state == OPEN:
+                retry_in = round(max(0.0, self.opened_at + self.open_sec - time.monotonic()), 1)
+            result = {
+                "state": state,
+                "failures": self.failures,
+                "retry_in_sec": retry_in,
+                "last_error": self.last_error,
+                "p50_ms": round(_percentile(samples, 0.50) * 1000, 1) if samples else None,
+                "p99_ms": round(_percentile(samples, 0.99) * 1000, 1) if samples else None,
+            }
+        result["connect_timeout_ms"] = round(self.connect_timeout() * 1000)
+        return result
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get(node_id: str) -> Breaker:
+    with _breakers_lock:
+        if node_id not in _breakers:
+            _breakers[node_id] = Breaker(node_id)
+        return _breakers[node_id]
+
+
+def snapshot(node_id: str) -> dict:
+    """노드 상태 응답에 넣을 차단기 상태"""
+    return get(node_id).snapshot()
+
+
+def allow_trial(node_id: str):
+    """수동 연결 테스트용: 대기 시간과 관계없이 다음 요청 하나를 시험으로 통과"""
+    breaker = get(node_id)
+    with breaker.lock:
+        if breaker.state != CLOSED:
+            breaker.state = HALF_OPEN
+            breaker.trial_in_flight = False
+
+
+def guards(base_url: str) -> bool:
+    """차단기를 적용할 주소인지 (로컬 소켓은 제외)"""
+    return urlparse(base_url).scheme not in ("unix", "npipe", "")
+
+
+@contextmanager
+def long_stream(read_timeout):
+    """이 스레드에서 여는 스트림 요청(출력 없이 오래 걸릴 수 있는 exec 등)의 읽기 타임아웃을
+    read_timeout(None이면 제한 없음)으로 하고 차단기 집계에서 뺀다"""
+    _stream.active, _stream.read_timeout = True, read_timeout
+    try:
+        yield
+    finally:
+        _stream.active = False
+
+
+def honor_long_streams(api):
+    """차단기를 쓰지 않는 클라이언트(로컬 소켓)도 long_stream의 읽기 타임아웃은 따르도록"""
+    send = api.send
+
+    def stream_send(request, **kwargs):
+        if getattr(_stream, "active", False):
+            kwargs["timeout"] = _stream.read_timeout
+        return send(request, **kwargs)
+
+    api.send = stream_send
+    return api
+
+
+def instrument(node_id: str, api):
+    """docker APIClient의 요청 전송을 차단기/적응형 타임아웃으로 감쌈"""
+    send = api.send
+    breaker = get(node_id)
+
+    def guarded_send(request, **kwargs):
+        if getattr(_stream, "active", False):
+            # 오래 걸리는 스트림: 연결만 적응형 타임아웃, 출력 없는 구간의 읽기 타임아웃은 실패로 세지 않음
+            kwargs["timeout"] = (breaker.connect_timeout(), _stream.read_timeout)
+            return send(request, **kwargs)
+        breaker.before_call()
+        connect = breaker.connect_timeout()
+        read = kwargs.get("timeout")
+        if urlparse(request.url).path.endswith(_QUICK_PATHS):
+            read = connect
+        elif not isinstance(read, (int, float)):
+            read = DOCKER_TIMEOUT_SEC
+        # 꺼진 노드에서 오래 기다리는 구간은 연결 단계이므로 연결 타임아웃만 짧게
+        kwargs["timeout"] = (connect, read)
+        started = time.perf_counter()
+        try:
+            response = send(request, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            breaker.record_failure(e)
+            raise
+        except BaseException:
+            # 그 밖의 오류(잘못된 요청, SSL 등)로 시험 요청이 끝나도 half-open에 갇히지 않도록
+            breaker.release_trial()
+            raise
+        # 응답 헤더까지의 시간. 서버 작업 시간이 섞이는 변경 요청은 지연 표본에서 제외
+        breaker.record_success(time.perf_counter() - started if request.method == "GET" else None)
+        return response
+
+    api.send = guarded_send
+    return api
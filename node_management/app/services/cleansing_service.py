@@ -0,0 +1,398 @@
+"""사일로 데이터 정제 엔진 (Parquet 행 그룹 / CSV 블록 단위 병렬 처리)
+
+사일로 MinIO 옆에서 실행된다. API(백그라운드 작업) 또는 CLI로 사용:
+    python -m services.cleansing_service --input s3://raw/a.parquet \\
+        --output s3://clean/a.parquet --endpoint minio-silo1:9000 --rules rules.json
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlparse
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from pyarrow import fs as pafs
+from fastapi import HTTPException
+from config.settings import (
+    CLEANSE_CSV_BLOCK_SIZE,
+    CLEANSE_JOB_HISTORY,
+    CLEANSE_WORKERS,
+    MINIO_ACCESS_KEY,
+    MINIO_SECRET_KEY,
+)
+from services import event_service, job_store
+from services.docker_service import get_docker_hosts
+
+# 정규화된 ID가 기록되는 컬럼 (샤딩 단계의 기준 키)
+NORMALIZED_ID_COLUMN = "normalized_id"
+
+_NUMERIC_PATTERNS = {
+    "int": r"^[-+]?\d+$",
+    "float": r"^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$",
+}
+_TRUE_VALUES = ["true", "t", "yes", "y", "1"]
+_FALSE_VALUES = ["false", "f", "no", "n", "0"]
+
+# 정제 작업 상태: job_id -> job dict
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def normalize_id(id_value: str, hash_it: bool = True) -> str:
+    """ID 정규화 (test/test.py의 normalize_id와 동일 규칙)"""
+    normalized = id_value.lower().strip()
+    normalized = ''.join(c for c in normalized if c.isalnum())
+    if hash_it:
+        normalized = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+    return normalized
+
+
+def normalize_ids(values, hash_it: bool = True) -> pa.Array:
+    """ID 컬럼 벡터 정규화 (normalize_id와 같은 결과)"""
+    values = pc.cast(values, pa.string())
+    values = pc.utf8_lower(values)
+    # 공백 제거 + 영숫자 외 문자 제거를 한 번에 처리
+    values = pc.replace_substring_regex(values, pattern=r"[^\p{L}\p{N}]", replacement="")
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    if hash_it:
+        values = pa.array(
+            [
+                None if v is None else hashlib.sha256(v.encode('utf-8')).hexdigest()
+                for v in values.to_pylist()
+            ],
+            type=pa.string(),
+        )
+    return values
+
+
+def _coerce(column, type_name: str):
+    """타입 변환 (변환할 수 없는 값은 null)"""
+    target = pa.type_for_alias(type_name)
+    if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+        column = pc.utf8_trim_whitespace(column)
+        null = pa.scalar(None, column.type)
+        if pa.types.is_integer(target) or pa.types.is_floating(target):
+            pattern = _NUMERIC_PATTERNS["int" if pa.types.is_integer(target) else "float"]
+            column = pc.if_else(pc.match_substring_regex(column, pattern), column, null)
+        elif pa.types.is_boolean(target):
+            lowered = pc.utf8_lower(column)
+            return pc.if_else(
+                pc.is_in(lowered, value_set=pa.array(_TRUE_VALUES)),
+                True,
+                pc.if_else(pc.is_in(lowered, value_set=pa.array(_FALSE_VALUES)), False, None),
+            )
+    try:
+        return pc.cast(column, target)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        # 벡터 변환이 실패한 경우에만 값 단위로 변환
+        converted = []
+        for value in column.to_pylist():
+            try:
+                converted.append(pa.scalar(value).cast(target).as_py())
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, TypeError):
+                converted.append(None)
+        return pa.array(converted, type=target)
+
+
+def _set_column(table: pa.Table, name: str, values) -> pa.Table:
+    """컬럼 교체 (없으면 추가)"""
+    if name in table.column_names:
+        return table.set_column(table.column_names.index(name), name, values)
+    return table.append_column(name, values)
+
+
+def _dedup_first(table: pa.Table) -> pa.Table:
+    """정규화 ID 기준으로 배치 안의 첫 행만 유지"""
+    rows = pa.array(range(table.num_rows), type=pa.int64())
+    indexed = pa.table({NORMALIZED_ID_COLUMN: table[NORMALIZED_ID_COLUMN], "row": rows})
+    first = indexed.group_by(NORMALIZED_ID_COLUMN, use_threads=False).aggregate([("row", "min")])["row_min"]
+    return table.take(pc.take(first, pc.array_sort_indices(first)))
+
+
+def apply_rules(table: pa.Table, rules: dict, dedup: bool = True) -> pa.Table:
+    """선언적 정제 규칙 적용 (타입 변환 → null 처리 → 범위 검사 → ID 정규화/중복 제거)"""
+    for name, type_name in rules.get("casts", {}).items():
+        if name in table.column_names:
+            table = _set_column(table, name, _coerce(table[name], type_name))
+
+    for name, value in rules.get("fill_nulls", {}).items():
+        if name in table.column_names:
+            column = table[name]
+            table = _set_column(table, name, pc.fill_null(column, pa.scalar(value).cast(column.type)))
+
+    mask = None
+    for name in rules.get("required_columns", []):
+        cond = pc.is_valid(table[name])
+        mask = cond if mask is None else pc.and_(mask, cond)
+    for name, (low, high) in rules.get("ranges", {}).items():
+        column = table[name]
+        cond = None
+        if low is not None:
+            cond = pc.greater_equal(column, low)
+        if high is not None:
+            upper = pc.less_equal(column, high)
+            cond = upper if cond is None else pc.and_kleene(cond, upper)
+        if cond is None:
+            continue
+        cond = pc.or_kleene(pc.is_null(column), cond)
+        mask = cond if mask is None else pc.and_(mask, cond)
+    if mask is not None:
+        table = table.filter(mask)
+
+    id_column = rules.get("id_column")
+    if id_column:
+        normalized = normalize_ids(table[id_column], rules.get("hash_ids", True))
+        table = _set_column(table, NORMALIZED_ID_COLUMN, normalized)
+        table = table.filter(pc.and_(pc.is_valid(normalized), pc.not_equal(normalized, "")))
+        if dedup:
+            table = _dedup_first(table)
+    return table
+
+
+def get_filesystem(fs_desc):
+    """파일시스템 생성 (fs_desc가 없으면 로컬)"""
+    if not fs_desc:
+        return pafs.LocalFileSystem()
+    return pafs.S3FileSystem(
+        access_key=fs_desc["access_key"],
+        secret_key=fs_desc["secret_key"],
+        endpoint_override=fs_desc["endpoint"],
+        scheme=fs_desc["scheme"],
+    )
+
+
+def s3_filesystem_desc(endpoint: str, secure: bool = False) -> dict:
+    """워커 프로세스로 넘길 수 있는 S3 파일시스템 설명"""
+    return {
+        "endpoint": endpoint,
+        "scheme": "https" if secure else "http",
+        "access_key": MINIO_ACCESS_KEY,
+        "secret_key": MINIO_SECRET_KEY,
+    }
+
+
+def node_filesystem(node_id: str) -> dict:
+    """노드의 MinIO 파일시스템 설명"""
+    hosts = get_docker_hosts()
+    if node_id not in hosts:
+        raise HTTPException(status_code=404, detail="Unknown node")
+    minio_url = hosts[node_id].get("minio_url")
+    if not minio_url:
+        raise HTTPException(status_code=400, detail=f"'{node_id}'에 minio_url이 설정되어 있지 않습니다")
+    parsed = urlparse(minio_url)
+    return s3_filesystem_desc(parsed.netloc or parsed.path, parsed.scheme == "https")
+
+
+def split_uri(uri: str) -> str:
+    """s3://bucket/key 또는 로컬 경로를 파일시스템 경로로 변환"""
+    parsed = urlparse(uri)
+    if parsed.scheme == "s3":
+        return f"{parsed.netloc}{parsed.path}"
+    return uri
+
+
+def _cleanse_unit(source: dict, unit, rules: dict):
+    """작업 단위 하나 정제 (프로세스 풀 워커)"""
+    if source["format"] == "parquet":
+        filesystem = get_filesystem(source["filesystem"])
+        with filesystem.open_input_file(source["path"]) as f:
+            table = pq.ParquetFile(f).read_row_group(unit)
+    else:
+        table = pa.Table.from_batches([unit])
+    rows_in = table.num_rows
+    table = apply_rules(table, rules, dedup=False)
+    rows_valid = table.num_rows
+    if rules.get("id_column"):
+        table = _dedup_first(table)
+    return rows_in, rows_valid, table
+
+
+def _ordered_results(pool, units, source: dict, rules: dict, window: int):
+    """제출 순서대로 결과 반환 (동시에 window개까지만 처리 중)"""
+    pending = deque()
+    for unit in units:
+        pending.append(pool.submit(_cleanse_unit, source, unit, rules))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _new_job(input_uri: str, output_uri: str, fs_desc, rules: dict, workers: int) -> dict:
+    return {
+        "id": uuid.uuid4().hex[:12],
+        "state": "pending",
+        "input_uri": input_uri,
+        "output_uri": output_uri,
+        "filesystem": fs_desc,
+        "rules": rules,
+        "workers": workers,
+        "rows_in": 0,
+        "rows_out": 0,
+        "rows_dropped": 0,
+        "duplicates": 0,
+        "progress_pct": 0.0,
+        "rows_per_sec": 0.0,
+        "elapsed_ms": 0,
+    }
+
+
+def run_cleanse(job: dict) -> dict:
+    """정제 실행: 입력을 스트리밍으로 읽어 워커 풀에서 정제 후 Parquet로 기록"""
+    started = time.perf_counter()
+    job["state"] = "running"
+    rules = job["rules"]
+    workers = job["workers"]
+    fs_desc = job["filesystem"]
+    filesystem = get_filesystem(fs_desc)
+    in_path = split_uri(job["input_uri"])
+    out_path = split_uri(job["output_uri"])
+    is_csv = in_path.lower().endswith(".csv")
+    source = {"format": "csv" if is_csv else "parquet", "path": in_path, "filesystem": fs_desc}
+    hash_ids = rules.get("hash_ids", True)
+
+    input_file = filesystem.open_input_file(in_path)
+    if is_csv:
+        input_size = input_file.size() or 1
+        units = pacsv.open_csv(
+            input_file, read_options=pacsv.ReadOptions(block_size=CLEANSE_CSV_BLOCK_SIZE)
+        )
+    else:
+        units_total = pq.ParquetFile(input_file).num_row_groups
+        units = range(units_total)
+
+    # 배치 간 중복 제거용 집합 (해시 ID는 앞 64비트만 보관해 메모리 절약)
+    seen = set()
+    writer = None
+    units_done = 0
+    try:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            for rows_in, rows_valid, table in _ordered_results(pool, units, source, rules, workers * 2):
+                if rules.get("id_column") and table.num_rows:
+                    keep = []
+                    for value in table[NORMALIZED_ID_COLUMN].to_pylist():
+                        key = int(value[:16], 16) if hash_ids else value
+                        if key in seen:
+                            keep.append(False)
+                        else:
+                            seen.add(key)
+                            keep.append(True)
+                    table = table.filter(pa.array(keep, type=pa.bool_()))
+
+                if writer is None:
+                    writer = pq.ParquetWriter(out_path, table.schema, filesystem=filesystem)
+                elif table.schema != writer.schema:
+                    table = table.cast(writer.schema)
+                if table.num_rows:
+                    writer.write_table(table)
+
+                units_done += 1
+                elapsed = time.perf_counter() - started
+                job["rows_in"] += rows_in
+                job["rows_out"] += table.num_rows
+                job["rows_dropped"] += rows_in - rows_valid
+                job["duplicates"] += rows_valid - table.num_rows
+                if is_csv:
+                    job["progress_pct"] = round(min(100.0, input_file.tell() * 100 / input_size), 1)
+                else:
+                    job["progress_pct"] = round(units_done * 100 / units_total, 1)
+                job["rows_per_sec"] = round(job["rows_in"] / elapsed, 1) if elapsed else 0.0
+                job["elapsed_ms"] = round(elapsed * 1000, 1)
+        job["progress_pct"] = 100.0
+        job["state"] = "done"
+    except Exception as e:
+        job["state"] = "failed"
+        job["error"] = str(e)
+    finally:
+        if writer is not None:
+            writer.close()
+        input_file.close()
+        job["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return job
+
+
+def start_cleanse(request) -> dict:
+    """정제 작업 시작 (백그라운드)"""
+    uses_s3 = request.input_uri.startswith("s3://") or request.output_uri.startswith("s3://")
+    if uses_s3 and not request.node_id:
+        raise HTTPException(status_code=400, detail="s3:// 경로는 node_id가 필요합니다")
+    fs_desc = node_filesystem(request.node_id) if uses_s3 else None
+    job = _new_job(
+        request.input_uri,
+        request.output_uri,
+        fs_desc,
+        request.rules.model_dump(),
+        max(1, request.workers or CLEANSE_WORKERS),
+    )
+    job["node_id"] = request.node_id
+    with _jobs_lock:
+        _jobs[job["id"]] = job
+        while len(_jobs) > CLEANSE_JOB_HISTORY:
+            _jobs.popitem(last=False)
+    job_store.add("cleanse", job, CLEANSE_JOB_HISTORY)
+    threading.Thread(target=_run_logged, args=(job,), daemon=True).start()
+    return _public(job)
+
+
+def _run_logged(job: dict):
+    run_cleanse(job)
+    event_service.log_job("cleanse", f"데이터 정제 '{job['input_uri']}'", job, node_id=job.get("node_id"))
+    job_store.finish("cleanse", job)
+
+
+def _public(job: dict) -> dict:
+    """응답용 작업 정보 (접속 정보 제외)"""
+    return {k: v for k, v in job.items() if k != "filesystem"}
+
+
+def get_job(job_id: str) -> dict:
+    """정제 작업 진행 상태 조회"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        job = job_store.get("cleanse", job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="정제 작업을 찾을 수 없습니다")
+    return _public(job)
+
+
+def list_jobs() -> list:
+    """정제 작업 목록 조회 (모든 워커)"""
+    with _jobs_lock:
+        local = list(_jobs.values())
+    return [_public(job) for job in job_store.merge("cleanse", local)]
+
+
+def main(argv=None) -> int:
+    """CLI 진입점 (사일로 컨테이너 안에서 실행)"""
+    parser = argparse.ArgumentParser(description="사일로 데이터 정제 엔진")
+    parser.add_argument("--input", required=True, help="입력 경로 또는 s3://bucket/key")
+    parser.add_argument("--output", required=True, help="출력 경로 또는 s3://bucket/key")
+    parser.add_argument("--rules", default="{}", help="정제 규칙 JSON 문자열 또는 @파일 경로")
+    parser.add_argument("--endpoint", help="MinIO 주소 (host:port). s3:// 경로에서 필요")
+    parser.add_argument("--secure", action="store_true", help="MinIO HTTPS 사용")
+    parser.add_argument("--workers", type=int, default=CLEANSE_WORKERS)
+    args = parser.parse_args(argv)
+
+    if args.rules.startswith("@"):
+        with open(args.rules[1:], 'r', encoding='utf-8') as f:
+            rules = json.load(f)
+    else:
+        rules = json.loads(args.rules)
+    fs_desc = s3_filesystem_desc(args.endpoint, args.secure) if args.endpoint else None
+    job = run_cleanse(_new_job(args.input, args.output, fs_desc, rules, max(1, args.workers)))
+    print(json.dumps(_public(job), ensure_ascii=False))
+    return 0 if job["state"] == "done" else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,88 @@
+"""읽기 요청 합치기 (single-flight + 짧은 TTL)
+
+같은 키의 조회가 동시에 들어오면 한 요청만 Docker 데몬까지 가고 나머지는 그 결과를
+기다려 받는다. 결과는 짧은 TTL 동안 워커 메모리와 공유 레지스트리 캐시에 두어, 접속한
+대시보드 수와 워커 수에 관계없이 데몬 부하가 일정하게 유지된다.
+"""
+import threading
+import time
+from config.settings import COALESCE_TTL_SEC
+from services import node_registry
+
+_SHARED_PREFIX = "read:"
+
+# 키별 진행 중인 조회
+_flights = {}
+# 키별 최근 결과: key -> (at, value, expires_at). 페이지/선택자마다 키가 달라지므로 만료된 결과는 기록할 때 정리
+_results = {}
+_lock = threading.Lock()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.at = None
+        self.source = None
+
+
+def _meta(at: float, source: str) -> dict:
+    return {"age": max(0.0, time.time() - at), "source": source}
+
+
+def fetch(key: str, loader, ttl_sec: float = COALESCE_TTL_SEC):
+    """(값, {"age", "source"}) 반환. source는 upstream/coalesced/cache/shared"""
+    with _lock:
+        cached = _results.get(key)
+        if cached and time.time() - cached[0] < ttl_sec:
+            return cached[1], _meta(cached[0], "cache")
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        # 같은 키의 조회가 진행 중이면 그 결과를 함께 사용
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value, _meta(flight.at, "coalesced")
+
+    try:
+        # 다른 워커가 방금 가져온 결과가 있으면 재사용
+        shared = node_registry.cache_get(_SHARED_PREFIX + key)
+        if shared and time.time() - shared["at"] < ttl_sec:
+            flight.value, flight.at, flight.source = shared["value"], shared["at"], "shared"
+        else:
+            flight.value = loader()
+            flight.at, flight.source = time.time(), "upstream"
+            node_registry.cache_set(_SHARED_PREFIX + key, {"at": flight.at, "value": flight.value}, ttl_sec)
+        with _lock:
+            now = time.time()
+            for stale in [k for k, (_, _, expires_at) in _results.items() if expires_at <= now]:
+                del _results[stale]
+            _results[key] = (flight.at, flight.value, flight.at + ttl_sec)
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _lock:
+            _flights.pop(key, None)
+        flight.done.set()
+    return flight.value, _meta(flight.at, flight.source)
+
+
+def invalidate(prefix: str):
+    """prefix로 시작하는 키의 결과 삭제 (변경 작업 직후 호출)"""
+    with _lock:
+        for key in [k for k in _results if k.startswith(prefix)]:
+            del _results[key]
+    node_registry.cache_delete_prefix(_SHARED_PREFIX + prefix)
+
+
+def set_headers(response, meta: dict):
+    """응답에 신선도 정보 헤더 추가 (Age는 초 단위 정수)"""
+    response.headers["Age"] = str(int(meta["age"]))
+    response.headers["X-Data-Age-Ms"] = str(round(meta["age"] * 1000))
+    response.headers["X-Data-Source"] = meta["source"]
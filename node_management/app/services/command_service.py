@@ -0,0 +1,269 @@
+"""사일로 원격 명령 실행 서비스 (SSH 대신 docker exec)
+
+노드별로 재사용하는 Docker 클라이언트로 여러 사일로 컨테이너에서 같은 명령을 동시에
+실행한다. stdout/stderr는 대상과 스트림을 붙인 이벤트로 섞어 SSE로 전달하고,
+대상별 종료 코드를 모은다.
+"""
+import codecs
+import json
+import shlex
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import docker
+from fastapi import HTTPException
+from config.settings import (
+    COMMAND_JOB_HISTORY,
+    COMMAND_MAX_PARALLEL,
+    COMMAND_OUTPUT_LIMIT,
+    COMMAND_STREAM_GRACE_SEC,
+    COMMAND_TIMEOUT_SEC,
+)
+from services import circuit_breaker, event_service, job_store
+from services.docker_service import get_docker_client, get_docker_hosts
+
+# `timeout` 명령이 제한 시간 초과 시 돌려주는 종료 코드
+_TIMEOUT_EXIT_CODE = 124
+
+# 실행 작업: job_id -> job dict (오래된 작업부터 정리)
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+# 이벤트 추가 알림 (SSE 대기용)
+_events_changed = threading.Condition()
+
+
+def _emit(job: dict, kind: str, **fields):
+    """작업 이벤트 추가 및 대기 중인 SSE 구독자 깨우기"""
+    with _events_changed:
+        job["events"].append({"seq": len(job["events"]), "kind": kind, **fields})
+        _events_changed.notify_all()
+
+
+def _argv(command, timeout_sec: int) -> list:
+    argv = ["sh", "-c", command] if isinstance(command, str) else list(command)
+    # docker exec에는 제한 시간이 없으므로 컨테이너 안의 timeout으로 감싼다
+    return ["timeout", str(timeout_sec)] + argv if timeout_sec else argv
+
+
+def _run_target(job: dict, target: dict, argv: list):
+    """대상 컨테이너 하나에서 명령 실행, 출력 청크를 이벤트로 전달"""
+    key = target["key"]
+    started = time.perf_counter()
+    target["state"] = "running"
+    _emit(job, "start", target=key)
+    try:
+        client = get_docker_client(target["node_id"])
+        container = client.containers.get(target["container"])
+        exec_id = client.api.exec_create(
+            container.id, argv, stdout=True, stderr=True,
+            environment=job["env"] or None, workdir=job["workdir"], user=job["user"] or "",
+        )["Id"]
+        # 청크 경계에서 잘린 멀티바이트 문자를 이어 붙이도록 스트림별 증분 디코더 사용
+        decoders = {name: codecs.getincrementaldecoder("utf-8")(errors="replace") for name in ("stdout", "stderr")}
+        # 출력 없이 오래 도는 명령도 있으므로 읽기 타임아웃은 명령 제한 시간 기준, 차단기 집계에서 제외
+        read_timeout = job["timeout_sec"] + COMMAND_STREAM_GRACE_SEC if job["timeout_sec"] else None
+        with circuit_breaker.long_stream(read_timeout):
+            stream = client.api.exec_start(exec_id, stream=True, demux=True)
+        for stdout, stderr in stream:
+            for name, chunk in (("stdout", stdout), ("stderr", stderr)):
+                if not chunk:
+                    continue
+                target["bytes"][name] += len(chunk)
+                if target["output_bytes"] >= COMMAND_OUTPUT_LIMIT:
+                    if not target["truncated"]:
+                        target["truncated"] = True
+                        _emit(job, "truncated", target=key)
+                    continue
+                target["output_bytes"] += len(chunk)
+                text = decoders[name].decode(chunk)
+                if text:
+                    _emit(job, name, target=key, data=text)
+        for name, decoder in decoders.items():
+            text = decoder.decode(b"", final=True)
+            if text and not target["truncated"]:
+                _emit(job, name, target=key, data=text)
+        exit_code = client.api.exec_inspect(exec_id)["ExitCode"]
+        target["exit_code"] = exit_code
+        if job["timeout_sec"] and exit_code == _TIMEOUT_EXIT_CODE:
+            target["state"] = "timeout"
+        else:
+            target["state"] = "done" if exit_code == 0 else "failed"
+    except docker.errors.NotFound:
+        target["state"] = "error"
+        target["error"] = f"컨테이너를 찾을 수 없습니다: {target['container']}"
+    except HTTPException as e:
+        target["state"] = "error"
+        target["error"] = e.detail
+    except Exception as e:
+        target["state"] = "error"
+        target["error"] = str(e)
+    target["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    _emit(job, "exit", target=key, state=target["state"], exit_code=target["exit_code"],
+          error=target.get("error"), elapsed_ms=target["elapsed_ms"])
+
+
+def _run_job(job: dict, max_parallel: int):
+    started = time.perf_counter()
+    argv = _argv(job["command"], job["timeout_sec"])
+    targets = list(job["targets"].values())
+    with ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="command") as pool:
+        for target in targets:
+            pool.submit(_run_target, job, target, argv)
+    failed = [t["key"] for t in targets if t["state"] != "done"]
+    job["state"] = "failed" if failed else "done"
+    job["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    job["finished_at"] = datetime.now().isoformat()
+    _emit(job, "state", state=job["state"], failed=failed, elapsed_ms=job["elapsed_ms"])
+    event_service.log_job("commands", f"원격 명령 '{job['command_line']}' ({len(targets)}곳)", job)
+    job_store.finish("commands", job)
+
+
+def _resolve_targets(request) -> list:
+    hosts = get_docker_hosts()
+    if request.targets:
+        targets = [(t.node_id, t.container) for t in request.targets]
+    else:
+        if not request.container:
+            raise HTTPException(status_code=400, detail="targets 또는 container가 필요합니다")
+        node_ids = request.node_ids or [
+            node_id for node_id, info in hosts.items() if info.get("role", "client") == "client"
+        ]
+        targets = [(node_id, request.container) for node_id in node_ids]
+    unknown = sorted({node_id for node_id, _ in targets if node_id not in hosts})
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"알 수 없는 노드: {', '.join(unknown)}")
+    if not targets:
+        raise HTTPException(status_code=409, detail="실행 대상이 없습니다")
+    return list(dict.fromkeys(targets))
+
+
+def start_command(request) -> dict:
+    """여러 노드/컨테이너에서 명령 동시 실행 시작 (백그라운드)"""
+    if not request.command:
+        raise HTTPException(status_code=400, detail="command가 비어 있습니다")
+    targets = _resolve_targets(request)
+    timeout_sec = COMMAND_TIMEOUT_SEC if request.timeout_sec is None else request.timeout_sec
+    max_parallel = max(1, min(request.max_parallel or COMMAND_MAX_PARALLEL, COMMAND_MAX_PARALLEL, len(targets)))
+    job = {
+        "id": uuid.uuid4().hex[:12],
+        "command": request.command,
+        "command_line": request.command if isinstance(request.command, str) else shlex.join(request.command),
+        "workdir": request.workdir,
+        "env": request.env,
+        "user": request.user,
+        "timeout_sec": timeout_sec,
+        "state": "running",
+        "created_at": datetime.now().isoformat(),
+        "targets": {
+            f"{node_id}/{container}": {
+                "key": f"{node_id}/{container}",
+                "node_id": node_id,
+                "container": container,
+                "state": "pending",
+                "exit_code": None,
+                "bytes": {"stdout": 0, "stderr": 0},
+                "output_bytes": 0,
+                "truncated": False,
+            }
+            for node_id, container in targets
+        },
+        "events": [],
+    }
+    with _jobs_lock:
+        _jobs[job["id"]] = job
+        while len(_jobs) > COMMAND_JOB_HISTORY:
+            _jobs.popitem(last=False)
+    job_store.add("commands", job, COMMAND_JOB_HISTORY)
+    event_service.log("client", f"원격 명령 실행: {job['command_line']}", source="commands",
+                      job_id=job["id"], targets=list(job["targets"]))
+    threading.Thread(target=_run_job, args=(job, max_parallel), daemon=True).start()
+    return _public(job)
+
+
+def _public(job: dict) -> dict:
+    """응답용 작업 정보 (출력 이벤트 제외, 대상별 종료 코드 포함)"""
+    result = {k: v for k, v in job.items() if k not in ("events", "targets")}
+    result["targets"] = [
+        {k: v for k, v in target.items() if k != "output_bytes"} for target in job["targets"].values()
+    ]
+    return result
+
+
+def _get(job_id: str) -> tuple:
+    """(job, 이 워커에서 실행 중인지). 다른 워커가 시작한 작업은 기록된 상태"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is not None:
+        return job, True
+    job = job_store.get("commands", job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="명령 실행 작업을 찾을 수 없습니다")
+    return job, False
+
+
+def get_job(job_id: str) -> dict:
+    """실행 상태와 대상별 종료 코드"""
+    return _public(_get(job_id)[0])
+
+
+def get_output(job_id: str, target: str = None) -> dict:
+    """대상별로 모은 stdout/stderr (출력 상한까지)"""
+    job, local = _get(job_id)
+    if local:
+        with _events_changed:
+            events = list(job["events"])
+    else:
+        events = job_store.events("commands", job_id)
+    output = {key: {"stdout": "", "stderr": ""} for key in job["targets"] if target in (None, key)}
+    for event in events:
+        if event["kind"] in ("stdout", "stderr") and event["target"] in output:
+            output[event["target"]][event["kind"]] += event["data"]
+    return output
+
+
+def list_jobs() -> list:
+    """명령 실행 작업 목록 (모든 워커, 최신순)"""
+    with _jobs_lock:
+        local = list(_jobs.values())
+    return [_public(job) for job in reversed(job_store.merge("commands", local))]
+
+
+def _finished(job: dict) -> bool:
+    last = job["events"][-1] if job["events"] else None
+    return last is not None and last["kind"] == "state"
+
+
+def stream_events(job_id: str, after: int = -1, heartbeat_sec: float = 15.0):
+    """출력/종료 이벤트를 SSE 형식으로 스트리밍 (모든 대상이 끝나면 종료)
+
+    event 이름이 stdout/stderr/exit이고 data의 target이 'node_id/container'라서
+    한 연결로 여러 대상의 출력을 구분해 받을 수 있다. 다른 워커가 실행 중인 작업은
+    공유 저장소에 기록된 이벤트를 이어서 보낸다.
+    """
+    job, local = _get(job_id)
+    if not local:
+        return job_store.follow("commands", job_id, after, heartbeat_sec)
+    return _stream_local(job, after, heartbeat_sec)
+
+
+def _stream_local(job: dict, after: int, heartbeat_sec: float):
+    next_seq = after + 1
+    while True:
+        timed_out = False
+        with _events_changed:
+            # 다른 작업의 이벤트로 깨어난 경우는 다시 대기
+            while next_seq >= len(job["events"]) and not _finished(job) and not timed_out:
+                timed_out = not _events_changed.wait(heartbeat_sec)
+            events = job["events"][next_seq:]
+        if not events:
+            if _finished(job):
+                return
+            # 프록시 연결 유지용 주석 라인
+            yield ": keep-alive\n\n"
+            continue
+        for event in events:
+            yield f"id: {event['seq']}\nevent: {event['kind']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        next_seq = events[-1]["seq"] + 1
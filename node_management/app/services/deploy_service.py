@@ -0,0 +1,297 @@
+"""모델 배포(롤아웃) 서비스
+
+패키징된 서빙 이미지를 사일로들에 웨이브 단위로 배포한다. 웨이브 안의 컨테이너
+교체는 병렬로 실행하고, 헬스 체크를 통과해야 다음 웨이브로 넘어간다. 실패하면
+지금까지 교체한 사일로를 모두 이전 컨테이너로 되돌린다.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import docker
+from fastapi import HTTPException
+from config.settings import (
+    CENTRAL_NODE_ID,
+    DEPLOY_HEALTH_TIMEOUT_SEC,
+    DEPLOY_JOB_HISTORY,
+    DEPLOY_WAVE_SIZE,
+    SERVING_CONTAINER_PREFIX,
+    SERVING_HOST_PORT,
+    SERVING_PORT,
+)
+from services import event_service, image_service, job_store, model_registry_service
+from services.docker_service import get_docker_client, get_docker_hosts
+
+# 서빙 컨테이너 안에서 실행하는 헬스 체크 (호스트 네트워크 구성과 무관)
+_HEALTH_CMD = [
+    "python", "-c",
+    f"import urllib.request; urllib.request.urlopen('http://127.0.0.1:{SERVING_PORT}/health', timeout=2)",
+]
+
+# 배포 상태: deployment_id -> deployment dict (최근 DEPLOY_JOB_HISTORY개)
+_deployments = OrderedDict()
+_deployments_lock = threading.Lock()
+# 같은 사일로의 서빙 컨테이너를 두 배포가 동시에 교체하지 않도록
+_rollout_lock = threading.Lock()
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def _serving_image(model_id: str) -> str:
+    """중앙 서버에서 패키징된 모델 이미지 태그"""
+    images = get_docker_client(CENTRAL_NODE_ID).images.list(filters={"label": f"fl.model.id={model_id}"})
+    tags = [tag for image in images for tag in image.tags]
+    if not tags:
+        raise HTTPException(status_code=409, detail="패키징된 이미지가 없습니다. 먼저 패키징을 실행하세요")
+    return tags[0]
+
+
+def _container_name(image: str) -> str:
+    """서빙 컨테이너 이름 (프로젝트별 하나, 이미지 저장소 이름 기준)"""
+    repository = image.rsplit(":", 1)[0].rsplit("/", 1)[-1]
+    return f"{SERVING_CONTAINER_PREFIX}-{repository}"
+
+
+def _get_container(client, name: str):
+    try:
+        return client.containers.get(name)
+    except docker.errors.NotFound:
+        return None
+
+
+def _wait_healthy(container, timeout_sec: float) -> bool:
+    """컨테이너가 실행 중이고 /health가 응답할 때까지 대기"""
+    deadline = time.monotonic() + timeout_sec
+    while time.monotonic() < deadline:
+        container.reload()
+        if container.status in ("exited", "dead"):
+            return False
+        if container.status == "running" and container.exec_run(_HEALTH_CMD).exit_code == 0:
+            return True
+        time.sleep(0.5)
+    return False
+
+
+def _swap(deployment: dict, node_id: str):
+    """사일로 한 곳의 서빙 컨테이너 교체 (이전 컨테이너는 -prev로 보관)"""
+    silo = deployment["silos"][node_id]
+    silo["state"] = "deploying"
+    silo["started_at"] = datetime.now().isoformat()
+    started = time.perf_counter()
+    name = deployment["container_name"]
+    try:
+        client = get_docker_client(node_id)
+        previous = _get_container(client, f"{name}-prev")
+        if previous is not None:
+            previous.remove(force=True)
+        current = _get_container(client, name)
+        if current is not None:
+            current.stop(timeout=10)
+            current.rename(f"{name}-prev")
+            silo["previous"] = current.labels.get("fl.model.id")
+
+        container = client.containers.run(
+            deployment["image"],
+            name=name,
+            detach=True,
+            ports={f"{SERVING_PORT}/tcp": SERVING_HOST_PORT},
+            environment={"FL_NODE_ID": node_id},
+            labels={
+                "fl.role": "serving",
+                "fl.model.id": deployment["model_id"],
+                "fl.deployment": deployment["id"],
+            },
+            restart_policy={"Name": "unless-stopped"},
+        )
+        silo["swap_ms"] = _elapsed_ms(started)
+
+        health_started = time.perf_counter()
+        healthy = _wait_healthy(container, deployment["health_timeout_sec"])
+        silo["health_ms"] = _elapsed_ms(health_started)
+        if not healthy:
+            raise RuntimeError("헬스 체크 실패")
+        silo["state"] = "done"
+    except Exception as e:
+        silo["state"] = "failed"
+        silo["error"] = str(e)
+    silo["elapsed_ms"] = _elapsed_ms(started)
+    silo["finished_at"] = datetime.now().isoformat()
+
+
+def _restore(deployment: dict, node_id: str):
+    """새 컨테이너를 제거하고 -prev 컨테이너를 원래 이름으로 되돌림"""
+    silo = deployment["silos"][node_id]
+    started = time.perf_counter()
+    name = deployment["container_name"]
+    try:
+        client = get_docker_client(node_id)
+        current = _get_container(client, name)
+        # 교체 전에 실패했다면 name은 아직 이전 컨테이너이므로 그대로 둔다
+        if current is not None and current.labels.get("fl.deployment") != deployment["id"]:
+            if current.status != "running":
+                current.start()
+            silo["state"] = "rolled_back"
+            silo["rollback_ms"] = _elapsed_ms(started)
+            return
+        if current is not None:
+            current.remove(force=True)
+        previous = _get_container(client, f"{name}-prev")
+        if previous is not None:
+            previous.rename(name)
+            previous.start()
+        silo["state"] = "rolled_back"
+    except Exception as e:
+        silo["state"] = "rollback_failed"
+        silo["error"] = str(e)
+    silo["rollback_ms"] = _elapsed_ms(started)
+
+
+def _rollback(deployment: dict, node_ids: list):
+    if not node_ids:
+        return
+    with ThreadPoolExecutor(max_workers=len(node_ids), thread_name_prefix="rollback") as pool:
+        list(pool.map(lambda node_id: _restore(deployment, node_id), node_ids))
+
+
+def _run_rollout(deployment: dict):
+    """이미지 전송 후 웨이브 단위로 교체, 실패 시 교체한 사일로 전체 롤백"""
+    started = time.perf_counter()
+    with _rollout_lock:
+        try:
+            deployment["state"] = "distributing"
+            transfer = image_service.distribute_image(
+                deployment["image"], list(deployment["silos"]), pull=False, wait=True,
+            )
+            deployment["distribute_ms"] = transfer.get("elapsed_ms")
+            failed = [node_id for node_id, p in transfer["nodes"].items() if p["state"] == "failed"]
+            if transfer["state"] == "failed" and not failed:
+                raise RuntimeError(transfer.get("error", "이미지 전송 실패"))
+            for node_id in failed:
+                deployment["silos"][node_id].update(state="failed", error="이미지 전송 실패")
+            if failed:
+                raise RuntimeError(f"이미지 전송 실패: {', '.join(failed)}")
+
+            deployment["state"] = "deploying"
+            swapped = []
+            for index, wave in enumerate(deployment["waves"]):
+                if index and deployment["interval_sec"]:
+                    time.sleep(deployment["interval_sec"])
+                deployment["current_wave"] = index
+                wave_started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=len(wave), thread_name_prefix="deploy") as pool:
+                    list(pool.map(lambda node_id: _swap(deployment, node_id), wave))
+                deployment["wave_ms"].append(_elapsed_ms(wave_started))
+                swapped += wave
+                failed = [node_id for node_id in wave if deployment["silos"][node_id]["state"] == "failed"]
+                if failed:
+                    deployment["state"] = "rolling_back"
+                    _rollback(deployment, swapped)
+                    raise RuntimeError(f"웨이브 {index + 1} 실패: {', '.join(failed)}")
+            deployment["state"] = "done"
+        except Exception as e:
+            if deployment["state"] != "rolling_back":
+                deployment["state"] = "failed"
+            else:
+                deployment["state"] = "rolled_back"
+            deployment["error"] = str(e)
+    deployment["elapsed_ms"] = _elapsed_ms(started)
+    deployment["finished_at"] = datetime.now().isoformat()
+    event_service.log_job("deployments", f"모델 '{deployment['model_label']}' 배포", deployment)
+    job_store.finish("deployments", deployment)
+
+
+def _plan_waves(silo_ids: list, strategy: str, wave_size) -> list:
+    """전략별 웨이브 구성 (realtime은 한 번에 전체)"""
+    if strategy == "realtime":
+        size = len(silo_ids)
+    else:
+        size = wave_size or DEPLOY_WAVE_SIZE
+    return [silo_ids[i:i + size] for i in range(0, len(silo_ids), size)]
+
+
+def start_deployment(request) -> dict:
+    """배포 시작 (백그라운드)"""
+    model = model_registry_service.get_model(request.model_id)
+    hosts = get_docker_hosts()
+    if request.strategy == "edge":
+        if not request.silo_ids:
+            raise HTTPException(status_code=400, detail="선택 배포에는 silo_ids가 필요합니다")
+        unknown = [node_id for node_id in request.silo_ids if node_id not in hosts]
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"알 수 없는 사일로: {', '.join(unknown)}")
+        silo_ids = list(dict.fromkeys(request.silo_ids))
+    else:
+        silo_ids = [node_id for node_id, info in hosts.items() if info.get("role", "client") == "client"]
+    if not silo_ids:
+        raise HTTPException(status_code=409, detail="배포 대상 사일로가 없습니다")
+
+    image = _serving_image(model["id"])
+    waves = _plan_waves(silo_ids, request.strategy, request.wave_size)
+    deployment = {
+        "id": uuid.uuid4().hex[:12],
+        "model_id": model["id"],
+        "model_label": f"{model['project']} {model['version']}",
+        "strategy": request.strategy,
+        "image": image,
+        "container_name": _container_name(image),
+        "interval_sec": request.interval_sec if request.strategy == "batch" else 0,
+        "health_timeout_sec": request.health_timeout_sec or DEPLOY_HEALTH_TIMEOUT_SEC,
+        "waves": waves,
+        "current_wave": None,
+        "wave_ms": [],
+        "state": "pending",
+        "created_at": datetime.now().isoformat(),
+        "silos": {
+            node_id: {"wave": index, "state": "pending"}
+            for index, wave in enumerate(waves) for node_id in wave
+        },
+    }
+    with _deployments_lock:
+        _deployments[deployment["id"]] = deployment
+        while len(_deployments) > DEPLOY_JOB_HISTORY:
+            _deployments.popitem(last=False)
+    job_store.add("deployments", deployment, DEPLOY_JOB_HISTORY)
+    threading.Thread(target=_run_rollout, args=(deployment,), daemon=True).start()
+    return deployment
+
+
+def rollback_deployment(deployment_id: str) -> dict:
+    """완료된 배포를 이전 서빙 컨테이너로 되돌림"""
+    deployment = get_deployment(deployment_id)
+    if deployment["state"] != "done":
+        raise HTTPException(status_code=409, detail="완료된 배포만 롤백할 수 있습니다")
+    with _rollout_lock:
+        deployment["state"] = "rolling_back"
+        _rollback(deployment, list(deployment["silos"]))
+        failed = [n for n, s in deployment["silos"].items() if s["state"] == "rollback_failed"]
+        deployment["state"] = "failed" if failed else "rolled_back"
+    job_store.save("deployments", deployment)
+    event_service.log(
+        "error" if failed else "success",
+        f"모델 '{deployment['model_label']}' 배포 롤백 {'실패' if failed else '완료'}",
+        source="deployments", job_id=deployment_id,
+    )
+    return deployment
+
+
+def get_deployment(deployment_id: str) -> dict:
+    """배포 상태와 사일로별 소요 시간 조회"""
+    with _deployments_lock:
+        deployment = _deployments.get(deployment_id)
+    if deployment is None:
+        # 다른 워커가 시작한 배포는 공유 저장소의 상태로 응답
+        deployment = job_store.get("deployments", deployment_id)
+    if deployment is None:
+        raise HTTPException(status_code=404, detail="배포를 찾을 수 없습니다")
+    return deployment
+
+
+def list_deployments() -> list:
+    """배포 목록 (모든 워커, 최신순)"""
+    with _deployments_lock:
+        local = list(_deployments.values())
+    return sorted(job_store.merge("deployments", local), key=lambda d: d["created_at"], reverse=True)
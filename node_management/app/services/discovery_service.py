@@ -0,0 +1,317 @@
+"""사일로 자동 탐색 서비스 (Docker API 포트 스캔)
+
+CIDR 대역/호스트 목록과 포트 범위를 asyncio로 동시에 훑어 `/_ping`에 OK로 답하고
+`/version`이 Docker 데몬 정보를 돌려주는 주소를 찾는다. 동시 연결 수와 초당 시도 수를
+제한하고, 찾은 데몬 중 미등록인 것은 노드 레지스트리에 한 번의 쓰기로 등록한다.
+"""
+import asyncio
+import ipaddress
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from urllib.parse import urlparse
+from fastapi import HTTPException
+from config.settings import (
+    DISCOVERY_CONCURRENCY,
+    DISCOVERY_DEFAULT_PORTS,
+    DISCOVERY_JOB_HISTORY,
+    DISCOVERY_MAX_TARGETS,
+    DISCOVERY_RATE_PER_SEC,
+    DISCOVERY_TIMEOUT_SEC,
+)
+from services import event_service, job_store, node_registry
+
+# 응답 본문 상한 (/version 응답은 1KB 내외)
+_MAX_RESPONSE_BYTES = 64 * 1024
+# 동시 연결 수를 정할 때 남겨 둘 파일 디스크립터 수
+_RESERVED_FDS = 128
+
+# 스캔 작업: job_id -> job dict (오래된 작업부터 정리)
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def _parse_ports(ports: list, port_range: str) -> list:
+    result = list(ports)
+    if port_range:
+        try:
+            first, _, last = port_range.partition("-")
+            first, last = int(first), int(last or first)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"잘못된 포트 범위: {port_range}")
+        result.extend(range(first, last + 1))
+    result = list(dict.fromkeys(result or DISCOVERY_DEFAULT_PORTS))
+    if not all(0 < port < 65536 for port in result):
+        raise HTTPException(status_code=400, detail="포트는 1~65535 범위여야 합니다")
+    return result
+
+
+def _parse_hosts(cidr: str, hosts: list) -> list:
+    result = list(hosts)
+    if cidr:
+        try:
+            network = ipaddress.ip_network(cidr, strict=False)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"잘못된 CIDR: {e}")
+        if network.num_addresses > DISCOVERY_MAX_TARGETS:
+            raise HTTPException(status_code=400, detail=f"CIDR 대역이 너무 큽니다: {cidr}")
+        # /31, /32가 아니면 네트워크/브로드캐스트 주소 제외
+        result.extend(str(ip) for ip in (network.hosts() if network.num_addresses > 2 else network))
+    result = list(dict.fromkeys(result))
+    if not result:
+        raise HTTPException(status_code=400, detail="cidr 또는 hosts가 필요합니다")
+    return result
+
+
+def _fd_budget() -> int:
+    """프로세스 파일 디스크립터 한도 안에서 쓸 수 있는 동시 연결 수"""
+    try:
+        import resource
+    except ImportError:
+        return DISCOVERY_CONCURRENCY
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return DISCOVERY_CONCURRENCY
+    return max(1, soft - _RESERVED_FDS)
+
+
+async def _http_get(host: str, port: int, path: str, timeout: float) -> tuple:
+    """HTTP/1.0 GET -> (상태 코드, 헤더 dict, 본문 bytes). 연결 실패/시간 초과는 예외"""
+    async def request():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            writer.write(f"GET {path} HTTP/1.0\r\nHost: {host}:{port}\r\nAccept: */*\r\n\r\n".encode("ascii"))
+            await writer.drain()
+            raw = await reader.read(_MAX_RESPONSE_BYTES)
+            while raw and len(raw) < _MAX_RESPONSE_BYTES:
+                chunk = await reader.read(_MAX_RESPONSE_BYTES - len(raw))
+                if not chunk:
+                    break
+                raw += chunk
+        finally:
+            writer.close()
+        head, _, body = raw.partition(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return status, headers, body
+
+    return await asyncio.wait_for(request(), timeout)
+
+
+async def _probe(job: dict, host: str, port: int, timeout: float):
+    """Docker 데몬이면 탐색 결과 dict, 아니면 None"""
+    started = time.perf_counter()
+    try:
+        status, headers, body = await _http_get(host, port, "/_ping", timeout)
+        if status != 200 or body.strip() != b"OK":
+            return None
+        latency_ms = (time.perf_counter() - started) * 1000
+        status, _, body = await _http_get(host, port, "/version", timeout)
+        version = json.loads(body) if status == 200 else {}
+    except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+        return None
+    finally:
+        job["probed"] += 1
+    if "ApiVersion" not in version and "api-version" not in headers:
+        return None
+    return {
+        "host": host,
+        "port": port,
+        "base_url": f"tcp://{host}:{port}",
+        "version": version.get("Version"),
+        "api_version": version.get("ApiVersion") or headers.get("api-version"),
+        "os": version.get("Os"),
+        "arch": version.get("Arch"),
+        "latency_ms": round(latency_ms, 2),
+    }
+
+
+async def _scan(job: dict, targets: list, concurrency: int, rate_per_sec: float, timeout: float):
+    """동시 연결 수(concurrency)와 초당 시작 수(rate_per_sec)를 지키며 대상 전체 탐색"""
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(concurrency)
+    started = loop.time()
+    pending = set()
+
+    async def run(host: str, port: int):
+        try:
+            found = await _probe(job, host, port, timeout)
+        finally:
+            slots.release()
+        if found:
+            job["found"].append(found)
+
+    for index, (host, port) in enumerate(targets):
+        await slots.acquire()
+        # 시작 시각을 index / rate 에 맞춰 고르게 분산
+        delay = started + index / rate_per_sec - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(run(host, port))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.gather(*pending)
+
+
+def _known_addresses(servers: dict) -> dict:
+    """등록된 노드의 (host, port) -> node_id"""
+    known = {}
+    for node_id, info in servers.items():
+        parsed = urlparse(info.get("base_url", ""))
+        if parsed.hostname:
+            known[(parsed.hostname, parsed.port or 2375)] = node_id
+    return known
+
+
+def _mark_known(job: dict):
+    _, servers = node_registry.load()
+    known = _known_addresses(servers)
+    for found in job["found"]:
+        found["node_id"] = known.get((found["host"], found["port"]))
+        found["registered"] = found["node_id"] is not None
+
+
+def _node_id(prefix: str, found: dict) -> str:
+    return f"{prefix}-{found['host'].replace('.', '-').replace(':', '-')}-{found['port']}"
+
+
+def _register(job: dict, base_urls: list = None) -> list:
+    """탐색 결과 중 미등록 데몬을 한 번의 레지스트리 쓰기로 등록하고 추가한 node_id 반환"""
+    wanted = None if base_urls is None else set(base_urls)
+    candidates = [f for f in job["found"] if wanted is None or f["base_url"] in wanted]
+
+    def add(servers):
+        known = _known_addresses(servers)
+        added = []
+        for found in candidates:
+            node_id = known.get((found["host"], found["port"]))
+            if node_id is None:
+                node_id = _node_id(job["id_prefix"], found)
+                if node_id in servers:
+                    # 같은 id가 다른 주소로 이미 있으면 건너뜀
+                    continue
+                servers[node_id] = {
+                    "base_url": found["base_url"],
+                    "label": f"{found['host']}:{found['port']}",
+                    "type": "remote",
+                    "role": "client",
+                    "tls": False,
+                }
+                if job["labels"]:
+                    servers[node_id]["labels"] = dict(job["labels"])
+                added.append(node_id)
+            found["node_id"], found["registered"] = node_id, True
+        return added
+
+    added = node_registry.update(add) if candidates else []
+    if added:
+        event_service.log("server", f"탐색한 사일로 {len(added)}곳 등록", source="discovery",
+                          job_id=job["id"], node_ids=added)
+    job["added"] = job.get("added", []) + added
+    return added
+
+
+def register(job_id: str, base_urls: list = None) -> dict:
+    """끝난 탐색 작업에서 찾은 데몬 등록 (base_urls를 생략하면 전체)"""
+    job = _get(job_id)
+    if job["state"] == "running":
+        raise HTTPException(status_code=409, detail="스캔이 아직 진행 중입니다")
+    added = _register(job, base_urls)
+    job_store.save("discovery", job)
+    return {"ok": True, "added": added, "job": _public(job)}
+
+
+def _run_job(job: dict, targets: list, concurrency: int, rate_per_sec: float, timeout: float, auto_register: bool):
+    started = time.perf_counter()
+    try:
+        asyncio.run(_scan(job, targets, concurrency, rate_per_sec, timeout))
+        job["found"].sort(key=lambda f: (f["host"], f["port"]))
+        _mark_known(job)
+        if auto_register:
+            _register(job)
+        job["state"] = "done"
+    except Exception as e:
+        job["state"] = "failed"
+        job["error"] = str(e)
+    job["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    job["finished_at"] = datetime.now().isoformat()
+    event_service.log_job(
+        "discovery", f"사일로 탐색 ({job['targets']}개 주소, Docker 데몬 {len(job['found'])}곳)", job,
+    )
+    job_store.finish("discovery", job)
+
+
+def start_scan(request) -> dict:
+    """CIDR/호스트 x 포트 조합을 백그라운드에서 동시 탐색"""
+    hosts = _parse_hosts(request.cidr, request.hosts)
+    ports = _parse_ports(request.ports, request.port_range)
+    if len(hosts) * len(ports) > DISCOVERY_MAX_TARGETS:
+        raise HTTPException(
+            status_code=400, detail=f"스캔 대상이 너무 많습니다 ({len(hosts) * len(ports)} > {DISCOVERY_MAX_TARGETS})",
+        )
+    invalid = [
+        key for key, value in request.labels.items()
+        if not node_registry.LABEL_PATTERN.match(key) or not node_registry.LABEL_PATTERN.match(value)
+    ]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"잘못된 라벨: {', '.join(invalid)}")
+    targets = [(host, port) for host in hosts for port in ports]
+    concurrency = max(1, min(request.concurrency or DISCOVERY_CONCURRENCY, DISCOVERY_CONCURRENCY,
+                             _fd_budget(), len(targets)))
+    rate_per_sec = max(1.0, request.rate_per_sec or DISCOVERY_RATE_PER_SEC)
+    timeout = request.timeout_sec or DISCOVERY_TIMEOUT_SEC
+    job = {
+        "id": uuid.uuid4().hex[:12],
+        "state": "running",
+        "created_at": datetime.now().isoformat(),
+        "targets": len(targets),
+        "probed": 0,
+        "concurrency": concurrency,
+        "rate_per_sec": rate_per_sec,
+        "id_prefix": request.id_prefix,
+        "labels": dict(request.labels),
+        "found": [],
+    }
+    with _jobs_lock:
+        _jobs[job["id"]] = job
+        while len(_jobs) > DISCOVERY_JOB_HISTORY:
+            _jobs.popitem(last=False)
+    job_store.add("discovery", job, DISCOVERY_JOB_HISTORY)
+    threading.Thread(
+        target=_run_job, args=(job, targets, concurrency, rate_per_sec, timeout, request.auto_register), daemon=True,
+    ).start()
+    return _public(job)
+
+
+def _public(job: dict) -> dict:
+    return {**job, "found": list(job["found"])}
+
+
+def _get(job_id: str) -> dict:
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        # 다른 워커가 시작한 작업은 공유 저장소의 상태로 응답
+        job = job_store.get("discovery", job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="탐색 작업을 찾을 수 없습니다")
+    return job
+
+
+def get_job(job_id: str) -> dict:
+    """진행 상황(probed/targets)과 찾은 Docker 데몬"""
+    return _public(_get(job_id))
+
+
+def list_jobs() -> list:
+    with _jobs_lock:
+        local = list(_jobs.values())
+    return [_public(job) for job in reversed(job_store.merge("discovery", local))]
@@ -1,34 +1,186 @@
 """Docker 클라이언트 관리 서비스"""
+import re
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlparse
 import docker
 from fastapi import HTTPException
-from config.server_manager import load_servers
+from config.settings import DOCKER_TIMEOUT_SEC, HEALTH_TTL_SEC
+from services import circuit_breaker, event_service, node_registry, telemetry_service
 
-# 전역 상태 (기존 DOCKER_HOSTS 대체)
+# 공유 레지스트리의 노드 목록 사본과 그 버전 (버전이 바뀌면 다시 읽음)
 _docker_hosts = {}
+_hosts_version = None
+_hosts_lock = threading.Lock()
+
+# 노드별 Docker 클라이언트 캐시: node_id -> (base_url, client)
+# DockerClient 생성 시 /version 왕복이 발생하므로 노드당 하나를 재사용
+_clients = {}
+_clients_lock = threading.Lock()
+
+# 지연 시간 지수 이동 평균 가중치
+_LATENCY_EWMA_ALPHA = 0.3
+
+# Docker API 경로의 버전 접두사 (/v1.43/containers/json)
+_API_VERSION = re.compile(r"^/v\d+(?:\.\d+)?(?=/)")
+# 계측 라벨에 그대로 남기는 경로 끝 동작 이름 (나머지 id/이름은 {id}로 치환)
+_DOCKER_ACTIONS = frozenset({
+    "json", "create", "start", "stop", "restart", "kill", "wait", "logs", "stats", "top", "exec",
+    "archive", "prune", "push", "tag", "get", "load", "search", "history", "connect", "disconnect",
+})
 
 
 def refresh_docker_hosts():
-    """DOCKER_HOSTS를 최신 설정으로 갱신 (중복 코드 제거)"""
-    global _docker_hosts
-    latest_servers = load_servers()
-    _docker_hosts.clear()
-    _docker_hosts.update(latest_servers)
+    """공유 레지스트리의 노드 목록 버전이 바뀌었으면 사본 갱신"""
+    global _docker_hosts, _hosts_version
+    current = node_registry.version()
+    if current == _hosts_version:
+        return _docker_hosts
+    with _hosts_lock:
+        if current != _hosts_version:
+            latest_version, latest_servers = node_registry.load()
+            # 읽는 중인 호출자가 있을 수 있으므로 사본을 통째로 교체
+            _docker_hosts = latest_servers
+            _hosts_version = latest_version
     return _docker_hosts
 
 
 def get_docker_hosts():
-    """현재 Docker 호스트 목록 반환"""
-    if not _docker_hosts:
-        refresh_docker_hosts()
-    return _docker_hosts
+    """현재 Docker 호스트 목록 반환 (다른 워커의 변경도 반영)"""
+    return refresh_docker_hosts()
+
+
+def get_node_host(node_id: str) -> str:
+    """노드의 Docker 데몬 호스트 (unix 소켓은 'local')"""
+    base_url = get_docker_hosts()[node_id]["base_url"]
+    parsed = urlparse(base_url)
+    if parsed.scheme in ("unix", "npipe"):
+        return "local"
+    return parsed.hostname or base_url
+
+
+def get_node_daemon(node_id: str) -> str:
+    """노드의 Docker 데몬 식별자 (같은 호스트라도 포트/소켓이 다르면 다른 데몬)"""
+    base_url = get_docker_hosts()[node_id]["base_url"]
+    parsed = urlparse(base_url)
+    if parsed.scheme in ("unix", "npipe"):
+        return f"{parsed.scheme}://{parsed.path}"
+    if not parsed.hostname:
+        return base_url
+    return f"{parsed.hostname}:{parsed.port or 2375}"
+
+
+def _docker_operation(request) -> str:
+    """계측 라벨용 Docker API 동작 (예: GET /containers/{id}/stats)"""
+    path = _API_VERSION.sub("", request.path_url.split("?", 1)[0])
+    parts = [part for part in path.split("/") if part]
+    if not parts:
+        return f"{request.method} /"
+    label = "/" + parts[0]
+    if len(parts) > 1:
+        label += "/" + (parts[1] if parts[1] in _DOCKER_ACTIONS else "{id}")
+    if len(parts) > 2:
+        label += "/" + (parts[-1] if parts[-1] in _DOCKER_ACTIONS else "...")
+    return f"{request.method} {label}"
+
+
+def _instrument(node_id: str, api):
+    """Docker API 요청마다 노드/동작별 소요 시간 기록"""
+    send = api.send
+
+    def timed_send(request, **kwargs):
+        with telemetry_service.span("docker_request", node=node_id, operation=_docker_operation(request)):
+            return send(request, **kwargs)
+
+    api.send = timed_send
+
+
+def _create_client(node_id: str, base_url: str) -> docker.DockerClient:
+    """원격 노드는 차단기를 거쳐 생성하고 요청마다 적응형 연결 타임아웃 적용"""
+    if not circuit_breaker.guards(base_url):
+        client = docker.DockerClient(base_url=base_url, timeout=DOCKER_TIMEOUT_SEC)
+        circuit_breaker.honor_long_streams(client.api)
+        return client
+    breaker = circuit_breaker.get(node_id)
+    breaker.before_call()
+    try:
+        # 생성 시 /version 왕복도 꺼진 노드에서 기본 60초를 기다리지 않도록 짧게
+        client = docker.DockerClient(base_url=base_url, timeout=breaker.connect_timeout())
+    except Exception as e:
+        breaker.record_failure(e)
+        raise
+    breaker.record_success()
+    client.api.timeout = DOCKER_TIMEOUT_SEC
+    circuit_breaker.instrument(node_id, client.api)
+    return client
 
 
 def get_docker_client(node_id: str) -> docker.DockerClient:
-    """특정 노드의 Docker 클라이언트 반환"""
+    """특정 노드의 Docker 클라이언트 반환 (base_url이 같으면 재사용)"""
+    with telemetry_service.span("get_docker_client", node=node_id):
+        return _get_docker_client(node_id)
+
+
+def _get_docker_client(node_id: str) -> docker.DockerClient:
     hosts = get_docker_hosts()
     if node_id not in hosts:
         raise HTTPException(status_code=404, detail="Unknown node")
 
-    cfg = hosts[node_id]
-    return docker.DockerClient(base_url=cfg["base_url"])
+    base_url = hosts[node_id]["base_url"]
+    with _clients_lock:
+        cached = _clients.get(node_id)
+        if cached and cached[0] == base_url:
+            return cached[1]
+
+    client = _create_client(node_id, base_url)
+    _instrument(node_id, client.api)
+    with _clients_lock:
+        previous = _clients.get(node_id)
+        _clients[node_id] = (base_url, client)
+    if previous and previous[1] is not client:
+        previous[1].close()
+    return client
+
+
+def get_node_health(node_id: str) -> dict:
+    """노드의 최근 상태 기록 반환 (기록이 없으면 빈 dict, 워커 간 공유)"""
+    return node_registry.get_health(node_id)
+
+
+def probe_node(node_id: str, max_age: float = HEALTH_TTL_SEC) -> dict:
+    """노드 연결 상태와 지연 시간 확인 (max_age 이내의 기록은 재사용)"""
+    record = get_node_health(node_id)
+    if record and time.time() - record["checked_at"] < max_age:
+        return record
+
+    start = time.perf_counter()
+    try:
+        get_docker_client(node_id).ping()
+    except HTTPException:
+        raise
+    except Exception as e:
+        record = {
+            "status": "offline",
+            "latency_ms": record.get("latency_ms"),
+            "error": str(e),
+        }
+        # 연결이 끊긴 클라이언트는 다음 호출에서 새로 생성
+        with _clients_lock:
+            _clients.pop(node_id, None)
+    else:
+        latency_ms = (time.perf_counter() - start) * 1000
+        previous = record.get("latency_ms")
+        if previous is not None:
+            latency_ms = _LATENCY_EWMA_ALPHA * latency_ms + (1 - _LATENCY_EWMA_ALPHA) * previous
+        record = {"status": "online", "latency_ms": round(latency_ms, 2)}
 
+    record["checked_at"] = time.time()
+    record["last_check"] = datetime.now().isoformat()
+    previous_status = node_registry.put_health(node_id, record).get("status")
+    if previous_status != record["status"]:
+        if record["status"] == "online":
+            event_service.log("success", "노드 연결됨", node_id=node_id, source="health")
+        else:
+            event_service.log("error", f"노드 연결 끊김: {record['error']}", node_id=node_id, source="health")
+    return dict(record)
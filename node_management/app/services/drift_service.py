@@ -0,0 +1,534 @@
+"""데이터 드리프트 탐지 서비스 (사일로/피처별 병합 가능한 스케치)
+
+수치형 피처는 KLL 분위수 스케치, 범주형 피처는 count-min 스케치로 요약한다.
+스케치는 수 KB라 사일로는 원본 대신 스케치만 보내고, 중앙 서버는 이를 병합해
+기준(reference) 구간 대비 PSI/KS를 계산한다. CLI:
+    python -m services.drift_service --input s3://clean/a.parquet \\
+        --columns age label --endpoint minio-silo1:9000 > sketches.json
+"""
+import argparse
+import base64
+import hashlib
+import json
+import math
+import sqlite3
+import threading
+import time
+from datetime import datetime
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from fastapi import HTTPException
+from config.settings import (
+    DRIFT_ALERT,
+    DRIFT_BATCH_ROWS,
+    DRIFT_CMS_DEPTH,
+    DRIFT_CMS_WIDTH,
+    DRIFT_DB,
+    DRIFT_KLL_K,
+    DRIFT_PSI_BINS,
+    DRIFT_TOP_CATEGORIES,
+    DRIFT_WARN,
+)
+from services.cleansing_service import get_filesystem, node_filesystem, s3_filesystem_desc, split_uri
+
+WINDOWS = ("reference", "current")
+
+# PSI 계산 시 빈 구간의 비율 하한 (log(0) 방지)
+_PSI_EPSILON = 1e-4
+
+
+def _encode(array: np.ndarray) -> str:
+    return base64.b64encode(array.tobytes()).decode('ascii')
+
+
+def _decode(text: str, dtype) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(text), dtype=dtype).copy()
+
+
+class KLLSketch:
+    """KLL 분위수 스케치 (수치형). 레벨 h의 항목은 가중치 2^h를 가진다"""
+
+    kind = "kll"
+
+    def __init__(self, k: int = DRIFT_KLL_K, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(int(math.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        while sum(len(level) for level in self.levels) > sum(self._capacity(h) for h in range(len(self.levels))):
+            for h, level in enumerate(self.levels):
+                if len(level) < self._capacity(h):
+                    continue
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                level = np.sort(level)
+                # 홀수 개면 하나는 현재 레벨에 남김
+                keep = level[:1] if len(level) % 2 else level[:0]
+                pairs = level[len(keep):]
+                promoted = pairs[self._rng.integers(2)::2]
+                self.levels[h] = keep
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                break
+
+    def update(self, values):
+        """배치 추가 (NaN 제외)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.n += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "KLLSketch"):
+        """다른 스케치 병합 (사일로 간 합산)"""
+        if other.kind != self.kind:
+            raise ValueError(f"스케치 종류가 다릅니다 ({self.kind}, {other.kind})")
+        if not other.n:
+            return
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype=np.float64) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def cdf(self, points) -> np.ndarray:
+        """각 지점 이하 비율 추정"""
+        points = np.asarray(points, dtype=np.float64)
+        if not self.n:
+            return np.zeros(len(points))
+        items, cumulative = self._weighted()
+        index = np.searchsorted(items, points, side="right")
+        ranks = np.where(index > 0, cumulative[np.maximum(index - 1, 0)], 0.0)
+        return ranks / cumulative[-1]
+
+    def quantiles(self, qs) -> np.ndarray:
+        """분위수 추정"""
+        if not self.n:
+            return np.full(len(qs), np.nan)
+        items, cumulative = self._weighted()
+        index = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1], side="left")
+        return items[np.minimum(index, len(items) - 1)]
+
+    def support(self) -> np.ndarray:
+        return np.unique(np.concatenate(self.levels))
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "k": self.k,
+            "n": self.n,
+            "min": self.min if self.n else None,
+            "max": self.max if self.n else None,
+            "levels": [_encode(level) for level in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "KLLSketch":
+        sketch = cls(data["k"])
+        sketch.n = data["n"]
+        sketch.min = data["min"] if data["min"] is not None else math.inf
+        sketch.max = data["max"] if data["max"] is not None else -math.inf
+        sketch.levels = [_decode(level, np.float64) for level in data["levels"]] or sketch.levels
+        return sketch
+
+
+class CountMinSketch:
+    """count-min 스케치 (범주형). 빈도 상위 범주 목록을 함께 유지한다"""
+
+    kind = "cms"
+
+    def __init__(self, width: int = DRIFT_CMS_WIDTH, depth: int = DRIFT_CMS_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.n = 0
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.top = {}
+
+    def _cells(self, value: str):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=4 * self.depth).digest()
+        return [int.from_bytes(digest[i * 4:(i + 1) * 4], "little") % self.width for i in range(self.depth)]
+
+    def _add(self, value: str, count: int):
+        cells = self._cells(value)
+        self.table[np.arange(self.depth), cells] += count
+        self.top[value] = self.estimate(value, cells)
+
+    def _trim(self):
+        if len(self.top) > DRIFT_TOP_CATEGORIES:
+            ranked = sorted(self.top.items(), key=lambda item: -item[1])
+            self.top = dict(ranked[:DRIFT_TOP_CATEGORIES])
+
+    def update(self, values):
+        """배치 추가 (범주별 개수로 묶어서 반영)"""
+        if not isinstance(values, (pa.Array, pa.ChunkedArray)):
+            values = pa.array(values)
+        counts = pc.value_counts(pc.drop_null(values).cast(pa.string()))
+        for item in counts.to_pylist():
+            self._add(item["values"], item["counts"])
+            self.n += item["counts"]
+        self._trim()
+
+    def merge(self, other: "CountMinSketch"):
+        if other.kind != self.kind:
+            raise ValueError(f"스케치 종류가 다릅니다 ({self.kind}, {other.kind})")
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("count-min 스케치 크기가 다릅니다")
+        self.table += other.table
+        self.n += other.n
+        for value in set(self.top) | set(other.top):
+            self.top[value] = self.estimate(value)
+        self._trim()
+
+    def estimate(self, value: str, cells=None) -> int:
+        cells = cells if cells is not None else self._cells(value)
+        return int(self.table[np.arange(self.depth), cells].min())
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "width": self.width,
+            "depth": self.depth,
+            "n": self.n,
+            "table": _encode(self.table),
+            "top": self.top,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CountMinSketch":
+        sketch = cls(data["width"], data["depth"])
+        sketch.n = data["n"]
+        sketch.table = _decode(data["table"], np.int64).reshape(data["depth"], data["width"])
+        sketch.top = dict(data["top"])
+        return sketch
+
+
+_SKETCH_TYPES = {KLLSketch.kind: KLLSketch, CountMinSketch.kind: CountMinSketch}
+
+
+def sketch_from_dict(data: dict):
+    """직렬화된 스케치 복원"""
+    if data.get("kind") not in _SKETCH_TYPES:
+        raise ValueError(f"알 수 없는 스케치 종류: {data.get('kind')}")
+    return _SKETCH_TYPES[data["kind"]].from_dict(data)
+
+
+# --- 드리프트 지표 ---
+
+def _psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    expected = np.maximum(expected, _PSI_EPSILON)
+    actual = np.maximum(actual, _PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def _numeric_drift(reference: KLLSketch, current: KLLSketch) -> dict:
+    # 기준 분포의 분위수로 구간을 나눈 뒤 두 분포의 구간 비율 비교
+    edges = np.unique(reference.quantiles(np.linspace(0, 1, DRIFT_PSI_BINS + 1)[1:-1]))
+    ref_cdf = np.concatenate([[0.0], reference.cdf(edges), [1.0]])
+    cur_cdf = np.concatenate([[0.0], current.cdf(edges), [1.0]])
+    psi = _psi(np.diff(ref_cdf), np.diff(cur_cdf))
+    points = np.union1d(reference.support(), current.support())
+    ks = float(np.max(np.abs(reference.cdf(points) - current.cdf(points)))) if len(points) else 0.0
+    return {"psi": round(psi, 4), "ks": round(ks, 4)}
+
+
+def _categorical_drift(reference: CountMinSketch, current: CountMinSketch) -> dict:
+    categories = sorted(set(reference.top) | set(current.top))
+
+    def fractions(sketch):
+        counts = np.array([sketch.estimate(c) for c in categories], dtype=np.float64)
+        # 상위 목록 밖의 나머지는 기타 구간으로
+        other = max(sketch.n - counts.sum(), 0.0)
+        return np.append(counts, other) / max(sketch.n, 1)
+
+    ref, cur = fractions(reference), fractions(current)
+    ks = float(np.max(np.abs(np.cumsum(ref) - np.cumsum(cur)))) if len(ref) else 0.0
+    return {"psi": round(_psi(ref, cur), 4), "ks": round(ks, 4)}
+
+
+def _level(score: float) -> str:
+    if score >= DRIFT_ALERT:
+        return "alert"
+    if score >= DRIFT_WARN:
+        return "warn"
+    return "ok"
+
+
+def compare(reference, current) -> dict:
+    """기준 스케치 대비 현재 스케치의 드리프트 (PSI/KS)"""
+    if reference is None or current is None or not reference.n or not current.n:
+        return {"psi": None, "ks": None, "score": None, "level": "unknown"}
+    if reference.kind != current.kind:
+        raise ValueError(f"스케치 종류가 다릅니다 (기준 {reference.kind}, 현재 {current.kind})")
+    if reference.kind == KLLSketch.kind:
+        metrics = _numeric_drift(reference, current)
+    else:
+        metrics = _categorical_drift(reference, current)
+    metrics["score"] = metrics["psi"]
+    metrics["level"] = _level(metrics["psi"])
+    return metrics
+
+
+# --- 스케치 생성 ---
+
+def _new_sketch(column_type: pa.DataType):
+    if pa.types.is_integer(column_type) or pa.types.is_floating(column_type) or pa.types.is_decimal(column_type):
+        return KLLSketch()
+    return CountMinSketch()
+
+
+def _iter_batches(filesystem, path: str, columns):
+    if path.endswith(".csv"):
+        with filesystem.open_input_stream(path) as f:
+            reader = pacsv.open_csv(f, convert_options=pacsv.ConvertOptions(include_columns=columns))
+            for batch in reader:
+                yield batch
+    else:
+        with filesystem.open_input_file(path) as f:
+            yield from pq.ParquetFile(f).iter_batches(batch_size=DRIFT_BATCH_ROWS, columns=columns)
+
+
+def sketch_dataset(uri: str, fs_desc=None, columns=None, sketches: dict = None) -> dict:
+    """데이터셋을 스트리밍으로 읽어 피처별 스케치 갱신 (feature -> sketch)"""
+    sketches = {} if sketches is None else sketches
+    filesystem = get_filesystem(fs_desc)
+    for batch in _iter_batches(filesystem, split_uri(uri), columns):
+        for name, column in zip(batch.schema.names, batch.columns):
+            if name not in sketches:
+                sketches[name] = _new_sketch(column.type)
+            sketch = sketches[name]
+            if sketch.kind == KLLSketch.kind:
+                sketch.update(pc.drop_null(column).to_numpy(zero_copy_only=False))
+            else:
+                sketch.update(column)
+    return sketches
+
+
+# --- 저장소 ---
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sketches (
+    node_id TEXT NOT NULL,
+    window_name TEXT NOT NULL,
+    feature TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    updated_at TEXT,
+    PRIMARY KEY (node_id, window_name, feature)
+);
+"""
+
+
+def _connect() -> sqlite3.Connection:
+    """드리프트 스케치 저장소 연결 (최초 호출 시 스키마 생성)"""
+    global _schema_ready
+    conn = sqlite3.connect(str(DRIFT_DB), timeout=30)
+    conn.row_factory = sqlite3.Row
+    if not _schema_ready:
+        with _schema_lock:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _schema_ready = True
+    return conn
+
+
+def _select(conn, node_id: str = None, window: str = None) -> dict:
+    """(node_id, window, feature) -> sketch"""
+    query = "SELECT node_id, window_name, feature, payload FROM sketches WHERE 1 = 1"
+    params = []
+    if node_id:
+        query += " AND node_id = ?"
+        params.append(node_id)
+    if window:
+        query += " AND window_name = ?"
+        params.append(window)
+    return {
+        (row["node_id"], row["window_name"], row["feature"]): sketch_from_dict(json.loads(row["payload"]))
+        for row in conn.execute(query, params).fetchall()
+    }
+
+
+def _load(node_id: str = None, window: str = None) -> dict:
+    """저장된 스케치 로드: (node_id, window, feature) -> sketch"""
+    conn = _connect()
+    try:
+        return _select(conn, node_id, window)
+    finally:
+        conn.close()
+
+
+def _write(conn, node_id: str, window: str, sketches: dict):
+    now = datetime.now().isoformat()
+    conn.executemany(
+        "INSERT OR REPLACE INTO sketches (node_id, window_name, feature, kind, payload, updated_at)"
+        " VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (node_id, window, feature, sketch.kind, json.dumps(sketch.to_dict()), now)
+            for feature, sketch in sketches.items()
+        ],
+    )
+
+
+def _check_window(window: str):
+    if window not in WINDOWS:
+        raise HTTPException(status_code=400, detail=f"window는 {', '.join(WINDOWS)} 중 하나여야 합니다")
+
+
+def merge_sketches(node_id: str, window: str, payload: dict) -> dict:
+    """사일로가 보낸 스케치를 저장된 스케치에 병합 (feature -> 직렬화 스케치)"""
+    _check_window(window)
+    try:
+        incoming = {feature: sketch_from_dict(data) for feature, data in payload.items()}
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"스케치 형식 오류: {e}")
+    conn = _connect()
+    try:
+        # 읽기-병합-쓰기를 한 트랜잭션으로: 다른 워커가 같은 (노드, 구간)을 동시에 병합해도 잃지 않음
+        conn.execute("BEGIN IMMEDIATE")
+        stored = {key[2]: sketch for key, sketch in _select(conn, node_id, window).items()}
+        for feature, sketch in incoming.items():
+            if feature in stored:
+                try:
+                    stored[feature].merge(sketch)
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=f"{feature}: {e}")
+            else:
+                stored[feature] = sketch
+        _write(conn, node_id, window, {f: stored[f] for f in incoming})
+        conn.commit()
+    finally:
+        # 커밋 전에 빠져나오면 연결을 닫을 때 트랜잭션이 롤백된다
+        conn.close()
+    return {"node_id": node_id, "window": window, "features": {f: stored[f].n for f in incoming}}
+
+
+def observe(node_id: str, uri: str, window: str = "current", columns=None) -> dict:
+    """사일로 데이터 배치를 읽어 스케치 갱신 (원본은 저장하지 않음)"""
+    _check_window(window)
+    started = time.perf_counter()
+    fs_desc = node_filesystem(node_id) if uri.startswith("s3://") else None
+    try:
+        sketches = sketch_dataset(uri, fs_desc, columns)
+    except (OSError, pa.ArrowException) as e:
+        raise HTTPException(status_code=400, detail=f"데이터 읽기 실패: {e}")
+    result = merge_sketches(node_id, window, {f: s.to_dict() for f, s in sketches.items()})
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def promote_reference(node_id: str) -> dict:
+    """현재 구간을 새 기준 구간으로 지정하고 현재 구간 초기화"""
+    conn = _connect()
+    try:
+        conn.execute("DELETE FROM sketches WHERE node_id = ? AND window_name = 'reference'", (node_id,))
+        moved = conn.execute(
+            "UPDATE sketches SET window_name = 'reference', updated_at = ?"
+            " WHERE node_id = ? AND window_name = 'current'",
+            (datetime.now().isoformat(), node_id),
+        ).rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    return {"node_id": node_id, "features": moved}
+
+
+def _report(stored: dict, node_ids) -> dict:
+    features = sorted({key[2] for key in stored})
+    report = {}
+    for feature in features:
+        merged = {}
+        rows = {window: 0 for window in WINDOWS}
+        error = None
+        for window in WINDOWS:
+            for node_id in node_ids:
+                sketch = stored.get((node_id, window, feature))
+                if sketch is None:
+                    continue
+                rows[window] += sketch.n
+                if window not in merged:
+                    merged[window] = sketch_from_dict(sketch.to_dict())
+                elif error is None:
+                    try:
+                        merged[window].merge(sketch)
+                    except ValueError as e:
+                        # 사일로마다 타입이 다른 피처 (수치/범주)
+                        error = f"{node_id}: {e}"
+        if error is None:
+            try:
+                entry = compare(merged.get("reference"), merged.get("current"))
+            except ValueError as e:
+                # 기준 구간 이후 타입이 바뀐 피처
+                error = str(e)
+        if error is not None:
+            # 한 피처의 스키마 불일치로 전체 보고서가 실패하지 않도록 해당 피처만 unknown
+            entry = {"psi": None, "ks": None, "score": None, "level": "unknown", "error": error}
+        entry["rows"] = rows
+        report[feature] = entry
+    return report
+
+
+def _summary(features: dict) -> dict:
+    scores = [f["score"] for f in features.values() if f["score"] is not None]
+    drift = max(scores) if scores else None
+    return {
+        "drift": drift,
+        "level": _level(drift) if drift is not None else "unknown",
+        "features": features,
+    }
+
+
+def get_drift(node_id: str = None) -> dict:
+    """드리프트 보고서. node_id가 없으면 전체 사일로 병합 결과와 사일로별 결과"""
+    started = time.perf_counter()
+    stored = _load(node_id)
+    node_ids = sorted({key[0] for key in stored})
+    result = _summary(_report(stored, node_ids))
+    if node_id is None:
+        result["silos"] = {n: _summary(_report(stored, [n])) for n in node_ids}
+    result["thresholds"] = {"warn": DRIFT_WARN, "alert": DRIFT_ALERT}
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def main(argv=None) -> int:
+    """CLI 진입점 (사일로에서 스케치만 만들어 전송용 JSON 출력)"""
+    parser = argparse.ArgumentParser(description="피처 스케치 생성")
+    parser.add_argument("--input", required=True, help="입력 Parquet/CSV (로컬 경로 또는 s3://)")
+    parser.add_argument("--columns", nargs="*", help="대상 피처 (생략 시 전체)")
+    parser.add_argument("--endpoint", help="MinIO 주소 (host:port). s3:// 경로에서 필요")
+    parser.add_argument("--secure", action="store_true")
+    args = parser.parse_args(argv)
+
+    fs_desc = s3_filesystem_desc(args.endpoint, args.secure) if args.endpoint else None
+    sketches = sketch_dataset(args.input, fs_desc, args.columns or None)
+    print(json.dumps({feature: sketch.to_dict() for feature, sketch in sketches.items()}))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,196 @@
+"""중앙 이벤트 로그 서비스 (SQLite, 시간/종류/노드 인덱스)
+
+모든 노드 관리 작업의 이벤트를 추가 전용으로 기록하고, 커서 기반 페이지 조회와
+실시간 tail 스트림을 제공한다. 보관 기간/행 수를 넘은 이벤트는 주기적으로 정리한다.
+"""
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from config.settings import EVENT_DB, EVENT_MAX_ROWS, EVENT_PAGE_LIMIT, EVENT_POLL_SEC, EVENT_RETENTION_DAYS
+
+KINDS = ("system", "server", "client", "success", "error")
+
+# 이 횟수만큼 기록할 때마다 보관 정책 적용
+_PRUNE_EVERY = 1000
+
+_conn = None
+_conn_lock = threading.Lock()
+_appended = threading.Condition()
+# 마지막으로 기록된 이벤트 id (tail 대기 판단용)
+_last_written = 0
+_writes_since_prune = 0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    node_id TEXT,
+    source TEXT,
+    message TEXT NOT NULL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS events_kind ON events (kind, id);
+CREATE INDEX IF NOT EXISTS events_node ON events (node_id, id);
+"""
+
+
+def _connection() -> sqlite3.Connection:
+    """공유 연결 (기록이 잦으므로 연결을 재사용하고 잠금으로 직렬화)"""
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect(str(EVENT_DB), timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _conn = conn
+    return _conn
+
+
+def log(kind: str, message: str, node_id: str = None, source: str = None, **data) -> int:
+    """이벤트 기록 (실패해도 호출한 작업을 막지 않음)"""
+    global _last_written, _writes_since_prune
+    try:
+        with _conn_lock:
+            conn = _connection()
+            cursor = conn.execute(
+                "INSERT INTO events (ts, kind, node_id, source, message, data) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    time.time(), kind, node_id, source, message,
+                    json.dumps(data, ensure_ascii=False, default=str) if data else None,
+                ),
+            )
+            conn.commit()
+            _writes_since_prune += 1
+            if _writes_since_prune >= _PRUNE_EVERY:
+                _writes_since_prune = 0
+                _prune(conn)
+        with _appended:
+            _last_written = max(_last_written, cursor.lastrowid)
+            _appended.notify_all()
+        return cursor.lastrowid
+    except sqlite3.Error as e:
+        print(f"이벤트 기록 오류: {e} ({kind}: {message})")
+        return None
+
+
+def log_job(source: str, title: str, job: dict, node_id: str = None) -> int:
+    """백그라운드 작업 종료 이벤트 (상태에 따라 success/error)"""
+    if job.get("state") in ("failed", "rolled_back", "rollback_failed"):
+        message = f"{title} 실패"
+        if job.get("error"):
+            message += f": {job['error']}"
+        return log("error", message, node_id=node_id, source=source, job_id=job.get("id"))
+    return log("success", f"{title} 완료", node_id=node_id, source=source, job_id=job.get("id"),
+               elapsed_ms=job.get("elapsed_ms"))
+
+
+def _prune(conn) -> int:
+    cutoff = time.time() - EVENT_RETENTION_DAYS * 86400
+    removed = conn.execute("DELETE FROM events WHERE ts < ?", (cutoff,)).rowcount
+    newest = conn.execute("SELECT MAX(id) FROM events").fetchone()[0] or 0
+    removed += conn.execute("DELETE FROM events WHERE id <= ?", (newest - EVENT_MAX_ROWS,)).rowcount
+    conn.commit()
+    return removed
+
+
+def prune() -> dict:
+    """보관 기간/최대 행 수를 넘은 이벤트 삭제"""
+    with _conn_lock:
+        return {"removed": _prune(_connection())}
+
+
+def _to_event(row) -> dict:
+    event = dict(row)
+    event["time"] = datetime.fromtimestamp(event["ts"]).isoformat(timespec="milliseconds")
+    event["data"] = json.loads(event["data"]) if event["data"] else None
+    return event
+
+
+def _filters(kinds=None, node_id: str = None, scope: str = None, since: float = None, until: float = None):
+    clauses, params = [], []
+    if kinds:
+        clauses.append(f"kind IN ({','.join('?' for _ in kinds)})")
+        params += list(kinds)
+    if node_id:
+        clauses.append("node_id = ?")
+        params.append(node_id)
+    # 대시보드 필터: nodes는 사일로 이벤트, server는 중앙 서버 이벤트
+    if scope == "nodes":
+        clauses.append("node_id IS NOT NULL AND node_id != 'main'")
+    elif scope == "server":
+        clauses.append("(node_id IS NULL OR node_id = 'main')")
+    if since is not None:
+        clauses.append("ts >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("ts < ?")
+        params.append(until)
+    return clauses, params
+
+
+def query(kinds=None, node_id: str = None, scope: str = None, since: float = None, until: float = None,
+          cursor: int = None, limit: int = EVENT_PAGE_LIMIT) -> dict:
+    """최신순 페이지 조회. next_cursor를 다음 요청의 cursor로 넘기면 이전 이벤트를 이어서 조회"""
+    clauses, params = _filters(kinds, node_id, scope, since, until)
+    if cursor is not None:
+        clauses.append("id < ?")
+        params.append(cursor)
+    limit = max(1, min(limit, EVENT_PAGE_LIMIT))
+    sql = "SELECT * FROM events"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY id DESC LIMIT ?"
+    with _conn_lock:
+        rows = _connection().execute(sql, params + [limit + 1]).fetchall()
+    events = [_to_event(row) for row in rows[:limit]]
+    return {
+        "events": events,
+        "next_cursor": events[-1]["id"] if len(rows) > limit else None,
+    }
+
+
+def _after(last_id: int, kinds, node_id, scope, limit: int = 500) -> list:
+    clauses, params = _filters(kinds, node_id, scope)
+    clauses.append("id > ?")
+    params.append(last_id)
+    sql = f"SELECT * FROM events WHERE {' AND '.join(clauses)} ORDER BY id LIMIT ?"
+    with _conn_lock:
+        return [_to_event(row) for row in _connection().execute(sql, params + [limit]).fetchall()]
+
+
+def latest_id() -> int:
+    with _conn_lock:
+        return _connection().execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+
+
+def tail(kinds=None, node_id: str = None, scope: str = None, last_id: int = None, heartbeat_sec: float = 15.0):
+    """새 이벤트를 SSE 형식으로 계속 전송 (last_id 이후부터)
+
+    다른 워커가 기록한 이벤트는 EVENT_POLL_SEC마다 DB에서 확인하고, 같은 워커의 기록은 바로 깨어나 보낸다.
+    """
+    if last_id is None:
+        last_id = latest_id()
+    idle_since = time.monotonic()
+    while True:
+        with _appended:
+            seen = _last_written
+        events = _after(last_id, kinds, node_id, scope)
+        if events:
+            for event in events:
+                yield f"id: {event['id']}\nevent: {event['kind']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+            last_id = events[-1]["id"]
+            idle_since = time.monotonic()
+            continue
+        if time.monotonic() - idle_since >= heartbeat_sec:
+            # 프록시 연결 유지용 주석 라인
+            yield ": keep-alive\n\n"
+            idle_since = time.monotonic()
+        with _appended:
+            # 조회 이후에 이 워커가 기록한 이벤트가 있으면 바로 다시 조회
+            if _last_written <= seen:
+                _appended.wait(EVENT_POLL_SEC)
@@ -0,0 +1,649 @@
+"""토폴로지 그래프 모델 서비스 (노드 -> 컨테이너 -> 네트워크/이미지)
+
+브라우저가 새로고침마다 컨테이너 목록으로 그래프 전체를 만들고 레이아웃을 처음부터 돌리지
+않도록, 그래프 모델을 두고 바뀐 부분만 갱신한다. 요소 id는 노드/컨테이너/네트워크/이미지
+식별자로 고정하고, 위치는 요소가 처음 생길 때 한 번 정해 유지한다(사용자가 옮기면 그 위치로).
+모델은 워커 간 공유 SQLite(WAL)에 두고 요소마다 마지막으로 바뀐 공유 리비전을 기록하므로,
+클라이언트가 가진 리비전 이후의 추가/변경/삭제만 보내는 diff가 어느 워커로 가도 이어진다.
+컨테이너가 많은 노드는 상태별 개수를 담은 그룹 요소 하나로 접는다.
+"""
+import heapq
+import json
+import math
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from fastapi import HTTPException
+from config.settings import (
+    GRAPH_CELL_SIZE,
+    GRAPH_COLLAPSE_CONTAINERS,
+    GRAPH_DB,
+    GRAPH_EXPAND_CONTAINERS,
+    GRAPH_HISTORY_REVISIONS,
+    GRAPH_REFRESH_SEC,
+    GRAPH_SLOT_SPACING,
+    ROUND_PROBE_WORKERS,
+)
+from services import coalesce_service, node_registry
+from services.docker_service import get_docker_client, get_docker_hosts
+
+# nodes: 노드와 중앙-클라이언트 연결만, auto: 컨테이너가 많은 노드는 그룹으로, full: 전체
+DETAILS = ("nodes", "auto", "full")
+LAYERS = ("base", "children", "group")
+
+_GOLDEN_ANGLE = math.pi * (3 - math.sqrt(5))
+
+_conn = None
+_conn_lock = threading.Lock()
+
+# meta: instance(모델 파일 식별자, 파일을 새로 만들면 클라이언트가 전체를 다시 받음),
+#       revision(공유 리비전), floor(이 리비전 이하부터의 변경은 삭제 기록이 정리되어 diff 불가),
+#       nodes(마지막으로 반영한 노드 목록/상태 세대)
+# owners: 노드별 상태 (칸, 접힘 여부, 주변 칸 배정, 조회 오류)
+# elements: 요소별 마지막 변경 리비전 (element가 NULL이면 그 리비전에 삭제됨)
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS owners (
+    node_id TEXT PRIMARY KEY,
+    cell INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    refreshed_at REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS elements (
+    id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    layer TEXT NOT NULL,
+    element TEXT,
+    rev INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS elements_rev ON elements (rev);
+CREATE INDEX IF NOT EXISTS elements_owner ON elements (owner);
+"""
+
+
+def _connection() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect(str(GRAPH_DB), timeout=30, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('instance', ?)", (uuid.uuid4().hex[:8],))
+        _conn = conn
+    return _conn
+
+
+@contextmanager
+def _transaction(write: bool = True):
+    """공유 연결의 트랜잭션 (쓰기는 BEGIN IMMEDIATE로 워커 간 직렬화, 읽기는 한 시점의 스냅샷)"""
+    with _conn_lock:
+        conn = _connection()
+        conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def _meta(conn, key: str, default=None):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def _set_meta(conn, key: str, value):
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+
+def _next_rev(conn) -> int:
+    return int(_meta(conn, "revision", 0)) + 1
+
+
+class _Owner:
+    """노드 하나와 그 아래 요소 (트랜잭션 안에서 읽어 바꾸고 다시 기록)"""
+
+    def __init__(self, node_id: str, cell: int, state: dict = None):
+        state = state or {}
+        self.node_id = node_id
+        self.cell = cell
+        # 항상 보이는 요소 (노드, 중앙 서버와의 연결)
+        self.base = {}
+        # 펼친 상태의 요소 (컨테이너/네트워크/이미지와 연결)
+        self.children = {}
+        # 접은 상태의 요소 (그룹과 연결)
+        self.group = {}
+        self.collapsed = state.get("collapsed", False)
+        self.collapse_rev = state.get("collapse_rev", 0)
+        # 노드 주변 위치 칸: 요소 id -> 칸 번호 (빈 칸은 작은 번호부터 재사용)
+        self.slots = state.get("slots", {})
+        self.free_slots = state.get("free_slots", [])
+        self.next_slot = state.get("next_slot", 0)
+        self.error = state.get("error")
+        # 이번 트랜잭션에서 바뀐 요소: id -> 층 (층에 없으면 삭제)
+        self.changed = {}
+
+    def state(self) -> dict:
+        return {
+            "collapsed": self.collapsed,
+            "collapse_rev": self.collapse_rev,
+            "slots": self.slots,
+            "free_slots": self.free_slots,
+            "next_slot": self.next_slot,
+            "error": self.error,
+        }
+
+
+def _load_owners(conn, node_ids: list = None, layers: tuple = LAYERS) -> dict:
+    """node_id -> _Owner (layers에 든 층의 요소까지)"""
+    if node_ids is None:
+        rows = conn.execute("SELECT node_id, cell, state FROM owners").fetchall()
+    else:
+        marks = ",".join("?" * len(node_ids))
+        rows = conn.execute(f"SELECT node_id, cell, state FROM owners WHERE node_id IN ({marks})", node_ids).fetchall()
+    owners = {node_id: _Owner(node_id, cell, json.loads(state)) for node_id, cell, state in rows}
+    if owners and layers:
+        marks = ",".join("?" * len(owners))
+        layer_marks = ",".join("?" * len(layers))
+        for element_id, owner_id, layer, element in conn.execute(
+            f"SELECT id, owner, layer, element FROM elements WHERE owner IN ({marks}) "
+            f"AND layer IN ({layer_marks}) AND element IS NOT NULL",
+            [*owners, *layers],
+        ):
+            getattr(owners[owner_id], layer)[element_id] = json.loads(element)
+    return owners
+
+
+def _save_owner(conn, owner: _Owner, rev: int):
+    """노드 상태와 바뀐 요소 기록 (삭제한 요소는 삭제 기록으로)"""
+    conn.execute(
+        "INSERT INTO owners (node_id, cell, state) VALUES (?, ?, ?) "
+        "ON CONFLICT (node_id) DO UPDATE SET state = excluded.state",
+        (owner.node_id, owner.cell, json.dumps(owner.state())),
+    )
+    rows = []
+    for element_id, layer in owner.changed.items():
+        element = getattr(owner, layer).get(element_id)
+        rows.append((element_id, owner.node_id, layer, None if element is None else json.dumps(element), rev))
+    conn.executemany("INSERT OR REPLACE INTO elements (id, owner, layer, element, rev) VALUES (?, ?, ?, ?, ?)", rows)
+    owner.changed.clear()
+
+
+def _cell_xy(index: int) -> tuple:
+    """사각 나선 칸 좌표 (0이 가운데, 노드가 늘어도 기존 칸은 그대로)"""
+    if index == 0:
+        return 0, 0
+    ring = math.ceil((math.sqrt(index + 1) - 1) / 2)
+    side = 2 * ring
+    # 이 고리의 시작 번호와 고리 안 위치
+    offset = index - (2 * ring - 1) ** 2
+    edge, step = divmod(offset, side)
+    if edge == 0:
+        return ring, -ring + 1 + step
+    if edge == 1:
+        return ring - 1 - step, ring
+    if edge == 2:
+        return -ring, ring - 1 - step
+    return -ring + 1 + step, -ring
+
+
+def _cell_position(owner: _Owner) -> dict:
+    x, y = _cell_xy(owner.cell)
+    return {"x": float(x * GRAPH_CELL_SIZE), "y": float(y * GRAPH_CELL_SIZE)}
+
+
+def _slot_position(owner: _Owner, slot: int) -> dict:
+    """노드 주변 해바라기 나선 위치 (칸 번호가 같으면 항상 같은 위치)"""
+    center = _cell_position(owner)
+    radius = GRAPH_SLOT_SPACING * (1.5 + math.sqrt(slot + 1))
+    angle = slot * _GOLDEN_ANGLE
+    return {
+        "x": round(center["x"] + radius * math.cos(angle), 1),
+        "y": round(center["y"] + radius * math.sin(angle), 1),
+    }
+
+
+def _group_position(owner: _Owner) -> dict:
+    center = _cell_position(owner)
+    return {"x": center["x"], "y": center["y"] + GRAPH_SLOT_SPACING * 3}
+
+
+def _take_slot(owner: _Owner, element_id: str) -> int:
+    slot = owner.slots.get(element_id)
+    if slot is None:
+        if owner.free_slots:
+            slot = heapq.heappop(owner.free_slots)
+        else:
+            slot, owner.next_slot = owner.next_slot, owner.next_slot + 1
+        owner.slots[element_id] = slot
+    return slot
+
+
+def _release_slot(owner: _Owner, element_id: str):
+    slot = owner.slots.pop(element_id, None)
+    if slot is not None:
+        heapq.heappush(owner.free_slots, slot)
+
+
+def _put(owner: _Owner, layer: str, element: dict) -> bool:
+    """요소 추가/변경 (내용이 같으면 리비전 유지)"""
+    table = getattr(owner, layer)
+    element_id = element["data"]["id"]
+    if table.get(element_id) == element:
+        return False
+    table[element_id] = element
+    owner.changed[element_id] = layer
+    return True
+
+
+def _delete(owner: _Owner, layer: str, element_id: str) -> bool:
+    if getattr(owner, layer).pop(element_id, None) is None:
+        return False
+    owner.changed[element_id] = layer
+    return True
+
+
+def _edge(edge_id: str, source: str, target: str, kind: str) -> dict:
+    return {"group": "edges", "data": {"id": edge_id, "source": source, "target": target, "kind": kind}}
+
+
+def _node_element_id(node_id: str) -> str:
+    return f"node:{node_id}"
+
+
+def _commit(conn, rev: int):
+    """리비전 확정, 오래된 삭제 기록 정리"""
+    _set_meta(conn, "revision", rev)
+    floor = int(_meta(conn, "floor", 0))
+    if rev - floor <= 2 * GRAPH_HISTORY_REVISIONS:
+        return
+    floor = rev - GRAPH_HISTORY_REVISIONS
+    _set_meta(conn, "floor", floor)
+    conn.execute("DELETE FROM elements WHERE element IS NULL AND rev <= ?", (floor,))
+
+
+def _remove_owner(conn, node_id: str, rev: int):
+    """삭제된 노드: 요소를 모두 삭제 기록으로 바꾸고 칸을 비움"""
+    conn.execute("UPDATE elements SET element = NULL, rev = ? WHERE owner = ? AND element IS NOT NULL", (rev, node_id))
+    conn.execute("DELETE FROM owners WHERE node_id = ?", (node_id,))
+
+
+def _sync_nodes() -> dict:
+    """노드 목록/상태 반영 (바뀐 노드 요소만 리비전 증가) -> 노드 목록"""
+    hosts = get_docker_hosts()
+    key = (
+        f"{node_registry.epoch()}:{node_registry.version()}:"
+        f"{node_registry.generation(node_registry.HEALTH_GENERATION)[0]}"
+    )
+    with _conn_lock:
+        if _meta(_connection(), "nodes") == key:
+            return hosts
+    health = node_registry.all_health()
+    with _transaction() as conn:
+        # 다른 워커가 먼저 반영했으면 그대로
+        if _meta(conn, "nodes") == key:
+            return hosts
+        rev = _next_rev(conn)
+        changed = False
+        owners = _load_owners(conn, layers=("base",))
+        for node_id in [n for n in owners if n not in hosts]:
+            del owners[node_id]
+            _remove_owner(conn, node_id, rev)
+            changed = True
+        used_cells = {owner.cell for owner in owners.values()}
+        central = next((n for n, info in hosts.items() if info.get("role") == "central"), None)
+        for node_id, info in hosts.items():
+            owner = owners.get(node_id)
+            if owner is None:
+                # 중앙 서버는 가운데 칸, 나머지는 비어 있는 가장 안쪽 칸
+                cell = 0 if node_id == central and 0 not in used_cells else 1
+                while cell in used_cells:
+                    cell += 1
+                used_cells.add(cell)
+                owner = owners[node_id] = _Owner(node_id, cell)
+            element_id = _node_element_id(node_id)
+            record = health.get(node_id, {})
+            data = {
+                "id": element_id,
+                "kind": "node",
+                "fullId": node_id,
+                "label": info.get("label", node_id),
+                "status": record.get("status", "unknown"),
+                "type": info.get("type", "remote"),
+                "role": info.get("role", "client"),
+                "base_url": info.get("base_url", ""),
+                "isCentral": node_id == central,
+            }
+            if owner.error:
+                data["error"] = owner.error
+            existing = owner.base.get(element_id)
+            position = existing["position"] if existing else _cell_position(owner)
+            changed |= _put(owner, "base", {"group": "nodes", "data": data, "position": position})
+            link_id = f"link:{central}:{node_id}"
+            if central and node_id != central:
+                changed |= _put(owner, "base", _edge(link_id, _node_element_id(central), element_id, "link"))
+            for stale in [i for i in owner.base if i.startswith("link:") and i != link_id]:
+                changed |= _delete(owner, "base", stale)
+            _save_owner(conn, owner, rev)
+        if changed:
+            _commit(conn, rev)
+        _set_meta(conn, "nodes", key)
+    return hosts
+
+
+def _ports(ports: list) -> str:
+    labels = []
+    for port in ports or []:
+        if port.get("PublicPort"):
+            label = f"{port.get('IP', '')}:{port['PublicPort']}->{port['PrivatePort']}/{port.get('Type', 'tcp')}"
+        else:
+            label = f"{port['PrivatePort']}/{port.get('Type', 'tcp')}"
+        if label not in labels:
+            labels.append(label)
+    return ", ".join(labels)
+
+
+def _build_children(node_id: str, containers: list) -> dict:
+    """Docker 컨테이너 목록 -> 요소 (위치 제외). 생성 순서대로 만들어 칸 배정이 워커 간에 같도록"""
+    parent = _node_element_id(node_id)
+    elements = {}
+    for c in sorted(containers, key=lambda c: (c.get("Created", 0), c["Id"])):
+        container_id = f"container:{node_id}:{c['Id']}"
+        names = c.get("Names") or [c["Id"][:12]]
+        elements[container_id] = {"group": "nodes", "data": {
+            "id": container_id,
+            "kind": "container",
+            "fullId": c["Id"][:12],
+            "label": names[0].lstrip("/"),
+            "status": c.get("State"),
+            "image": c.get("Image"),
+            "ports": _ports(c.get("Ports")),
+        }}
+        elements[f"host:{container_id}"] = _edge(f"host:{container_id}", parent, container_id, "host")
+
+        image_id = f"image:{node_id}:{c.get('ImageID') or c.get('Image')}"
+        if image_id not in elements:
+            elements[image_id] = {"group": "nodes", "data": {
+                "id": image_id, "kind": "image", "label": c.get("Image"), "fullId": c.get("ImageID"),
+            }}
+        elements[f"uses:{container_id}"] = _edge(f"uses:{container_id}", container_id, image_id, "uses")
+
+        networks = ((c.get("NetworkSettings") or {}).get("Networks") or {})
+        for network in sorted(networks):
+            network_id = f"network:{node_id}:{network}"
+            if network_id not in elements:
+                elements[network_id] = {"group": "nodes", "data": {"id": network_id, "kind": "network", "label": network}}
+            edge_id = f"net:{container_id}:{network}"
+            elements[edge_id] = _edge(edge_id, container_id, network_id, "attached")
+    return elements
+
+
+def _apply_containers(owner: _Owner, containers, error: str, rev: int) -> bool:
+    """한 노드의 컨테이너 조회 결과를 모델에 반영 (바뀐 요소만)"""
+    node_id = owner.node_id
+    changed = False
+    if containers is None:
+        # 조회 실패: 마지막으로 본 요소는 두고 노드 요소에 오류 표시
+        owner.error = error
+        node = owner.base[_node_element_id(node_id)]
+        if node["data"].get("error") != error:
+            changed |= _put(owner, "base", {**node, "data": {**node["data"], "error": error}})
+        return changed
+    if owner.error:
+        owner.error = None
+        node = owner.base[_node_element_id(node_id)]
+        data = {k: v for k, v in node["data"].items() if k != "error"}
+        changed |= _put(owner, "base", {**node, "data": data})
+
+    elements = _build_children(node_id, containers)
+    for element_id in [i for i in owner.children if i not in elements]:
+        _release_slot(owner, element_id)
+        changed |= _delete(owner, "children", element_id)
+    for element_id, element in elements.items():
+        if element["group"] == "nodes":
+            existing = owner.children.get(element_id)
+            slot = _take_slot(owner, element_id)
+            # 지금 위치(옮긴 위치 포함) > 처음 배정한 칸
+            element["position"] = (existing and existing["position"]) or _slot_position(owner, slot)
+        changed |= _put(owner, "children", element)
+
+    # 상태별 컨테이너 수 (접은 노드의 그룹 요소)
+    counts = {}
+    for c in containers:
+        counts[c.get("State") or "unknown"] = counts.get(c.get("State") or "unknown", 0) + 1
+    total = len(containers)
+    group_id = f"group:{node_id}"
+    existing = owner.group.get(group_id)
+    changed |= _put(owner, "group", {"group": "nodes", "data": {
+        "id": group_id, "kind": "group", "label": f"컨테이너 {total}개", "total": total, "counts": counts,
+    }, "position": existing["position"] if existing else _group_position(owner)})
+    changed |= _put(owner, "group", _edge(f"host:{group_id}", _node_element_id(node_id), group_id, "host"))
+
+    # 경계 근처에서 접기/펼치기가 반복되지 않도록 기준을 둘로 나눔
+    collapsed = total > GRAPH_COLLAPSE_CONTAINERS if not owner.collapsed else total > GRAPH_EXPAND_CONTAINERS
+    if collapsed != owner.collapsed:
+        owner.collapsed = collapsed
+        owner.collapse_rev = rev
+        changed = True
+    return changed
+
+
+def _load_containers(node_id: str) -> list:
+    # 저수준 API 한 번으로 네트워크/이미지 정보까지 (컨테이너별 추가 요청 없음)
+    return get_docker_client(node_id).api.containers(all=True)
+
+
+def _fetch(node_id: str) -> tuple:
+    try:
+        # 컨테이너 API와 같은 키 접두사: 상태를 바꾸면 함께 무효화되고, 동시 조회는 워커 간에도 하나로 합침
+        containers, _ = coalesce_service.fetch(f"containers:{node_id}:graph", lambda: _load_containers(node_id))
+        return node_id, containers, None
+    except HTTPException as e:
+        return node_id, None, str(e.detail)
+    except Exception as e:
+        return node_id, None, str(e)
+
+
+def _claim_due(node_ids: list) -> list:
+    """재조회 간격이 지난 노드를 조회 중으로 표시하고 반환 (다른 워커/요청이 같은 노드를 또 조회하지 않도록)"""
+    if not node_ids:
+        return []
+    now = time.time()
+    marks = ",".join("?" * len(node_ids))
+    sql = f"SELECT node_id FROM owners WHERE node_id IN ({marks}) AND refreshed_at <= ?"
+    with _conn_lock:
+        if not _connection().execute(sql, [*node_ids, now - GRAPH_REFRESH_SEC]).fetchone():
+            return []
+    with _transaction() as conn:
+        due = [row[0] for row in conn.execute(sql, [*node_ids, now - GRAPH_REFRESH_SEC])]
+        conn.executemany("UPDATE owners SET refreshed_at = ? WHERE node_id = ?", [(now, n) for n in due])
+    return due
+
+
+def _refresh(node_ids: list):
+    """재조회 간격이 지난 노드의 컨테이너를 병렬 조회해 반영"""
+    due = _claim_due(node_ids)
+    if not due:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(len(due), ROUND_PROBE_WORKERS))) as pool:
+        results = list(pool.map(_fetch, due))
+    with _transaction() as conn:
+        rev = _next_rev(conn)
+        changed = False
+        owners = _load_owners(conn, due)
+        for node_id, containers, error in results:
+            owner = owners.get(node_id)
+            # 조회 중에 노드가 삭제되었으면 버림
+            if owner is not None:
+                changed |= _apply_containers(owner, containers, error, rev)
+                _save_owner(conn, owner, rev)
+        if changed:
+            _commit(conn, rev)
+
+
+def invalidate(node_id: str):
+    """컨테이너 상태를 바꾼 직후 다음 조회에서 바로 재조회 (모든 워커)"""
+    with _conn_lock:
+        _connection().execute("UPDATE owners SET refreshed_at = 0 WHERE node_id = ?", (node_id,))
+
+
+def _diff_owner(owner: _Owner, detail: str, expanded: bool, since, changed: list, upsert: list, remove: list):
+    """changed: since 이후 바뀐 이 노드의 요소 (id, 층, 요소 JSON 또는 삭제면 None)"""
+    show_group = detail == "auto" and owner.collapsed and not expanded
+    show_children = detail == "full" or (detail == "auto" and not show_group)
+    if since is None:
+        upsert.extend(owner.base.values())
+        if show_children:
+            upsert.extend(owner.children.values())
+        if show_group:
+            upsert.extend(owner.group.values())
+        return
+    # 접기/펼치기가 바뀌었으면 이전 표현을 지우고 새 표현 전체를 보냄
+    toggled = detail == "auto" and not expanded and owner.collapse_rev > since
+    shown = {"base"}
+    if show_children and not toggled:
+        shown.add("children")
+    if show_group and not toggled:
+        shown.add("group")
+    for element_id, layer, element in changed:
+        if element is None:
+            remove.append(element_id)
+        elif layer in shown:
+            upsert.append(json.loads(element))
+    if toggled:
+        if show_group:
+            remove.extend(owner.children)
+            upsert.extend(owner.group.values())
+        else:
+            remove.extend(owner.group)
+            upsert.extend(owner.children.values())
+
+
+def get_graph(node_ids: list = None, detail: str = "auto", expand: list = (), since: int = None,
+              instance: str = None) -> dict:
+    """그래프 요소 (since와 instance를 주면 그 리비전 이후의 변경분만)
+
+    응답의 reset이 true면 클라이언트는 가진 요소를 모두 버리고 upsert로 새로 그린다.
+    노드 목록/detail/expand를 바꾸면 since 없이 다시 요청해야 한다.
+    """
+    if detail not in DETAILS:
+        raise HTTPException(status_code=400, detail=f"detail은 {', '.join(DETAILS)} 중 하나여야 합니다")
+    hosts = _sync_nodes()
+    if node_ids:
+        unknown = [n for n in node_ids if n not in hosts]
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"알 수 없는 노드: {', '.join(unknown)}")
+    view = list(node_ids) if node_ids else list(hosts)
+    if detail != "nodes":
+        _refresh(view)
+
+    expand = set(expand or ())
+    with _transaction(write=False) as conn:
+        current = _meta(conn, "instance")
+        revision = int(_meta(conn, "revision", 0))
+        reset = since is None or instance != current or since < int(_meta(conn, "floor", 0)) or since > revision
+        since = None if reset else since
+        owners = _load_owners(conn, view, LAYERS if reset else ())
+        changed = {}
+        if since is not None:
+            for element_id, owner_id, layer, element in conn.execute(
+                "SELECT id, owner, layer, element FROM elements WHERE rev > ?", (since,),
+            ):
+                changed.setdefault(owner_id, []).append((element_id, layer, element))
+            # 접기/펼치기가 바뀐 노드는 층 전체가 필요
+            toggled = [n for n, owner in owners.items() if n not in expand and owner.collapse_rev > since]
+            if detail == "auto" and toggled:
+                owners.update(_load_owners(conn, toggled))
+    upsert, remove = [], []
+    for node_id in view:
+        owner = owners.get(node_id)
+        if owner is not None:
+            _diff_owner(owner, detail, node_id in expand, since, changed.get(node_id, ()), upsert, remove)
+    if since is not None and not node_ids:
+        # 삭제된 노드의 요소
+        for owner_id, rows in changed.items():
+            if owner_id not in owners:
+                remove.extend(element_id for element_id, _, element in rows if element is None)
+    collapsed = [n for n in view if n in owners and detail == "auto" and owners[n].collapsed and n not in expand]
+    # 엣지가 가리키는 노드 요소가 먼저 추가되도록
+    upsert.sort(key=lambda element: element["group"] != "nodes")
+    return {
+        "instance": current,
+        "revision": revision,
+        "reset": reset,
+        "upsert": upsert,
+        "remove": remove,
+        "collapsed": collapsed,
+    }
+
+
+def _move(conn, updates: dict, rev: int) -> list:
+    """요소 위치 변경 (모델에 있는 노드 요소만) -> 변경한 id"""
+    if not updates:
+        return []
+    marks = ",".join("?" * len(updates))
+    rows = conn.execute(
+        f"SELECT id, element FROM elements WHERE id IN ({marks}) AND element IS NOT NULL", list(updates),
+    ).fetchall()
+    moved = []
+    for element_id, element in rows:
+        element = json.loads(element)
+        if element["group"] != "nodes":
+            continue
+        if element.get("position") != updates[element_id]:
+            element["position"] = updates[element_id]
+            conn.execute("UPDATE elements SET element = ?, rev = ? WHERE id = ?", (json.dumps(element), rev, element_id))
+        moved.append(element_id)
+    return moved
+
+
+def save_positions(positions: dict) -> dict:
+    """사용자가 옮긴 위치 저장 (워커 간 공유, 다음 diff로 다른 대시보드에도 반영)
+
+    요소별로 한 트랜잭션에서 바꾸므로 동시에 다른 요소를 옮겨도 서로 덮어쓰지 않고,
+    위치는 요소와 함께 저장되어 요소가 삭제되면 같이 지워진다.
+    """
+    positions = {
+        element_id: {"x": round(float(p["x"]), 1), "y": round(float(p["y"]), 1)}
+        for element_id, p in positions.items()
+    }
+    with _transaction() as conn:
+        rev = _next_rev(conn)
+        moved = _move(conn, positions, rev)
+        if moved:
+            _commit(conn, rev)
+        revision = int(_meta(conn, "revision", 0))
+    return {"ok": True, "saved": moved, "revision": revision}
+
+
+def reset_positions(element_ids: list) -> dict:
+    """옮긴 위치를 지우고 처음 배정한 위치로 되돌림"""
+    with _transaction() as conn:
+        rev = _next_rev(conn)
+        marks = ",".join("?" * len(element_ids))
+        rows = conn.execute(
+            f"SELECT id, owner, layer FROM elements WHERE id IN ({marks}) AND element IS NOT NULL", list(element_ids),
+        ).fetchall()
+        owners = _load_owners(conn, sorted({owner_id for _, owner_id, _ in rows}), ())
+        homes = {}
+        for element_id, owner_id, layer in rows:
+            owner = owners.get(owner_id)
+            if owner is None or (layer == "children" and element_id not in owner.slots):
+                continue
+            if layer == "base":
+                homes[element_id] = _cell_position(owner)
+            elif layer == "group":
+                homes[element_id] = _group_position(owner)
+            else:
+                homes[element_id] = _slot_position(owner, owner.slots[element_id])
+        moved = _move(conn, homes, rev)
+        if moved:
+            _commit(conn, rev)
+        revision = int(_meta(conn, "revision", 0))
+    return {"ok": True, "reset": moved, "revision": revision}
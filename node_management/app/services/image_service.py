@@ -0,0 +1,211 @@
+"""이미지 배포 서비스 (중앙 pull 후 노드별 images/load 전송)"""
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import docker
+from fastapi import HTTPException
+from config.settings import CENTRAL_NODE_ID, IMAGE_CHUNK_SIZE, IMAGE_DISTRIBUTE_PARALLEL, IMAGE_JOB_HISTORY
+from services import event_service, job_store
+from services import node_registry
+from services.docker_service import get_docker_client, get_docker_hosts
+
+# 배포 작업 상태: job_id -> job dict (최근 IMAGE_JOB_HISTORY개)
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def ensure_image(node_id: str, image: str, force_pull: bool = False) -> str:
+    """노드에 이미지가 준비되어 있는지 확인 (없으면 pull)"""
+    # 이미지 준비 캐시는 워커 간 공유: image:<node_id>:<image> -> image id
+    key = f"image:{node_id}:{image}"
+    if not force_pull:
+        cached = node_registry.cache_get(key)
+        if cached:
+            return cached
+
+    client = get_docker_client(node_id)
+    if force_pull:
+        pulled = client.images.pull(image)
+    else:
+        try:
+            pulled = client.images.get(image)
+        except docker.errors.ImageNotFound:
+            pulled = client.images.pull(image)
+    node_registry.cache_set(key, pulled.id)
+    return pulled.id
+
+
+def _local_image_id(node_id: str, image: str):
+    """노드에 있는 이미지 id (없으면 None)"""
+    try:
+        return get_docker_client(node_id).images.get(image).id
+    except docker.errors.ImageNotFound:
+        return None
+
+
+def _read_chunks(path: str, progress: dict):
+    """tar 파일을 청크 단위로 읽으며 전송량 기록"""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(IMAGE_CHUNK_SIZE)
+            if not chunk:
+                break
+            progress["bytes_sent"] += len(chunk)
+            yield chunk
+
+
+def _check_node(job: dict, node_id: str) -> bool:
+    """노드에 같은 이미지가 이미 있으면 skipped로 표시"""
+    try:
+        present = _local_image_id(node_id, job["image"]) == job["image_id"]
+    except Exception:
+        # 연결 실패 등은 전송 단계에서 다시 시도하고 오류를 기록
+        return False
+    if present:
+        job["nodes"][node_id]["state"] = "skipped"
+        node_registry.cache_set(f"image:{node_id}:{job['image']}", job["image_id"])
+    return present
+
+
+def _load_on_node(job: dict, node_id: str, tar_path: str):
+    """단일 노드에 이미지 tar 전송 및 로드"""
+    progress = job["nodes"][node_id]
+    started = time.perf_counter()
+    try:
+        progress["state"] = "transferring"
+        client = get_docker_client(node_id)
+        # load 응답 스트림을 끝까지 소비해야 로드가 완료됨
+        # 데몬 쪽 실패는 예외가 아니라 error/errorDetail 메시지로 옴
+        for message in client.api.load_image(_read_chunks(tar_path, progress)):
+            if "error" in message or "errorDetail" in message:
+                detail = message.get("error") or message["errorDetail"].get("message")
+                raise RuntimeError(str(detail).strip())
+        progress["state"] = "loaded"
+        node_registry.cache_set(f"image:{node_id}:{job['image']}", job["image_id"])
+    except Exception as e:
+        progress["state"] = "failed"
+        progress["error"] = str(e)
+    progress["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def _resolve_image_id(central, image: str, pull: bool) -> str:
+    """배포할 이미지 id (중앙 서버에 레지스트리 최신본이 이미 있으면 pull 생략)"""
+    if not pull:
+        # 중앙 서버에서 빌드한 이미지는 레지스트리에 없으므로 로컬 이미지를 사용
+        return central.images.get(image).id
+    try:
+        digest = central.images.get_registry_data(image).id
+        local = central.images.get(image)
+        if any(repo_digest.endswith(digest) for repo_digest in local.attrs.get("RepoDigests") or []):
+            return local.id
+    except docker.errors.APIError:
+        pass
+    return central.images.pull(image).id
+
+
+def _run_distribution(job: dict, max_parallel: int, pull: bool = True):
+    """중앙 서버에서 한 번 pull/save 후 노드들로 병렬 전송"""
+    started = time.perf_counter()
+    tar_path = None
+    try:
+        central = get_docker_client(CENTRAL_NODE_ID)
+        job["state"] = "pulling" if pull else "resolving"
+        job["image_id"] = _resolve_image_id(central, job["image"], pull)
+
+        # 모든 노드에 이미 있으면 tar 저장/전송 생략
+        job["state"] = "checking"
+        with ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="image-check") as pool:
+            present = list(pool.map(lambda node_id: _check_node(job, node_id), job["nodes"]))
+        targets = [node_id for node_id, done in zip(job["nodes"], present) if not done]
+        if not targets:
+            job["state"] = "done"
+            return
+
+        job["state"] = "saving"
+        with tempfile.NamedTemporaryFile(suffix=".tar", delete=False) as f:
+            tar_path = f.name
+            for chunk in central.api.get_image(job["image"], chunk_size=IMAGE_CHUNK_SIZE):
+                f.write(chunk)
+        total_bytes = os.path.getsize(tar_path)
+        job["total_bytes"] = total_bytes
+        for node_id in targets:
+            job["nodes"][node_id]["total_bytes"] = total_bytes
+
+        job["state"] = "distributing"
+        with ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="image-load") as pool:
+            for node_id in targets:
+                pool.submit(_load_on_node, job, node_id, tar_path)
+
+        failed = [n for n, p in job["nodes"].items() if p["state"] == "failed"]
+        job["state"] = "failed" if failed else "done"
+    except Exception as e:
+        job["state"] = "failed"
+        job["error"] = str(e)
+    finally:
+        if tar_path and os.path.exists(tar_path):
+            os.remove(tar_path)
+        job["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        event_service.log_job("images", f"이미지 '{job['image']}' 배포", job)
+        job_store.finish("images", job)
+
+
+def distribute_image(image: str, node_ids=None, max_parallel: int = None,
+                     pull: bool = True, wait: bool = False) -> dict:
+    """이미지 배포 작업 시작 (wait=False면 백그라운드)"""
+    hosts = get_docker_hosts()
+    if node_ids is None:
+        node_ids = [
+            node_id for node_id, info in hosts.items()
+            if info.get("role", "client") == "client"
+        ]
+    unknown = [node_id for node_id in node_ids if node_id not in hosts]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"알 수 없는 노드: {', '.join(unknown)}")
+
+    job = {
+        "id": uuid.uuid4().hex[:12],
+        "image": image,
+        "image_id": None,
+        "state": "pending",
+        "total_bytes": None,
+        "nodes": {
+            node_id: {"state": "pending", "bytes_sent": 0, "total_bytes": None}
+            for node_id in node_ids
+        },
+    }
+    with _jobs_lock:
+        _jobs[job["id"]] = job
+        while len(_jobs) > IMAGE_JOB_HISTORY:
+            _jobs.popitem(last=False)
+    job_store.add("images", job, IMAGE_JOB_HISTORY)
+    max_parallel = max(1, min(max_parallel or IMAGE_DISTRIBUTE_PARALLEL, len(node_ids) or 1))
+    if wait:
+        _run_distribution(job, max_parallel, pull)
+    else:
+        threading.Thread(
+            target=_run_distribution, args=(job, max_parallel, pull), daemon=True
+        ).start()
+    return job
+
+
+def get_job(job_id: str) -> dict:
+    """배포 작업 상태 조회"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        # 다른 워커가 시작한 작업은 공유 저장소의 상태로 응답
+        job = job_store.get("images", job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="이미지 배포 작업을 찾을 수 없습니다")
+    return job
+
+
+def list_jobs() -> list:
+    """배포 작업 목록 조회 (모든 워커)"""
+    with _jobs_lock:
+        local = list(_jobs.values())
+    return job_store.merge("images", local)
@@ -0,0 +1,244 @@
+"""워커 간 공유 작업 상태 저장소 (SQLite WAL)
+
+백그라운드 작업은 시작한 워커의 스레드에서 실행되고 진행 상태도 그 워커 메모리의 job dict에
+쌓인다. 다른 워커로 간 조회/SSE 요청도 같은 작업을 보도록, 시작 시 스냅샷을 바로 기록하고
+실행 중에는 JOB_SYNC_SEC마다 바뀐 스냅샷과 새 이벤트만 기록한다. 종료 상태는 마지막
+이벤트와 같은 트랜잭션에 기록하므로 done이 보이면 이벤트도 모두 기록된 것이다.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from config.settings import JOB_DB, JOB_STALE_SEC, JOB_SYNC_SEC
+
+_conn = None
+_conn_lock = threading.Lock()
+
+# 이 워커가 실행 중인 작업: (kind, job_id) -> {"job", "data", "events"(기록한 이벤트 수), "lock", "closed"}
+_tracked = {}
+_tracked_lock = threading.Lock()
+_flusher = None
+# 스냅샷에서 빼는 필드 (이벤트는 job_events에 따로, 파일시스템 접속 정보는 기록하지 않음)
+_EXCLUDED = ("events", "filesystem")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    worker INTEGER,
+    updated_at REAL NOT NULL,
+    UNIQUE (kind, id)
+);
+CREATE TABLE IF NOT EXISTS job_events (
+    kind TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (kind, job_id, seq)
+);
+"""
+
+
+def _connection() -> sqlite3.Connection:
+    """공유 연결 (기록이 잦으므로 연결을 재사용하고 잠금으로 직렬화)"""
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect(str(JOB_DB), timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _conn = conn
+    return _conn
+
+
+def _snapshot(job: dict) -> str:
+    """이벤트/접속 정보를 뺀 작업 상태 JSON (실행 스레드가 dict를 바꾸는 중이면 None)"""
+    try:
+        return json.dumps({k: v for k, v in job.items() if k not in _EXCLUDED}, ensure_ascii=False, default=str)
+    except RuntimeError:
+        return None
+
+
+def _write(conn, kind: str, job_id: str, data: str, events: list, first_seq: int, done: bool):
+    now = time.time()
+    if data is None:
+        conn.execute("UPDATE jobs SET updated_at = ? WHERE kind = ? AND id = ?", (now, kind, job_id))
+    else:
+        conn.execute(
+            "INSERT INTO jobs (kind, id, data, done, worker, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (kind, id) DO UPDATE SET data = excluded.data, done = excluded.done, "
+            "worker = excluded.worker, updated_at = excluded.updated_at",
+            (kind, job_id, data, int(done), os.getpid(), now),
+        )
+    conn.executemany(
+        "INSERT OR REPLACE INTO job_events (kind, job_id, seq, data) VALUES (?, ?, ?, ?)",
+        [
+            (kind, job_id, first_seq + i, json.dumps(event, ensure_ascii=False, default=str))
+            for i, event in enumerate(events)
+        ],
+    )
+
+
+def _prune(conn, kind: str, history: int):
+    """종류별로 최근 history개만 보관"""
+    stale = [row[0] for row in conn.execute(
+        "SELECT id FROM jobs WHERE kind = ? ORDER BY seq DESC LIMIT -1 OFFSET ?", (kind, history),
+    )]
+    conn.executemany("DELETE FROM jobs WHERE kind = ? AND id = ?", [(kind, job_id) for job_id in stale])
+    conn.executemany("DELETE FROM job_events WHERE kind = ? AND job_id = ?", [(kind, job_id) for job_id in stale])
+
+
+def _flush(entry_key, entry: dict, done: bool = False):
+    with entry["lock"]:
+        # 종료 기록 뒤에 주기적 기록이 이전 스냅샷으로 덮어쓰지 않도록
+        if entry["closed"]:
+            return
+        entry["closed"] = done
+        _flush_locked(entry_key, entry, done)
+
+
+def _flush_locked(entry_key, entry: dict, done: bool):
+    kind, job_id = entry_key
+    job = entry["job"]
+    data = _snapshot(job)
+    if done:
+        # 종료 기록은 빠뜨리면 안 되므로 변경 중이면 다시 시도
+        while data is None:
+            time.sleep(0.01)
+            data = _snapshot(job)
+    events = list(job.get("events") or [])[entry["events"]:]
+    if data == entry["data"] and not done:
+        data = None
+    with _conn_lock:
+        conn = _connection()
+        _write(conn, kind, job_id, data, events, entry["events"], done)
+        conn.commit()
+    if data is not None:
+        entry["data"] = data
+    entry["events"] += len(events)
+
+
+def _flush_loop():
+    while True:
+        time.sleep(JOB_SYNC_SEC)
+        with _tracked_lock:
+            entries = list(_tracked.items())
+        for key, entry in entries:
+            try:
+                _flush(key, entry)
+            except sqlite3.Error as e:
+                print(f"작업 상태 기록 오류: {e} ({key[0]}/{key[1]})")
+
+
+def _entry(job: dict, flushed_events: int) -> dict:
+    return {"job": job, "data": None, "events": flushed_events, "lock": threading.Lock(), "closed": False}
+
+
+def add(kind: str, job: dict, history: int):
+    """새 작업을 바로 기록하고 종료(finish)까지 주기적으로 기록"""
+    global _flusher
+    key = (kind, job["id"])
+    entry = _entry(job, 0)
+    try:
+        with _conn_lock:
+            conn = _connection()
+            events = list(job.get("events") or [])
+            _write(conn, kind, job["id"], _snapshot(job) or "{}", events, 0, False)
+            _prune(conn, kind, history)
+            conn.commit()
+        entry["events"] = len(events)
+    except sqlite3.Error as e:
+        print(f"작업 상태 기록 오류: {e} ({kind}/{job['id']})")
+    with _tracked_lock:
+        _tracked[key] = entry
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_flush_loop, name="job-store", daemon=True)
+            _flusher.start()
+
+
+def finish(kind: str, job: dict):
+    """종료 상태와 남은 이벤트를 기록하고 주기적 기록 중단"""
+    key = (kind, job["id"])
+    with _tracked_lock:
+        entry = _tracked.pop(key, None)
+    try:
+        _flush(key, entry or _entry(job, len(job.get("events") or [])), done=True)
+    except sqlite3.Error as e:
+        print(f"작업 상태 기록 오류: {e} ({kind}/{job['id']})")
+
+
+def save(kind: str, job: dict, history: int = None):
+    """끝난 작업 상태 기록 (동기 작업 결과, 끝난 뒤의 롤백/등록 등). history를 주면 최근 history개만 보관"""
+    finish(kind, job)
+    if history is not None:
+        with _conn_lock:
+            conn = _connection()
+            _prune(conn, kind, history)
+            conn.commit()
+
+
+def get(kind: str, job_id: str) -> dict:
+    """기록된 작업 상태 (없으면 None)"""
+    with _conn_lock:
+        row = _connection().execute("SELECT data FROM jobs WHERE kind = ? AND id = ?", (kind, job_id)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def list_jobs(kind: str) -> list:
+    """기록된 작업 목록 (오래된 순)"""
+    with _conn_lock:
+        rows = _connection().execute("SELECT data FROM jobs WHERE kind = ? ORDER BY seq", (kind,)).fetchall()
+    return [json.loads(row[0]) for row in rows]
+
+
+def ids(kind: str) -> list:
+    """기록된 작업 id 목록 (오래된 순)"""
+    with _conn_lock:
+        rows = _connection().execute("SELECT id FROM jobs WHERE kind = ? ORDER BY seq", (kind,)).fetchall()
+    return [row[0] for row in rows]
+
+
+def merge(kind: str, local: list) -> list:
+    """기록된 작업 목록(오래된 순)에 이 워커가 가진 작업의 최신 상태를 덮어씀"""
+    live = {job["id"]: job for job in local}
+    merged = [live.pop(job["id"], job) for job in list_jobs(kind)]
+    return merged + list(live.values())
+
+
+def events(kind: str, job_id: str, after: int = -1) -> list:
+    """기록된 작업 이벤트 (seq가 after보다 큰 것)"""
+    with _conn_lock:
+        rows = _connection().execute(
+            "SELECT data FROM job_events WHERE kind = ? AND job_id = ? AND seq > ? ORDER BY seq",
+            (kind, job_id, after),
+        ).fetchall()
+    return [json.loads(row[0]) for row in rows]
+
+
+def follow(kind: str, job_id: str, after: int = -1, heartbeat_sec: float = 15.0):
+    """다른 워커가 실행 중인 작업의 이벤트를 기록에서 읽어 SSE 형식으로 전송 (작업이 끝나면 종료)"""
+    idle_since = time.monotonic()
+    while True:
+        with _conn_lock:
+            row = _connection().execute(
+                "SELECT done, updated_at FROM jobs WHERE kind = ? AND id = ?", (kind, job_id),
+            ).fetchone()
+        # 종료 기록과 마지막 이벤트는 같은 트랜잭션이므로 done을 먼저 읽으면 이벤트를 놓치지 않는다
+        new = events(kind, job_id, after)
+        for event in new:
+            yield f"id: {event['seq']}\nevent: {event['kind']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        if new:
+            after = new[-1]["seq"]
+            idle_since = time.monotonic()
+            continue
+        if row is None or row[0] or time.time() - row[1] > JOB_STALE_SEC:
+            return
+        if time.monotonic() - idle_since >= heartbeat_sec:
+            # 프록시 연결 유지용 주석 라인
+            yield ": keep-alive\n\n"
+            idle_since = time.monotonic()
+        time.sleep(JOB_SYNC_SEC)
@@ -0,0 +1,464 @@
+"""모델 레지스트리 서비스 (SQLite 메타데이터 + 내용 주소 청크 저장소)
+
+가중치는 텐서별로 고정 크기 청크로 나눠 sha256으로 저장하므로, 라운드 사이에
+바뀌지 않은 청크는 한 번만 저장된다. 로드는 텐서별 연속 파일을 memory-map 한다
+(여러 청크로 된 텐서는 청크 목록을 키로 한 캐시 파일로 한 번 이어 붙임).
+"""
+import hashlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+from fastapi import HTTPException
+from config.settings import (
+    MODEL_BLOB_BACKEND,
+    MODEL_BLOB_BUCKET,
+    MODEL_BLOB_DIR,
+    MODEL_BLOB_NODE,
+    MODEL_CHUNK_SIZE,
+    MODEL_DB,
+    MODEL_TENSOR_CACHE_DIR,
+)
+from services import catalog_service, event_service
+from services.cleansing_service import get_filesystem, node_filesystem, split_uri
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    id TEXT PRIMARY KEY,
+    project TEXT NOT NULL,
+    version TEXT NOT NULL,
+    status TEXT NOT NULL,
+    accuracy REAL,
+    algorithm TEXT,
+    rounds INTEGER,
+    note TEXT,
+    created_at TEXT,
+    total_bytes INTEGER NOT NULL,
+    stored_bytes INTEGER NOT NULL,
+    manifest TEXT NOT NULL,
+    UNIQUE (project, version)
+);
+CREATE INDEX IF NOT EXISTS models_project ON models (project, created_at);
+CREATE TABLE IF NOT EXISTS chunks (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    refcount INTEGER NOT NULL
+);
+"""
+
+_SUMMARY_COLUMNS = (
+    "id, project, version, status, accuracy, algorithm, rounds, note, created_at, total_bytes, stored_bytes"
+)
+
+
+def _connect() -> sqlite3.Connection:
+    """레지스트리 DB 연결 (최초 호출 시 스키마 생성)"""
+    global _schema_ready
+    conn = sqlite3.connect(str(MODEL_DB), timeout=30)
+    conn.row_factory = sqlite3.Row
+    if not _schema_ready:
+        with _schema_lock:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _schema_ready = True
+    return conn
+
+
+# --- 청크 저장소 ---
+
+class LocalBlobStore:
+    """로컬 디렉터리 청크 저장소 (digest[:2]/digest)"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def exists(self, digest: str) -> bool:
+        return self.path(digest).exists()
+
+    def put(self, digest: str, data: memoryview):
+        path = self.path(digest)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 임시 파일에 쓴 뒤 이동해 반쯤 쓰인 청크가 보이지 않도록
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def local_path(self, digest: str) -> Path:
+        """memory-map 할 로컬 파일 경로"""
+        return self.path(digest)
+
+    def delete(self, digest: str):
+        self.path(digest).unlink(missing_ok=True)
+
+
+class MinioBlobStore(LocalBlobStore):
+    """MinIO 청크 저장소. 로드 시 로컬 디렉터리에 캐시 후 memory-map"""
+
+    def __init__(self, node_id: str, bucket: str, cache_root: Path):
+        super().__init__(cache_root)
+        self.node_id = node_id
+        self.bucket = bucket
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = catalog_service.get_minio_client(self.node_id)
+            if not self._client.bucket_exists(self.bucket):
+                self._client.make_bucket(self.bucket)
+        return self._client
+
+    def put(self, digest: str, data: memoryview):
+        self.client.put_object(self.bucket, digest, io.BytesIO(data), len(data))
+
+    def local_path(self, digest: str) -> Path:
+        path = self.path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+            os.close(fd)
+            self.client.fget_object(self.bucket, digest, tmp_path)
+            os.replace(tmp_path, path)
+        return path
+
+    def delete(self, digest: str):
+        self.client.remove_object(self.bucket, digest)
+        super().delete(digest)
+
+
+_store = None
+
+
+def get_store():
+    """설정된 청크 저장소 반환 (local 또는 minio)"""
+    global _store
+    if _store is None:
+        if MODEL_BLOB_BACKEND == "minio":
+            _store = MinioBlobStore(MODEL_BLOB_NODE, MODEL_BLOB_BUCKET, MODEL_BLOB_DIR)
+        else:
+            _store = LocalBlobStore(MODEL_BLOB_DIR)
+    return _store
+
+
+# --- 등록 ---
+
+def _chunk_tensor(array: np.ndarray):
+    """텐서를 고정 크기 청크로 나눔: (digest, view) 목록"""
+    data = memoryview(np.ascontiguousarray(array).reshape(-1).view(np.uint8))
+    chunks = []
+    for offset in range(0, len(data), MODEL_CHUNK_SIZE):
+        view = data[offset:offset + MODEL_CHUNK_SIZE]
+        chunks.append((hashlib.sha256(view).hexdigest(), view))
+    return chunks
+
+
+def read_weights(uri: str, node_id: str = None) -> dict:
+    """npz 가중치 파일 읽기 (로컬 경로 또는 s3://)"""
+    fs_desc = node_filesystem(node_id) if uri.startswith("s3://") else None
+    with get_filesystem(fs_desc).open_input_file(split_uri(uri)) as f:
+        with np.load(io.BytesIO(f.read()), allow_pickle=False) as data:
+            return {name: data[name] for name in data.files}
+
+
+def register(meta: dict, tensors: dict) -> dict:
+    """모델 버전 등록. 이미 저장된 청크는 다시 쓰지 않는다"""
+    started = time.perf_counter()
+    store = get_store()
+    manifest = []
+    total_bytes = 0
+    chunk_views = {}
+    for name, array in tensors.items():
+        array = np.asarray(array)
+        if array.dtype.hasobject:
+            raise HTTPException(status_code=400, detail=f"'{name}'은 수치 텐서가 아닙니다")
+        chunks = _chunk_tensor(array)
+        manifest.append({
+            "name": name,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "nbytes": array.nbytes,
+            "chunks": [digest for digest, _ in chunks],
+        })
+        total_bytes += array.nbytes
+        for digest, view in chunks:
+            chunk_views.setdefault(digest, view)
+
+    conn = _connect()
+    try:
+        # 청크 참조 수는 워커 간에 공유되므로 조회부터 갱신까지 한 쓰기 트랜잭션에서
+        # (다른 워커가 같은 청크를 지우는 중에 재사용으로 판단하지 않도록)
+        conn.execute("BEGIN IMMEDIATE")
+        if conn.execute(
+            "SELECT 1 FROM models WHERE project = ? AND version = ?", (meta["project"], meta["version"])
+        ).fetchone():
+            raise HTTPException(status_code=400, detail=f"{meta['project']} {meta['version']}이 이미 존재합니다")
+        known = set()
+        digests = list(chunk_views)
+        for start in range(0, len(digests), 500):
+            batch = digests[start:start + 500]
+            placeholders = ",".join("?" for _ in batch)
+            known.update(row["digest"] for row in conn.execute(
+                # 참조 수가 0인 청크는 삭제 대기 중이므로 없는 것으로 보고 다시 쓴다
+                f"SELECT digest FROM chunks WHERE digest IN ({placeholders}) AND refcount > 0", batch
+            ))
+        stored_bytes = 0
+        for digest, view in chunk_views.items():
+            if digest not in known:
+                store.put(digest, view)
+                stored_bytes += len(view)
+
+        # 같은 버전 안에서 반복되는 청크도 참조 수에 모두 반영
+        references = {}
+        for tensor in manifest:
+            for digest in tensor["chunks"]:
+                references[digest] = references.get(digest, 0) + 1
+        conn.executemany(
+            "INSERT INTO chunks (digest, size, refcount) VALUES (?, ?, ?)"
+            " ON CONFLICT(digest) DO UPDATE SET refcount = refcount + excluded.refcount",
+            [(digest, len(chunk_views[digest]), count) for digest, count in references.items()],
+        )
+        model_id = uuid.uuid4().hex[:12]
+        conn.execute(
+            f"INSERT INTO models ({_SUMMARY_COLUMNS}, manifest) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                model_id, meta["project"], meta["version"], meta.get("status", "experimental"),
+                meta.get("accuracy"), meta.get("algorithm"), meta.get("rounds"), meta.get("note"),
+                datetime.now().isoformat(), total_bytes, stored_bytes, json.dumps(manifest),
+            ),
+        )
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    result = get_model(model_id)
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    event_service.log("success", f"모델 '{meta['project']} {meta['version']}' 등록", source="models",
+                      model_id=model_id, stored_bytes=stored_bytes)
+    return result
+
+
+def register_from_uri(request) -> dict:
+    """요청의 weights_uri에서 가중치를 읽어 등록"""
+    try:
+        tensors = read_weights(request.weights_uri, request.node_id)
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"가중치 읽기 실패: {e}")
+    meta = request.model_dump(exclude={"weights_uri", "node_id"})
+    return register(meta, tensors)
+
+
+# --- 조회/로드 ---
+
+def _row_to_model(row) -> dict:
+    model = dict(row)
+    if "manifest" in model:
+        manifest = json.loads(model.pop("manifest"))
+        model["tensors"] = [
+            {"name": t["name"], "dtype": t["dtype"], "shape": t["shape"], "nbytes": t["nbytes"], "chunks": len(t["chunks"])}
+            for t in manifest
+        ]
+    return model
+
+
+def list_models(project: str = None) -> list:
+    """모델 버전 목록 (최신순)"""
+    query = f"SELECT {_SUMMARY_COLUMNS} FROM models"
+    params = ()
+    if project:
+        query += " WHERE project = ?"
+        params = (project,)
+    query += " ORDER BY created_at DESC"
+    conn = _connect()
+    try:
+        return [dict(row) for row in conn.execute(query, params)]
+    finally:
+        conn.close()
+
+
+def _fetch(model_id: str):
+    conn = _connect()
+    try:
+        row = conn.execute(f"SELECT {_SUMMARY_COLUMNS}, manifest FROM models WHERE id = ?", (model_id,)).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        raise HTTPException(status_code=404, detail="모델을 찾을 수 없습니다")
+    return row
+
+
+def get_model(model_id: str) -> dict:
+    """모델 버전 상세 (텐서 목록 포함)"""
+    return _row_to_model(_fetch(model_id))
+
+
+def _tensor_cache_path(chunks: list) -> Path:
+    key = hashlib.sha256("\n".join(chunks).encode("ascii")).hexdigest()
+    return MODEL_TENSOR_CACHE_DIR / key[:2] / key
+
+
+def _tensor_file(store, tensor: dict) -> Path:
+    """텐서 전체가 연속으로 들어 있는 파일 (청크 하나면 청크 파일, 여러 개면 이어 붙인 캐시 파일)"""
+    if len(tensor["chunks"]) == 1:
+        return store.local_path(tensor["chunks"][0])
+    path = _tensor_cache_path(tensor["chunks"])
+    if path.exists():
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 임시 파일에 쓴 뒤 이동해 다른 워커가 반쯤 쓰인 파일을 memory-map 하지 않도록
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for digest in tensor["chunks"]:
+                with open(store.local_path(digest), "rb") as f:
+                    shutil.copyfileobj(f, out, MODEL_CHUNK_SIZE)
+            if out.tell() != tensor["nbytes"]:
+                raise ValueError(f"'{tensor['name']}' 청크 크기 합이 텐서 크기와 다릅니다")
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+    return path
+
+
+def load_weights(model_id: str) -> dict:
+    """가중치 로드 (name -> 읽기 전용 memmap)
+
+    텐서마다 연속 파일 하나를 memory-map 하므로 본문을 읽거나 복사하지 않는다.
+    여러 청크로 된 텐서는 처음 로드할 때 한 번 캐시 파일로 이어 붙이고, 청크 목록이 같은
+    텐서(다른 버전의 바뀌지 않은 층 포함)는 그 파일을 함께 쓴다.
+    """
+    store = get_store()
+    manifest = json.loads(_fetch(model_id)["manifest"])
+    weights = {}
+    for tensor in manifest:
+        dtype = np.dtype(tensor["dtype"])
+        shape = tuple(tensor["shape"])
+        if not tensor["nbytes"]:
+            weights[tensor["name"]] = np.empty(shape, dtype=dtype)
+        else:
+            weights[tensor["name"]] = np.memmap(_tensor_file(store, tensor), dtype=dtype, mode="r", shape=shape)
+    return weights
+
+
+def set_status(model_id: str, status: str) -> dict:
+    """상태 변경. deployed로 올리면 같은 프로젝트의 기존 배포본은 experimental로 내림"""
+    model = get_model(model_id)
+    conn = _connect()
+    try:
+        if status == "deployed":
+            conn.execute(
+                "UPDATE models SET status = 'experimental' WHERE project = ? AND status = 'deployed' AND id != ?",
+                (model["project"], model_id),
+            )
+        conn.execute("UPDATE models SET status = ? WHERE id = ?", (status, model_id))
+        conn.commit()
+    finally:
+        conn.close()
+    return get_model(model_id)
+
+
+def remove_model(model_id: str) -> dict:
+    """모델 버전 삭제 (다른 버전이 참조하지 않는 청크만 삭제)"""
+    conn = _connect()
+    try:
+        # 참조 수 감소와 버전 삭제를 한 쓰기 트랜잭션에서. 청크 파일은 커밋된 뒤에 지운다
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT manifest FROM models WHERE id = ?", (model_id,)).fetchone()
+        if row is None:
+            raise HTTPException(status_code=404, detail="모델을 찾을 수 없습니다")
+        references = {}
+        for tensor in json.loads(row["manifest"]):
+            for digest in tensor["chunks"]:
+                references[digest] = references.get(digest, 0) + 1
+        conn.executemany(
+            "UPDATE chunks SET refcount = refcount - ? WHERE digest = ?",
+            [(count, digest) for digest, count in references.items()],
+        )
+        conn.execute("DELETE FROM models WHERE id = ?", (model_id,))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    try:
+        freed = _collect_garbage()
+    except Exception as e:
+        # 버전 삭제는 끝났고 남은 청크는 다음 정리 때 지워진다
+        event_service.log("error", f"모델 청크 정리 오류: {e}", source="models", model_id=model_id)
+        freed = 0
+    return {"ok": True, "freed_chunks": freed}
+
+
+def _collect_garbage() -> int:
+    """참조 수가 0인 청크와 남은 버전이 쓰지 않는 텐서 캐시 파일 삭제 -> 지운 청크 수
+
+    쓰기 트랜잭션을 잡은 채 지우므로 그동안 다른 워커의 등록은 기다렸다가 지워진 청크를 다시 쓴다.
+    파일을 지운 뒤 커밋이 실패해도 참조 수 0인 행은 등록에서 없는 것으로 보므로 다음 정리에서 지워진다.
+    """
+    store = get_store()
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        orphans = [row["digest"] for row in conn.execute("SELECT digest FROM chunks WHERE refcount <= 0")]
+        for digest in orphans:
+            store.delete(digest)
+        conn.execute("DELETE FROM chunks WHERE refcount <= 0")
+        # 캐시 파일은 청크 목록별이므로 청크를 다른 버전과 공유해도 목록이 다르면 따로 남는다
+        live = {
+            _tensor_cache_path(tensor["chunks"]).name
+            for row in conn.execute("SELECT manifest FROM models")
+            for tensor in json.loads(row["manifest"])
+            if len(tensor["chunks"]) > 1
+        }
+        for path in MODEL_TENSOR_CACHE_DIR.glob("*/*"):
+            # 다른 워커가 쓰는 중인 임시 파일(mkstemp)은 이름 길이가 달라 건드리지 않음
+            if len(path.name) == 64 and path.name not in live:
+                path.unlink(missing_ok=True)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return len(orphans)
+
+
+def get_stats() -> dict:
+    """저장소 통계 (논리 크기 대비 실제 저장 크기)"""
+    conn = _connect()
+    try:
+        models = conn.execute("SELECT COUNT(*) AS versions, COALESCE(SUM(total_bytes), 0) AS logical FROM models").fetchone()
+        chunks = conn.execute(
+            "SELECT COUNT(*) AS chunks, COALESCE(SUM(size), 0) AS stored FROM chunks WHERE refcount > 0"
+        ).fetchone()
+    finally:
+        conn.close()
+    return {
+        "versions": models["versions"],
+        "chunks": chunks["chunks"],
+        "logical_bytes": models["logical"],
+        "stored_bytes": chunks["stored"],
+        "dedup_ratio": round(models["logical"] / chunks["stored"], 2) if chunks["stored"] else None,
+        "backend": MODEL_BLOB_BACKEND,
+    }
@@ -0,0 +1,304 @@
+"""추론 처리량/지연 시간 모니터링 서비스
+
+배포된 서빙 컨테이너의 /metrics(누적 요청 수 + 지연 시간 히스토그램)를 모든 사일로에서
+병렬로 수집한다. 사일로들이 같은 호스트의 Docker 데몬일 수도 있으므로 호스트 포트가 아니라
+각 사일로 Docker 데몬에서 컨테이너 안으로 exec해 읽는다(배포 헬스 체크와 같은 방식). 수집 간 차이로 처리량과 구간 히스토그램을 구하고, 백분위수는
+원본 샘플 없이 합산한 히스토그램 구간에서 계산한다. 수집은 담당 워커 하나만 하므로
+시계열/라운드 합산/수집 상태는 SQLite(WAL)에 기록하고 조회는 모든 워커가 그 파일에서 한다.
+"""
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from fastapi import HTTPException
+from config.settings import (
+    MONITOR_DB,
+    MONITOR_RETENTION_POINTS,
+    MONITOR_SCRAPE_INTERVAL_SEC,
+    MONITOR_SCRAPE_TIMEOUT_SEC,
+    MONITOR_SCRAPE_WORKERS,
+    SERVING_PORT,
+)
+from services import event_service, round_service
+from services.docker_service import get_docker_client, get_docker_hosts
+
+ALL_SILOS = "all"
+
+# 사일로별 직전 수집 값 (수집 워커): node_id -> {"at", "started_at", "requests", "errors", "counts"}
+_last = {}
+_lock = threading.Lock()
+
+_conn = None
+_conn_lock = threading.Lock()
+
+# points: series(사일로 id 또는 'all')별 시계열 (최근 MONITOR_RETENTION_POINTS개)
+# rounds: 라운드별 합산 {"requests", "errors", "seconds", "buckets_ms", "counts"} (round는 JSON, 라운드 밖은 'null')
+# status: 사일로별 마지막 수집 상태
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS points (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    series TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS points_series ON points (series, id);
+CREATE TABLE IF NOT EXISTS rounds (
+    round TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS status (
+    node_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+_stop = threading.Event()
+_thread = None
+
+
+def _connection() -> sqlite3.Connection:
+    """공유 연결 (조회가 잦으므로 연결을 재사용하고 잠금으로 직렬화)"""
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect(str(MONITOR_DB), timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _conn = conn
+    return _conn
+
+
+def percentile(buckets_ms: list, counts: list, q: float):
+    """구간 히스토그램에서 백분위수 추정 (구간 안은 선형 보간)"""
+    total = sum(counts)
+    if not total:
+        return None
+    target = q * total
+    cumulative = 0
+    for i, count in enumerate(counts):
+        if count and cumulative + count >= target:
+            lower = buckets_ms[i - 1] if i > 0 else 0.0
+            # 마지막 구간(상한 초과)은 상한 값으로 보고
+            upper = buckets_ms[i] if i < len(buckets_ms) else buckets_ms[-1]
+            return round(lower + (upper - lower) * (target - cumulative) / count, 2)
+        cumulative += count
+    return float(buckets_ms[-1])
+
+
+# 서빙 컨테이너 안에서 /metrics 응답을 그대로 출력
+_METRICS_CMD = [
+    "python", "-c",
+    "import sys, urllib.request; sys.stdout.write(urllib.request.urlopen("
+    f"'http://127.0.0.1:{SERVING_PORT}/metrics', timeout={MONITOR_SCRAPE_TIMEOUT_SEC}).read().decode())",
+]
+
+
+def _serving_container(node_id: str):
+    """사일로의 실행 중인 서빙 컨테이너 (호스트 포트를 하나만 쓰므로 사일로당 하나)"""
+    containers = get_docker_client(node_id).containers.list(filters={"label": "fl.role=serving", "status": "running"})
+    if not containers:
+        raise RuntimeError("실행 중인 서빙 컨테이너가 없습니다")
+    return sorted(containers, key=lambda c: c.name)[0]
+
+
+def _scrape(node_id: str):
+    """사일로 한 곳의 서빙 지표 수집"""
+    started = time.perf_counter()
+    try:
+        exit_code, output = _serving_container(node_id).exec_run(_METRICS_CMD)
+        if exit_code != 0:
+            raise RuntimeError(f"/metrics 조회 실패 (종료 코드 {exit_code}): {output.decode(errors='replace')[-200:]}")
+        payload = json.loads(output)
+        return node_id, payload, None, round((time.perf_counter() - started) * 1000, 1)
+    except Exception as e:
+        return node_id, None, str(e), round((time.perf_counter() - started) * 1000, 1)
+
+
+def _delta(node_id: str, payload: dict, now: float):
+    """직전 수집 대비 증가분 (컨테이너가 재시작되면 현재 값을 그대로 증가분으로)"""
+    previous = _last.get(node_id)
+    _last[node_id] = {
+        "at": now,
+        "started_at": payload["started_at"],
+        "requests": payload["requests"],
+        "errors": payload["errors"],
+        "counts": payload["counts"],
+    }
+    if previous is None:
+        return None
+    restarted = (
+        previous["started_at"] != payload["started_at"]
+        or payload["requests"] < previous["requests"]
+        or len(previous["counts"]) != len(payload["counts"])
+    )
+    if restarted:
+        return now - previous["at"], payload["requests"], payload["errors"], list(payload["counts"])
+    return (
+        now - previous["at"],
+        payload["requests"] - previous["requests"],
+        payload["errors"] - previous["errors"],
+        [c - p for c, p in zip(payload["counts"], previous["counts"])],
+    )
+
+
+def _point(at: float, round_no, seconds: float, requests: int, errors: int, buckets_ms: list, counts: list) -> dict:
+    return {
+        "ts": datetime.fromtimestamp(at).isoformat(timespec="seconds"),
+        "round": round_no,
+        "throughput": round(requests / seconds, 2) if seconds > 0 else 0.0,
+        "requests": requests,
+        "errors": errors,
+        "p50": percentile(buckets_ms, counts, 0.50),
+        "p95": percentile(buckets_ms, counts, 0.95),
+        "p99": percentile(buckets_ms, counts, 0.99),
+    }
+
+
+def _write(points: list, statuses: dict, round_no, merged: dict):
+    """수집 결과를 한 트랜잭션으로 기록 (시계열은 series별 최근 MONITOR_RETENTION_POINTS개만 보관)"""
+    with _conn_lock:
+        conn = _connection()
+        try:
+            conn.executemany(
+                "INSERT INTO points (series, data) VALUES (?, ?)",
+                [(key, json.dumps(point)) for key, point in points],
+            )
+            conn.executemany(
+                "DELETE FROM points WHERE series = ? AND id <= "
+                "(SELECT id FROM points WHERE series = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                [(key, key, MONITOR_RETENTION_POINTS) for key in {key for key, _ in points}],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO status (node_id, data) VALUES (?, ?)",
+                [(node_id, json.dumps(status, ensure_ascii=False)) for node_id, status in statuses.items()],
+            )
+            if merged is not None:
+                key = json.dumps(round_no)
+                row = conn.execute("SELECT data FROM rounds WHERE round = ?", (key,)).fetchone()
+                totals = json.loads(row[0]) if row else {
+                    "requests": 0, "errors": 0, "seconds": 0.0,
+                    "buckets_ms": merged["buckets_ms"], "counts": [0] * len(merged["counts"]),
+                }
+                if totals["buckets_ms"] == merged["buckets_ms"]:
+                    totals["requests"] += merged["requests"]
+                    totals["errors"] += merged["errors"]
+                    totals["seconds"] += merged["seconds"]
+                    totals["counts"] = [a + b for a, b in zip(totals["counts"], merged["counts"])]
+                conn.execute("INSERT OR REPLACE INTO rounds (round, data) VALUES (?, ?)", (key, json.dumps(totals)))
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+
+def scrape_once() -> dict:
+    """모든 사일로를 병렬로 수집해 시계열에 한 점씩 추가"""
+    node_ids = [node_id for node_id, info in get_docker_hosts().items() if info.get("role", "client") == "client"]
+    if not node_ids:
+        return {"silos": 0}
+    with ThreadPoolExecutor(max_workers=min(len(node_ids), MONITOR_SCRAPE_WORKERS)) as pool:
+        results = list(pool.map(_scrape, node_ids))
+
+    now = time.time()
+    round_no = round_service.current_round()
+    merged = None
+    points, statuses = [], {}
+    with _lock:
+        for node_id, payload, error, elapsed_ms in results:
+            statuses[node_id] = {
+                "ok": error is None,
+                "error": error,
+                "scrape_ms": elapsed_ms,
+                "scraped_at": datetime.fromtimestamp(now).isoformat(timespec="seconds"),
+                "model_id": payload.get("model_id") if payload else None,
+            }
+            if payload is None:
+                continue
+            delta = _delta(node_id, payload, now)
+            if delta is None:
+                continue
+            seconds, requests, errors, counts = delta
+            buckets_ms = payload["buckets_ms"]
+            points.append((node_id, _point(now, round_no, seconds, requests, errors, buckets_ms, counts)))
+
+            # 사일로 합산: 같은 구간 정의끼리만 더할 수 있다
+            if merged is None:
+                merged = {"seconds": seconds, "requests": 0, "errors": 0, "buckets_ms": buckets_ms,
+                          "counts": [0] * len(counts)}
+            if merged["buckets_ms"] == buckets_ms:
+                merged["seconds"] = max(merged["seconds"], seconds)
+                merged["requests"] += requests
+                merged["errors"] += errors
+                merged["counts"] = [a + b for a, b in zip(merged["counts"], counts)]
+
+    if merged is not None:
+        points.append((ALL_SILOS, _point(now, round_no, merged["seconds"], merged["requests"], merged["errors"],
+                                         merged["buckets_ms"], merged["counts"])))
+    _write(points, statuses, round_no, merged)
+    return {"silos": len(node_ids), "ok": sum(1 for _, payload, _, _ in results if payload is not None)}
+
+
+def get_series(silo: str = ALL_SILOS, limit: int = None) -> list:
+    """처리량/백분위수 시계열 (silo='all'이면 전체 합산)"""
+    sql = "SELECT data FROM points WHERE series = ? ORDER BY id DESC"
+    params = [silo]
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    with _conn_lock:
+        rows = _connection().execute(sql, params).fetchall()
+    if not rows and silo != ALL_SILOS and silo not in get_docker_hosts():
+        raise HTTPException(status_code=404, detail="Unknown node")
+    return [json.loads(row[0]) for row in reversed(rows)]
+
+
+def get_rounds() -> list:
+    """라운드별 처리량과 지연 백분위수 (라운드 동안의 히스토그램 합산 기준)"""
+    with _conn_lock:
+        rows = _connection().execute("SELECT round, data FROM rounds").fetchall()
+    totals = {json.loads(key): json.loads(data) for key, data in rows}
+    result = []
+    for round_no in sorted(totals, key=lambda r: (r is None, r)):
+        t = totals[round_no]
+        result.append({
+            "round": round_no,
+            "throughput": round(t["requests"] / t["seconds"], 2) if t["seconds"] else 0.0,
+            "requests": t["requests"],
+            "errors": t["errors"],
+            "p50": percentile(t["buckets_ms"], t["counts"], 0.50),
+            "p95": percentile(t["buckets_ms"], t["counts"], 0.95),
+            "p99": percentile(t["buckets_ms"], t["counts"], 0.99),
+        })
+    return result
+
+
+def get_status() -> dict:
+    """사일로별 마지막 수집 상태"""
+    with _conn_lock:
+        rows = _connection().execute("SELECT node_id, data FROM status").fetchall()
+    return {node_id: json.loads(data) for node_id, data in rows}
+
+
+def _loop():
+    while not _stop.is_set():
+        try:
+            scrape_once()
+        except Exception as e:
+            event_service.log("error", f"서빙 지표 수집 오류: {e}", source="monitor")
+        _stop.wait(MONITOR_SCRAPE_INTERVAL_SEC)
+
+
+def start_scraper():
+    """주기적 수집 스레드 시작"""
+    global _thread
+    if _thread and _thread.is_alive():
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_loop, name="serving-monitor", daemon=True)
+    _thread.start()
+
+
+def stop_scraper():
+    """주기적 수집 스레드 종료"""
+    _stop.set()
@@ -0,0 +1,481 @@
+"""워커 간 공유 노드 레지스트리 (SQLite WAL)
+
+uvicorn 워커가 여러 개여도 같은 노드 목록을 보도록 노드 설정, 상태 확인 기록, 공유 캐시를
+한 SQLite 파일에 둔다. 노드 목록이 바뀔 때마다 버전을 올리고, 각 워커는 버전이 바뀐
+경우에만 목록을 다시 읽는다. servers.yaml은 최초 적재와 수동 편집 반영(mtime 비교),
+변경 내보내기에만 쓴다.
+"""
+import base64
+import json
+import re
+import sqlite3
+import threading
+import time
+from config.server_manager import load_servers, save_servers
+from config.settings import CACHE_PURGE_SEC, NODE_REGISTRY_DB, SERVERS_FILE
+from services import telemetry_service
+
+_conn = None
+_conn_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    config TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS nodes_position ON nodes (position, id);
+CREATE INDEX IF NOT EXISTS nodes_label ON nodes (COALESCE(json_extract(config, '$.label'), id), id);
+CREATE TABLE IF NOT EXISTS labels (
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    node_id TEXT NOT NULL,
+    PRIMARY KEY (key, value, node_id)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS health (
+    node_id TEXT PRIMARY KEY,
+    record TEXT NOT NULL,
+    checked_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS generations (
+    name TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL,
+    digest TEXT,
+    observed_at REAL NOT NULL,
+    changed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL
+);
+"""
+
+
+def _connection() -> sqlite3.Connection:
+    """공유 연결 (조회가 잦으므로 연결을 재사용하고 잠금으로 직렬화)"""
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect(str(NODE_REGISTRY_DB), timeout=30, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        if conn.execute("SELECT 1 FROM labels LIMIT 1").fetchone() is None:
+            # 라벨 색인 도입 전의 레지스트리: 노드 설정에서 색인 채움
+            _index_labels(conn)
+        if _meta(conn, "epoch", None) is None:
+            # 레지스트리 파일을 새로 만들면 버전이 처음부터 다시 시작하므로 ETag 구분용 생성 시각
+            _set_meta(conn, "epoch", int(time.time()))
+        _conn = conn
+    return _conn
+
+
+def _meta(conn, key: str, default=0):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def _set_meta(conn, key: str, value):
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+
+def _yaml_mtime() -> float:
+    try:
+        return SERVERS_FILE.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+def _write_nodes(conn, servers: dict):
+    conn.execute("DELETE FROM nodes")
+    conn.executemany(
+        "INSERT INTO nodes (id, position, config) VALUES (?, ?, ?)",
+        [(node_id, i, json.dumps(info, ensure_ascii=False)) for i, (node_id, info) in enumerate(servers.items())],
+    )
+    _index_labels(conn)
+    _set_meta(conn, "version", _meta(conn, "version") + 1)
+
+
+def _index_labels(conn):
+    """라벨 역색인 (key, value) -> node_id 재구성"""
+    conn.execute("DELETE FROM labels")
+    conn.executemany(
+        "INSERT INTO labels (key, value, node_id) VALUES (?, ?, ?)",
+        [
+            (key, value, node_id)
+            for node_id, config in conn.execute("SELECT id, config FROM nodes")
+            for key, value in json.loads(config).get("labels", {}).items()
+        ],
+    )
+
+
+def _read_nodes(conn) -> dict:
+    return {
+        node_id: json.loads(config)
+        for node_id, config in conn.execute("SELECT id, config FROM nodes ORDER BY position")
+    }
+
+
+def version() -> int:
+    """노드 목록 버전 (YAML이 수동으로 바뀌었으면 먼저 다시 적재)"""
+    mtime = _yaml_mtime()
+    with _conn_lock:
+        conn = _connection()
+        seen = _meta(conn, "yaml_mtime", None)
+        if seen == mtime:
+            return int(_meta(conn, "version"))
+    # 최초 실행 또는 servers.yaml 수동 편집: YAML 내용을 레지스트리로 적재
+    with telemetry_service.span("load_servers"):
+        servers = load_servers()
+    with _conn_lock:
+        conn = _connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 그사이 다른 워커가 적재/수정했으면 읽어 둔 YAML이 오래된 것이므로 건너뜀
+            if _meta(conn, "yaml_mtime", None) == seen:
+                _write_nodes(conn, servers)
+                _set_meta(conn, "yaml_mtime", mtime)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return int(_meta(conn, "version"))
+
+
+def load() -> tuple:
+    """(버전, 노드 목록)"""
+    version()
+    with _conn_lock:
+        conn = _connection()
+        conn.execute("BEGIN")
+        try:
+            return int(_meta(conn, "version")), _read_nodes(conn)
+        finally:
+            conn.execute("COMMIT")
+
+
+def update(mutate) -> dict:
+    """노드 목록을 쓰기 트랜잭션 안에서 수정 (mutate가 예외를 내면 취소). YAML로도 내보냄"""
+    version()
+    with _conn_lock:
+        conn = _connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            servers = _read_nodes(conn)
+            result = mutate(servers)
+            _write_nodes(conn, servers)
+            with telemetry_service.span("save_servers"):
+                save_servers(servers)
+            _set_meta(conn, "yaml_mtime", _yaml_mtime())
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    return result
+
+
+# --- 라벨 선택자 / 페이지 조회 ---
+
+LABEL_PATTERN = re.compile(r"^[A-Za-z0-9][\w./-]*$")
+_REQUIREMENT = re.compile(
+    r"\s*(?P<neg>!?)\s*(?P<key>[\w./-]+)\s*"
+    r"(?:(?P<op>==|=|!=)\s*(?P<value>[\w./-]+)|\s+(?P<set>in|notin)\s*\((?P<values>[^)]*)\))?"
+    r"\s*(?:,|$)"
+)
+
+# 정렬 기준 -> SQL 식 (nodes_position/nodes_label 색인과 같은 식)
+SORT_KEYS = {
+    "position": "position",
+    "id": "id",
+    "label": "COALESCE(json_extract(config, '$.label'), id)",
+}
+
+
+def parse_selector(selector: str) -> list:
+    """라벨 선택자 파싱 -> [(key, op, values)]
+
+    쉼표로 구분한 조건의 AND. 'region=kr', 'site!=a', 'hw in (gpu,cpu)', 'hw notin (arm)',
+    'gpu'(키 존재), '!deprecated'(키 없음). 형식이 잘못되면 ValueError.
+    """
+    requirements = []
+    position = 0
+    selector = (selector or "").strip()
+    while position < len(selector):
+        match = _REQUIREMENT.match(selector, position)
+        if not match or match.end() == position:
+            raise ValueError(f"잘못된 선택자: {selector[position:]!r}")
+        position = match.end()
+        key = match["key"]
+        if match["neg"]:
+            if match["op"] or match["set"]:
+                raise ValueError(f"'!'는 키 존재 조건에만 쓸 수 있습니다: {key}")
+            requirements.append((key, "!exists", []))
+        elif match["op"]:
+            requirements.append((key, "notin" if match["op"] == "!=" else "in", [match["value"]]))
+        elif match["set"]:
+            values = [v.strip() for v in match["values"].split(",") if v.strip()]
+            if not values or not all(LABEL_PATTERN.match(v) for v in values):
+                raise ValueError(f"잘못된 값 목록: {key} {match['set']} ({match['values']})")
+            requirements.append((key, match["set"], values))
+        else:
+            requirements.append((key, "exists", []))
+    return requirements
+
+
+def encode_cursor(sort: str, value, node_id: str) -> str:
+    raw = json.dumps([sort, value, node_id], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> tuple:
+    """(정렬 값, node_id). 다른 정렬의 커서이거나 형식이 잘못되면 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, node_id = json.loads(raw)
+    except Exception:
+        raise ValueError("잘못된 커서입니다")
+    if cursor_sort != sort:
+        raise ValueError("커서의 정렬 기준이 요청과 다릅니다")
+    return value, node_id
+
+
+def query(requirements: list = (), sort: str = "position", descending: bool = False,
+          cursor: str = None, limit: int = 100) -> tuple:
+    """선택자에 맞는 노드 한 페이지 -> ([(node_id, config)], next_cursor)
+
+    선택자는 라벨 역색인으로, 정렬/커서는 (정렬 값, id) 색인 범위 조회로 처리해
+    전체 노드 수와 관계없이 페이지 크기만큼만 읽는다.
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"정렬 기준은 {', '.join(SORT_KEYS)} 중 하나여야 합니다")
+    expression = SORT_KEYS[sort]
+    clauses, params = [], []
+    for key, op, values in requirements:
+        if op in ("exists", "!exists"):
+            subquery = "SELECT node_id FROM labels WHERE key = ?"
+            params.append(key)
+        else:
+            subquery = f"SELECT node_id FROM labels WHERE key = ? AND value IN ({', '.join('?' * len(values))})"
+            params.extend([key, *values])
+        clauses.append(f"id {'IN' if op in ('exists', 'in') else 'NOT IN'} ({subquery})")
+    if cursor:
+        clauses.append(f"({expression}, id) {'<' if descending else '>'} (?, ?)")
+        params.extend(decode_cursor(cursor, sort))
+    direction = "DESC" if descending else "ASC"
+    sql = f"SELECT id, config, {expression} FROM nodes"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += f" ORDER BY {expression} {direction}, id {direction} LIMIT ?"
+    version()
+    with _conn_lock:
+        rows = _connection().execute(sql, params + [limit + 1]).fetchall()
+    page = [(node_id, json.loads(config)) for node_id, config, _ in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(sort, last[2], last[0])
+    return page, next_cursor
+
+
+def label_values(key: str = None) -> dict:
+    """라벨 키별 값과 노드 수 (필터 UI용)"""
+    sql = "SELECT key, value, COUNT(*) FROM labels"
+    params = []
+    if key:
+        sql += " WHERE key = ?"
+        params.append(key)
+    sql += " GROUP BY key, value ORDER BY key, value"
+    version()
+    with _conn_lock:
+        rows = _connection().execute(sql, params).fetchall()
+    result = {}
+    for label_key, value, count in rows:
+        result.setdefault(label_key, {})[value] = count
+    return result
+
+
+# --- 상태 확인 기록 ---
+
+def get_health(node_id: str) -> dict:
+    with _conn_lock:
+        row = _connection().execute("SELECT record FROM health WHERE node_id = ?", (node_id,)).fetchone()
+    return json.loads(row[0]) if row else {}
+
+
+def all_health() -> dict:
+    """node_id -> 최근 상태 기록 (한 번의 조회)"""
+    with _conn_lock:
+        rows = _connection().execute("SELECT node_id, record FROM health").fetchall()
+    return {node_id: json.loads(record) for node_id, record in rows}
+
+
+def put_health(node_id: str, record: dict):
+    """상태 기록 저장 후 직전 기록 반환 (상태 전이 판단을 워커 간에 한 번만 하도록 한 트랜잭션에서)"""
+    with _conn_lock:
+        conn = _connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT record FROM health WHERE node_id = ?", (node_id,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO health (node_id, record, checked_at) VALUES (?, ?, ?)",
+                (node_id, json.dumps(record, ensure_ascii=False), record["checked_at"]),
+            )
+            previous = json.loads(row[0]) if row else {}
+            if previous.get("status") != record.get("status"):
+                _bump(conn, HEALTH_GENERATION)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    return previous
+
+
+def oldest_check(node_ids: list):
+    """노드들의 가장 오래된 상태 확인 시각 (기록이 없는 노드가 있으면 None)"""
+    if not node_ids:
+        return time.time()
+    with _conn_lock:
+        count, oldest = _connection().execute(
+            f"SELECT COUNT(*), MIN(checked_at) FROM health WHERE node_id IN ({','.join('?' * len(node_ids))})",
+            list(node_ids),
+        ).fetchone()
+    return oldest if count == len(set(node_ids)) else None
+
+
+# --- 세대 번호 (조건부 GET의 ETag) ---
+
+# 노드 상태(online/offline)가 바뀔 때마다 올라가는 세대 이름
+HEALTH_GENERATION = "health"
+
+
+def epoch() -> int:
+    with _conn_lock:
+        return int(_meta(_connection(), "epoch"))
+
+
+def _bump(conn, name: str):
+    conn.execute(
+        "INSERT INTO generations (name, generation, digest, observed_at, changed_at) VALUES (?, 1, NULL, 0, ?) "
+        "ON CONFLICT(name) DO UPDATE SET generation = generation + 1, digest = NULL, observed_at = 0, "
+        "changed_at = excluded.changed_at",
+        (name, time.time()),
+    )
+
+
+def generation(name: str) -> tuple:
+    """(세대 번호, 마지막 관측 시각)"""
+    with _conn_lock:
+        row = _connection().execute(
+            "SELECT generation, observed_at FROM generations WHERE name = ?", (name,),
+        ).fetchone()
+    return (row[0], row[1]) if row else (0, 0.0)
+
+
+def bump(*names: str):
+    """변경 작업 직후 세대 번호 증가 (다음 조회는 관측부터 다시 함)"""
+    with _conn_lock:
+        conn = _connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for name in names:
+                _bump(conn, name)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def observe(name: str, digest: str, started_at: float) -> int:
+    """관측한 내용의 digest가 직전과 다르면 세대 번호를 올리고 현재 세대 반환
+
+    관측을 시작한 뒤(started_at 이후)에 bump된 경우 관측 결과가 변경 전 상태일 수 있으므로 기록하지 않는다.
+    """
+    with _conn_lock:
+        conn = _connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT generation, digest, changed_at FROM generations WHERE name = ?", (name,),
+            ).fetchone()
+            current = row[0] if row else 0
+            if row is not None and row[2] > started_at:
+                conn.execute("COMMIT")
+                return current
+            now = time.time()
+            changed_at = row[2] if row else now
+            if row is None or row[1] != digest:
+                current, changed_at = current + 1, now
+            conn.execute(
+                "INSERT OR REPLACE INTO generations (name, generation, digest, observed_at, changed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (name, current, digest, now, changed_at),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    return current
+
+
+# --- 공유 캐시 ---
+
+# 이 워커가 마지막으로 만료된 캐시 행을 정리한 시각
+_purged_at = 0.0
+
+def cache_get(key: str):
+    """만료되지 않은 캐시 값 (없으면 None)"""
+    with _conn_lock:
+        row = _connection().execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+    if row is None or (row[1] is not None and row[1] < time.time()):
+        return None
+    return json.loads(row[0])
+
+
+def cache_set(key: str, value, ttl_sec: float = None):
+    """캐시 기록 (만료된 행은 CACHE_PURGE_SEC마다 함께 삭제)"""
+    global _purged_at
+    now = time.time()
+    expires_at = now + ttl_sec if ttl_sec else None
+    with _conn_lock:
+        conn = _connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False, default=str), expires_at),
+        )
+        if now - _purged_at >= CACHE_PURGE_SEC:
+            _purged_at = now
+            conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))
+
+
+def cache_delete_prefix(prefix: str):
+    with _conn_lock:
+        _connection().execute("DELETE FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+
+
+# --- 백그라운드 작업 담당 워커 ---
+
+_leader_file = None
+
+
+def acquire_leadership() -> bool:
+    """스케줄러/수집기를 돌릴 워커 하나를 파일 잠금으로 선출 (잠금은 프로세스 종료 시 해제)"""
+    global _leader_file
+    if _leader_file is not None:
+        return True
+    try:
+        import fcntl
+    except ImportError:
+        # 파일 잠금이 없는 플랫폼은 단일 워커로 가정
+        return True
+    handle = open(NODE_REGISTRY_DB.with_suffix(".leader"), "a")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    _leader_file = handle
+    return True
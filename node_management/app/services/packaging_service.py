@@ -0,0 +1,232 @@
+"""모델 패키징 서비스 (중앙 Docker 데몬에서 서빙 이미지 빌드)
+
+Dockerfile은 런타임 의존성 → 서빙 코드 → 가중치 순으로 레이어를 쌓으므로,
+새 버전을 빌드할 때는 런타임 레이어를 캐시에서 재사용하고 가중치 레이어만 새로 만든다.
+"""
+import json
+import re
+import tarfile
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+from fastapi import HTTPException
+from config.settings import (
+    CENTRAL_NODE_ID,
+    PACKAGE_JOB_HISTORY,
+    PACKAGE_MAX_CONCURRENT_BUILDS,
+    PACKAGE_RUNTIME_PACKAGES,
+    SERVING_PORT,
+)
+from services import event_service, job_store, model_registry_service
+from services.docker_service import get_docker_client
+
+SERVE_SCRIPT = Path(__file__).parent.parent / "serving" / "serve.py"
+
+# 가중치 COPY 이전 단계는 버전과 무관해야 캐시가 재사용된다
+_DOCKERFILE = """FROM {runtime}
+RUN pip install --no-cache-dir {packages}
+WORKDIR /app
+COPY serve.py /app/serve.py
+COPY weights/ /app/weights/
+LABEL fl.role="serving" fl.model.id="{model_id}" fl.model.project="{project}" fl.model.version="{version}"
+EXPOSE {port}
+CMD ["uvicorn", "serve:app", "--host", "0.0.0.0", "--port", "{port}"]
+"""
+
+# 패키징 작업 상태: job_id -> job dict (최근 PACKAGE_JOB_HISTORY개)
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+# 이벤트 추가 알림 (SSE 대기용)
+_events_changed = threading.Condition()
+
+_build_slots = threading.BoundedSemaphore(PACKAGE_MAX_CONCURRENT_BUILDS)
+
+_FINISHED = ("built", "failed")
+
+
+def build_image_tag(project: str, version: str) -> str:
+    """프로젝트명 + 버전 → 이미지 태그 (대시보드 buildImageTag와 동일 규칙)"""
+    slug = re.sub(r"[^a-z0-9]+", "-", project.lower()).strip("-")
+    if not slug or slug[0].isdigit():
+        slug = f"proj-{slug}"
+    return f"{slug}:{version}"
+
+
+def _emit(job: dict, kind: str, message: str = None, **fields):
+    """작업 이벤트 추가 및 대기 중인 SSE 구독자 깨우기"""
+    event = {"seq": len(job["events"]), "kind": kind, "time": datetime.now().isoformat(), **fields}
+    if message:
+        event["message"] = message
+    with _events_changed:
+        job["events"].append(event)
+        _events_changed.notify_all()
+
+
+def _write_context(job: dict, model: dict, context_dir: Path):
+    """빌드 컨텍스트 작성 (Dockerfile, 서빙 코드, 텐서별 .npy)"""
+    weights = model_registry_service.load_weights(model["id"])
+    weights_dir = context_dir / "weights"
+    weights_dir.mkdir()
+    tensors = []
+    for i, (name, array) in enumerate(weights.items()):
+        filename = f"{i:04d}.npy"
+        np.save(weights_dir / filename, array)
+        tensors.append({"name": name, "file": filename, "shape": list(array.shape), "dtype": array.dtype.str})
+    manifest = {"model_id": model["id"], "project": model["project"], "version": model["version"], "tensors": tensors}
+    (weights_dir / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    (context_dir / "serve.py").write_bytes(SERVE_SCRIPT.read_bytes())
+    (context_dir / "Dockerfile").write_text(_DOCKERFILE.format(
+        runtime=job["runtime"],
+        packages=" ".join(PACKAGE_RUNTIME_PACKAGES),
+        model_id=model["id"],
+        project=model["project"],
+        version=model["version"],
+        port=SERVING_PORT,
+    ), encoding="utf-8")
+
+
+def _run_build(job: dict):
+    """빌드 슬롯을 얻은 뒤 중앙 Docker 데몬에서 빌드하며 진행 이벤트 기록"""
+    with _build_slots:
+        started = time.perf_counter()
+        job["state"] = "building"
+        job["started_at"] = datetime.now().isoformat()
+        _emit(job, "state", state="building")
+        try:
+            model = model_registry_service.get_model(job["model_id"])
+            with tempfile.TemporaryDirectory() as tmp:
+                context_dir = Path(tmp) / "context"
+                context_dir.mkdir()
+                _write_context(job, model, context_dir)
+                with tempfile.TemporaryFile() as context:
+                    with tarfile.open(fileobj=context, mode="w") as tar:
+                        tar.add(str(context_dir), arcname=".")
+                    context.seek(0)
+                    _emit(job, "log", "빌드 컨텍스트 전송 중")
+
+                    client = get_docker_client(CENTRAL_NODE_ID)
+                    stream = client.api.build(
+                        fileobj=context, custom_context=True, tag=job["image_tag"],
+                        rm=True, forcerm=True, decode=True,
+                    )
+                    for chunk in stream:
+                        if "error" in chunk:
+                            raise RuntimeError(chunk["error"].strip())
+                        if "stream" in chunk:
+                            line = chunk["stream"].strip()
+                            if not line:
+                                continue
+                            if line.startswith("Step "):
+                                job["steps"] += 1
+                            elif "Using cache" in line:
+                                job["cached_steps"] += 1
+                            _emit(job, "log", line)
+                        elif "status" in chunk:
+                            _emit(job, "pull", chunk["status"], progress=chunk.get("progress"))
+                        elif "aux" in chunk:
+                            job["image_id"] = chunk["aux"].get("ID")
+
+            job["state"] = "built"
+            job["built_at"] = datetime.now().isoformat()
+        except Exception as e:
+            job["state"] = "failed"
+            job["error"] = str(e)
+        job["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        _emit(job, "state", state=job["state"], error=job.get("error"), elapsed_ms=job["elapsed_ms"])
+        event_service.log_job("packages", f"서빙 이미지 '{job['image_tag']}' 빌드", job)
+        job_store.finish("packages", job)
+
+
+def start_build(model_id: str, runtime: str) -> dict:
+    """패키징 작업 시작 (동시 빌드 수 초과 시 queued 상태로 대기)"""
+    model = model_registry_service.get_model(model_id)
+    job = {
+        "id": uuid.uuid4().hex[:12],
+        "model_id": model_id,
+        "runtime": runtime,
+        "image_tag": build_image_tag(model["project"], model["version"]),
+        "image_id": None,
+        "state": "queued",
+        "steps": 0,
+        "cached_steps": 0,
+        "created_at": datetime.now().isoformat(),
+        "events": [],
+    }
+    with _jobs_lock:
+        _jobs[job["id"]] = job
+        while len(_jobs) > PACKAGE_JOB_HISTORY:
+            _jobs.popitem(last=False)
+    _emit(job, "state", state="queued")
+    job_store.add("packages", job, PACKAGE_JOB_HISTORY)
+    threading.Thread(target=_run_build, args=(job,), daemon=True).start()
+    return _public(job)
+
+
+def _public(job: dict) -> dict:
+    return {k: v for k, v in job.items() if k != "events"}
+
+
+def _stored(job_id: str) -> dict:
+    """다른 워커가 시작한 작업의 기록된 상태"""
+    job = job_store.get("packages", job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="패키징 작업을 찾을 수 없습니다")
+    return job
+
+
+def get_job(job_id: str) -> dict:
+    """패키징 작업 상태 조회"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    return _public(job) if job is not None else _stored(job_id)
+
+
+def list_jobs() -> list:
+    """패키징 작업 목록 조회 (모든 워커)"""
+    with _jobs_lock:
+        local = list(_jobs.values())
+    return [_public(job) for job in job_store.merge("packages", local)]
+
+
+def _finished(job: dict) -> bool:
+    """마지막 이벤트가 종료 상태 이벤트인지 (상태 변경 후 이벤트 기록 전 구간 제외)"""
+    last = job["events"][-1]
+    return last["kind"] == "state" and last["state"] in _FINISHED
+
+
+def stream_events(job_id: str, after: int = -1, heartbeat_sec: float = 15.0):
+    """작업 이벤트를 SSE 형식으로 스트리밍 (빌드가 끝나면 종료)
+
+    다른 워커가 실행 중인 작업은 공유 저장소에 기록된 이벤트를 이어서 보낸다.
+    """
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        _stored(job_id)
+        return job_store.follow("packages", job_id, after, heartbeat_sec)
+    return _stream_local(job, after, heartbeat_sec)
+
+
+def _stream_local(job: dict, after: int, heartbeat_sec: float):
+    next_seq = after + 1
+    while True:
+        timed_out = False
+        with _events_changed:
+            # 다른 작업의 이벤트로 깨어난 경우는 다시 대기
+            while next_seq >= len(job["events"]) and not _finished(job) and not timed_out:
+                timed_out = not _events_changed.wait(heartbeat_sec)
+            events = job["events"][next_seq:]
+        if not events:
+            if _finished(job):
+                return
+            # 프록시 연결 유지용 주석 라인
+            yield ": keep-alive\n\n"
+            continue
+        for event in events:
+            yield f"id: {event['seq']}\nevent: {event['kind']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        next_seq = events[-1]["seq"] + 1
@@ -0,0 +1,644 @@
+"""데이터 파이프라인 DAG 실행 서비스 (ingest → cleanse → shard/validate)
+
+작업 정의와 실행 기록은 SQLite에 저장한다. 입력 지문이 마지막 성공과 같으면
+건너뛰므로, 재시작 후 다시 실행해도 끝난 작업은 반복하지 않는다.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from config.settings import (
+    CLEANSE_WORKERS,
+    PIPELINE_CLAIM_POLL_SEC,
+    PIPELINE_DB,
+    PIPELINE_RUN_STALE_SEC,
+    PIPELINE_TASK_TIMEOUT_SEC,
+    PIPELINE_WORKERS,
+)
+from services import catalog_service, cleansing_service, event_service, image_service, sharding_service
+from services.docker_service import get_docker_client, get_docker_hosts
+
+# 요일은 0과 7 모두 일요일
+_CRON_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+# 로컬 샤딩처럼 CPU를 오래 쓰는 작업용 프로세스 풀 (최초 사용 시 생성)
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+_scheduler_stop = threading.Event()
+_scheduler_thread = None
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    schedule TEXT NOT NULL,
+    depends_on TEXT NOT NULL,
+    target_silo TEXT,
+    kind TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    paused INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    trigger_id TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    silo TEXT NOT NULL,
+    state TEXT NOT NULL,
+    fingerprint TEXT,
+    output TEXT,
+    result TEXT,
+    error TEXT,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_job_silo ON runs (job_id, silo, id);
+CREATE INDEX IF NOT EXISTS runs_state ON runs (state);
+"""
+
+
+def _connect() -> sqlite3.Connection:
+    """파이프라인 DB 연결 (최초 호출 시 스키마 생성)"""
+    global _schema_ready
+    conn = sqlite3.connect(str(PIPELINE_DB), timeout=30)
+    conn.row_factory = sqlite3.Row
+    if not _schema_ready:
+        with _schema_lock:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _schema_ready = True
+    return conn
+
+
+# --- cron ---
+
+def _parse_cron_field(field: str, low: int, high: int) -> set:
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(v) for v in part.split("-", 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"cron 필드 범위 오류: {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+def parse_cron(expr: str) -> list:
+    """5필드 cron 식 파싱 (분 시 일 월 요일, *, */n, a-b, a,b 지원)"""
+    fields = expr.split()
+    if len(fields) != 5:
+        raise ValueError(f"cron 식은 5개 필드여야 합니다: {expr}")
+    parsed = [_parse_cron_field(f, low, high) for f, (low, high) in zip(fields, _CRON_RANGES)]
+    if 7 in parsed[4]:
+        parsed[4] = (parsed[4] - {7}) | {0}
+    return parsed
+
+
+def cron_matches(expr: str, dt: datetime) -> bool:
+    """해당 시각(분 단위)이 cron 식에 해당하는지 확인"""
+    minute, hour, dom, month, dow = parse_cron(expr)
+    if dt.minute not in minute or dt.hour not in hour or dt.month not in month:
+        return False
+    dom_match = dt.day in dom
+    dow_match = (dt.weekday() + 1) % 7 in dow
+    # 일/요일이 둘 다 제한되어 있으면 cron 관례대로 둘 중 하나만 맞아도 실행
+    dom_any = len(dom) == 31
+    dow_any = len(dow) == 7
+    if not dom_any and not dow_any:
+        return dom_match or dow_match
+    return dom_match and dow_match
+
+
+# --- 작업 정의 ---
+
+def _row_to_job(row) -> dict:
+    job = dict(row)
+    job["depends_on"] = json.loads(job["depends_on"])
+    job["spec"] = json.loads(job["spec"])
+    job["paused"] = bool(job["paused"])
+    return job
+
+
+def load_jobs() -> dict:
+    """등록된 작업 정의 (id -> job)"""
+    conn = _connect()
+    try:
+        return {row["id"]: _row_to_job(row) for row in conn.execute("SELECT * FROM jobs ORDER BY created_at, id")}
+    finally:
+        conn.close()
+
+
+def _toposort(job_ids, jobs: dict) -> list:
+    """의존 순서 정렬 (순환이면 ValueError)"""
+    order, state = [], {}
+
+    def visit(job_id):
+        if state.get(job_id) == "done":
+            return
+        if state.get(job_id) == "visiting":
+            raise ValueError(f"작업 의존성에 순환이 있습니다: {job_id}")
+        state[job_id] = "visiting"
+        for dep in jobs[job_id]["depends_on"]:
+            visit(dep)
+        state[job_id] = "done"
+        order.append(job_id)
+
+    for job_id in job_ids:
+        visit(job_id)
+    return order
+
+
+def add_job(job) -> dict:
+    """작업 등록 (의존 작업 존재/순환/cron 식 검증)"""
+    jobs = load_jobs()
+    if job.id in jobs:
+        raise HTTPException(status_code=400, detail=f"작업 ID '{job.id}'가 이미 존재합니다")
+    unknown = [dep for dep in job.depends_on if dep not in jobs]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 선행 작업: {', '.join(unknown)}")
+    try:
+        parse_cron(job.schedule)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if job.target_silo and job.target_silo not in get_docker_hosts():
+        raise HTTPException(status_code=404, detail="Unknown node")
+
+    conn = _connect()
+    try:
+        conn.execute(
+            "INSERT INTO jobs (id, name, schedule, depends_on, target_silo, kind, spec, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                job.id, job.name, job.schedule, json.dumps(job.depends_on), job.target_silo,
+                job.kind, json.dumps(job.spec), datetime.now().isoformat(),
+            ),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return load_jobs()[job.id]
+
+
+def remove_job(job_id: str) -> dict:
+    """작업 삭제 (다른 작업이 의존하면 거부)"""
+    jobs = load_jobs()
+    if job_id not in jobs:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    dependents = [j["id"] for j in jobs.values() if job_id in j["depends_on"]]
+    if dependents:
+        raise HTTPException(status_code=400, detail=f"의존하는 작업이 있습니다: {', '.join(dependents)}")
+    conn = _connect()
+    try:
+        conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        conn.commit()
+    finally:
+        conn.close()
+    return {"ok": True}
+
+
+def set_paused(job_id: str, paused: bool) -> dict:
+    """작업 스케줄 일시정지/재개"""
+    conn = _connect()
+    try:
+        updated = conn.execute("UPDATE jobs SET paused = ? WHERE id = ?", (int(paused), job_id)).rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    if not updated:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    return load_jobs()[job_id]
+
+
+# --- 실행 기록 ---
+
+def _insert_run(trigger_id: str, job_id: str, silo: str, fingerprint: str) -> int:
+    conn = _connect()
+    try:
+        cursor = conn.execute(
+            "INSERT INTO runs (trigger_id, job_id, silo, state, fingerprint, started_at)"
+            " VALUES (?, ?, ?, 'running', ?, ?)",
+            (trigger_id, job_id, silo, fingerprint, datetime.now().isoformat()),
+        )
+        conn.commit()
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+
+def _claim_run(trigger_id: str, job_id: str, silo: str, fingerprint: str):
+    """같은 (작업, 사일로)의 진행 중 실행이 없으면 running 기록을 만들고 id 반환, 있으면 None
+
+    확인과 기록을 한 트랜잭션(BEGIN IMMEDIATE)에서 하므로 다른 워커의 실행과도 겹치지 않는다.
+    """
+    stale = (datetime.now() - timedelta(seconds=PIPELINE_RUN_STALE_SEC)).isoformat()
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        running = conn.execute(
+            "SELECT 1 FROM runs WHERE job_id = ? AND silo = ? AND state = 'running' AND started_at > ? LIMIT 1",
+            (job_id, silo, stale),
+        ).fetchone()
+        if running:
+            conn.rollback()
+            return None
+        cursor = conn.execute(
+            "INSERT INTO runs (trigger_id, job_id, silo, state, fingerprint, started_at)"
+            " VALUES (?, ?, ?, 'running', ?, ?)",
+            (trigger_id, job_id, silo, fingerprint, datetime.now().isoformat()),
+        )
+        conn.commit()
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+
+def _wait_claim(trigger_id: str, job_id: str, silo: str, fingerprint: str) -> int:
+    """진행 중인 같은 (작업, 사일로) 실행이 끝날 때까지 기다렸다가 실행 기록 생성"""
+    while True:
+        run_id = _claim_run(trigger_id, job_id, silo, fingerprint)
+        if run_id is not None:
+            return run_id
+        time.sleep(PIPELINE_CLAIM_POLL_SEC)
+
+
+def _running_jobs() -> set:
+    """실행 중인 작업 id (스케줄러가 같은 작업을 또 요청하지 않도록)"""
+    stale = (datetime.now() - timedelta(seconds=PIPELINE_RUN_STALE_SEC)).isoformat()
+    conn = _connect()
+    try:
+        rows = conn.execute("SELECT DISTINCT job_id FROM runs WHERE state = 'running' AND started_at > ?", (stale,))
+        return {row["job_id"] for row in rows}
+    finally:
+        conn.close()
+
+
+def _finish_run(run_id: int, state: str, output=None, result=None, error=None):
+    conn = _connect()
+    try:
+        conn.execute(
+            "UPDATE runs SET state = ?, output = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+            (
+                state, output, json.dumps(result, ensure_ascii=False, default=str) if result else None,
+                error, datetime.now().isoformat(), run_id,
+            ),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _last_success(job_id: str, silo: str):
+    conn = _connect()
+    try:
+        return conn.execute(
+            "SELECT fingerprint, output FROM runs"
+            " WHERE job_id = ? AND silo = ? AND state IN ('done', 'skipped')"
+            " ORDER BY id DESC LIMIT 1",
+            (job_id, silo),
+        ).fetchone()
+    finally:
+        conn.close()
+
+
+def list_runs(job_id: str = None, limit: int = 100) -> list:
+    """실행 기록 조회 (최신순)"""
+    query = "SELECT * FROM runs"
+    params = []
+    if job_id:
+        query += " WHERE job_id = ?"
+        params.append(job_id)
+    query += " ORDER BY id DESC LIMIT ?"
+    params.append(limit)
+    conn = _connect()
+    try:
+        rows = [dict(row) for row in conn.execute(query, params)]
+    finally:
+        conn.close()
+    for row in rows:
+        row["result"] = json.loads(row["result"]) if row["result"] else None
+    return rows
+
+
+def job_states() -> list:
+    """작업별 최근 상태 (사일로별 마지막 실행 기준)"""
+    conn = _connect()
+    try:
+        latest = conn.execute(
+            "SELECT r.job_id, r.silo, r.state, r.finished_at FROM runs r"
+            " JOIN (SELECT job_id, silo, MAX(id) AS id FROM runs GROUP BY job_id, silo) m ON r.id = m.id"
+        ).fetchall()
+    finally:
+        conn.close()
+    jobs = load_jobs()
+    for job in jobs.values():
+        job["silos"] = {}
+    for row in latest:
+        if row["job_id"] in jobs:
+            jobs[row["job_id"]]["silos"][row["silo"]] = {"state": row["state"], "finished_at": row["finished_at"]}
+    return list(jobs.values())
+
+
+# --- 실행기 ---
+
+def _format_spec(value, silo: str):
+    """spec 문자열의 {silo}를 대상 사일로 id로 치환"""
+    if isinstance(value, str):
+        return value.replace("{silo}", silo)
+    if isinstance(value, list):
+        return [_format_spec(v, silo) for v in value]
+    if isinstance(value, dict):
+        return {k: _format_spec(v, silo) for k, v in value.items()}
+    return value
+
+
+def _fs_for(silo: str, *uris):
+    if any(uri.startswith("s3://") for uri in uris if uri):
+        return cleansing_service.node_filesystem(silo)
+    return None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=PIPELINE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _process_pool
+
+
+def _run_ingest(spec: dict, silo: str) -> dict:
+    return catalog_service.sync_node(silo, spec.get("full", False))
+
+
+def _run_cleanse(spec: dict, silo: str) -> dict:
+    # 정제 엔진은 내부에서 프로세스 풀을 사용
+    job = cleansing_service.run_cleanse(cleansing_service._new_job(
+        spec["input_uri"], spec["output_uri"],
+        _fs_for(silo, spec["input_uri"], spec["output_uri"]),
+        spec.get("rules", {}),
+        max(1, spec.get("workers") or CLEANSE_WORKERS),
+    ))
+    if job["state"] != "done":
+        raise RuntimeError(job.get("error", "정제 실패"))
+    return cleansing_service._public(job)
+
+
+def _run_shard(spec: dict, silo: str) -> dict:
+    job = sharding_service._new_job(
+        "shard", _fs_for(silo, spec["input_uri"], spec["output_uri"]),
+        input_uri=spec["input_uri"], output_uri=spec["output_uri"],
+        num_shards=spec["num_shards"], mode=spec.get("mode", "hash"),
+        key_column=spec.get("key_column", cleansing_service.NORMALIZED_ID_COLUMN),
+        label_column=spec.get("label_column"),
+    )
+    job = _get_process_pool().submit(sharding_service.shard_dataset, job).result()
+    if job["state"] != "done":
+        raise RuntimeError(job.get("error", "샤딩 실패"))
+    return sharding_service._public(job)
+
+
+def _run_container(spec: dict, silo: str) -> dict:
+    """사일로 Docker 데몬에서 컨테이너로 실행 후 종료 코드 확인"""
+    client = get_docker_client(silo)
+    image_service.ensure_image(silo, spec["image"])
+    container = client.containers.run(
+        spec["image"],
+        command=spec.get("command"),
+        environment={**spec.get("env", {}), "FL_NODE_ID": silo},
+        labels={"fl.role": "pipeline"},
+        detach=True,
+    )
+    try:
+        status = container.wait(timeout=spec.get("timeout", PIPELINE_TASK_TIMEOUT_SEC))
+        logs = container.logs(tail=20).decode("utf-8", errors="replace")
+    finally:
+        container.remove(force=True)
+    if status.get("StatusCode") != 0:
+        raise RuntimeError(f"종료 코드 {status.get('StatusCode')}: {logs[-500:]}")
+    return {"exit_code": 0, "logs": logs}
+
+
+_EXECUTORS = {
+    "ingest": _run_ingest,
+    "cleanse": _run_cleanse,
+    "shard": _run_shard,
+    "container": _run_container,
+}
+
+
+def _silos_for(job: dict) -> list:
+    """작업 대상 사일로 (target_silo가 없으면 전체)"""
+    if job["target_silo"]:
+        return [job["target_silo"]]
+    hosts = get_docker_hosts()
+    if job["kind"] == "container":
+        return [n for n, info in hosts.items() if info.get("role", "client") == "client"]
+    return [n for n, info in hosts.items() if info.get("minio_url")]
+
+
+def _input_fingerprint(job: dict, spec: dict, silo: str) -> str:
+    """작업 입력 데이터 지문 (카탈로그 etag 또는 로컬 파일 크기/수정 시각)"""
+    uri = spec.get("input_uri")
+    if not uri:
+        return ""
+    if uri.startswith("s3://"):
+        bucket, _, prefix = uri[len("s3://"):].partition("/")
+        return catalog_service.fingerprint(silo, bucket, prefix)
+    try:
+        stat = os.stat(uri)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+    except OSError:
+        return "missing"
+
+
+def _run_task(trigger_id: str, job: dict, silo: str, upstream: list, force: bool):
+    """작업 하나를 사일로 하나에 대해 실행. 출력 지문 반환 (실패 시 None)"""
+    run_id = None
+    try:
+        spec = _format_spec(job["spec"], silo)
+        payload = {
+            "kind": job["kind"],
+            "spec": spec,
+            "upstream": upstream,
+            "input": _input_fingerprint(job, spec, silo),
+        }
+        fingerprint = hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+        run_id = _wait_claim(trigger_id, job["id"], silo, fingerprint)
+        # 기다리는 동안 끝난 실행까지 반영해 비교
+        last = _last_success(job["id"], silo)
+
+        # ingest는 변경 감지 단계이므로 항상 실행
+        if not force and job["kind"] != "ingest" and last and last["fingerprint"] == fingerprint:
+            _finish_run(run_id, "skipped", output=last["output"])
+            return last["output"]
+        result = _EXECUTORS[job["kind"]](spec, silo)
+        output = fingerprint
+        if job["kind"] == "ingest":
+            # 동기화 시각이 아닌 객체 집합(key, etag)만으로: 데이터가 그대로면 후속 작업을 건너뜀
+            output = catalog_service.fingerprint(silo)
+        _finish_run(run_id, "done", output=output, result=result)
+        event_service.log("success", f"파이프라인 작업 '{job['name']}' 완료", node_id=silo, source="pipeline",
+                          run_id=run_id, trigger_id=trigger_id)
+        return output
+    except Exception as e:
+        try:
+            if run_id is None:
+                run_id = _insert_run(trigger_id, job["id"], silo, None)
+            _finish_run(run_id, "failed", error=str(e))
+        except sqlite3.Error as db_error:
+            print(f"파이프라인 실행 기록 오류: {db_error} ({job['id']}/{silo})")
+        event_service.log("error", f"파이프라인 작업 '{job['name']}' 실패: {e}", node_id=silo, source="pipeline",
+                          run_id=run_id, trigger_id=trigger_id)
+        return None
+
+
+def _execute(trigger_id: str, job_ids, force: bool):
+    """DAG 실행: 의존이 끝난 (작업, 사일로)부터 병렬 실행
+
+    다른 실행(다른 워커 포함)과는 (작업, 사일로) 단위로만 겹치지 않게 한다(_claim_run).
+    """
+    jobs = load_jobs()
+    order = _toposort(job_ids or list(jobs), jobs)
+    targets = {job_id: _silos_for(jobs[job_id]) for job_id in order}
+
+    # 같은 사일로의 선행 작업에만 의존 (선행 작업이 특정 사일로 전용이면 그 결과에 의존)
+    remaining = {}
+    for job_id in order:
+        for silo in targets[job_id]:
+            deps = []
+            for dep in jobs[job_id]["depends_on"]:
+                dep_silos = targets[dep]
+                deps += [(dep, silo)] if silo in dep_silos else [(dep, s) for s in dep_silos]
+            remaining[(job_id, silo)] = deps
+
+    outputs = {}
+    futures = {}
+    with ThreadPoolExecutor(max_workers=PIPELINE_WORKERS, thread_name_prefix="pipeline") as pool:
+        while remaining or futures:
+            progressed = True
+            while progressed:
+                progressed = False
+                for task, deps in list(remaining.items()):
+                    if not all(dep in outputs for dep in deps):
+                        continue
+                    del remaining[task]
+                    progressed = True
+                    job_id, silo = task
+                    if any(outputs[dep] is None for dep in deps):
+                        run_id = _insert_run(trigger_id, job_id, silo, None)
+                        _finish_run(run_id, "blocked", error="선행 작업 실패")
+                        outputs[task] = None
+                        continue
+                    upstream = [outputs[dep] for dep in deps]
+                    futures[pool.submit(_run_task, trigger_id, jobs[job_id], silo, upstream, force)] = task
+            if not futures:
+                break
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = futures.pop(future)
+                try:
+                    outputs[task] = future.result()
+                except Exception as e:
+                    # 실행 기록조차 남기지 못한 경우: 후속 작업은 막고 나머지는 계속
+                    event_service.log("error", f"파이프라인 작업 오류 ({task[0]}/{task[1]}): {e}", source="pipeline")
+                    outputs[task] = None
+
+
+def trigger(job_ids=None, force: bool = False) -> dict:
+    """DAG 실행 요청 (선택 작업과 그 선행 작업까지, 백그라운드)"""
+    jobs = load_jobs()
+    unknown = [job_id for job_id in job_ids or [] if job_id not in jobs]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"알 수 없는 작업: {', '.join(unknown)}")
+    trigger_id = uuid.uuid4().hex[:12]
+    threading.Thread(target=_execute, args=(trigger_id, job_ids, force), daemon=True).start()
+    return {"trigger_id": trigger_id, "job_ids": job_ids or list(jobs), "force": force}
+
+
+# --- 스케줄러 ---
+
+def resume_interrupted() -> list:
+    """재시작 전 실행 중이던 작업을 중단 처리 후 다시 실행 (끝난 작업은 지문으로 건너뜀)"""
+    conn = _connect()
+    try:
+        job_ids = [row["job_id"] for row in conn.execute("SELECT DISTINCT job_id FROM runs WHERE state = 'running'")]
+        conn.execute(
+            "UPDATE runs SET state = 'interrupted', finished_at = ? WHERE state = 'running'",
+            (datetime.now().isoformat(),),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    job_ids = [job_id for job_id in job_ids if job_id in load_jobs()]
+    if job_ids:
+        trigger(job_ids)
+    return job_ids
+
+
+def _scheduler_loop():
+    try:
+        resume_interrupted()
+    except Exception as e:
+        event_service.log("error", f"파이프라인 재개 오류: {e}", source="pipeline")
+    last_minute = None
+    while not _scheduler_stop.is_set():
+        now = datetime.now().replace(second=0, microsecond=0)
+        if now != last_minute:
+            last_minute = now
+            try:
+                due = []
+                for job in load_jobs().values():
+                    try:
+                        if not job["paused"] and cron_matches(job["schedule"], now):
+                            due.append(job["id"])
+                    except ValueError as e:
+                        event_service.log("error", f"cron 식 오류 ({job['id']}): {e}", source="pipeline")
+                # 앞선 실행이 아직 진행 중인 작업은 이번 주기를 건너뜀 (대기 스레드가 쌓이지 않도록)
+                running = _running_jobs()
+                due = [job_id for job_id in due if job_id not in running]
+                if due:
+                    trigger(due)
+            except Exception as e:
+                event_service.log("error", f"파이프라인 스케줄러 오류: {e}", source="pipeline")
+        _scheduler_stop.wait(60 - datetime.now().second)
+
+
+def start_scheduler():
+    """cron 스케줄러 스레드 시작"""
+    global _scheduler_thread
+    if _scheduler_thread and _scheduler_thread.is_alive():
+        return
+    _scheduler_stop.clear()
+    _scheduler_thread = threading.Thread(target=_scheduler_loop, name="pipeline-scheduler", daemon=True)
+    _scheduler_thread.start()
+
+
+def stop_scheduler():
+    """cron 스케줄러 스레드 종료 및 프로세스 풀 정리"""
+    global _process_pool
+    _scheduler_stop.set()
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
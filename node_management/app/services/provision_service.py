@@ -0,0 +1,293 @@
+"""사일로 컨테이너 프로비저닝 서비스
+
+중앙 Docker 데몬에서 템플릿(이미지, 포트 블록, 볼륨, MinIO)으로 사일로 컨테이너를 여러 개
+동시에 만든다. 고정 대기 대신 사일로 Docker API `/_ping`과 MinIO `/minio/health/live`를
+준비될 때까지 확인하고, 준비된 사일로는 바로 노드로 등록하며 단계별 소요 시간을 기록한다.
+"""
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import docker
+import requests
+from fastapi import HTTPException
+from config.settings import (
+    CENTRAL_NODE_ID,
+    MINIO_ACCESS_KEY,
+    MINIO_SECRET_KEY,
+    PROVISION_JOB_HISTORY,
+    PROVISION_MAX_PARALLEL,
+    PROVISION_PROBE_INTERVAL_SEC,
+    PROVISION_PROBE_MAX_INTERVAL_SEC,
+    PROVISION_READY_TIMEOUT_SEC,
+    SILO_DOCKER_PORT_BASE,
+    SILO_IMAGE,
+    SILO_MINIO_CONTAINER_PREFIX,
+    SILO_MINIO_IMAGE,
+    SILO_MINIO_PORT,
+    SILO_MINIO_PORT_BASE,
+    SILO_NETWORK,
+    SILO_PUBLISH_HOST,
+)
+from services import event_service, job_store, node_registry
+from services.docker_service import get_docker_client, get_docker_hosts
+
+_SILO_NAME = re.compile(r"^silo-(\d+)$")
+# 한 번의 준비 확인 요청 제한 시간(초)
+_PROBE_TIMEOUT_SEC = 2
+
+# 프로비저닝 작업: job_id -> job dict (오래된 작업부터 정리)
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def _wait_until(check, deadline: float, what: str):
+    """check()가 True가 될 때까지 간격을 늘려 가며 재시도 (연결 오류는 준비 전으로 간주)"""
+    interval = PROVISION_PROBE_INTERVAL_SEC
+    last_error = None
+    while True:
+        try:
+            if check():
+                return
+        except requests.RequestException as e:
+            last_error = e
+        if time.monotonic() + interval > deadline:
+            raise TimeoutError(f"{what} 준비 시간 초과" + (f": {last_error}" if last_error else ""))
+        time.sleep(interval)
+        interval = min(interval * 2, PROVISION_PROBE_MAX_INTERVAL_SEC)
+
+
+def _used_indexes(central) -> set:
+    """등록된 노드와 중앙 데몬 컨테이너에서 사용 중인 silo-N 번호"""
+    names = list(get_docker_hosts())
+    names += [c.name for c in central.containers.list(all=True, filters={"name": "silo-"})]
+    return {int(m.group(1)) for m in map(_SILO_NAME.match, names) if m}
+
+
+def _ensure_network(central, name: str):
+    if not any(network.name == name for network in central.networks.list(names=[name])):
+        central.networks.create(name, driver="bridge")
+
+
+def _start_minio(silo_client, silo: dict, image: str):
+    """사일로 안의 Docker에서 MinIO 실행 (이미 있으면 시작만)"""
+    name = f"{SILO_MINIO_CONTAINER_PREFIX}{silo['index']}"
+    try:
+        container = silo_client.containers.get(name)
+        if container.status != "running":
+            container.start()
+        return
+    except docker.errors.NotFound:
+        pass
+    silo_client.containers.run(
+        image,
+        f"server /data --console-address :{SILO_MINIO_PORT + 1}",
+        name=name,
+        user="0:0",
+        detach=True,
+        environment={"MINIO_ROOT_USER": MINIO_ACCESS_KEY, "MINIO_ROOT_PASSWORD": MINIO_SECRET_KEY},
+        ports={f"{SILO_MINIO_PORT}/tcp": SILO_MINIO_PORT, f"{SILO_MINIO_PORT + 1}/tcp": SILO_MINIO_PORT + 1},
+        volumes={"/var/lib/docker/data/minio": {"bind": "/data", "mode": "rw"}},
+        restart_policy={"Name": "unless-stopped"},
+    )
+
+
+def _register(silo: dict, labels: dict):
+    def add(servers):
+        servers[silo["name"]] = {
+            "base_url": silo["base_url"],
+            "label": silo["name"],
+            "type": "remote",
+            "role": "client",
+            "tls": False,
+        }
+        if silo.get("minio_url"):
+            servers[silo["name"]]["minio_url"] = silo["minio_url"]
+        if labels:
+            servers[silo["name"]]["labels"] = dict(labels)
+
+    node_registry.update(add)
+
+
+def _provision_silo(job: dict, silo: dict):
+    """사일로 하나 생성 -> Docker 준비 -> MinIO 준비 -> 노드 등록"""
+    template = job["template"]
+    started = time.perf_counter()
+    deadline = time.monotonic() + template["ready_timeout_sec"]
+    timings = silo["timings"]
+    host = template["host"]
+    try:
+        silo["state"] = "creating"
+        central = get_docker_client(CENTRAL_NODE_ID)
+        data = template["data_root"]
+        volume = f"{data.rstrip('/')}/silo{silo['index']}" if data else f"{silo['name']}-docker"
+        ports = {"2375/tcp": silo["docker_port"]}
+        if template["minio"]:
+            ports[f"{SILO_MINIO_PORT}/tcp"] = silo["minio_port"]
+            ports[f"{SILO_MINIO_PORT + 1}/tcp"] = silo["minio_port"] + 1
+        container = central.containers.run(
+            template["image"],
+            name=silo["name"],
+            hostname=silo["name"],
+            detach=True,
+            privileged=True,
+            network=template["network"],
+            ports=ports,
+            volumes={volume: {"bind": "/var/lib/docker", "mode": "rw"}},
+            # MinIO는 이 서비스가 사일로 Docker API로 직접 실행
+            environment={"SILO_NUM": str(silo["index"]), "SILO_MINIO_MANAGED": "1"},
+            labels={"fl.silo": silo["name"], "fl.provision.job": job["id"]},
+        )
+        silo["container_id"] = container.short_id
+        timings["container_ms"] = _elapsed_ms(started)
+
+        silo["state"] = "waiting_docker"
+
+        def docker_ready():
+            container.reload()
+            if container.status in ("exited", "dead"):
+                tail = container.logs(tail=20).decode("utf-8", errors="replace")
+                raise RuntimeError(f"사일로 컨테이너가 종료되었습니다: {tail}")
+            response = requests.get(f"http://{host}:{silo['docker_port']}/_ping", timeout=_PROBE_TIMEOUT_SEC)
+            return response.status_code == 200 and response.text.strip() == "OK"
+
+        _wait_until(docker_ready, deadline, "Docker 데몬")
+        timings["docker_ready_ms"] = _elapsed_ms(started)
+
+        if template["minio"]:
+            silo["state"] = "waiting_minio"
+            silo_client = docker.DockerClient(base_url=silo["base_url"], timeout=_PROBE_TIMEOUT_SEC * 30)
+            try:
+                _start_minio(silo_client, silo, template["minio_image"])
+            finally:
+                silo_client.close()
+
+            def minio_ready():
+                response = requests.get(f"{silo['minio_url']}/minio/health/live", timeout=_PROBE_TIMEOUT_SEC)
+                return response.status_code == 200
+
+            _wait_until(minio_ready, deadline, "MinIO")
+            timings["minio_ready_ms"] = _elapsed_ms(started)
+
+        _register(silo, template["labels"])
+        timings["ready_ms"] = _elapsed_ms(started)
+        silo["state"] = "ready"
+        event_service.log(
+            "server", f"사일로 '{silo['name']}' 준비 완료 ({timings['ready_ms'] / 1000:.1f}초)",
+            node_id=silo["name"], source="provision", timings=timings,
+        )
+    except HTTPException as e:
+        silo["failed_state"], silo["state"], silo["error"] = silo["state"], "failed", e.detail
+    except Exception as e:
+        silo["failed_state"], silo["state"], silo["error"] = silo["state"], "failed", str(e)
+    if silo["state"] == "failed":
+        timings["failed_ms"] = _elapsed_ms(started)
+        event_service.log("error", f"사일로 '{silo['name']}' 프로비저닝 실패: {silo['error']}",
+                          node_id=silo["name"], source="provision")
+
+
+def _run_job(job: dict):
+    started = time.perf_counter()
+    silos = job["silos"]
+    with ThreadPoolExecutor(max_workers=min(len(silos), PROVISION_MAX_PARALLEL), thread_name_prefix="provision") as pool:
+        for silo in silos:
+            pool.submit(_provision_silo, job, silo)
+    failed = [silo["name"] for silo in silos if silo["state"] != "ready"]
+    job["state"] = "failed" if failed else "done"
+    job["failed"] = failed
+    job["elapsed_ms"] = _elapsed_ms(started)
+    job["finished_at"] = datetime.now().isoformat()
+    event_service.log_job("provision", f"사일로 {len(silos)}곳 프로비저닝", job)
+    job_store.finish("provision", job)
+
+
+def start_provision(request) -> dict:
+    """템플릿으로 사일로 여러 개를 병렬 생성 (백그라운드, 준비되는 대로 등록)"""
+    if request.count < 1:
+        raise HTTPException(status_code=400, detail="count는 1 이상이어야 합니다")
+    invalid = [
+        key for key, value in request.labels.items()
+        if not node_registry.LABEL_PATTERN.match(key) or not node_registry.LABEL_PATTERN.match(value)
+    ]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"잘못된 라벨: {', '.join(invalid)}")
+    template = {
+        "image": request.image or SILO_IMAGE,
+        "host": request.host or SILO_PUBLISH_HOST,
+        "docker_port_base": request.docker_port_base or SILO_DOCKER_PORT_BASE,
+        "minio_port_base": request.minio_port_base or SILO_MINIO_PORT_BASE,
+        "data_root": request.data_root,
+        "network": request.network or SILO_NETWORK,
+        "minio": request.minio,
+        "minio_image": request.minio_image or SILO_MINIO_IMAGE,
+        "labels": dict(request.labels),
+        "ready_timeout_sec": request.ready_timeout_sec or PROVISION_READY_TIMEOUT_SEC,
+    }
+    central = get_docker_client(CENTRAL_NODE_ID)
+    used = _used_indexes(central)
+    start = request.start_index or max(used, default=0) + 1
+    indexes = list(range(start, start + request.count))
+    taken = sorted(used.intersection(indexes))
+    if taken:
+        raise HTTPException(status_code=409, detail=f"이미 사용 중인 사일로: {', '.join(f'silo-{i}' for i in taken)}")
+    last_port = template["minio_port_base"] + 2 * indexes[-1] if template["minio"] else 0
+    if start < 1 or max(template["docker_port_base"] + indexes[-1], last_port) > 65535:
+        raise HTTPException(status_code=400, detail="사일로 번호에 맞는 포트가 범위를 벗어납니다")
+    _ensure_network(central, template["network"])
+
+    host = template["host"]
+    job = {
+        "id": uuid.uuid4().hex[:12],
+        "state": "running",
+        "created_at": datetime.now().isoformat(),
+        "template": template,
+        "silos": [
+            {
+                "name": f"silo-{index}",
+                "index": index,
+                "state": "pending",
+                "docker_port": template["docker_port_base"] + index,
+                "base_url": f"tcp://{host}:{template['docker_port_base'] + index}",
+                "minio_port": template["minio_port_base"] + 2 * index - 1 if template["minio"] else None,
+                "minio_url": f"http://{host}:{template['minio_port_base'] + 2 * index - 1}" if template["minio"] else None,
+                "timings": {},
+            }
+            for index in indexes
+        ],
+    }
+    with _jobs_lock:
+        _jobs[job["id"]] = job
+        while len(_jobs) > PROVISION_JOB_HISTORY:
+            _jobs.popitem(last=False)
+    job_store.add("provision", job, PROVISION_JOB_HISTORY)
+    threading.Thread(target=_run_job, args=(job,), daemon=True).start()
+    return _public(job)
+
+
+def _public(job: dict) -> dict:
+    return {**job, "silos": [dict(silo) for silo in job["silos"]]}
+
+
+def get_job(job_id: str) -> dict:
+    """사일로별 상태와 단계별 소요 시간(ms)"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        # 다른 워커가 시작한 작업은 공유 저장소의 상태로 응답
+        job = job_store.get("provision", job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="프로비저닝 작업을 찾을 수 없습니다")
+    return _public(job)
+
+
+def list_jobs() -> list:
+    with _jobs_lock:
+        local = list(_jobs.values())
+    return [_public(job) for job in reversed(job_store.merge("provision", local))]
@@ -0,0 +1,137 @@
+"""노드 자원 사용률 수집 서비스
+
+사일로마다 실행 중인 컨테이너의 CPU/메모리 사용량을 Docker stats로 합산해 호스트 대비
+사용률(%)로 만들고, 디스크는 Docker 데이터 사용량을 servers.yaml의 disk_gb와 비교한다.
+수집한 값은 알림 엔진에 넘겨 임계치 규칙을 평가한다. 수집은 담당 워커 하나만 하므로
+마지막 수집 결과는 공유 레지스트리 캐시에 기록하고 조회는 모든 워커가 그 캐시에서 한다.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from config.settings import RESOURCE_COLLECT_INTERVAL_SEC, RESOURCE_DISK_INTERVAL_SEC, RESOURCE_WORKERS
+from services import alert_service, event_service, node_registry
+from services.docker_service import get_docker_client, get_docker_hosts, get_node_health
+
+# 공유 캐시 키 (노드별 마지막 수집 결과)
+_SNAPSHOT_KEY = "resources:latest"
+
+# 노드별 마지막 수집 결과 (수집 워커)
+_latest = {}
+# 노드별 디스크 사용률 (df는 느리므로 RESOURCE_DISK_INTERVAL_SEC마다 갱신): node_id -> (checked_at, pct)
+_disk = {}
+_lock = threading.Lock()
+
+_stop = threading.Event()
+_thread = None
+
+
+def _container_usage(container):
+    """컨테이너의 (호스트 CPU 점유율, 메모리 사용 바이트)"""
+    stats = container.stats(stream=False)
+    cpu, precpu = stats.get("cpu_stats", {}), stats.get("precpu_stats", {})
+    cpu_delta = cpu.get("cpu_usage", {}).get("total_usage", 0) - precpu.get("cpu_usage", {}).get("total_usage", 0)
+    system_delta = cpu.get("system_cpu_usage", 0) - precpu.get("system_cpu_usage", 0)
+    share = cpu_delta / system_delta if cpu_delta > 0 and system_delta > 0 else 0.0
+    memory = stats.get("memory_stats", {})
+    # docker stats와 같이 페이지 캐시는 제외 (cgroup v2: inactive_file, v1: cache)
+    detail = memory.get("stats", {})
+    used = memory.get("usage", 0) - detail.get("inactive_file", detail.get("cache", 0))
+    return share, max(used, 0)
+
+
+def _disk_pct(node_id: str, client, capacity_gb, now: float):
+    if not capacity_gb:
+        return None
+    cached = _disk.get(node_id)
+    if cached and now - cached[0] < RESOURCE_DISK_INTERVAL_SEC:
+        return cached[1]
+    df = client.df()
+    used = (df.get("LayersSize") or 0)
+    used += sum(c.get("SizeRw") or 0 for c in df.get("Containers") or [])
+    used += sum((v.get("UsageData") or {}).get("Size", 0) or 0 for v in df.get("Volumes") or [])
+    pct = round(max(used, 0) * 100 / (capacity_gb * 1024 ** 3), 1)
+    _disk[node_id] = (now, pct)
+    return pct
+
+
+def _collect(node_id: str, info: dict, pool: ThreadPoolExecutor) -> dict:
+    """노드 한 곳의 CPU/메모리/디스크 사용률"""
+    client = get_docker_client(node_id)
+    host = client.info()
+    containers = client.containers.list()
+    usage = list(pool.map(_container_usage, containers))
+    now = time.time()
+    return {
+        "cpu": round(sum(share for share, _ in usage) * 100, 1),
+        "mem": round(sum(used for _, used in usage) * 100 / host["MemTotal"], 1) if host.get("MemTotal") else None,
+        "disk": _disk_pct(node_id, client, info.get("disk_gb"), now),
+        "containers": len(containers),
+        "at": now,
+    }
+
+
+def collect_once() -> dict:
+    """온라인 사일로의 자원 사용률을 병렬로 수집하고 알림 규칙 평가"""
+    hosts = {
+        node_id: info for node_id, info in get_docker_hosts().items()
+        if info.get("role", "client") == "client" and get_node_health(node_id).get("status") != "offline"
+    }
+    collected = 0
+    with _lock:
+        if not _latest:
+            # 담당 워커가 바뀌면 이전 담당 워커가 남긴 결과(오프라인 노드 포함)에서 이어감
+            _latest.update(node_registry.cache_get(_SNAPSHOT_KEY) or {})
+    with ThreadPoolExecutor(max_workers=RESOURCE_WORKERS, thread_name_prefix="resource") as pool, \
+            ThreadPoolExecutor(max_workers=RESOURCE_WORKERS, thread_name_prefix="resource-stats") as stats_pool:
+        futures = {node_id: pool.submit(_collect, node_id, info, stats_pool) for node_id, info in hosts.items()}
+        for node_id, future in futures.items():
+            try:
+                sample = future.result()
+            except Exception as e:
+                with _lock:
+                    _latest[node_id] = {"error": str(e), "last_check": datetime.now().isoformat()}
+                continue
+            collected += 1
+            with _lock:
+                _latest[node_id] = {
+                    **{k: v for k, v in sample.items() if k != "at"},
+                    "last_check": datetime.fromtimestamp(sample["at"]).isoformat(timespec="seconds"),
+                }
+            alert_service.ingest(
+                node_id, {metric: sample[metric] for metric in alert_service.METRICS}, sample["at"],
+            )
+    alert_service.tick()
+    with _lock:
+        snapshot = {node_id: dict(sample) for node_id, sample in _latest.items()}
+    node_registry.cache_set(_SNAPSHOT_KEY, snapshot)
+    return {"silos": len(hosts), "collected": collected}
+
+
+def get_resources() -> dict:
+    """사일로별 마지막 자원 사용률 (수집 워커가 공유 캐시에 기록한 값)"""
+    return node_registry.cache_get(_SNAPSHOT_KEY) or {}
+
+
+def _loop():
+    while not _stop.is_set():
+        try:
+            collect_once()
+        except Exception as e:
+            event_service.log("error", f"자원 사용률 수집 오류: {e}", source="resources")
+        _stop.wait(RESOURCE_COLLECT_INTERVAL_SEC)
+
+
+def start_collector():
+    """주기적 수집 스레드 시작"""
+    global _thread
+    if _thread and _thread.is_alive():
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_loop, name="resource-collector", daemon=True)
+    _thread.start()
+
+
+def stop_collector():
+    """주기적 수집 스레드 종료"""
+    _stop.set()
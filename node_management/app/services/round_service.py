@@ -0,0 +1,213 @@
+"""학습 라운드 스케줄러 서비스"""
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import docker
+from fastapi import HTTPException
+from config.settings import (
+    ROUND_HISTORY,
+    ROUND_MAX_LAUNCH_PER_HOST,
+    ROUND_PROBE_WORKERS,
+    TRAINER_CONTAINER_PREFIX,
+    TRAINER_IMAGE,
+)
+from services import assignment_service, event_service, image_service, job_store
+from services.docker_service import get_docker_client, get_docker_hosts, get_node_daemon, probe_node
+
+# Docker 데몬별 동시 실행 제한: daemon -> BoundedSemaphore
+# (사일로들이 한 호스트의 여러 데몬일 수 있으므로 호스트 이름이 아니라 데몬 주소 기준)
+_host_slots = {}
+_slots_lock = threading.Lock()
+
+
+def _host_slot(node_id: str) -> threading.BoundedSemaphore:
+    """노드의 Docker 데몬별 실행 슬롯 반환"""
+    daemon = get_node_daemon(node_id)
+    with _slots_lock:
+        if daemon not in _host_slots:
+            _host_slots[daemon] = threading.BoundedSemaphore(ROUND_MAX_LAUNCH_PER_HOST)
+        return _host_slots[daemon]
+
+
+def select_silos(silo_ids=None, max_silos=None):
+    """최근 상태와 지연 시간 기준으로 참여 사일로 선택
+
+    Returns:
+        (선택된 사일로 id 목록, 노드별 상태 기록)
+    """
+    hosts = get_docker_hosts()
+    if silo_ids:
+        unknown = [node_id for node_id in silo_ids if node_id not in hosts]
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"알 수 없는 사일로: {', '.join(unknown)}")
+        candidates = list(silo_ids)
+    else:
+        candidates = [
+            node_id for node_id, info in hosts.items()
+            if info.get("role", "client") == "client"
+        ]
+    if not candidates:
+        return [], {}
+
+    with ThreadPoolExecutor(max_workers=min(len(candidates), ROUND_PROBE_WORKERS)) as pool:
+        health = dict(zip(candidates, pool.map(probe_node, candidates)))
+
+    online = [node_id for node_id in candidates if health[node_id]["status"] == "online"]
+    online.sort(key=lambda node_id: health[node_id].get("latency_ms") or 0)
+    if max_silos:
+        online = online[:max_silos]
+    return online, health
+
+
+def prefetch_image(image: str, silo_ids=None) -> dict:
+    """사일로들에 이미지를 미리 배포 (중앙 pull 1회 + 노드별 전송, 백그라운드)"""
+    if silo_ids is None:
+        silo_ids, _ = select_silos()
+    return image_service.distribute_image(image, silo_ids)
+
+
+def _config_hash(image: str, env: dict, network: str = None) -> str:
+    """컨테이너 재사용 판단용 설정 해시"""
+    config = {"image": image, "env": env}
+    if network:
+        config["network"] = network
+    payload = json.dumps(config, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _launch_trainer(node_id: str, image: str, env: dict, network: str = None) -> dict:
+    """사일로 한 곳에 트레이너 컨테이너 실행 또는 재사용"""
+    started = time.perf_counter()
+    name = f"{TRAINER_CONTAINER_PREFIX}-{node_id}"
+    config_hash = _config_hash(image, env, network)
+    try:
+        with _host_slot(node_id):
+            client = get_docker_client(node_id)
+            action = "created"
+            try:
+                container = client.containers.get(name)
+            except docker.errors.NotFound:
+                container = None
+
+            if container is not None and container.labels.get("fl.config") == config_hash:
+                # 같은 라운드 설정의 컨테이너는 그대로 재사용
+                if container.status == "running":
+                    action = "reused"
+                else:
+                    container.start()
+                    action = "restarted"
+            else:
+                if container is not None:
+                    container.remove(force=True)
+                image_service.ensure_image(node_id, image)
+                container = client.containers.run(
+                    image,
+                    name=name,
+                    detach=True,
+                    environment={**env, "FL_NODE_ID": node_id},
+                    network=network,
+                    labels={
+                        "fl.role": "trainer",
+                        "fl.round": env["FL_ROUND"],
+                        "fl.config": config_hash,
+                    },
+                )
+        return {
+            "node_id": node_id,
+            "status": action,
+            "container_id": container.short_id,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+    except Exception as e:
+        return {
+            "node_id": node_id,
+            "status": "failed",
+            "error": str(e),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+
+def _launch_with_shards(node_id: str, image: str, env: dict, plan: dict = None) -> dict:
+    """배정 계획이 있으면 사일로 MinIO에 기록하고, 트레이너를 MinIO와 같은 네트워크에서 실행"""
+    if plan is None:
+        return _launch_trainer(node_id, image, env)
+    try:
+        assignment_uri = assignment_service.publish(plan, int(env["FL_ROUND"]))
+    except Exception as e:
+        return {"node_id": node_id, "status": "failed", "error": f"샤드 배정 기록 실패: {e}"}
+    shard_env = {
+        **env,
+        "FL_SHARD_ENDPOINT": plan["minio"]["endpoint"],
+        "FL_SHARD_ASSIGNMENT": assignment_uri,
+        "FL_NUM_WORKERS": str(len(plan["workers"])),
+    }
+    result = _launch_trainer(node_id, image, shard_env, plan["minio"]["network"])
+    result["assignment"] = assignment_uri
+    result["imbalance"] = plan["imbalance"]
+    return result
+
+
+def start_round(config) -> dict:
+    """라운드 시작: 사일로 선택 후 트레이너 컨테이너 병렬 실행"""
+    started = time.perf_counter()
+    image = config.image or TRAINER_IMAGE
+    silos, health = select_silos(config.silo_ids, config.max_silos)
+    if not silos:
+        raise HTTPException(status_code=409, detail="참여 가능한 온라인 사일로가 없습니다")
+
+    env = {
+        "FL_ROUND": str(config.round),
+        "FL_EPOCHS": str(config.epochs),
+        "FL_LEARNING_RATE": str(config.learning_rate),
+        "FL_ALGORITHM": config.algorithm,
+    }
+    # 샤드 배정: 배정 계획을 만들 수 없는 사일로(매니페스트/MinIO 없음)는 제외
+    plans, unplanned = {}, []
+    if config.shards_uri:
+        plans = assignment_service.plan(silos, config.shards_uri, config.workers_per_silo)
+        unplanned = [
+            {"node_id": node_id, "status": "unassigned", "error": plan["error"]}
+            for node_id, plan in plans.items() if "error" in plan
+        ]
+        silos = [node_id for node_id in silos if "error" not in plans[node_id]]
+        if not silos:
+            raise HTTPException(status_code=409, detail="샤드를 배정할 수 있는 사일로가 없습니다")
+
+    with ThreadPoolExecutor(max_workers=len(silos), thread_name_prefix="round") as pool:
+        launched = list(pool.map(lambda node_id: _launch_with_shards(node_id, image, env, plans.get(node_id)), silos))
+
+    # 다음 라운드 이미지는 이번 라운드 학습 중에 미리 받아둔다
+    if config.next_image:
+        prefetch_image(config.next_image, silos)
+
+    result = {
+        "round": config.round,
+        "image": image,
+        "silos": launched,
+        "skipped": [
+            {"node_id": node_id, "status": info["status"], "error": info.get("error")}
+            for node_id, info in health.items() if node_id not in silos and node_id not in plans
+        ] + unplanned,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    # 라운드 실행 결과는 모든 워커가 조회하도록 공유 저장소에 기록 (id = 라운드 번호)
+    job_store.save("rounds", {"id": str(config.round), **result}, history=ROUND_HISTORY)
+    event_service.log("system", f"라운드 {config.round} 시작 (사일로 {len(silos)}곳)", source="rounds",
+                      round=config.round, silos=silos)
+    return result
+
+
+def get_round(round_no: int) -> dict:
+    """라운드 실행 결과 조회"""
+    result = job_store.get("rounds", str(round_no))
+    if result is None:
+        raise HTTPException(status_code=404, detail="라운드 실행 기록을 찾을 수 없습니다")
+    return {k: v for k, v in result.items() if k != "id"}
+
+
+def current_round():
+    """가장 최근에 시작한 라운드 번호 (없으면 None)"""
+    rounds = [int(round_id) for round_id in job_store.ids("rounds")]
+    return max(rounds) if rounds else None
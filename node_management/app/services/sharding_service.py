@@ -0,0 +1,433 @@
+"""학습 샤드 분할 서비스 (정규화 ID 해시 / 레이블 계층 분할)
+
+해시 분할은 jump consistent hash를 사용하므로 샤드 수를 바꿔도
+이동이 필요한 행만 옮긴다. CLI:
+    python -m services.sharding_service --input s3://clean/a.parquet \\
+        --output s3://shards/a --shards 8 --endpoint minio-silo1:9000
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from fastapi import HTTPException
+from config.settings import SHARD_BATCH_ROWS, SHARD_JOB_HISTORY, SHARD_ROW_GROUP_ROWS
+from services import event_service, job_store
+from services.cleansing_service import (
+    NORMALIZED_ID_COLUMN,
+    get_filesystem,
+    node_filesystem,
+    s3_filesystem_desc,
+    split_uri,
+)
+
+MANIFEST_NAME = "manifest.json"
+
+# 샤딩 작업 상태: job_id -> job dict
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def jump_hash(key: int, num_buckets: int) -> int:
+    """Jump consistent hash (Lamping & Veach). 버킷 수가 바뀌어도 필요한 키만 이동"""
+    b, j = -1, 0
+    while j < num_buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return b
+
+
+def _key_of(value) -> int:
+    """정규화 ID를 64비트 해시 키로 변환 (SHA-256 hex면 앞 16자리 사용)"""
+    text = str(value)
+    if len(text) == 64:
+        try:
+            return int(text[:16], 16)
+        except ValueError:
+            pass
+    return int(hashlib.sha256(text.encode('utf-8')).hexdigest()[:16], 16)
+
+
+def _hash_assign(column, num_shards: int) -> pa.Array:
+    """해시 분할 샤드 번호"""
+    return pa.array(
+        [jump_hash(_key_of(v), num_shards) for v in column.to_pylist()], type=pa.int32()
+    )
+
+
+def _stratified_assign(column, num_shards: int, counters: dict) -> pa.Array:
+    """레이블별 라운드로빈 샤드 번호 (레이블 분포를 샤드마다 고르게 유지)"""
+    shards = []
+    for label in column.to_pylist():
+        n = counters.get(label, 0)
+        counters[label] = n + 1
+        shards.append(n % num_shards)
+    return pa.array(shards, type=pa.int32())
+
+
+class _ShardWriter:
+    """샤드 파일 하나에 행을 모아 행 그룹 단위로 기록"""
+
+    def __init__(self, filesystem, path: str, label_column):
+        self.filesystem = filesystem
+        self.path = path
+        self.label_column = label_column
+        self.rows = 0
+        self.labels = {}
+        self._writer = None
+        self._buffer = []
+        self._buffered = 0
+
+    def write(self, table: pa.Table):
+        if table.num_rows == 0:
+            return
+        self.rows += table.num_rows
+        if self.label_column:
+            for item in pc.value_counts(table[self.label_column]).to_pylist():
+                label = str(item["values"])
+                self.labels[label] = self.labels.get(label, 0) + item["counts"]
+        self._buffer.append(table)
+        self._buffered += table.num_rows
+        if self._buffered >= SHARD_ROW_GROUP_ROWS:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        table = pa.concat_tables(self._buffer)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema, filesystem=self.filesystem)
+        self._writer.write_table(table.cast(self._writer.schema))
+        self._buffer = []
+        self._buffered = 0
+
+    def close(self) -> dict:
+        """기록 종료 후 파일 정보 반환 (행이 없으면 None)"""
+        self._flush()
+        if self._writer is None:
+            return None
+        self._writer.close()
+        size = self.filesystem.get_file_info(self.path).size
+        return {"path": self.path, "rows": self.rows, "bytes": size}
+
+
+def _merge_labels(target: dict, labels: dict):
+    for label, count in labels.items():
+        target[label] = target.get(label, 0) + count
+
+
+def _shard_path(output_dir: str, shard: int, generation: int) -> str:
+    return f"{output_dir}/shard-{shard:05d}-g{generation}.parquet"
+
+
+def _iter_batches(filesystem, paths):
+    """Parquet 파일들을 배치 단위로 스트리밍"""
+    for path in paths:
+        with filesystem.open_input_file(path) as f:
+            for batch in pq.ParquetFile(f).iter_batches(batch_size=SHARD_BATCH_ROWS):
+                yield pa.Table.from_batches([batch])
+
+
+def _scatter(table: pa.Table, shards: pa.Array, writers: dict, make_writer):
+    """배치를 샤드 번호별로 나눠 기록"""
+    for shard in pc.unique(shards).to_pylist():
+        if shard not in writers:
+            writers[shard] = make_writer(shard)
+        writers[shard].write(table.filter(pc.equal(shards, shard)))
+
+
+def _write_manifest(filesystem, output_dir: str, manifest: dict):
+    """매니페스트 기록 (임시 파일 기록 후 이동)"""
+    path = f"{output_dir}/{MANIFEST_NAME}"
+    tmp_path = f"{path}.tmp"
+    with filesystem.open_output_stream(tmp_path) as f:
+        f.write(json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8'))
+    filesystem.move(tmp_path, path)
+
+
+def read_manifest(filesystem, output_dir: str) -> dict:
+    """샤드 매니페스트 읽기"""
+    with filesystem.open_input_stream(f"{output_dir}/{MANIFEST_NAME}") as f:
+        return json.loads(f.read().decode('utf-8'))
+
+
+def _shard_entry(shard: int, files: list, labels: dict) -> dict:
+    return {
+        "shard": shard,
+        "files": files,
+        "rows": sum(f["rows"] for f in files),
+        "bytes": sum(f["bytes"] for f in files),
+        "labels": labels,
+    }
+
+
+def shard_dataset(job: dict) -> dict:
+    """데이터셋을 한 번의 스트리밍 패스로 N개 샤드로 분할"""
+    started = time.perf_counter()
+    job["state"] = "running"
+    filesystem = get_filesystem(job["filesystem"])
+    in_path = split_uri(job["input_uri"])
+    output_dir = split_uri(job["output_uri"]).rstrip("/")
+    num_shards = job["num_shards"]
+    key_column = job["key_column"]
+    label_column = job["label_column"]
+    counters = {}
+    writers = {}
+    try:
+        filesystem.create_dir(output_dir, recursive=True)
+        for table in _iter_batches(filesystem, [in_path]):
+            if job["mode"] == "stratified":
+                shards = _stratified_assign(table[label_column], num_shards, counters)
+            else:
+                shards = _hash_assign(table[key_column], num_shards)
+            _scatter(
+                table, shards, writers,
+                lambda s: _ShardWriter(filesystem, _shard_path(output_dir, s, 0), label_column),
+            )
+            job["rows"] += table.num_rows
+
+        shards = []
+        for shard in range(num_shards):
+            writer = writers.get(shard)
+            info = writer.close() if writer else None
+            shards.append(_shard_entry(shard, [info] if info else [], writer.labels if writer else {}))
+        manifest = {
+            "mode": job["mode"],
+            "num_shards": num_shards,
+            "generation": 0,
+            "key_column": key_column,
+            "label_column": label_column,
+            "source": job["input_uri"],
+            "created_at": datetime.now().isoformat(),
+            "shards": shards,
+        }
+        _write_manifest(filesystem, output_dir, manifest)
+        job["manifest"] = manifest
+        job["state"] = "done"
+    except Exception as e:
+        job["state"] = "failed"
+        job["error"] = str(e)
+    job["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return job
+
+
+def reshard_dataset(job: dict) -> dict:
+    """샤드 수 변경 (해시 분할만 지원). 이동하는 행만 옮긴다
+
+    - 늘릴 때: 기존 샤드에서 새 샤드로 옮겨갈 행만 빼내고 남은 행으로 다시 기록
+    - 줄일 때: 없어지는 샤드의 행만 남는 샤드에 파일로 추가 (기존 파일은 그대로)
+    """
+    started = time.perf_counter()
+    job["state"] = "running"
+    filesystem = get_filesystem(job["filesystem"])
+    output_dir = split_uri(job["output_uri"]).rstrip("/")
+    try:
+        manifest = read_manifest(filesystem, output_dir)
+        if manifest["mode"] != "hash":
+            raise ValueError("계층(stratified) 분할은 재샤딩을 지원하지 않습니다. 다시 분할하세요")
+        old_n = manifest["num_shards"]
+        new_n = job["num_shards"]
+        generation = manifest.get("generation", 0) + 1
+        key_column = manifest["key_column"]
+        label_column = manifest["label_column"]
+        old_shards = {s["shard"]: s for s in manifest["shards"]}
+        new_shards = {s: old_shards[s] for s in range(min(old_n, new_n))}
+        obsolete = []
+        movers = {}
+
+        def mover(s):
+            return _ShardWriter(filesystem, _shard_path(output_dir, s, generation), label_column)
+
+        if new_n > old_n:
+            for shard, entry in old_shards.items():
+                keep = _ShardWriter(filesystem, _shard_path(output_dir, shard, generation), label_column)
+                moved = 0
+                for table in _iter_batches(filesystem, [f["path"] for f in entry["files"]]):
+                    assigned = _hash_assign(table[key_column], new_n)
+                    stay = pc.equal(assigned, shard)
+                    keep.write(table.filter(stay))
+                    leaving = table.filter(pc.invert(stay))
+                    if leaving.num_rows:
+                        moved += leaving.num_rows
+                        _scatter(leaving, assigned.filter(pc.invert(stay)), movers, mover)
+                    job["rows"] += table.num_rows
+                info = keep.close()
+                if moved == 0:
+                    # 옮겨갈 행이 없으면 기존 파일 유지
+                    if info:
+                        filesystem.delete_file(info["path"])
+                    continue
+                job["moved_rows"] += moved
+                job["rewritten_shards"].append(shard)
+                obsolete += [f["path"] for f in entry["files"]]
+                new_shards[shard] = _shard_entry(shard, [info] if info else [], keep.labels)
+        else:
+            for shard in range(new_n, old_n):
+                entry = old_shards[shard]
+                for table in _iter_batches(filesystem, [f["path"] for f in entry["files"]]):
+                    _scatter(table, _hash_assign(table[key_column], new_n), movers, mover)
+                    job["rows"] += table.num_rows
+                    job["moved_rows"] += table.num_rows
+                obsolete += [f["path"] for f in entry["files"]]
+
+        for shard in range(new_n):
+            writer = movers.get(shard)
+            info = writer.close() if writer else None
+            if shard not in new_shards:
+                new_shards[shard] = _shard_entry(shard, [info] if info else [], writer.labels if writer else {})
+            elif info:
+                entry = new_shards[shard]
+                labels = dict(entry["labels"])
+                _merge_labels(labels, writer.labels)
+                new_shards[shard] = _shard_entry(shard, entry["files"] + [info], labels)
+
+        manifest.update({
+            "num_shards": new_n,
+            "generation": generation,
+            "created_at": datetime.now().isoformat(),
+            "shards": [new_shards[s] for s in range(new_n)],
+        })
+        _write_manifest(filesystem, output_dir, manifest)
+        for path in obsolete:
+            filesystem.delete_file(path)
+        job["manifest"] = manifest
+        job["state"] = "done"
+    except Exception as e:
+        job["state"] = "failed"
+        job["error"] = str(e)
+    job["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return job
+
+
+def _new_job(kind: str, fs_desc, **fields) -> dict:
+    return {
+        "id": uuid.uuid4().hex[:12],
+        "kind": kind,
+        "state": "pending",
+        "filesystem": fs_desc,
+        "rows": 0,
+        "moved_rows": 0,
+        "rewritten_shards": [],
+        "elapsed_ms": 0,
+        **fields,
+    }
+
+
+def _start(job: dict, target) -> dict:
+    with _jobs_lock:
+        _jobs[job["id"]] = job
+        while len(_jobs) > SHARD_JOB_HISTORY:
+            _jobs.popitem(last=False)
+    job_store.add("shards", job, SHARD_JOB_HISTORY)
+    threading.Thread(target=_run_logged, args=(job, target), daemon=True).start()
+    return _public(job)
+
+
+def _run_logged(job: dict, target):
+    target(job)
+    title = "재샤딩" if job["kind"] == "reshard" else "샤딩"
+    event_service.log_job("shards", f"{title} '{job['output_uri']}'", job, node_id=job.get("node_id"))
+    job_store.finish("shards", job)
+
+
+def _resolve_fs(node_id, *uris):
+    """s3:// 경로면 노드 MinIO 파일시스템 설명 반환"""
+    if any(uri.startswith("s3://") for uri in uris if uri):
+        if not node_id:
+            raise HTTPException(status_code=400, detail="s3:// 경로는 node_id가 필요합니다")
+        return node_filesystem(node_id)
+    return None
+
+
+def start_shard(request) -> dict:
+    """샤딩 작업 시작 (백그라운드)"""
+    if request.mode == "stratified" and not request.label_column:
+        raise HTTPException(status_code=400, detail="계층 분할에는 label_column이 필요합니다")
+    job = _new_job(
+        "shard",
+        _resolve_fs(request.node_id, request.input_uri, request.output_uri),
+        node_id=request.node_id,
+        input_uri=request.input_uri,
+        output_uri=request.output_uri,
+        num_shards=request.num_shards,
+        mode=request.mode,
+        key_column=request.key_column,
+        label_column=request.label_column,
+    )
+    return _start(job, shard_dataset)
+
+
+def start_reshard(request) -> dict:
+    """재샤딩 작업 시작 (백그라운드)"""
+    job = _new_job(
+        "reshard",
+        _resolve_fs(request.node_id, request.output_uri),
+        node_id=request.node_id,
+        output_uri=request.output_uri,
+        num_shards=request.num_shards,
+    )
+    return _start(job, reshard_dataset)
+
+
+def get_manifest(output_uri: str, node_id: str = None) -> dict:
+    """샤드 매니페스트 조회"""
+    filesystem = get_filesystem(_resolve_fs(node_id, output_uri))
+    try:
+        return read_manifest(filesystem, split_uri(output_uri).rstrip("/"))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="샤드 매니페스트를 찾을 수 없습니다")
+
+
+def _public(job: dict) -> dict:
+    """응답용 작업 정보 (접속 정보 제외)"""
+    return {k: v for k, v in job.items() if k != "filesystem"}
+
+
+def get_job(job_id: str) -> dict:
+    """샤딩 작업 상태 조회"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        job = job_store.get("shards", job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="샤딩 작업을 찾을 수 없습니다")
+    return _public(job)
+
+
+def main(argv=None) -> int:
+    """CLI 진입점 (사일로 컨테이너 안에서 실행)"""
+    parser = argparse.ArgumentParser(description="학습 샤드 분할")
+    parser.add_argument("--input", help="정제된 입력 Parquet (재샤딩 시 생략)")
+    parser.add_argument("--output", required=True, help="샤드 출력 디렉터리")
+    parser.add_argument("--shards", type=int, required=True)
+    parser.add_argument("--mode", choices=["hash", "stratified"], default="hash")
+    parser.add_argument("--key-column", default=NORMALIZED_ID_COLUMN)
+    parser.add_argument("--label-column")
+    parser.add_argument("--endpoint", help="MinIO 주소 (host:port). s3:// 경로에서 필요")
+    parser.add_argument("--secure", action="store_true")
+    args = parser.parse_args(argv)
+
+    fs_desc = s3_filesystem_desc(args.endpoint, args.secure) if args.endpoint else None
+    if args.input:
+        job = shard_dataset(_new_job(
+            "shard", fs_desc, input_uri=args.input, output_uri=args.output,
+            num_shards=args.shards, mode=args.mode,
+            key_column=args.key_column, label_column=args.label_column,
+        ))
+    else:
+        job = reshard_dataset(_new_job(
+            "reshard", fs_desc, output_uri=args.output, num_shards=args.shards,
+        ))
+    print(json.dumps(_public(job), ensure_ascii=False))
+    return 0 if job["state"] == "done" else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,340 @@
+"""요청/구간 지연 계측과 샘플링 프로파일러
+
+라우트별 요청 지연과 서버 목록 적재, Docker 클라이언트 생성, Docker API 호출 같은 구간의
+소요 시간을 누적 히스토그램으로 모아 Prometheus 텍스트 형식으로 내보낸다.
+
+값은 워커 프로세스별로 모이므로 각 워커가 METRICS_DIR에 자기 히스토그램 파일을 주기적으로
+기록하고, /metrics는 어느 워커가 받든 모든 워커의 파일을 합산해 응답한다 (prometheus_client
+multiprocess 방식). 종료된 워커의 파일은 archive에 더해 두므로 워커가 바뀌어도 누적 값이
+줄지 않는다. 워커는 같은 호스트에 있고 METRICS_DIR을 공유한다고 가정한다.
+
+프로파일러는 지정한 시간 동안 일정 간격으로 모든 스레드의 스택을 표본 추출해
+flamegraph.pl / speedscope가 읽는 folded 형식(`프레임;프레임;... 횟수`)으로 합산한다.
+"""
+import atexit
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from fastapi import HTTPException
+from config.settings import (
+    METRICS_BUCKETS_SEC,
+    METRICS_DIR,
+    METRICS_FLUSH_SEC,
+    PROFILE_MAX_SEC,
+    PROFILE_MIN_INTERVAL_MS,
+)
+
+REQUEST_METRIC = "fl_http_request_duration_seconds"
+SPAN_METRIC = "fl_span_duration_seconds"
+
+_HELP = {
+    REQUEST_METRIC: "HTTP 요청 처리 시간 (라우트별)",
+    SPAN_METRIC: "내부 구간 소요 시간 (구간/노드별)",
+}
+
+_started_at = time.time()
+
+# (metric, 라벨 튜플) -> [구간별 개수, 합계, 개수]
+_histograms = {}
+_lock = threading.Lock()
+_flusher = None
+# 종료된 워커들의 합산 파일
+_ARCHIVE = "archive.json"
+
+# 한 번에 하나의 프로파일만 수집
+_profile_lock = threading.Lock()
+# 앱 코드 위치 (유휴 스레드 판별용)
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 표본 맨 위 프레임이 이 함수이고 스택에 앱 코드가 없으면 유휴 스레드(스레드 풀 대기, 이벤트 루프 select)로 봄
+_IDLE_FUNCTIONS = frozenset({"wait", "_wait_for_tstate_lock", "select", "poll", "accept"})
+
+
+def observe(metric: str, seconds: float, **labels):
+    """히스토그램에 관측값 추가"""
+    key = (metric, tuple(sorted(labels.items())))
+    if _flusher is None:
+        _start_flusher()
+    with _lock:
+        entry = _histograms.get(key)
+        if entry is None:
+            entry = _histograms[key] = [[0] * (len(METRICS_BUCKETS_SEC) + 1), 0.0, 0]
+        counts = entry[0]
+        for i, bound in enumerate(METRICS_BUCKETS_SEC):
+            if seconds <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        entry[1] += seconds
+        entry[2] += 1
+
+
+@contextmanager
+def span(name: str, node: str = "", operation: str = ""):
+    """with 블록 소요 시간을 구간 히스토그램에 기록 (예외가 나도 기록)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(SPAN_METRIC, time.perf_counter() - started, span=name, node=node or "", operation=operation)
+
+
+def traced(name: str):
+    """함수 호출 전체를 구간으로 기록하는 데코레이터"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+# --- 워커 간 합산 ---
+
+def _worker_file():
+    return METRICS_DIR / f"{os.getpid()}-{int(_started_at * 1000)}.json"
+
+
+def _write_json(path, payload: dict):
+    """임시 파일에 쓴 뒤 교체 (읽는 워커가 반쯤 쓴 파일을 보지 않도록)"""
+    fd, tmp = tempfile.mkstemp(dir=str(METRICS_DIR), suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)
+
+
+def flush():
+    """이 워커의 히스토그램을 METRICS_DIR에 기록"""
+    with _lock:
+        histograms = [[metric, [list(p) for p in pairs], list(v[0]), v[1], v[2]]
+                      for (metric, pairs), v in _histograms.items()]
+    METRICS_DIR.mkdir(parents=True, exist_ok=True)
+    _write_json(_worker_file(), {"pid": os.getpid(), "started_at": _started_at, "histograms": histograms})
+
+
+def _flush_loop():
+    while True:
+        time.sleep(METRICS_FLUSH_SEC)
+        try:
+            flush()
+        except OSError as e:
+            print(f"지표 기록 오류: {e}")
+
+
+def _start_flusher():
+    global _flusher
+    with _lock:
+        if _flusher is not None:
+            return
+        _flusher = threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True)
+    _flusher.start()
+    atexit.register(flush)
+
+
+def _alive(path, pid: int) -> bool:
+    """파일을 쓴 워커가 실행 중인지 (같은 pid를 재사용한 다른 프로세스면 종료된 것으로 봄)"""
+    if pid == os.getpid():
+        return path == _worker_file()
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _read(path) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _add(total: dict, histograms: list):
+    for metric, pairs, counts, seconds, count in histograms:
+        key = (metric, tuple(tuple(p) for p in pairs))
+        entry = total.get(key)
+        if entry is None:
+            total[key] = [list(counts), seconds, count]
+            continue
+        entry[0] = [a + b for a, b in zip(entry[0], counts)]
+        entry[1] += seconds
+        entry[2] += count
+
+
+def _archive_dead(files: list):
+    """종료된 워커 파일을 archive에 더하고 삭제 (다른 워커와 겹치지 않게 파일 잠금)"""
+    try:
+        import fcntl
+    except ImportError:
+        fcntl = None
+    with open(METRICS_DIR / "archive.lock", "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        archive = _read(METRICS_DIR / _ARCHIVE) or {"histograms": []}
+        merged = {}
+        _add(merged, archive["histograms"])
+        moved = []
+        for path in files:
+            # 잠금을 기다리는 사이 다른 워커가 이미 옮겼으면 없음
+            payload = _read(path)
+            if payload is not None:
+                _add(merged, payload["histograms"])
+                moved.append(path)
+        if moved:
+            _write_json(METRICS_DIR / _ARCHIVE, {
+                "histograms": [[metric, [list(p) for p in pairs], *v] for (metric, pairs), v in merged.items()],
+            })
+            for path in moved:
+                os.remove(path)
+
+
+def _collect() -> tuple:
+    """(모든 워커 합산 히스토그램, 실행 중인 워커의 (pid, 시작 시각))"""
+    flush()
+    workers, dead = [], []
+    total = {}
+    for path in sorted(METRICS_DIR.glob("*-*.json")):
+        payload = _read(path)
+        if payload is None:
+            continue
+        if not _alive(path, payload["pid"]):
+            dead.append(path)
+            continue
+        workers.append((payload["pid"], payload["started_at"]))
+        _add(total, payload["histograms"])
+    if dead:
+        _archive_dead(dead)
+    # 종료된 워커 파일은 건너뛰었으므로 (다른 워커가 옮긴 것까지) 옮긴 뒤의 archive로 더함
+    archive = _read(METRICS_DIR / _ARCHIVE)
+    if archive is not None:
+        _add(total, archive["histograms"])
+    return total, workers
+
+
+def render() -> str:
+    """Prometheus 텍스트 형식 (text/plain; version=0.0.4), 모든 워커 합산"""
+    histograms, workers = _collect()
+    snapshot = sorted(histograms.items())
+    lines = [
+        "# HELP fl_process_start_time_seconds 워커 프로세스 시작 시각",
+        "# TYPE fl_process_start_time_seconds gauge",
+    ]
+    lines += [
+        f"fl_process_start_time_seconds{_labels([('worker', str(pid))])} {started_at:.3f}"
+        for pid, started_at in sorted(workers)
+    ]
+    previous = None
+    for (metric, pairs), (counts, total, count) in snapshot:
+        if metric != previous:
+            lines.append(f"# HELP {metric} {_HELP.get(metric, metric)}")
+            lines.append(f"# TYPE {metric} histogram")
+            previous = metric
+        base = list(pairs)
+        cumulative = 0
+        for bound, bucket in zip(METRICS_BUCKETS_SEC, counts):
+            cumulative += bucket
+            lines.append(f"{metric}_bucket{_labels(base + [('le', repr(float(bound)))])} {cumulative}")
+        lines.append(f"{metric}_bucket{_labels(base + [('le', '+Inf')])} {count}")
+        lines.append(f"{metric}_sum{_labels(base)} {total:.6f}")
+        lines.append(f"{metric}_count{_labels(base)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+# --- 샘플링 프로파일러 ---
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle(frame) -> bool:
+    if frame.f_code.co_name not in _IDLE_FUNCTIONS:
+        return False
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(_APP_DIR):
+            # 앱 코드가 기다리는 중(Docker 응답, 합쳐진 조회 등)이면 실제 소요 시간
+            return False
+        frame = frame.f_back
+    return True
+
+
+def _stack(frame, thread_name: str) -> str:
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    names.append(thread_name)
+    # folded 형식은 바깥 프레임부터
+    return ";".join(reversed(names))
+
+
+def profile(seconds: float, interval_ms: float, idle: bool = False) -> dict:
+    """seconds 동안 interval_ms마다 전체 스레드 스택을 표본 추출해 합산
+
+    idle=False면 앱 코드와 무관하게 대기 중인 스레드(스레드 풀 대기, 이벤트 루프 select) 표본은 제외한다.
+    Docker 응답 대기처럼 앱 코드 아래의 I/O 대기는 포함한다.
+    """
+    seconds = max(0.1, min(seconds, PROFILE_MAX_SEC))
+    interval = max(PROFILE_MIN_INTERVAL_MS, interval_ms) / 1000
+    if not _profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="다른 프로파일 수집이 진행 중입니다")
+    try:
+        me = threading.get_ident()
+        stacks = Counter()
+        samples = 0
+        started = time.perf_counter()
+        deadline = started + seconds
+        next_at = started
+        while True:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                if not idle and _is_idle(frame):
+                    continue
+                stacks[_stack(frame, names.get(ident, f"thread-{ident}"))] += 1
+            samples += 1
+            next_at += interval
+            now = time.perf_counter()
+            if next_at >= deadline:
+                break
+            if next_at > now:
+                time.sleep(next_at - now)
+        elapsed = time.perf_counter() - started
+    finally:
+        _profile_lock.release()
+    return {
+        "worker": str(os.getpid()),
+        "seconds": round(elapsed, 3),
+        "interval_ms": round(interval * 1000, 3),
+        "samples": samples,
+        "stacks": [{"stack": stack, "count": count} for stack, count in stacks.most_common()],
+    }
+
+
+def folded(report: dict) -> str:
+    """flamegraph.pl / speedscope 입력 형식"""
+    return "".join(f"{item['stack']} {item['count']}\n" for item in report["stacks"])
@@ -0,0 +1,101 @@
+"""모델 서빙 컨테이너 진입점 (패키징 서비스가 이미지에 복사)
+
+/app/weights의 텐서를 memory-map으로 읽고, '<layer>.weight' / '<layer>.bias'
+쌍을 순서대로 적용하는 dense 네트워크로 추론한다.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request
+from pydantic import BaseModel
+
+WEIGHTS_DIR = os.environ.get("FL_WEIGHTS_DIR", "/app/weights")
+
+with open(os.path.join(WEIGHTS_DIR, "manifest.json"), encoding="utf-8") as f:
+    MANIFEST = json.load(f)
+
+WEIGHTS = {
+    tensor["name"]: np.load(os.path.join(WEIGHTS_DIR, tensor["file"]), mmap_mode="r")
+    for tensor in MANIFEST["tensors"]
+}
+
+# 이름 순서대로 (weight, bias) 레이어 구성
+LAYERS = [
+    (WEIGHTS[name], WEIGHTS.get(name[:-len("weight")] + "bias"))
+    for name in WEIGHTS
+    if name.endswith("weight") and WEIGHTS[name].ndim == 2
+]
+
+app = FastAPI(title=f"FL model {MANIFEST['project']} {MANIFEST['version']}")
+
+# 지연 시간 히스토그램 상한(ms). 구간별 누적이 아닌 개수로 보고해 합산 가능
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+_metrics_lock = threading.Lock()
+_metrics = {"requests": 0, "errors": 0, "counts": [0] * (len(LATENCY_BUCKETS_MS) + 1)}
+_started_at = time.time()
+
+
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    if request.url.path != "/predict":
+        return await call_next(request)
+    started = time.perf_counter()
+    response = await call_next(request)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    with _metrics_lock:
+        _metrics["requests"] += 1
+        if response.status_code >= 500:
+            _metrics["errors"] += 1
+        _metrics["counts"][bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+    return response
+
+
+class PredictRequest(BaseModel):
+    inputs: list
+
+
+@app.get("/health")
+def health():
+    return {"ok": True}
+
+
+@app.get("/metadata")
+def metadata():
+    return {
+        "model_id": MANIFEST["model_id"],
+        "project": MANIFEST["project"],
+        "version": MANIFEST["version"],
+        "tensors": [{"name": t["name"], "shape": t["shape"]} for t in MANIFEST["tensors"]],
+    }
+
+
+@app.get("/metrics")
+def metrics():
+    """누적 요청 수와 지연 시간 히스토그램 (노드 관리 서버가 주기적으로 수집)"""
+    with _metrics_lock:
+        snapshot = {**_metrics, "counts": list(_metrics["counts"])}
+    return {
+        "model_id": MANIFEST["model_id"],
+        "started_at": _started_at,
+        "buckets_ms": LATENCY_BUCKETS_MS,
+        **snapshot,
+    }
+
+
+@app.post("/predict")
+def predict(request: PredictRequest):
+    if not LAYERS:
+        raise HTTPException(status_code=501, detail="dense 레이어가 없는 모델입니다")
+    x = np.asarray(request.inputs, dtype=np.float32)
+    for i, (weight, bias) in enumerate(LAYERS):
+        if x.shape[-1] != weight.shape[1]:
+            raise HTTPException(status_code=400, detail=f"입력 차원 오류: {x.shape[-1]} != {weight.shape[1]}")
+        x = x @ weight.T
+        if bias is not None:
+            x = x + bias
+        if i < len(LAYERS) - 1:
+            x = np.maximum(x, 0)
+    return {"outputs": x.tolist()}
@@ -0,0 +1,5 @@
+"""테스트 공통 설정 (앱 모듈을 config/services 최상위 패키지로 import)"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,58 @@
+"""LPT 샤드 배정 균형 테스트"""
+import itertools
+import random
+from services.assignment_service import lpt
+
+
+def _shards(sizes):
+    return [{"shard": i, "bytes": size, "rows": size // 10} for i, size in enumerate(sizes)]
+
+
+def _optimal(sizes, workers):
+    """작은 입력의 최적 최대 적재량 (전수 탐색)"""
+    best = sum(sizes)
+    for assignment in itertools.product(range(workers), repeat=len(sizes)):
+        loads = [0] * workers
+        for size, worker in zip(sizes, assignment):
+            loads[worker] += size
+        best = min(best, max(loads))
+    return best
+
+
+def test_every_shard_assigned_once():
+    shards = _shards([5, 9, 1, 7, 3, 3, 8])
+    bins = lpt(shards, 3)
+    assert [b["rank"] for b in bins] == [0, 1, 2]
+    assigned = sorted(s["shard"] for b in bins for s in b["shards"])
+    assert assigned == list(range(7))
+    assert sum(b["bytes"] for b in bins) == 36
+    assert sum(b["rows"] for b in bins) == sum(s["rows"] for s in shards)
+
+
+def test_within_four_thirds_of_optimal():
+    rng = random.Random(0)
+    for _ in range(30):
+        workers = rng.randint(2, 3)
+        sizes = [rng.randint(1, 100) for _ in range(rng.randint(workers, 7))]
+        bins = lpt(_shards(sizes), workers)
+        makespan = max(b["bytes"] for b in bins)
+        assert makespan <= 4 / 3 * _optimal(sizes, workers)
+
+
+def test_equal_shards_spread_evenly():
+    bins = lpt(_shards([10] * 12), 4)
+    assert [b["bytes"] for b in bins] == [30, 30, 30, 30]
+
+
+def test_more_workers_than_shards_leaves_empty_workers():
+    bins = lpt(_shards([4, 2]), 4)
+    assert sorted(b["bytes"] for b in bins) == [0, 0, 2, 4]
+
+
+def test_largest_shards_first_and_deterministic():
+    shards = _shards([3, 7, 7, 2])
+    first = lpt(shards, 2)
+    assert first == lpt(list(reversed(shards)), 2)
+    # 같은 크기면 샤드 번호 순
+    assert first[0]["shards"][0]["shard"] == 1
+    assert first[1]["shards"][0]["shard"] == 2
@@ -0,0 +1,76 @@
+"""노드별 차단기 half-open 시험 요청 테스트"""
+import pytest
+import requests
+from services import circuit_breaker
+
+
+class _FakeRequest:
+    url = "http://silo:2375/containers/json"
+    method = "GET"
+
+
+class _FakeApi:
+    def __init__(self, error=None):
+        self.error = error
+
+    def send(self, request, **kwargs):
+        if self.error is not None:
+            raise self.error
+        return "ok"
+
+
+def _half_open(node_id: str, error=None):
+    """차단 후 대기 시간이 지난 상태의 노드와 감싼 API"""
+    api = circuit_breaker.instrument(node_id, _FakeApi(error))
+    breaker = circuit_breaker.get(node_id)
+    breaker._open()
+    breaker.opened_at -= breaker.open_sec + 1
+    return breaker, api
+
+
+def test_connection_failure_reopens():
+    breaker, api = _half_open("cb-conn", requests.exceptions.ConnectionError("refused"))
+    with pytest.raises(requests.exceptions.ConnectionError):
+        api.send(_FakeRequest())
+    assert breaker.state == circuit_breaker.OPEN
+    assert not breaker.trial_in_flight
+
+
+def test_other_error_releases_trial():
+    breaker, api = _half_open("cb-other", requests.exceptions.InvalidHeader("bad header"))
+    with pytest.raises(requests.exceptions.InvalidHeader):
+        api.send(_FakeRequest())
+    # 연결 문제가 아니므로 차단하지 않고, 다음 요청이 다시 시험할 수 있어야 한다
+    assert breaker.state == circuit_breaker.HALF_OPEN
+    assert not breaker.trial_in_flight
+    api.error = None
+    assert api.send(_FakeRequest()) == "ok"
+    assert breaker.state == circuit_breaker.CLOSED
+
+
+def test_only_one_trial_in_flight():
+    breaker, _ = _half_open("cb-single")
+    breaker.before_call()
+    with pytest.raises(circuit_breaker.CircuitOpenError):
+        breaker.before_call()
+
+
+class _RecordingApi(_FakeApi):
+    def send(self, request, **kwargs):
+        self.timeout = kwargs.get("timeout")
+        return super().send(request, **kwargs)
+
+
+def test_long_stream_uses_caller_read_timeout_outside_breaker():
+    api = circuit_breaker.instrument("cb-stream", _RecordingApi(requests.exceptions.ReadTimeout("idle")))
+    breaker = circuit_breaker.get("cb-stream")
+    for _ in range(circuit_breaker.BREAKER_FAILURE_THRESHOLD + 1):
+        with circuit_breaker.long_stream(330):
+            with pytest.raises(requests.exceptions.ReadTimeout):
+                api.send(_FakeRequest())
+    assert api.timeout[1] == 330
+    # 출력 없는 긴 명령의 읽기 타임아웃은 노드 장애로 세지 않는다
+    assert breaker.state == circuit_breaker.CLOSED
+    api.error = None
+    api.send(_FakeRequest())
+    assert api.timeout[1] != 330
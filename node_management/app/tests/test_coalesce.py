@@ -0,0 +1,48 @@
+"""읽기 요청 합치기 결과 만료/정리 테스트"""
+import pytest
+from services import coalesce_service, node_registry
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(node_registry, "NODE_REGISTRY_DB", tmp_path / "nodes.db")
+    monkeypatch.setattr(node_registry, "_conn", None)
+    monkeypatch.setattr(node_registry, "_purged_at", 0.0)
+    monkeypatch.setattr(coalesce_service, "_results", {})
+    yield
+    if node_registry._conn is not None:
+        node_registry._conn.close()
+
+
+def _cache_keys() -> list:
+    with node_registry._conn_lock:
+        return [row[0] for row in node_registry._connection().execute("SELECT key FROM cache ORDER BY key")]
+
+
+def test_expired_results_are_evicted_on_write(registry, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(coalesce_service.time, "time", lambda: clock[0])
+    for cursor in range(5):
+        coalesce_service.fetch(f"status:page:{cursor}", lambda: cursor, ttl_sec=2)
+    assert len(coalesce_service._results) == 5
+
+    clock[0] += 3
+    value, meta = coalesce_service.fetch("status:page:9", lambda: "fresh", ttl_sec=2)
+    assert (value, meta["source"]) == ("fresh", "upstream")
+    # 만료된 페이지 결과는 다음 기록 때 워커 메모리에서 정리
+    assert list(coalesce_service._results) == ["status:page:9"]
+
+
+def test_purge_is_rate_limited_and_keeps_unexpiring_rows(registry, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(node_registry.time, "time", lambda: clock[0])
+    # 공유 캐시의 만료된 행은 CACHE_PURGE_SEC마다 기록할 때 함께 삭제
+    node_registry.cache_set("pinned", {"x": 1})
+    node_registry.cache_set("short", 1, ttl_sec=1)
+    clock[0] += 5
+    node_registry.cache_set("other", 2, ttl_sec=1)
+    # 마지막 정리 후 CACHE_PURGE_SEC가 지나지 않았으므로 그대로
+    assert _cache_keys() == ["other", "pinned", "short"]
+    clock[0] += node_registry.CACHE_PURGE_SEC
+    node_registry.cache_set("later", 3, ttl_sec=1)
+    assert _cache_keys() == ["later", "pinned"]
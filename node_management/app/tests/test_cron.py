@@ -0,0 +1,72 @@
+"""cron 식 파싱/일치 테스트"""
+from datetime import datetime
+import pytest
+from services.pipeline_service import cron_matches, parse_cron
+
+
+def test_parse_basic_fields():
+    minute, hour, dom, month, dow = parse_cron("*/15 9-17 1,15 * 1-5")
+    assert minute == {0, 15, 30, 45}
+    assert hour == set(range(9, 18))
+    assert dom == {1, 15}
+    assert month == set(range(1, 13))
+    assert dow == {1, 2, 3, 4, 5}
+
+
+def test_star_day_of_week_is_seven_days():
+    assert parse_cron("* * * * *")[4] == set(range(7))
+
+
+@pytest.mark.parametrize("field, expected", [
+    ("7", {0}),
+    ("0", {0}),
+    ("5-7", {5, 6, 0}),
+    ("0,7", {0}),
+    ("*/2", {0, 2, 4, 6}),
+])
+def test_day_of_week_seven_is_sunday(field, expected):
+    assert parse_cron(f"0 0 * * {field}")[4] == expected
+
+
+def test_step_from_start_value():
+    # a/n은 a부터 범위 끝까지 n 간격
+    assert parse_cron("5/20 * * * *")[0] == {5, 25, 45}
+
+
+@pytest.mark.parametrize("expr", [
+    "* * * *",
+    "* * * * * *",
+    "60 * * * *",
+    "* 24 * * *",
+    "* * 0 * *",
+    "* * * 13 *",
+    "* * * * 8",
+    "5-1 * * * *",
+    "*/0 * * * *",
+    "a * * * *",
+])
+def test_invalid_expressions(expr):
+    with pytest.raises(ValueError):
+        parse_cron(expr)
+
+
+def test_sunday_matches_with_zero_or_seven():
+    sunday = datetime(2024, 6, 2, 3, 0)
+    monday = datetime(2024, 6, 3, 3, 0)
+    for expr in ("0 3 * * 0", "0 3 * * 7"):
+        assert cron_matches(expr, sunday)
+        assert not cron_matches(expr, monday)
+
+
+def test_day_of_month_or_day_of_week_when_both_restricted():
+    # 둘 다 제한되면 둘 중 하나만 맞아도 실행 (1일이거나 월요일)
+    expr = "0 0 1 * 1"
+    assert cron_matches(expr, datetime(2024, 6, 1, 0, 0))   # 토요일, 1일
+    assert cron_matches(expr, datetime(2024, 6, 3, 0, 0))   # 월요일
+    assert not cron_matches(expr, datetime(2024, 6, 4, 0, 0))
+
+
+def test_minute_and_month_must_match():
+    assert cron_matches("30 12 * 6 *", datetime(2024, 6, 10, 12, 30))
+    assert not cron_matches("30 12 * 6 *", datetime(2024, 6, 10, 12, 31))
+    assert not cron_matches("30 12 * 6 *", datetime(2024, 7, 10, 12, 30))
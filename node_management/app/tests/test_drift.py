@@ -0,0 +1,79 @@
+"""드리프트 보고서 스키마 불일치 처리, 스케치 병합 저장 테스트"""
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pyarrow as pa
+import pytest
+from fastapi import HTTPException
+from services import drift_service
+from services.drift_service import CountMinSketch, KLLSketch, _report, _summary, compare
+
+
+def _numeric(values):
+    sketch = KLLSketch()
+    sketch.update(np.asarray(values, dtype=np.float64))
+    return sketch
+
+
+def _categorical(values):
+    sketch = CountMinSketch()
+    sketch.update(pa.array(values))
+    return sketch
+
+
+def test_merge_rejects_other_kind():
+    with pytest.raises(ValueError):
+        _numeric([1, 2]).merge(_categorical(["a"]))
+    with pytest.raises(ValueError):
+        _categorical(["a"]).merge(_numeric([1, 2]))
+
+
+def test_mixed_kinds_across_silos_marks_only_that_feature_unknown():
+    rng = np.random.default_rng(0)
+    stored = {
+        ("silo-1", "reference", "age"): _numeric(rng.normal(40, 5, 1000)),
+        ("silo-1", "current", "age"): _numeric(rng.normal(40, 5, 1000)),
+        ("silo-1", "reference", "zip"): _numeric([1, 2, 3]),
+        ("silo-2", "reference", "zip"): _categorical(["a", "b"]),
+        ("silo-1", "current", "zip"): _numeric([1, 2, 3]),
+    }
+    report = _report(stored, ["silo-1", "silo-2"])
+    assert report["age"]["level"] == "ok"
+    assert report["zip"]["level"] == "unknown"
+    assert "silo-2" in report["zip"]["error"]
+    assert report["zip"]["rows"] == {"reference": 5, "current": 3}
+    assert _summary(report)["level"] == "ok"
+
+
+def test_type_change_between_windows_is_unknown():
+    stored = {
+        ("silo-1", "reference", "code"): _numeric([1, 2, 3]),
+        ("silo-1", "current", "code"): _categorical(["1", "2", "3"]),
+    }
+    entry = _report(stored, ["silo-1"])["code"]
+    assert entry["level"] == "unknown"
+    assert entry["score"] is None
+    with pytest.raises(ValueError):
+        compare(stored[("silo-1", "reference", "code")], stored[("silo-1", "current", "code")])
+
+
+@pytest.fixture
+def drift_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(drift_service, "DRIFT_DB", tmp_path / "drift.db")
+    monkeypatch.setattr(drift_service, "_schema_ready", False)
+
+
+def test_concurrent_merges_keep_every_update(drift_db):
+    payload = {"age": _numeric(range(10)).to_dict()}
+    drift_service.merge_sketches("silo-1", "current", payload)
+    # 워커마다 따로 여는 연결로 같은 (노드, 구간)을 동시에 병합
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda _: drift_service.merge_sketches("silo-1", "current", payload), range(20)))
+    assert drift_service._load("silo-1", "current")[("silo-1", "current", "age")].n == 210
+
+
+def test_failed_merge_leaves_stored_sketch(drift_db):
+    drift_service.merge_sketches("silo-1", "current", {"age": _numeric([1, 2]).to_dict()})
+    with pytest.raises(HTTPException):
+        drift_service.merge_sketches("silo-1", "current", {"age": _categorical(["a"]).to_dict()})
+    stored = drift_service._load("silo-1", "current")[("silo-1", "current", "age")]
+    assert (stored.kind, stored.n) == ("kll", 2)
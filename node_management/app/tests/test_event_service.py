@@ -0,0 +1,32 @@
+"""이벤트 tail 스트림이 다른 워커의 기록을 바로 보내는지 테스트"""
+import sqlite3
+import threading
+import time
+import pytest
+from services import event_service
+
+
+@pytest.fixture
+def events_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(event_service, "EVENT_DB", tmp_path / "events.db")
+    monkeypatch.setattr(event_service, "_conn", None)
+    event_service.log("system", "시작")
+    yield tmp_path / "events.db"
+    event_service._conn.close()
+
+
+def _write_from_other_worker(path, message: str):
+    """다른 워커: 이 프로세스의 Condition을 거치지 않고 같은 파일에 기록"""
+    conn = sqlite3.connect(str(path))
+    conn.execute("INSERT INTO events (ts, kind, message) VALUES (?, 'client', ?)", (time.time(), message))
+    conn.commit()
+    conn.close()
+
+
+def test_tail_sends_other_worker_events_without_waiting_for_heartbeat(events_db):
+    stream = event_service.tail(heartbeat_sec=60)
+    threading.Timer(0.2, _write_from_other_worker, (events_db, "다른 워커")).start()
+    started = time.monotonic()
+    chunk = next(stream)
+    assert "다른 워커" in chunk
+    assert time.monotonic() - started < 5
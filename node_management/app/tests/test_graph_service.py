@@ -0,0 +1,125 @@
+"""토폴로지 그래프 diff가 워커를 옮겨도 이어지는지, 위치 저장이 서로 덮어쓰지 않는지 테스트"""
+import pytest
+from services import coalesce_service, graph_service, node_registry
+
+
+def _container(container_id: str, created: int, network: str = "bridge") -> dict:
+    return {
+        "Id": container_id * 16,
+        "Names": [f"/{container_id}"],
+        "Created": created,
+        "State": "running",
+        "Image": "flower:latest",
+        "ImageID": "sha256:flower",
+        "NetworkSettings": {"Networks": {network: {}}},
+    }
+
+
+class _Cluster:
+    def __init__(self):
+        self.hosts = {
+            "main": {"label": "central", "role": "central"},
+            "silo-1": {"label": "silo 1"},
+        }
+        self.containers = {"main": [], "silo-1": [_container("a", 1), _container("b", 2)]}
+
+    def fetch(self, key, loader, ttl_sec=None):
+        node_id = key.split(":")[1]
+        return list(self.containers[node_id]), {}
+
+
+@pytest.fixture
+def cluster(tmp_path, monkeypatch):
+    cluster = _Cluster()
+    monkeypatch.setattr(graph_service, "GRAPH_DB", tmp_path / "graph.db")
+    monkeypatch.setattr(graph_service, "GRAPH_REFRESH_SEC", 0)
+    monkeypatch.setattr(graph_service, "_conn", None)
+    monkeypatch.setattr(graph_service, "get_docker_hosts", lambda: dict(cluster.hosts))
+    monkeypatch.setattr(coalesce_service, "fetch", cluster.fetch)
+    monkeypatch.setattr(node_registry, "epoch", lambda: 1)
+    monkeypatch.setattr(node_registry, "version", lambda: len(cluster.hosts))
+    monkeypatch.setattr(node_registry, "generation", lambda name: (0, 0.0))
+    monkeypatch.setattr(node_registry, "all_health", lambda: {})
+    yield cluster
+    if graph_service._conn is not None:
+        graph_service._conn.close()
+
+
+def _hop():
+    """다른 워커: 같은 파일을 새 연결로 연다"""
+    graph_service._conn.close()
+    graph_service._conn = None
+
+
+def _ids(elements: list) -> set:
+    return {element["data"]["id"] for element in elements}
+
+
+def test_diff_survives_worker_hop(cluster):
+    first = graph_service.get_graph(detail="full")
+    assert first["reset"]
+    assert "container:silo-1:" + "a" * 16 in _ids(first["upsert"])
+
+    cluster.containers["silo-1"] = [_container("b", 2), _container("c", 3)]
+    _hop()
+    diff = graph_service.get_graph(detail="full", since=first["revision"], instance=first["instance"])
+    assert not diff["reset"]
+    assert "container:silo-1:" + "c" * 16 in _ids(diff["upsert"])
+    assert "container:silo-1:" + "b" * 16 not in _ids(diff["upsert"])
+    assert "container:silo-1:" + "a" * 16 in diff["remove"]
+
+    # 변경이 없으면 빈 diff
+    _hop()
+    same = graph_service.get_graph(detail="full", since=diff["revision"], instance=diff["instance"])
+    assert (same["reset"], same["upsert"], same["remove"]) == (False, [], [])
+
+
+def test_removed_node_is_sent_as_removals(cluster):
+    first = graph_service.get_graph(detail="full")
+    del cluster.hosts["silo-1"]
+    _hop()
+    diff = graph_service.get_graph(detail="full", since=first["revision"], instance=first["instance"])
+    assert not diff["reset"]
+    assert {"node:silo-1", "container:silo-1:" + "a" * 16, "link:main:silo-1"} <= set(diff["remove"])
+
+
+def test_positions_do_not_overwrite_each_other(cluster):
+    first = graph_service.get_graph(detail="full")
+    graph_service.save_positions({"node:main": {"x": 1, "y": 2}})
+    _hop()
+    graph_service.save_positions({"node:silo-1": {"x": 3, "y": 4}})
+    diff = graph_service.get_graph(detail="full", since=first["revision"], instance=first["instance"])
+    positions = {element["data"]["id"]: element["position"] for element in diff["upsert"]}
+    assert positions == {"node:main": {"x": 1.0, "y": 2.0}, "node:silo-1": {"x": 3.0, "y": 4.0}}
+
+    graph_service.reset_positions(["node:main"])
+    home = graph_service.get_graph(detail="nodes")
+    assert {e["data"]["id"]: e.get("position") for e in home["upsert"]}["node:main"] == {"x": 0.0, "y": 0.0}
+
+
+def test_moved_position_is_dropped_with_element(cluster):
+    graph_service.get_graph(detail="full")
+    container_id = "container:silo-1:" + "a" * 16
+    assert graph_service.save_positions({container_id: {"x": 5, "y": 5}})["saved"] == [container_id]
+    cluster.containers["silo-1"] = [_container("b", 2)]
+    graph_service.get_graph(detail="full")
+    cluster.containers["silo-1"] = [_container("a", 1), _container("b", 2)]
+    again = graph_service.get_graph(detail="full")
+    positions = {element["data"]["id"]: element.get("position") for element in again["upsert"]}
+    # 삭제 후 다시 생긴 요소는 옮긴 위치가 아니라 배정한 칸으로
+    assert positions[container_id] != {"x": 5.0, "y": 5.0}
+    assert graph_service.save_positions({"node:unknown": {"x": 0, "y": 0}})["saved"] == []
+
+
+def test_collapse_replaces_children_with_group(cluster, monkeypatch):
+    monkeypatch.setattr(graph_service, "GRAPH_COLLAPSE_CONTAINERS", 2)
+    monkeypatch.setattr(graph_service, "GRAPH_EXPAND_CONTAINERS", 1)
+    first = graph_service.get_graph()
+    assert "group:silo-1" not in _ids(first["upsert"])
+    cluster.containers["silo-1"].append(_container("c", 3))
+    _hop()
+    diff = graph_service.get_graph(since=first["revision"], instance=first["instance"])
+    assert diff["collapsed"] == ["silo-1"]
+    assert {"group:silo-1", "host:group:silo-1"} <= _ids(diff["upsert"])
+    assert "container:silo-1:" + "a" * 16 in diff["remove"]
+    assert not any(element["data"].get("kind") == "container" for element in diff["upsert"])
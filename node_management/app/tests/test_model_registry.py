@@ -0,0 +1,112 @@
+"""모델 레지스트리 청크 저장/로드 테스트"""
+import numpy as np
+import pytest
+from services import model_registry_service as registry
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, "MODEL_DB", tmp_path / "models.db")
+    monkeypatch.setattr(registry, "MODEL_TENSOR_CACHE_DIR", tmp_path / "tensors")
+    monkeypatch.setattr(registry, "MODEL_CHUNK_SIZE", 4096)
+    monkeypatch.setattr(registry, "_schema_ready", False)
+    monkeypatch.setattr(registry, "_store", registry.LocalBlobStore(tmp_path / "blobs"))
+    monkeypatch.setattr(registry.event_service, "log", lambda *args, **kwargs: None)
+    return tmp_path
+
+
+def _register(version, tensors):
+    return registry.register({"project": "p", "version": version}, tensors)
+
+
+def test_multi_chunk_tensor_is_memory_mapped(store):
+    rng = np.random.default_rng(0)
+    tensors = {"w": rng.standard_normal((64, 100)).astype(np.float32), "b": np.arange(3, dtype=np.int64)}
+    model = _register("v1", tensors)
+    loaded = registry.load_weights(model["id"])
+    for name, array in tensors.items():
+        assert isinstance(loaded[name], np.memmap)
+        np.testing.assert_array_equal(loaded[name], array)
+    assert not loaded["w"].flags.writeable
+    # 청크 목록이 같으면 같은 캐시 파일을 재사용
+    assert len(list((store / "tensors").rglob("*"))) == 2  # 디렉터리 + 파일
+    again = registry.load_weights(model["id"])
+    assert again["w"].filename == loaded["w"].filename
+
+
+def _chunks(model_id):
+    return registry.json.loads(registry._fetch(model_id)["manifest"])[0]["chunks"]
+
+
+def test_unchanged_chunks_are_shared_and_freed_by_refcount(store):
+    base = np.random.default_rng(1).standard_normal(4096).astype(np.float32)
+    first = _register("v1", {"w": base})
+    changed = base.copy()
+    changed[-1] = 1.0
+    second = _register("v2", {"w": changed})
+    # 16 KiB 텐서 = 4 청크, 마지막 청크만 새로 저장
+    assert second["stored_bytes"] == 4096
+    assert registry.get_stats()["chunks"] == 5
+
+    registry.load_weights(first["id"])
+    first_cache = registry._tensor_cache_path(_chunks(first["id"]))
+    assert first_cache.exists()
+    result = registry.remove_model(first["id"])
+    assert result["freed_chunks"] == 1
+    assert not first_cache.exists()
+    # 남은 버전은 공유 청크로 그대로 로드
+    np.testing.assert_array_equal(registry.load_weights(second["id"])["w"], changed)
+    assert registry.get_stats()["chunks"] == 4
+
+
+def test_duplicate_version_rolls_back(store):
+    _register("v1", {"w": np.ones(10)})
+    with pytest.raises(registry.HTTPException):
+        _register("v1", {"w": np.ones(20)})
+    assert registry.get_stats()["versions"] == 1
+
+
+def test_remove_unknown_model_is_404(store):
+    with pytest.raises(registry.HTTPException) as error:
+        registry.remove_model("missing")
+    assert error.value.status_code == 404
+
+
+def test_cache_file_of_removed_version_is_freed_even_if_chunks_are_shared(store):
+    base = np.random.default_rng(2).standard_normal(4096).astype(np.float32)
+    first = _register("v1", {"w": base})
+    # 같은 청크를 다른 목록으로 쓰는 버전 (청크는 하나도 고아가 되지 않음)
+    second = _register("v2", {"w": np.concatenate([base, base])})
+    registry.load_weights(first["id"])
+    registry.load_weights(second["id"])
+    first_cache = registry._tensor_cache_path(_chunks(first["id"]))
+    second_cache = registry._tensor_cache_path(_chunks(second["id"]))
+
+    assert registry.remove_model(first["id"])["freed_chunks"] == 0
+    assert not first_cache.exists()
+    assert second_cache.exists()
+
+
+class _FailingCommit:
+    """커밋만 실패하는 연결 대역"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def commit(self):
+        raise registry.sqlite3.OperationalError("disk I/O error")
+
+
+def test_chunks_survive_failed_remove_commit(store, monkeypatch):
+    weights = np.random.default_rng(3).standard_normal(4096).astype(np.float32)
+    model = _register("v1", {"w": weights})
+    connect = registry._connect
+    monkeypatch.setattr(registry, "_connect", lambda: _FailingCommit(connect()))
+    with pytest.raises(registry.sqlite3.OperationalError):
+        registry.remove_model(model["id"])
+    monkeypatch.setattr(registry, "_connect", connect)
+    # 롤백된 메타데이터가 가리키는 청크가 그대로 있어야 한다
+    np.testing.assert_array_equal(registry.load_weights(model["id"])["w"], weights)
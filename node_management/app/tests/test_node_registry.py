@@ -0,0 +1,116 @@
+"""노드 레지스트리 라벨 선택자와 커서 페이지 조회 테스트"""
+import pytest
+from services import node_registry
+
+
+def _servers():
+    servers = {}
+    for i in range(25):
+        labels = {"region": ["kr", "us", "eu"][i % 3], "hw": "gpu" if i % 4 == 0 else "cpu"}
+        if i % 5 == 0:
+            labels["deprecated"] = "true"
+        # 표시 이름이 겹치는 노드가 있어야 (정렬 값, id) 순서가 검증된다
+        servers[f"silo-{i:02d}"] = {"label": f"site-{i % 6}", "labels": labels}
+    servers["main"] = {"label": "central", "role": "server"}
+    return servers
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    servers = _servers()
+    monkeypatch.setattr(node_registry, "NODE_REGISTRY_DB", tmp_path / "nodes.db")
+    monkeypatch.setattr(node_registry, "SERVERS_FILE", tmp_path / "servers.yaml")
+    monkeypatch.setattr(node_registry, "load_servers", lambda: dict(servers))
+    monkeypatch.setattr(node_registry, "_conn", None)
+    yield servers
+    if node_registry._conn is not None:
+        node_registry._conn.close()
+
+
+def _all_pages(requirements, sort, descending, limit):
+    ids, cursor = [], None
+    while True:
+        page, cursor = node_registry.query(requirements, sort, descending, cursor, limit)
+        assert len(page) <= limit
+        ids += [node_id for node_id, _ in page]
+        if cursor is None:
+            return ids
+
+
+def _matches(labels: dict, requirements) -> bool:
+    for key, op, values in requirements:
+        if op == "exists" and key not in labels:
+            return False
+        if op == "!exists" and key in labels:
+            return False
+        if op == "in" and labels.get(key) not in values:
+            return False
+        if op == "notin" and key in labels and labels[key] in values:
+            return False
+    return True
+
+
+def _expected(servers, requirements, sort, descending):
+    positions = {node_id: i for i, node_id in enumerate(servers)}
+    sort_value = {
+        "position": lambda node_id: positions[node_id],
+        "id": lambda node_id: node_id,
+        "label": lambda node_id: servers[node_id].get("label", node_id),
+    }[sort]
+    ids = [node_id for node_id, info in servers.items() if _matches(info.get("labels", {}), requirements)]
+    return sorted(ids, key=lambda node_id: (sort_value(node_id), node_id), reverse=descending)
+
+
+def test_parse_selector_operators():
+    assert node_registry.parse_selector("region=kr, site!=a,hw in (gpu, cpu),arch notin (arm),gpu,!deprecated") == [
+        ("region", "in", ["kr"]),
+        ("site", "notin", ["a"]),
+        ("hw", "in", ["gpu", "cpu"]),
+        ("arch", "notin", ["arm"]),
+        ("gpu", "exists", []),
+        ("deprecated", "!exists", []),
+    ]
+    assert node_registry.parse_selector("zone==a.b/c-1") == [("zone", "in", ["a.b/c-1"])]
+    assert node_registry.parse_selector("") == []
+    assert node_registry.parse_selector(None) == []
+
+
+@pytest.mark.parametrize("selector", ["!region=kr", "hw in ()", "hw in (gpu,", "region=", "=kr", "a b", "hw in (g pu)"])
+def test_parse_selector_rejects(selector):
+    with pytest.raises(ValueError):
+        node_registry.parse_selector(selector)
+
+
+def test_cursor_round_trip():
+    for sort, value in (("position", 3), ("id", "silo-03"), ("label", "사이트 한글")):
+        cursor = node_registry.encode_cursor(sort, value, "silo-03")
+        assert "=" not in cursor
+        assert node_registry.decode_cursor(cursor, sort) == (value, "silo-03")
+
+
+def test_cursor_rejects_other_sort_and_garbage():
+    cursor = node_registry.encode_cursor("label", "site-1", "silo-01")
+    with pytest.raises(ValueError):
+        node_registry.decode_cursor(cursor, "id")
+    with pytest.raises(ValueError):
+        node_registry.decode_cursor("not-a-cursor", "id")
+
+
+@pytest.mark.parametrize("sort", sorted(node_registry.SORT_KEYS))
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("selector", ["", "region=kr", "hw in (gpu),!deprecated", "region!=us,deprecated"])
+def test_query_pages_cover_each_node_once(registry, sort, descending, selector):
+    requirements = node_registry.parse_selector(selector)
+    ids = _all_pages(requirements, sort, descending, limit=4)
+    assert ids == _expected(registry, requirements, sort, descending)
+
+
+def test_query_last_page_has_no_cursor(registry):
+    page, cursor = node_registry.query(limit=len(registry))
+    assert len(page) == len(registry)
+    assert cursor is None
+
+
+def test_query_rejects_unknown_sort(registry):
+    with pytest.raises(ValueError):
+        node_registry.query(sort="created")
@@ -0,0 +1,83 @@
+"""파이프라인 DAG 실행 테스트 (변경 없는 데이터의 후속 작업 건너뛰기, 같은 작업 겹침 방지)"""
+from types import SimpleNamespace
+import pytest
+from services import catalog_service, event_service, pipeline_service
+
+
+class _FakeMinio:
+    """버킷 하나에 객체 목록만 있는 MinIO 대역"""
+
+    def __init__(self):
+        self.objects = {"data/a.csv": "e1", "data/b.csv": "e2"}
+
+    def list_buckets(self):
+        return [SimpleNamespace(name="raw")]
+
+    def list_objects(self, bucket, recursive=True):
+        return [
+            SimpleNamespace(object_name=key, etag=f'"{etag}"', size=10, is_dir=False, last_modified=None)
+            for key, etag in sorted(self.objects.items())
+        ]
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    minio = _FakeMinio()
+    calls = []
+    monkeypatch.setattr(pipeline_service, "PIPELINE_DB", tmp_path / "pipeline.db")
+    monkeypatch.setattr(pipeline_service, "_schema_ready", False)
+    monkeypatch.setattr(catalog_service, "CATALOG_DB", tmp_path / "catalog.db")
+    monkeypatch.setattr(catalog_service, "_schema_ready", False)
+    monkeypatch.setattr(catalog_service, "get_minio_client", lambda node_id: minio)
+    monkeypatch.setattr(pipeline_service, "get_docker_hosts", lambda: {"silo-1": {"minio_url": "http://minio"}})
+    monkeypatch.setattr(event_service, "log", lambda *args, **kwargs: None)
+    monkeypatch.setitem(pipeline_service._EXECUTORS, "container", lambda spec, silo: calls.append(silo) or {})
+
+    pipeline_service.add_job(SimpleNamespace(
+        id="ingest", name="ingest", schedule="0 * * * *", depends_on=[], target_silo="silo-1", kind="ingest", spec={},
+    ))
+    pipeline_service.add_job(SimpleNamespace(
+        id="train-prep", name="train-prep", schedule="0 * * * *", depends_on=["ingest"], target_silo="silo-1",
+        kind="container", spec={"image": "prep:latest"},
+    ))
+    return SimpleNamespace(minio=minio, calls=calls)
+
+
+def _states(trigger_id: str) -> dict:
+    return {run["job_id"]: run["state"] for run in pipeline_service.list_runs() if run["trigger_id"] == trigger_id}
+
+
+def test_unchanged_ingest_skips_downstream(pipeline):
+    pipeline_service._execute("first", None, False)
+    assert _states("first") == {"ingest": "done", "train-prep": "done"}
+
+    # 동기화 시각만 바뀌고 객체는 그대로
+    pipeline_service._execute("second", None, False)
+    assert _states("second") == {"ingest": "done", "train-prep": "skipped"}
+    assert pipeline.calls == ["silo-1"]
+
+    pipeline.minio.objects["data/b.csv"] = "e3"
+    pipeline_service._execute("third", None, False)
+    assert _states("third") == {"ingest": "done", "train-prep": "done"}
+    assert pipeline.calls == ["silo-1", "silo-1"]
+
+
+def test_running_run_blocks_same_job_and_silo(pipeline):
+    held = pipeline_service._claim_run("other", "train-prep", "silo-1", "x")
+    assert held is not None
+    assert pipeline_service._claim_run("mine", "train-prep", "silo-1", "x") is None
+    # 다른 사일로/작업은 겹쳐도 실행
+    assert pipeline_service._claim_run("mine", "train-prep", "silo-2", "x") is not None
+    assert pipeline_service._running_jobs() == {"train-prep"}
+    pipeline_service._finish_run(held, "done", output="x")
+    assert pipeline_service._claim_run("mine", "train-prep", "silo-1", "x") is not None
+
+
+def test_setup_error_is_recorded_as_failed(pipeline, monkeypatch):
+    def broken(job, spec, silo):
+        raise OSError("input unavailable")
+
+    monkeypatch.setattr(pipeline_service, "_input_fingerprint", broken)
+    pipeline_service._execute("broken", None, False)
+    assert _states("broken") == {"ingest": "failed", "train-prep": "blocked"}
+    assert pipeline_service._running_jobs() == set()
@@ -0,0 +1,17 @@
+"""라운드 실행 슬롯이 호스트 이름이 아니라 Docker 데몬별로 나뉘는지 테스트"""
+from services import docker_service, round_service
+
+
+def test_launch_slots_are_per_docker_daemon(monkeypatch):
+    hosts = {
+        "silo-1": {"base_url": "tcp://localhost:2376"},
+        "silo-2": {"base_url": "tcp://localhost:2377"},
+        "silo-3": {"base_url": "tcp://localhost:2376"},
+        "main": {"base_url": "unix:///var/run/docker.sock"},
+    }
+    monkeypatch.setattr(docker_service, "get_docker_hosts", lambda: hosts)
+    monkeypatch.setattr(round_service, "_host_slots", {})
+    # 같은 호스트라도 포트가 다르면 다른 데몬
+    assert round_service._host_slot("silo-1") is not round_service._host_slot("silo-2")
+    assert round_service._host_slot("silo-1") is round_service._host_slot("silo-3")
+    assert round_service._host_slot("main") is not round_service._host_slot("silo-1")
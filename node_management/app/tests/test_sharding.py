@@ -0,0 +1,115 @@
+"""Jump hash와 재샤딩 이동량 테스트"""
+import pyarrow as pa
+import pyarrow.parquet as pq
+from services import sharding_service
+from services.sharding_service import jump_hash
+
+
+def _shard(tmp_path, num_shards, rows=4000):
+    source = tmp_path / "input.parquet"
+    pq.write_table(pa.table({
+        "id": [f"user-{i}" for i in range(rows)],
+        "label": [i % 3 for i in range(rows)],
+    }), source)
+    job = sharding_service._new_job(
+        "shard", None, input_uri=str(source), output_uri=str(tmp_path / "shards"),
+        num_shards=num_shards, mode="hash", key_column="id", label_column="label",
+    )
+    sharding_service.shard_dataset(job)
+    assert job["state"] == "done", job.get("error")
+    return job["manifest"]
+
+
+def _reshard(tmp_path, num_shards):
+    job = sharding_service._new_job("reshard", None, output_uri=str(tmp_path / "shards"), num_shards=num_shards)
+    sharding_service.reshard_dataset(job)
+    assert job["state"] == "done", job.get("error")
+    return job
+
+
+def _assignments(manifest) -> dict:
+    """id -> 실제로 들어 있는 샤드 번호"""
+    placed = {}
+    for entry in manifest["shards"]:
+        for f in entry["files"]:
+            for row_id in pq.read_table(f["path"], columns=["id"])["id"].to_pylist():
+                assert row_id not in placed, f"{row_id} 중복"
+                placed[row_id] = entry["shard"]
+    return placed
+
+
+def test_jump_hash_in_range_and_deterministic():
+    for key in range(1000):
+        bucket = jump_hash(key * 7919, 13)
+        assert 0 <= bucket < 13
+        assert jump_hash(key * 7919, 13) == bucket
+    assert jump_hash(12345, 1) == 0
+
+
+def test_jump_hash_only_moves_keys_to_new_bucket():
+    keys = [sharding_service._key_of(f"user-{i}") for i in range(20000)]
+    for n in (1, 4, 10):
+        moved = 0
+        for key in keys:
+            before, after = jump_hash(key, n), jump_hash(key, n + 1)
+            if before != after:
+                assert after == n
+                moved += 1
+        # 기대 이동 비율 1/(n+1)
+        assert abs(moved / len(keys) - 1 / (n + 1)) < 0.02
+
+
+def test_reshard_up_moves_only_expected_fraction(tmp_path):
+    _shard(tmp_path, 4)
+    job = _reshard(tmp_path, 5)
+    manifest = job["manifest"]
+    assert manifest["num_shards"] == 5 and manifest["generation"] == 1
+    assert job["rows"] == 4000
+    # 새 샤드로 옮겨갈 행(약 1/5)만 이동
+    assert 0.15 < job["moved_rows"] / 4000 < 0.25
+    placed = _assignments(manifest)
+    assert len(placed) == 4000
+    for row_id, shard in placed.items():
+        assert shard == jump_hash(sharding_service._key_of(row_id), 5)
+    assert sum(entry["rows"] for entry in manifest["shards"]) == 4000
+    assert manifest["shards"][4]["rows"] == job["moved_rows"]
+
+
+def test_reshard_down_keeps_surviving_files(tmp_path):
+    before = _shard(tmp_path, 5)
+    kept = {entry["shard"]: [f["path"] for f in entry["files"]] for entry in before["shards"][:4]}
+    job = _reshard(tmp_path, 4)
+    manifest = job["manifest"]
+    # 없어지는 샤드의 행만 이동
+    assert job["moved_rows"] == before["shards"][4]["rows"]
+    assert job["rewritten_shards"] == []
+    for entry in manifest["shards"]:
+        paths = [f["path"] for f in entry["files"]]
+        assert paths[:len(kept[entry["shard"]])] == kept[entry["shard"]]
+    placed = _assignments(manifest)
+    assert len(placed) == 4000
+    for row_id, shard in placed.items():
+        assert shard == jump_hash(sharding_service._key_of(row_id), 4)
+
+
+def test_reshard_rejects_stratified(tmp_path):
+    source = tmp_path / "input.parquet"
+    pq.write_table(pa.table({"id": ["a", "b"], "label": [0, 1]}), source)
+    job = sharding_service._new_job(
+        "shard", None, input_uri=str(source), output_uri=str(tmp_path / "shards"),
+        num_shards=2, mode="stratified", key_column="id", label_column="label",
+    )
+    sharding_service.shard_dataset(job)
+    job = sharding_service._new_job("reshard", None, output_uri=str(tmp_path / "shards"), num_shards=3)
+    sharding_service.reshard_dataset(job)
+    assert job["state"] == "failed"
+    assert "재샤딩" in job["error"]
+
+
+def test_key_of_uses_normalized_sha256_prefix():
+    # 정규화 ID(SHA-256 hex)는 앞 16자리를 그대로 키로 사용
+    assert sharding_service._key_of("a" * 64) == int("a" * 16, 16)
+    # 그 밖의 값은 해시 후 같은 방식
+    assert sharding_service._key_of("user-1") == sharding_service._key_of(
+        sharding_service.hashlib.sha256(b"user-1").hexdigest()
+    )
@@ -11,8 +11,41 @@ async function handleResponse(response) {
   return response.json();
 }
 
+// 조건부 GET 캐시: URL -> { etag, body, nextCursor } (오래된 항목부터 정리)
+const MAX_CACHED_RESPONSES = 100;
+const responseCache = new Map();
+
+/** ETag가 있으면 If-None-Match로 조회하고 304면 캐시한 본문 재사용 */
+async function conditionalGet(endpoint) {
+  const url = `${API_BASE}${endpoint}`;
+  const cached = responseCache.get(url);
+  const response = await fetch(url, cached ? { headers: { 'If-None-Match': cached.etag } } : undefined);
+  if (response.status === 304 && cached) {
+    // 최근 사용 순서 유지
+    responseCache.delete(url);
+    responseCache.set(url, cached);
+    return cached;
+  }
+  const body = await handleResponse(response);
+  const entry = { etag: response.headers.get('ETag'), body, nextCursor: response.headers.get('X-Next-Cursor') };
+  responseCache.delete(url);
+  if (entry.etag) {
+    responseCache.set(url, entry);
+    if (responseCache.size > MAX_CACHED_RESPONSES) {
+      responseCache.delete(responseCache.keys().next().value);
+    }
+  }
+  return entry;
+}
+
 export async function apiGet(endpoint) {
-  return handleResponse(await fetch(`${API_BASE}${endpoint}`));
+  return (await conditionalGet(endpoint)).body;
+}
+
+/** 커서 페이지 조회: { items, nextCursor } (다음 페이지 커서는 X-Next-Cursor 헤더) */
+export async function apiGetPage(endpoint) {
+  const { body, nextCursor } = await conditionalGet(endpoint);
+  return { items: body, nextCursor };
 }
 
 export async function apiPost(endpoint, data) {
@@ -0,0 +1,22 @@
+/** 토폴로지 그래프 API 호출 */
+import { apiGet, apiPost } from './client.js';
+
+/** { nodes, detail, expand, since, instance } -> { instance, revision, reset, upsert, remove, collapsed } */
+export async function getGraph(params = {}) {
+  const query = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined && value !== null && value !== '') {
+      query.set(key, Array.isArray(value) ? value.join(',') : value);
+    }
+  });
+  const search = query.toString();
+  return apiGet(`/api/graph${search ? `?${search}` : ''}`);
+}
+
+export async function saveGraphPositions(positions) {
+  return apiPost('/api/graph/positions', { positions });
+}
+
+export async function resetGraphPositions(ids) {
+  return apiPost('/api/graph/positions/reset', { ids });
+}
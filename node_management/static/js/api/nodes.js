@@ -1,12 +1,34 @@
 /** 서버 관련 API 호출 */
-import { apiGet, apiPost, apiPut, apiDelete } from './client.js';
+import { apiGet, apiGetPage, apiPost, apiPut, apiDelete } from './client.js';
+
+/** params: { selector, sort, cursor, limit, fields } 중 필요한 것만 */
+function query(params = {}) {
+  const search = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined && value !== null && value !== '') search.set(key, value);
+  });
+  const text = search.toString();
+  return text ? `?${text}` : '';
+}
+
+export async function getNodes(params) {
+  return apiGet(`/api/nodes${query(params)}`);
+}
+
+export async function getNodesPage(params) {
+  return apiGetPage(`/api/nodes${query(params)}`);
+}
+
+export async function getNodesStatus(params) {
+  return apiGet(`/api/nodes/status${query(params)}`);
+}
 
-export async function getNodes() {
-  return apiGet('/api/nodes');
+export async function getNodesStatusPage(params) {
+  return apiGetPage(`/api/nodes/status${query(params)}`);
 }
 
-export async function getNodesStatus() {
-  return apiGet('/api/nodes/status');
+export async function getNodeLabels() {
+  return apiGet('/api/nodes/labels');
 }
 
 export async function getNode(nodeId) {
@@ -0,0 +1,73 @@
+/** 그래프 diff 적용 유틸리티
+ *
+ * 서버(/api/graph)가 요소 id와 위치를 정해 주므로 매번 다시 그리거나 레이아웃을 돌리지 않고
+ * 직전 revision 이후 바뀐 요소만 기존 Cytoscape 인스턴스에 반영한다.
+ */
+import { getGraph, saveGraphPositions } from '../../api/graph.js';
+
+export function createGraphState() {
+  return { instance: null, revision: null, viewKey: null, requests: 0 };
+}
+
+/** 그래프 인스턴스를 새로 만들면 다음 요청은 전체 요소를 받도록 초기화 */
+export function resetGraphState(state) {
+  state.instance = null;
+  state.revision = null;
+  state.viewKey = null;
+}
+
+/** 같은 보기(노드 목록/detail)면 변경분만 요청, 더 최근 요청이 있으면 null */
+export async function fetchGraphDiff(state, params) {
+  const viewKey = JSON.stringify(params);
+  const token = ++state.requests;
+  const incremental = state.viewKey === viewKey && state.revision !== null;
+  const diff = await getGraph(incremental ? { ...params, since: state.revision, instance: state.instance } : params);
+  if (token !== state.requests) return null;
+  diff.viewKey = viewKey;
+  return diff;
+}
+
+/** diff를 인스턴스에 반영하고 다음 요청 기준 revision 기록 */
+export function applyGraphDiff(cy, state, diff, decorate) {
+  cy.batch(() => {
+    if (diff.reset) {
+      cy.elements().remove();
+    }
+    diff.remove.forEach(id => cy.getElementById(id).remove());
+    diff.upsert.forEach(element => {
+      const data = decorate ? decorate({ ...element.data }) : element.data;
+      const existing = cy.getElementById(data.id);
+      if (existing.empty()) {
+        cy.add({ group: element.group, data, position: element.position });
+        return;
+      }
+      if (existing.isEdge()) {
+        if (existing.data('source') !== data.source || existing.data('target') !== data.target) {
+          existing.move({ source: data.source, target: data.target });
+        }
+      } else {
+        // 서버에서 빠진 속성(해소된 오류 등)은 지움
+        const stale = Object.keys(existing.data()).filter(key => key !== 'id' && !(key in data));
+        if (stale.length > 0) existing.removeData(stale.join(' '));
+        // 사용자가 끌고 있는 노드는 위치를 덮어쓰지 않음
+        if (element.position && !existing.grabbed()) existing.position(element.position);
+      }
+      existing.data(data);
+    });
+  });
+  state.instance = diff.instance;
+  state.revision = diff.revision;
+  state.viewKey = diff.viewKey;
+}
+
+/** 옮긴 노드 위치를 서버에 저장 (다른 대시보드에도 다음 diff로 반영) */
+export function bindPositionSaving(cy) {
+  cy.on('dragfree', 'node', function(evt) {
+    const node = evt.target;
+    saveGraphPositions({ [node.id()]: node.position() }).catch(error => {
+      console.error('그래프 위치 저장 오류:', error);
+    });
+  });
+}
+
+export const PRESET_LAYOUT = { name: 'preset', fit: true, padding: 40 };
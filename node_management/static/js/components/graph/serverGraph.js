@@ -1,12 +1,232 @@
 /** 서버 그래프 렌더링 컴포넌트 */
+import { resetGraphPositions } from '../../api/graph.js';
+import {
+  createGraphState, resetGraphState, fetchGraphDiff, applyGraphDiff, bindPositionSaving, PRESET_LAYOUT
+} from './graphPatch.js';
+
 let serverCy = null; // 서버 그래프 인스턴스
+const serverGraphState = createGraphState();
 
 // 상태 아이콘 매핑 함수
 function getServerStatusIcon(status) {
   return status === 'online' ? '✓' : '✗';
 }
 
-export function renderServerGraph(servers) {
+function decorateServer(data) {
+  data.statusIcon = getServerStatusIcon(data.status);
+  return data;
+}
+
+function destroyServerGraph() {
+  if (serverCy) {
+    serverCy.destroy();
+    serverCy = null;
+  }
+  resetGraphState(serverGraphState);
+}
+
+function createServerGraph(container) {
+  container.innerHTML = '';
+  // 요소 위치는 서버가 정해 주므로 preset 레이아웃
+  serverCy = cytoscape({
+    container: container,
+    elements: [],
+    style: [
+      {
+        selector: 'node',
+        style: {
+          'label': function(ele) {
+            const icon = ele.data('statusIcon') || '?';
+            const label = ele.data('label') || '';
+            return `${icon} ${label}`;
+          },
+          'text-valign': 'center',
+          'text-halign': 'center',
+          'width': 'label',
+          'height': 'label',
+          'shape': 'roundrectangle',
+          'min-width': '140px',
+          'min-height': '60px',
+          'padding': '12px 16px',
+          'background-color': '#FFFFFF',
+          'border-width': '1px',
+          'border-color': function(ele) {
+            const status = ele.data('status');
+            const role = ele.data('role');
+            if (role === 'central') {
+              return status === 'online' ? '#4B5563' : '#EA4335';
+            }
+            if (status === 'online') {
+              return '#60A5FA'; // 연파랑 (기존: #34A853)
+            } else if (status === 'offline') {
+              return '#EA4335'; // Kubeflow 실패 테두리 (정확한 색상)
+            }
+            return '#9E9E9E'; // 대기 상태
+          },
+          'border-radius': '8px',
+          'color': '#1F2937',
+          'font-size': '13px',
+          'font-weight': '500',
+          'font-family': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif',
+          'text-wrap': 'wrap',
+          'text-max-width': '120px',
+          'text-margin-y': '0px',
+          'overlay-opacity': 0,
+          'transition-property': 'border-width, border-color, background-color, transform',
+          'transition-duration': '0.2s',
+          'transition-timing-function': 'ease-in-out'
+        }
+      },
+      {
+        selector: 'node[isCentral = true]',
+        style: {
+          'label': function(ele) {
+            const icon = ele.data('statusIcon') || '?';
+            const label = ele.data('label') || '';
+            return `${icon} ${label}`;
+          },
+          'background-color': '#FFFFFF',
+          'border-width': '1.5px',
+          'border-color': function(ele) {
+            const status = ele.data('status');
+            return status === 'online' ? '#4B5563' : '#EA4335';
+          },
+          'min-width': '160px',
+          'min-height': '70px',
+          'font-size': '14px',
+          'font-weight': '600',
+          'padding': '14px 18px'
+        }
+      },
+      {
+        selector: 'node:active',
+        style: {
+          'border-width': '1.5px',
+          'transform': 'scale(0.98)',
+          'transition-duration': '0.1s'
+        }
+      },
+      {
+        selector: 'node:hover',
+        style: {
+          'border-width': '1.5px',
+          'border-color': function(ele) {
+            const status = ele.data('status');
+            const role = ele.data('role');
+            if (role === 'central') {
+              return status === 'online' ? '#4B5563' : '#EA4335';
+            }
+            if (status === 'online') {
+              return '#60A5FA';
+            } else if (status === 'offline') {
+              return '#EA4335';
+            }
+            return '#9E9E9E';
+          },
+          'transition-duration': '0.15s',
+          'box-shadow': '0 4px 12px rgba(0, 0, 0, 0.15)'
+        }
+      },
+      {
+        selector: 'node:selected',
+        style: {
+          'border-width': '2px',
+          'border-color': function(ele) {
+            const status = ele.data('status');
+            const role = ele.data('role');
+            if (role === 'central') {
+              return status === 'online' ? '#4B5563' : '#EA4335';
+            }
+            if (status === 'online') {
+              return '#60A5FA';
+            } else if (status === 'offline') {
+              return '#EA4335';
+            }
+            return '#9E9E9E';
+          },
+          'background-color': '#FFFFFF',
+          'z-index': 1000,
+          'box-shadow': '0 6px 16px rgba(0, 0, 0, 0.2)'
+        }
+      },
+      {
+        selector: 'edge',
+        style: {
+          'width': 1,
+          'line-color': '#9CA3AF', // Kubeflow 기본 엣지 색상
+          'line-style': 'solid',
+          'target-arrow-shape': 'triangle',
+          'target-arrow-color': '#9CA3AF',
+          'target-arrow-size': '8px',
+          'target-arrow-fill': 'filled',
+          'curve-style': 'bezier',
+          'control-point-distances': [0, -20],
+          'control-point-weights': [0.25, 0.75],
+          'opacity': 0.6,
+          'transition-property': 'width, line-color, opacity',
+          'transition-duration': '0.2s'
+        }
+      },
+      {
+        selector: 'edge:hover',
+        style: {
+          'width': 1.5,
+          'line-color': '#6366F1',
+          'target-arrow-color': '#6366F1',
+          'opacity': 0.9
+        }
+      },
+      {
+        selector: 'edge:selected',
+        style: {
+          'width': 1.5,
+          'line-color': '#6366F1',
+          'target-arrow-color': '#6366F1',
+          'opacity': 1
+        }
+      }
+    ],
+    layout: PRESET_LAYOUT
+  });
+
+  // 그래프 배경 설정 (Kubeflow 스타일)
+  container.style.background = '#FAFBFC';
+  container.style.border = '1px solid #E5E7EB';
+  container.style.borderRadius = '8px';
+
+  // 노드 클릭 이벤트는 외부에서 설정 (showServerDetailsPanel 함수 필요)
+  serverCy.on('tap', 'node', function(evt) {
+    const node = evt.target;
+    const data = node.data();
+    
+    // 다른 노드 선택 해제
+    serverCy.elements().removeClass('selected');
+    // 현재 노드 선택
+    node.addClass('selected');
+    // 연결된 엣지 선택
+    node.connectedEdges().addClass('selected');
+    
+    // 상세 정보 패널 표시 (외부 함수 호출)
+    if (window.showServerDetailsPanel) {
+      window.showServerDetailsPanel(data);
+    }
+  });
+
+  // 배경 클릭 시 패널 닫기
+  serverCy.on('tap', function(evt) {
+    if (evt.target === serverCy) {
+      serverCy.elements().removeClass('selected');
+      if (window.closeServerDetailsPanel) {
+        window.closeServerDetailsPanel();
+      }
+    }
+  });
+
+  bindPositionSaving(serverCy);
+}
+
+/** 서버 목록으로 빈 상태를 판단하고, 그래프는 /api/graph 변경분만 받아 반영 */
+export async function renderServerGraph(servers) {
   const container = document.getElementById('serverCy');
   
   if (!container) {
@@ -14,14 +234,9 @@ export function renderServerGraph(servers) {
     return;
   }
 
-  // 기존 그래프 제거
-  if (serverCy) {
-    serverCy.destroy();
-    serverCy = null;
-  }
-
   // 서버가 없을 때 처리
   if (!servers || servers.length === 0) {
+    destroyServerGraph();
     container.innerHTML = `
       <div class="graph-empty-state">
         <i class="fas fa-server" style="font-size: 4rem; color: #9ca3af; margin-bottom: 1.5rem;"></i>
@@ -38,22 +253,18 @@ export function renderServerGraph(servers) {
 
   // Cytoscape가 로드되지 않았을 때 처리
   if (typeof cytoscape === 'undefined') {
+    destroyServerGraph();
     container.innerHTML = '<div style="padding: 20px; text-align: center; color: #f00;">Cytoscape.js 라이브러리를 로드할 수 없습니다.</div>';
     console.error('Cytoscape.js가 로드되지 않았습니다.');
     return;
   }
 
-  // cytoscape-dagre 플러그인 등록 (사용 가능한 경우)
-  if (typeof cytoscapeDagre !== 'undefined') {
-    cytoscape.use(cytoscapeDagre);
-  }
-
   // 중앙 서버와 클라이언트 서버 분리
-  const centralServer = servers.find(s => s.role === 'central');
   const clientServers = servers.filter(s => s.role !== 'central');
 
   // 클라이언트 서버가 없을 때 처리 (실무 패턴: 조건부 빈 상태)
   if (clientServers.length === 0) {
+    destroyServerGraph();
     container.innerHTML = `
       <div class="graph-empty-state">
         <i class="fas fa-network-wired" style="font-size: 4rem; color: #9ca3af; margin-bottom: 1.5rem;"></i>
@@ -71,271 +282,43 @@ export function renderServerGraph(servers) {
     return;
   }
 
-  // 노드 데이터 생성
-  const nodes = servers.map(s => ({
-    data: {
-      id: s.id,
-      label: s.label || s.id,
-      status: s.status,
-      statusIcon: getServerStatusIcon(s.status),
-      type: s.type || 'remote',
-      role: s.role || 'client',
-      fullId: s.id,
-      base_url: s.base_url || '',
-      isCentral: s.role === 'central'
-    }
-  }));
-
-  // 엣지 생성: 중앙 서버 → 클라이언트 서버
-  const edges = [];
-  if (centralServer && clientServers.length > 0) {
-    clientServers.forEach(client => {
-      edges.push({
-        data: {
-          id: `edge-${centralServer.id}-${client.id}`,
-          source: centralServer.id,
-          target: client.id
-        }
-      });
-    });
+  if (!serverCy) {
+    resetGraphState(serverGraphState);
   }
 
   try {
-    // Cytoscape 초기화
-    serverCy = cytoscape({
-      container: container,
-      elements: [...nodes, ...edges],
-      style: [
-        {
-          selector: 'node',
-          style: {
-            'label': function(ele) {
-              const icon = ele.data('statusIcon') || '?';
-              const label = ele.data('label') || '';
-              return `${icon} ${label}`;
-            },
-            'text-valign': 'center',
-            'text-halign': 'center',
-            'width': 'label',
-            'height': 'label',
-            'shape': 'roundrectangle',
-            'min-width': '140px',
-            'min-height': '60px',
-            'padding': '12px 16px',
-            'background-color': '#FFFFFF',
-            'border-width': '1px',
-            'border-color': function(ele) {
-              const status = ele.data('status');
-              const role = ele.data('role');
-              if (role === 'central') {
-                return status === 'online' ? '#4B5563' : '#EA4335';
-              }
-              if (status === 'online') {
-                return '#60A5FA'; // 연파랑 (기존: #34A853)
-              } else if (status === 'offline') {
-                return '#EA4335'; // Kubeflow 실패 테두리 (정확한 색상)
-              }
-              return '#9E9E9E'; // 대기 상태
-            },
-            'border-radius': '8px',
-            'color': '#1F2937',
-            'font-size': '13px',
-            'font-weight': '500',
-            'font-family': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif',
-            'text-wrap': 'wrap',
-            'text-max-width': '120px',
-            'text-margin-y': '0px',
-            'overlay-opacity': 0,
-            'transition-property': 'border-width, border-color, background-color, transform',
-            'transition-duration': '0.2s',
-            'transition-timing-function': 'ease-in-out'
-          }
-        },
-        {
-          selector: 'node[isCentral = true]',
-          style: {
-            'label': function(ele) {
-              const icon = ele.data('statusIcon') || '?';
-              const label = ele.data('label') || '';
-              return `${icon} ${label}`;
-            },
-            'background-color': '#FFFFFF',
-            'border-width': '1.5px',
-            'border-color': function(ele) {
-              const status = ele.data('status');
-              return status === 'online' ? '#4B5563' : '#EA4335';
-            },
-            'min-width': '160px',
-            'min-height': '70px',
-            'font-size': '14px',
-            'font-weight': '600',
-            'padding': '14px 18px'
-          }
-        },
-        {
-          selector: 'node:active',
-          style: {
-            'border-width': '1.5px',
-            'transform': 'scale(0.98)',
-            'transition-duration': '0.1s'
-          }
-        },
-        {
-          selector: 'node:hover',
-          style: {
-            'border-width': '1.5px',
-            'border-color': function(ele) {
-              const status = ele.data('status');
-              const role = ele.data('role');
-              if (role === 'central') {
-                return status === 'online' ? '#4B5563' : '#EA4335';
-              }
-              if (status === 'online') {
-                return '#60A5FA';
-              } else if (status === 'offline') {
-                return '#EA4335';
-              }
-              return '#9E9E9E';
-            },
-            'transition-duration': '0.15s',
-            'box-shadow': '0 4px 12px rgba(0, 0, 0, 0.15)'
-          }
-        },
-        {
-          selector: 'node:selected',
-          style: {
-            'border-width': '2px',
-            'border-color': function(ele) {
-              const status = ele.data('status');
-              const role = ele.data('role');
-              if (role === 'central') {
-                return status === 'online' ? '#4B5563' : '#EA4335';
-              }
-              if (status === 'online') {
-                return '#60A5FA';
-              } else if (status === 'offline') {
-                return '#EA4335';
-              }
-              return '#9E9E9E';
-            },
-            'background-color': '#FFFFFF',
-            'z-index': 1000,
-            'box-shadow': '0 6px 16px rgba(0, 0, 0, 0.2)'
-          }
-        },
-        {
-          selector: 'edge',
-          style: {
-            'width': 1,
-            'line-color': '#9CA3AF', // Kubeflow 기본 엣지 색상
-            'line-style': 'solid',
-            'target-arrow-shape': 'triangle',
-            'target-arrow-color': '#9CA3AF',
-            'target-arrow-size': '8px',
-            'target-arrow-fill': 'filled',
-            'curve-style': 'bezier',
-            'control-point-distances': [0, -20],
-            'control-point-weights': [0.25, 0.75],
-            'opacity': 0.6,
-            'transition-property': 'width, line-color, opacity',
-            'transition-duration': '0.2s'
-          }
-        },
-        {
-          selector: 'edge:hover',
-          style: {
-            'width': 1.5,
-            'line-color': '#6366F1',
-            'target-arrow-color': '#6366F1',
-            'opacity': 0.9
-          }
-        },
-        {
-          selector: 'edge:selected',
-          style: {
-            'width': 1.5,
-            'line-color': '#6366F1',
-            'target-arrow-color': '#6366F1',
-            'opacity': 1
-          }
-        }
-      ],
-      layout: (typeof cytoscapeDagre !== 'undefined') ? {
-        name: 'dagre',
-        rankDir: 'TB',
-        nodeSep: 80,
-        edgeSep: 40,
-        rankSep: 120,
-        ranker: 'network-simplex',
-        padding: 40
-      } : {
-        name: 'breadthfirst',
-        directed: true,
-        spacingFactor: 1.2,
-        padding: 40,
-        roots: centralServer ? `#${centralServer.id}` : undefined
+    const diff = await fetchGraphDiff(serverGraphState, { detail: 'nodes' });
+    // 더 최근 요청이 있으면 그 응답으로 반영
+    if (!diff) return;
+    if (!serverCy) {
+      if (!diff.reset) {
+        // 요청 중에 그래프가 제거됨: 전체 요소를 다시 받음
+        return renderServerGraph(servers);
       }
-    });
-
-    // 그래프 배경 설정 (Kubeflow 스타일)
-    container.style.background = '#FAFBFC';
-    container.style.border = '1px solid #E5E7EB';
-    container.style.borderRadius = '8px';
-
-    // 노드 클릭 이벤트는 외부에서 설정 (showServerDetailsPanel 함수 필요)
-    serverCy.on('tap', 'node', function(evt) {
-      const node = evt.target;
-      const data = node.data();
-      
-      // 다른 노드 선택 해제
-      serverCy.elements().removeClass('selected');
-      // 현재 노드 선택
-      node.addClass('selected');
-      // 연결된 엣지 선택
-      node.connectedEdges().addClass('selected');
-      
-      // 상세 정보 패널 표시 (외부 함수 호출)
-      if (window.showServerDetailsPanel) {
-        window.showServerDetailsPanel(data);
-      }
-    });
-
-    // 배경 클릭 시 패널 닫기
-    serverCy.on('tap', function(evt) {
-      if (evt.target === serverCy) {
-        serverCy.elements().removeClass('selected');
-        if (window.closeServerDetailsPanel) {
-          window.closeServerDetailsPanel();
-        }
-      }
-    });
+      createServerGraph(container);
+    }
+    applyGraphDiff(serverCy, serverGraphState, diff, decorateServer);
+    if (diff.reset) {
+      fitServerGraph();
+    }
 
-    console.log('서버 그래프 렌더링 완료:', nodes.length, '노드,', edges.length, '엣지');
+    console.log('서버 그래프 반영 완료: revision', diff.revision, '변경', diff.upsert.length, '삭제', diff.remove.length);
   } catch (error) {
     console.error('서버 그래프 렌더링 오류:', error);
+    destroyServerGraph();
     container.innerHTML = '<div style="padding: 20px; text-align: center; color: #f00;">그래프를 렌더링하는 중 오류가 발생했습니다. 콘솔을 확인하세요.</div>';
   }
 }
 
-export function resetServerGraphLayout() {
-  if (serverCy) {
-    const centralNode = serverCy.nodes('[isCentral = true]');
-    const layoutOptions = (typeof cytoscapeDagre !== 'undefined') ? {
-      name: 'dagre',
-      rankDir: 'TB',
-      nodeSep: 80,
-      edgeSep: 40,
-      rankSep: 120,
-      ranker: 'network-simplex',
-      padding: 40
-    } : {
-      name: 'breadthfirst',
-      directed: true,
-      spacingFactor: 1.2,
-      padding: 40,
-      roots: centralNode.length > 0 ? `#${centralNode[0].id()}` : undefined
-    };
-    serverCy.layout(layoutOptions).run();
+export async function resetServerGraphLayout() {
+  if (!serverCy) return;
+  try {
+    // 저장한 위치를 지우면 서버가 처음 배정한 위치를 다음 diff로 돌려줌
+    await resetGraphPositions(serverCy.nodes().map(node => node.id()));
+    await renderServerGraph(serverCy.nodes().map(node => ({ id: node.data('fullId'), role: node.data('role') })));
+    fitServerGraph();
+  } catch (error) {
+    console.error('서버 그래프 레이아웃 초기화 오류:', error);
   }
 }
 
@@ -15,14 +15,25 @@ export function setServerStateSetter(setter) {
   setCurrentServers = setter;
 }
 
-export async function loadServerList() {
+// 지금까지 불러온 서버와 다음 페이지 커서 (append=true면 이어서 조회)
+let loadedServers = [];
+let nextCursor = null;
+
+export async function loadServerList(append = false) {
   try {
-    const servers = await nodesAPI.getNodesStatus();
+    // 새로고침은 이미 펼친 만큼을 한 페이지로 다시 조회
+    const params = append && nextCursor
+      ? { cursor: nextCursor }
+      : { limit: loadedServers.length || undefined };
+    const page = await nodesAPI.getNodesStatusPage(params);
     
     // 응답이 배열인지 확인
-    if (!Array.isArray(servers)) {
+    if (!Array.isArray(page.items)) {
       throw new Error('서버 목록 형식이 올바르지 않습니다');
     }
+    const servers = append ? loadedServers.concat(page.items) : page.items;
+    loadedServers = servers;
+    nextCursor = page.nextCursor;
     
     // 전역 변수에 저장 (그래프에서 사용)
     if (setCurrentServers) {
@@ -104,6 +115,14 @@ export async function loadServerList() {
       serverList.appendChild(serverItem);
     });
     
+    if (nextCursor) {
+      const more = document.createElement('button');
+      more.className = 'btn-modern btn-primary';
+      more.innerHTML = '<i class="fas fa-chevron-down"></i><span>더 보기</span>';
+      more.onclick = () => loadServerList(true);
+      serverList.appendChild(more);
+    }
+    
     // 서버 그래프 뷰가 활성화되어 있으면 그래프도 업데이트
     if (document.getElementById('serverGraphView') && document.getElementById('serverGraphView').style.display !== 'none') {
       renderServerGraph(servers);
@@ -114,6 +133,8 @@ export async function loadServerList() {
     showToast(errorMessage, 'error');
     
     // 에러 발생 시에도 currentServers를 빈 배열로 초기화하여 UI 일관성 유지
+    loadedServers = [];
+    nextCursor = null;
     if (setCurrentServers) {
       setCurrentServers([]);
     }
@@ -122,7 +122,7 @@ async function reloadContainers() {
 
     // 그래프 뷰가 활성화되어 있으면 그래프도 업데이트
     if (document.getElementById('graphView').style.display !== 'none') {
-      renderGraph(data);
+      renderGraph(nodeId);
     }
 
     const now = new Date();
@@ -419,7 +419,7 @@ async function testServerConnectionById(serverId) {
 // 노드 선택 드롭다운 업데이트
 async function updateNodeSelect() {
   try {
-    const nodes = await nodesAPI.getNodes();
+    const nodes = await nodesAPI.getNodes({ fields: 'id,label', limit: 1000 });
     
     const nodeSelect = document.getElementById('nodeSelect');
     const currentValue = nodeSelect.value;
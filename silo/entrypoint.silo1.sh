@@ -7,11 +7,10 @@ service ssh start
 # - host 설정을 통해 내부 socket과 외부 TCP 포트(2375) 모두 엽니다.
 dockerd --host=unix:///var/run/docker.sock --host=tcp://0.0.0.0:2375 &
 
-# 3. Docker가 완전히 켜질 때까지 잠시 대기
+# 3. Docker API가 응답할 때까지 대기 (/_ping)
 echo "Waiting for Docker daemon to start..."
-while (! docker stats --no-stream > /dev/null 2>&1); do
-  # Docker가 아직 안 켜졌으면 1초 대기
-  sleep 1
+until curl -fsS --unix-socket /var/run/docker.sock http://localhost/_ping > /dev/null 2>&1; do
+  sleep 0.2
 done
 echo "Docker daemon started!"
 
@@ -33,13 +32,20 @@ if [ -f "$MINIO_COMPOSE" ]; then
         exit 1
     fi
     
-    # MinIO 컨테이너 시작 확인
+    # MinIO가 응답할 때까지 대기 (/minio/health/live, 최대 MINIO_READY_TIMEOUT초)
     echo "Waiting for MinIO to start..."
-    sleep 3
-    if docker ps | grep -q "minio-silo${SILO_NUM}"; then
-        echo "MinIO started successfully for silo-${SILO_NUM}!"
+    MINIO_READY_TIMEOUT="${MINIO_READY_TIMEOUT:-60}"
+    deadline=$((SECONDS + MINIO_READY_TIMEOUT))
+    until curl -fsS http://localhost:9000/minio/health/live > /dev/null 2>&1; do
+        if [ "$SECONDS" -ge "$deadline" ]; then
+            break
+        fi
+        sleep 0.5
+    done
+    if curl -fsS http://localhost:9000/minio/health/live > /dev/null 2>&1; then
+        echo "MinIO started successfully for silo-${SILO_NUM}! (${SECONDS}s)"
     else
-        echo "Warning: MinIO container may not have started properly."
+        echo "Warning: MinIO did not become ready within ${MINIO_READY_TIMEOUT}s."
     fi
 else
     echo "Warning: MinIO compose file not found: $MINIO_COMPOSE"